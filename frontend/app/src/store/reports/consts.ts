@@ -14,5 +14,17 @@ export const costBasisMethodData: ActionDataEntry<CostBasisMethod>[] = [
     label: i18n
       .t('account_settings.cost_basis_method_settings.labels.lifo')
       .toString()
+  },
+  {
+    identifier: CostBasisMethod.Hifo,
+    label: i18n
+      .t('account_settings.cost_basis_method_settings.labels.hifo')
+      .toString()
+  },
+  {
+    identifier: CostBasisMethod.Lofo,
+    label: i18n
+      .t('account_settings.cost_basis_method_settings.labels.lofo')
+      .toString()
   }
 ];
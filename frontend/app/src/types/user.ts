@@ -50,7 +50,9 @@ export type GeneralSettings = z.infer<typeof GeneralSettings>;
 
 export enum CostBasisMethod {
   Fifo = 'fifo',
-  Lifo = 'lifo'
+  Lifo = 'lifo',
+  Hifo = 'hifo',
+  Lofo = 'lofo'
 }
 
 export const CostBasisMethodEnum = z.nativeEnum(CostBasisMethod);
@@ -1,9 +1,17 @@
 import logging
+from itertools import islice
 from pathlib import Path
 from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple
 
 import gevent
 
+from rotkehlchen.accounting.checkpoints import (
+    AccountingCheckpoint,
+    EventsCursor,
+    EventsFingerprint,
+    get_checkpoint_timestamps,
+    settings_fingerprint,
+)
 from rotkehlchen.accounting.constants import FREE_PNL_EVENTS_LIMIT
 from rotkehlchen.accounting.export.csv import CSVExporter
 from rotkehlchen.accounting.mixins.event import AccountingEventMixin
@@ -13,8 +21,9 @@ from rotkehlchen.accounting.types import MissingPrice
 from rotkehlchen.db.reports import DBAccountingReports
 from rotkehlchen.db.settings import DBSettings
 from rotkehlchen.errors.asset import UnknownAsset, UnprocessableTradePair, UnsupportedAsset
-from rotkehlchen.errors.misc import RemoteError
+from rotkehlchen.errors.misc import InputError, RemoteError
 from rotkehlchen.errors.price import NoPriceForGivenTimestamp, PriceQueryUnsupportedAsset
+from rotkehlchen.errors.serialization import DeserializationError
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.premium.premium import Premium
 from rotkehlchen.types import Timestamp
@@ -104,7 +113,9 @@ class Accountant():
 
         start_ts here is the timestamp at which to start taking trades and other
         taxable events into account. Not where processing starts from. Processing
-        always starts from the very first event we find in the history.
+        starts from the very first event we find in the history, unless a valid
+        checkpoint of the pot state taken at or before start_ts exists. Then processing
+        resumes from it.
 
         Returns the id of the generated report
         """
@@ -141,66 +152,115 @@ class Accountant():
             actions_length = len(events)
             prev_time = last_event_ts = Timestamp(0)
             ignored_ids_mapping = self.db.get_ignored_action_ids(cursor=cursor, action_type=None)
+            ignored_assets = self.db.get_ignored_assets(cursor)
+            settings_hash = settings_fingerprint(
+                settings=db_settings,
+                ignored_assets=ignored_assets,
+            )
 
-        events_iter = iter(events)
-        while True:
-            try:
-                (
-                    processed_events_num,
-                    prev_time,
-                ) = self._process_event(
-                    events_iterator=events_iter,
-                    start_ts=start_ts,
-                    end_ts=end_ts,
-                    prev_time=prev_time,
-                    db_settings=db_settings,
-                    ignored_ids_mapping=ignored_ids_mapping,
-                )
-            except PriceQueryUnsupportedAsset as e:
-                count = self._process_skipping_exception(
-                    exception=e,
-                    events=events,
-                    count=count,
-                    reason='not being able to find price for an unsupported asset',
-                )
-                continue
-            except NoPriceForGivenTimestamp as e:
-                self.pots[0].cost_basis.missing_prices.add(
-                    MissingPrice(
-                        from_asset=e.from_asset,
-                        to_asset=e.to_asset,
-                        time=e.time,
-                        rate_limited=e.rate_limited,
-                    ),
-                )
-                continue
-            except RemoteError as e:
-                count = self._process_skipping_exception(
-                    exception=e,
-                    events=events,
-                    count=count,
-                    reason='inability to reach an external service at that point in time',
-                )
-                continue
-
-            if processed_events_num == 0:
-                break  # we reached the period end
-
-            last_event_ts = prev_time
-            if count % 500 == 0:
-                # This loop can take a very long time depending on the amount of events
-                # to process. We need to yield to other greenlets or else calls to the
-                # API may time out
-                gevent.sleep(0.5)
-            count += processed_events_num
-            if not active_premium and count >= FREE_PNL_EVENTS_LIMIT:
-                log.debug(
-                    f'PnL reports event processing has hit the event limit of {events_limit}. '
-                    f'Processing stopped and the results will not '
-                    f'take into account subsequent events. Total events were {len(events)}',
+        events_iter = EventsCursor(events=events, fingerprint=None)
+        checkpoint_timestamps: List[Timestamp] = []
+        # checkpoints only make sense if events before start_ts are processed
+        if db_settings.calculate_past_cost_basis:
+            events_iter.fingerprint = EventsFingerprint(ignored_ids_mapping)
+            resumed_ts = self._maybe_resume_from_checkpoint(
+                dbpnl=dbpnl,
+                events_iter=events_iter,
+                start_ts=start_ts,
+                settings_hash=settings_hash,
+                ignored_ids_mapping=ignored_ids_mapping,
+            )
+            checkpoint_timestamps = [x for x in get_checkpoint_timestamps(start_ts) if x > resumed_ts]  # noqa: E501
+            count = events_iter.index
+
+        # resolve in bulk the prices of all events that are going to be processed
+        self.pots[0].price_table.prefetch(
+            events=islice(events, events_iter.index, None),
+            to_asset=self.pots[0].profit_currency,
+            start_ts=Timestamp(0) if db_settings.calculate_past_cost_basis else start_ts,
+            end_ts=end_ts,
+            ignored_assets=ignored_assets,
+        )
+        try:
+            while True:
+                self._maybe_add_checkpoint(
+                    dbpnl=dbpnl,
+                    events_iter=events_iter,
+                    settings_hash=settings_hash,
+                    checkpoint_timestamps=checkpoint_timestamps,
                 )
-                break
-
+                try:
+                    (
+                        processed_events_num,
+                        prev_time,
+                    ) = self._process_event(
+                        events_iterator=events_iter,
+                        start_ts=start_ts,
+                        end_ts=end_ts,
+                        prev_time=prev_time,
+                        db_settings=db_settings,
+                        ignored_ids_mapping=ignored_ids_mapping,
+                    )
+                except PriceQueryUnsupportedAsset as e:
+                    # a price may be added later. Don't persist state missing this event
+                    checkpoint_timestamps.clear()
+                    count = self._process_skipping_exception(
+                        exception=e,
+                        events=events,
+                        count=count,
+                        reason='not being able to find price for an unsupported asset',
+                    )
+                    continue
+                except NoPriceForGivenTimestamp as e:
+                    # the price may be found or added manually later, which doesn't change
+                    # the checkpoint fingerprints. Don't persist state missing this event
+                    checkpoint_timestamps.clear()
+                    self.pots[0].cost_basis.missing_prices.add(
+                        MissingPrice(
+                            from_asset=e.from_asset,
+                            to_asset=e.to_asset,
+                            time=e.time,
+                            rate_limited=e.rate_limited,
+                        ),
+                    )
+                    continue
+                except RemoteError as e:
+                    checkpoint_timestamps.clear()  # state depends on a transient failure
+                    count = self._process_skipping_exception(
+                        exception=e,
+                        events=events,
+                        count=count,
+                        reason='inability to reach an external service at that point in time',
+                    )
+                    continue
+
+                if processed_events_num == 0:
+                    break  # we reached the period end
+
+                last_event_ts = prev_time
+                if count % 500 == 0:
+                    # This loop can take a very long time depending on the amount of events
+                    # to process. We need to yield to other greenlets or else calls to the
+                    # API may time out
+                    gevent.sleep(0.5)
+                count += processed_events_num
+                if not active_premium and count >= FREE_PNL_EVENTS_LIMIT:
+                    log.debug(
+                        f'PnL reports event processing has hit the event limit of {events_limit}. '
+                        f'Processing stopped and the results will not '
+                        f'take into account subsequent events. Total events were {len(events)}',
+                    )
+                    break
+        finally:
+            # write what was processed even if processing aborts
+            self.pots[0].flush_report_data()
+
+        log.debug(
+            'End of history processing',
+            prefetched_price_hits=self.pots[0].price_table.hits,
+            prefetched_price_misses=self.pots[0].price_table.misses,
+            **self.pots[0].report_writer.get_stats(),
+        )
         dbpnl.add_report_overview(
             report_id=report_id,
             last_processed_timestamp=last_event_ts,
@@ -210,6 +270,105 @@ class Accountant():
         )
         return report_id
 
+    def _maybe_resume_from_checkpoint(
+            self,
+            dbpnl: DBAccountingReports,
+            events_iter: EventsCursor,
+            start_ts: Timestamp,
+            settings_hash: str,
+            ignored_ids_mapping: Dict[ActionType, List[str]],
+    ) -> Timestamp:
+        """Finds the latest checkpoint taken at or before start_ts whose events
+        still match the current history, restores the pot state from it and moves
+        the events cursor right after the events it covers.
+
+        Checkpoints whose events no longer match, because events before them got
+        added, edited or ignored, are deleted.
+
+        Returns the timestamp of the checkpoint used or 0 if none was used.
+        """
+        checkpoints = dbpnl.get_checkpoints(settings_hash=settings_hash, to_ts=start_ts)
+        fingerprint = EventsFingerprint(ignored_ids_mapping)
+        index = 0
+        valid: Optional[Tuple[AccountingCheckpoint, EventsFingerprint]] = None
+        for checkpoint in checkpoints:
+            if checkpoint.processed_events > len(events_iter.events):
+                dbpnl.delete_checkpoints(settings_hash=settings_hash, from_ts=checkpoint.timestamp)  # noqa: E501
+                break
+
+            while index < checkpoint.processed_events:
+                fingerprint.update(events_iter.events[index])
+                index += 1
+
+            if fingerprint.hexdigest() != checkpoint.events_hash:
+                # history before the checkpoint changed. This and all later ones are invalid
+                log.debug(f'Invalidating PnL checkpoints from {checkpoint.timestamp} onwards')
+                dbpnl.delete_checkpoints(settings_hash=settings_hash, from_ts=checkpoint.timestamp)  # noqa: E501
+                break
+
+            valid = (checkpoint, fingerprint.copy())
+
+        if valid is None:
+            return Timestamp(0)
+
+        checkpoint, fingerprint = valid
+        try:
+            self.pots[0].restore_checkpoint_state(checkpoint.state)
+        except DeserializationError as e:
+            log.error(f'Failed to restore PnL checkpoint at {checkpoint.timestamp}: {str(e)}')
+            dbpnl.delete_checkpoints(settings_hash=settings_hash)
+            self.pots[0].reset(
+                settings=self.pots[0].settings,
+                start_ts=self.pots[0].query_start_ts,
+                end_ts=self.pots[0].query_end_ts,
+                report_id=self.pots[0].report_id,  # type: ignore  # report id is set by now
+            )
+            return Timestamp(0)
+
+        log.info(
+            f'Resuming history processing from checkpoint at {checkpoint.timestamp} '
+            f'skipping {checkpoint.processed_events} already processed events',
+        )
+        events_iter.index = checkpoint.processed_events
+        events_iter.fingerprint = fingerprint
+        return checkpoint.timestamp
+
+    def _maybe_add_checkpoint(
+            self,
+            dbpnl: DBAccountingReports,
+            events_iter: EventsCursor,
+            settings_hash: str,
+            checkpoint_timestamps: List[Timestamp],
+    ) -> None:
+        """Saves a checkpoint of the pot state if the next event to process is at or
+        after the next checkpoint timestamp. Consumes passed timestamps from the list."""
+        if len(checkpoint_timestamps) == 0 or events_iter.fingerprint is None:
+            events_iter.fingerprint = None  # no more checkpoints. Stop hashing the events
+            return
+
+        next_ts = events_iter.peek_timestamp()
+        if next_ts is None or next_ts < checkpoint_timestamps[0]:
+            return
+
+        checkpoint_ts = checkpoint_timestamps.pop(0)
+        while len(checkpoint_timestamps) != 0 and next_ts >= checkpoint_timestamps[0]:
+            checkpoint_ts = checkpoint_timestamps.pop(0)
+
+        if events_iter.index == 0:
+            return  # nothing processed yet, nothing to save
+
+        # the report should have all the events the checkpoint covers
+        self.pots[0].flush_report_data()
+        dbpnl.add_checkpoint(
+            settings_hash=settings_hash,
+            checkpoint=AccountingCheckpoint(
+                timestamp=checkpoint_ts,
+                processed_events=events_iter.index,
+                events_hash=events_iter.fingerprint.hexdigest(),
+                state=self.pots[0].serialize_checkpoint_state(),
+            ),
+        )
+
     def _process_event(
             self,
             events_iterator: Iterator[AccountingEventMixin],
@@ -307,3 +466,36 @@ class Accountant():
             pnls=self.pots[0].pnls,
             directory=directory_path,
         )
+
+    def stream_export(self, report_id: Optional[int]) -> Iterator[bytes]:
+        """Returns an iterator over the bytes of the zipped CSV export of a PnL report.
+
+        The events are read from the DB in chunks and written to the zip as they come,
+        so neither the events nor the CSV are ever entirely in memory. The summary is
+        computed from the events. If no report id is given the last processed report
+        is exported.
+
+        May raise:
+        - InputError if there is no processed report or the given report does not exist
+        """
+        dbpnl = DBAccountingReports(self.db)
+        csvexporter = self.csvexporter
+        if report_id is None or report_id == self.pots[0].report_id:
+            report_id = self.pots[0].report_id
+            if report_id is None:
+                raise InputError('No history processed in order to perform an export')
+            # make sure everything processed so far is in the DB
+            self.pots[0].flush_report_data()
+        else:
+            reports, _ = dbpnl.get_reports(report_id=report_id, with_limit=False)
+            if len(reports) == 0:
+                raise InputError(f'PnL report with id {report_id} does not exist')
+            # don't touch the exporter of the current report
+            csvexporter = CSVExporter(database=self.db)
+            csvexporter.reset(
+                start_ts=Timestamp(reports[0]['start_ts']),
+                end_ts=Timestamp(reports[0]['end_ts']),
+            )
+
+        events = dbpnl.iter_report_events(report_id=report_id)
+        return csvexporter.stream_zip(events=events)
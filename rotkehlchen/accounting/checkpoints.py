@@ -0,0 +1,119 @@
+import hashlib
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, NamedTuple, Optional, Set
+
+from rotkehlchen.constants.timing import YEAR_IN_SECONDS
+from rotkehlchen.types import Timestamp
+from rotkehlchen.utils.serialization import rlk_jsondumps
+
+if TYPE_CHECKING:
+    from rotkehlchen.accounting.mixins.event import AccountingEventMixin
+    from rotkehlchen.accounting.structures.types import ActionType
+    from rotkehlchen.assets.asset import Asset
+    from rotkehlchen.db.settings import DBSettings
+
+# Checkpoints are taken at every multiple of this interval that falls before the
+# start of a report and also at the report start itself
+PNL_CHECKPOINT_INTERVAL = YEAR_IN_SECONDS
+# How many checkpoints per settings combination to keep in the DB
+MAX_PNL_CHECKPOINTS = 10
+
+
+class AccountingCheckpoint(NamedTuple):
+    """State of an accounting pot right before processing the first event with
+    timestamp >= `timestamp`.
+
+    - `processed_events`: How many events of the sorted history had been consumed
+    - `events_hash`: Rolling hash of those consumed events. Used to detect if any of
+    them got added, edited or ignored after the checkpoint was taken.
+    - `state`: The serialized state of the pot
+    """
+    timestamp: Timestamp
+    processed_events: int
+    events_hash: str
+    state: Dict[str, Any]
+
+
+class EventsFingerprint():
+    """Rolling hash over the accounting events in the order they are processed"""
+
+    def __init__(self, ignored_ids_mapping: Dict['ActionType', List[str]]) -> None:
+        self.ignored_ids_mapping = ignored_ids_mapping
+        self._hash = hashlib.sha256()
+
+    def update(self, event: 'AccountingEventMixin') -> None:
+        data = rlk_jsondumps(event.serialize())
+        self._hash.update(data.encode())
+        self._hash.update(b'1' if event.should_ignore(self.ignored_ids_mapping) else b'0')
+
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
+
+    def copy(self) -> 'EventsFingerprint':
+        new = EventsFingerprint(self.ignored_ids_mapping)
+        new._hash = self._hash.copy()
+        return new
+
+
+class EventsCursor():
+    """Iterator over the sorted accounting events that keeps track of how many
+    events have been consumed and of their fingerprint.
+
+    The fingerprint is only needed for taking checkpoints. It is set to None when no
+    more checkpoints are going to be taken so that the remaining events aren't hashed.
+    """
+
+    def __init__(
+            self,
+            events: List['AccountingEventMixin'],
+            fingerprint: Optional[EventsFingerprint],
+            start_index: int = 0,
+    ) -> None:
+        self.events = events
+        self.fingerprint = fingerprint
+        self.index = start_index
+
+    def __iter__(self) -> Iterator['AccountingEventMixin']:
+        return self
+
+    def __next__(self) -> 'AccountingEventMixin':
+        if self.index >= len(self.events):
+            raise StopIteration
+
+        event = self.events[self.index]
+        self.index += 1
+        if self.fingerprint is not None:
+            self.fingerprint.update(event)
+        return event
+
+    def peek_timestamp(self) -> Optional[Timestamp]:
+        """Timestamp of the next event to be consumed or None if we reached the end"""
+        if self.index >= len(self.events):
+            return None
+        return self.events[self.index].get_timestamp()
+
+
+def settings_fingerprint(settings: 'DBSettings', ignored_assets: Set['Asset']) -> str:
+    """Hash of everything apart from the events themselves that affects the pot state"""
+    data = rlk_jsondumps([
+        settings.main_currency.identifier,
+        settings.taxfree_after_period,
+        settings.include_crypto2crypto,
+        settings.calculate_past_cost_basis,
+        settings.include_gas_costs,
+        settings.account_for_assets_movements,
+        settings.cost_basis_method.serialize(),
+        settings.eth_staking_taxable_after_withdrawal_enabled,
+        sorted(x.identifier for x in ignored_assets),
+    ])
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def get_checkpoint_timestamps(
+        start_ts: Timestamp,
+        interval: int = PNL_CHECKPOINT_INTERVAL,
+) -> List[Timestamp]:
+    """Returns the ascending timestamps at which checkpoints should be taken
+    for a report starting at start_ts"""
+    timestamps = [Timestamp(x) for x in range(interval, start_ts, interval)]
+    timestamps.append(start_ts)
+    return timestamps
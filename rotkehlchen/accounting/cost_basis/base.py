@@ -1,3 +1,4 @@
+import heapq
 import logging
 from abc import ABCMeta, abstractmethod
 from collections import defaultdict, deque
@@ -25,7 +26,7 @@ from rotkehlchen.constants.assets import A_ETH, A_WETH
 from rotkehlchen.constants.misc import ZERO
 from rotkehlchen.db.settings import DBSettings
 from rotkehlchen.errors.serialization import DeserializationError
-from rotkehlchen.fval import FVal
+from rotkehlchen.fval import FixedFVal, FVal
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.types import CostBasisMethod, Location, Price, Timestamp
 from rotkehlchen.user_messages import MessagesAggregator
@@ -126,6 +127,11 @@ class BaseAcquisitionsOrder(metaclass=ABCMeta):
         """Returns read-only _acquisitions"""
         return tuple(self._acquisitions)
 
+    def restore_acquisitions(self, acquisitions: List[AssetAcquisitionEvent]) -> None:
+        """Replaces the acquisitions with the given ones. They are expected to be in
+        the order returned by get_acquisitions() so no reordering happens here."""
+        self._acquisitions = deque(acquisitions)
+
     def consume_result(self, used_amount: FVal) -> None:
         """This function should be used to consume results of the
         currently processed event (received from __next__)
@@ -136,11 +142,11 @@ class BaseAcquisitionsOrder(metaclass=ABCMeta):
         """
         # this is a temporary assertion to test that new accounting tools work properly.
         # Written on 06.06.2022 and can be removed after a couple of months if everything goes well
-        assert ZERO <= used_amount <= self._acquisitions[0].remaining_amount, \
+        assert 0 <= used_amount <= self._acquisitions[0].remaining_amount, \
             f'Used amount must be in the interval [0, {self._acquisitions[0].remaining_amount}] but it was {used_amount}'  # noqa: E501
 
         self._acquisitions[0].remaining_amount -= used_amount
-        if self._acquisitions[0].remaining_amount == ZERO:
+        if self._acquisitions[0].remaining_amount == 0:
             self._acquisitions.popleft()
 
     def __len__(self) -> int:
@@ -159,6 +165,77 @@ class LIFOAcquisitionsOrder(BaseAcquisitionsOrder):
         self._acquisitions.appendleft(acquisition)
 
 
+class SortedAcquisitionsOrder(BaseAcquisitionsOrder, metaclass=ABCMeta):
+    """Base for orders that are not defined by the time of the acquisitions.
+
+    The acquisitions are kept in a binary heap keyed by sort_key() so that adding an
+    acquisition and consuming the first one are O(log n) no matter how many lots there
+    are. Acquisitions with equal keys are processed in the order they were added.
+    """
+    _heap: List[Tuple[Any, int, AssetAcquisitionEvent]]
+
+    def __init__(self) -> None:  # pylint: disable=super-init-not-called
+        self._heap = []
+        self._counter = 0
+
+    @staticmethod
+    @abstractmethod
+    def sort_key(acquisition: AssetAcquisitionEvent) -> Any:
+        """The key by which acquisitions are processed in ascending order"""
+        ...
+
+    def add_acquisition(self, acquisition: AssetAcquisitionEvent) -> None:
+        heapq.heappush(self._heap, (self.sort_key(acquisition), self._counter, acquisition))
+        self._counter += 1
+
+    def processing_iterator(self) -> Iterator[AssetAcquisitionEvent]:
+        while len(self._heap) > 0:
+            yield self._heap[0][2]
+
+    def get_acquisitions(self) -> Tuple[AssetAcquisitionEvent, ...]:
+        """Returns the acquisitions in processing order. This is O(n log n)"""
+        return tuple(x[2] for x in sorted(self._heap))
+
+    def restore_acquisitions(self, acquisitions: List[AssetAcquisitionEvent]) -> None:
+        self._heap = [(self.sort_key(x), idx, x) for idx, x in enumerate(acquisitions)]
+        heapq.heapify(self._heap)
+        self._counter = len(acquisitions)
+
+    def consume_result(self, used_amount: FVal) -> None:
+        """Same as BaseAcquisitionsOrder.consume_result() for the first acquisition
+        of the heap. Reducing the remaining amount does not change the order.
+
+        May raise:
+        - IndexError if the method was called when acquisitions were empty
+        """
+        acquisition = self._heap[0][2]
+        assert 0 <= used_amount <= acquisition.remaining_amount, \
+            f'Used amount must be in the interval [0, {acquisition.remaining_amount}] but it was {used_amount}'  # noqa: E501
+
+        acquisition.remaining_amount -= used_amount
+        if acquisition.remaining_amount == 0:
+            heapq.heappop(self._heap)
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+
+class HIFOAcquisitionsOrder(SortedAcquisitionsOrder):
+    """Accounting in HIFO (highest-in-first-out) order. The acquisition with
+    the highest rate is used first"""
+    @staticmethod
+    def sort_key(acquisition: AssetAcquisitionEvent) -> Any:
+        return -acquisition.rate
+
+
+class LOFOAcquisitionsOrder(SortedAcquisitionsOrder):
+    """Accounting in LOFO (lowest-in-first-out) order. The acquisition with
+    the lowest rate is used first"""
+    @staticmethod
+    def sort_key(acquisition: AssetAcquisitionEvent) -> Any:
+        return acquisition.rate
+
+
 class CostBasisEvents:
     used_acquisitions: List[AssetAcquisitionEvent]
     acquisitions_manager: BaseAcquisitionsOrder
@@ -172,6 +249,10 @@ class CostBasisEvents:
             self.acquisitions_manager = FIFOAcquisitionsOrder()
         elif cost_basis_method == CostBasisMethod.LIFO:
             self.acquisitions_manager = LIFOAcquisitionsOrder()
+        elif cost_basis_method == CostBasisMethod.HIFO:
+            self.acquisitions_manager = HIFOAcquisitionsOrder()
+        elif cost_basis_method == CostBasisMethod.LOFO:
+            self.acquisitions_manager = LOFOAcquisitionsOrder()
         self.spends = []
         self.used_acquisitions = []
 
@@ -286,16 +367,36 @@ class CostBasisInfo(NamedTuple):
 
 
 class CostBasisCalculator(CustomizableDateMixin):
+    """Matches spends to acquisitions according to the cost basis method.
+
+    If `fixed_point` is True, amounts and rates are kept as FixedFVal while processing,
+    which is much faster for big histories. All results are returned as FVal.
+    """
 
     def __init__(
             self,
             database: 'DBHandler',
             msg_aggregator: MessagesAggregator,
+            fixed_point: bool = False,
     ) -> None:
         super().__init__(database=database)
         self.msg_aggregator = msg_aggregator
+        self.fixed_point = fixed_point
         self.reset(self.settings)
 
+    def _to_internal(self, value: FVal) -> FVal:
+        """Convert a value to the numeric type used during processing"""
+        if self.fixed_point:
+            return FixedFVal(value)  # type: ignore  # same interface as FVal
+        return value
+
+    @staticmethod
+    def _to_fval(value: FVal) -> FVal:
+        """Convert a value used during processing to FVal. Always lossless"""
+        if isinstance(value, FixedFVal):
+            return value.to_fval()
+        return value
+
     def reset(self, settings: DBSettings) -> None:
         self.settings = settings
         self.profit_currency = settings.main_currency
@@ -303,6 +404,66 @@ class CostBasisCalculator(CustomizableDateMixin):
         self.missing_acquisitions: List[MissingAcquisition] = []
         self.missing_prices: Set[MissingPrice] = set()
 
+    def serialize_state(self) -> Dict[str, Any]:
+        """Serialize the remaining acquisitions and the missing information found so far
+        so that processing can later be resumed from this point. Spends are not kept
+        since they are not used after being processed."""
+        acquisitions = {}
+        for asset, asset_events in self._events.items():
+            entries = []
+            for acquisition_event in asset_events.acquisitions_manager.get_acquisitions():
+                entry = acquisition_event.serialize()
+                entry['remaining_amount'] = str(acquisition_event.remaining_amount)
+                entries.append(entry)
+            acquisitions[asset.identifier] = entries
+
+        return {
+            'acquisitions': acquisitions,
+            'missing_acquisitions': [x.serialize() for x in self.missing_acquisitions],
+            'missing_prices': [x.serialize() for x in self.missing_prices],
+        }
+
+    def restore_state(self, data: Dict[str, Any]) -> None:
+        """Restore the state created by serialize_state(). Should be called after reset()
+
+        May raise:
+        - DeserializationError if the data is malformed
+        """
+        try:
+            for identifier, entries in data['acquisitions'].items():
+                acquisitions = []
+                for entry in entries:
+                    acquisition_event = AssetAcquisitionEvent(
+                        amount=self._to_internal(FVal(entry['full_amount'])),
+                        timestamp=Timestamp(entry['timestamp']),
+                        rate=Price(self._to_internal(FVal(entry['rate']))),
+                        index=entry['index'],
+                    )
+                    acquisition_event.remaining_amount = self._to_internal(FVal(entry['remaining_amount']))  # noqa: E501
+                    acquisitions.append(acquisition_event)
+                self._events[Asset(identifier)].acquisitions_manager.restore_acquisitions(acquisitions)  # noqa: E501
+
+            self.missing_acquisitions = [
+                MissingAcquisition(
+                    asset=Asset(entry['asset']),
+                    time=Timestamp(entry['time']),
+                    found_amount=FVal(entry['found_amount']),
+                    missing_amount=FVal(entry['missing_amount']),
+                ) for entry in data['missing_acquisitions']
+            ]
+            self.missing_prices = {
+                MissingPrice(
+                    from_asset=Asset(entry['from_asset']),
+                    to_asset=Asset(entry['to_asset']),
+                    time=Timestamp(entry['time']),
+                    rate_limited=entry['rate_limited'],
+                ) for entry in data['missing_prices']
+            }
+        except (KeyError, ValueError) as e:
+            raise DeserializationError(
+                f'Could not restore cost basis state due to {str(e)}',
+            ) from e
+
     def get_events(self, asset: Asset) -> CostBasisEvents:
         """Custom getter for events so that we have common cost basis for some assets"""
         if asset == A_WETH:
@@ -323,19 +484,20 @@ class CostBasisCalculator(CustomizableDateMixin):
         if len(asset_events.acquisitions_manager) == 0:
             return False
 
-        remaining_amount = amount
+        remaining_amount = self._to_internal(amount)
         for acquisition_event in asset_events.acquisitions_manager.processing_iterator():
             if remaining_amount < acquisition_event.remaining_amount:
                 asset_events.acquisitions_manager.consume_result(remaining_amount)
-                remaining_amount = ZERO
+                remaining_amount = self._to_internal(ZERO)
                 # stop iterating since we found all acquisitions to satisfy reduction
                 break
 
             remaining_amount -= acquisition_event.remaining_amount
             asset_events.acquisitions_manager.consume_result(acquisition_event.remaining_amount)
 
-        if remaining_amount != ZERO:
+        if remaining_amount != 0:
             if not asset.is_fiat():
+                remaining_amount = self._to_fval(remaining_amount)
                 self.missing_acquisitions.append(
                     MissingAcquisition(
                         asset=asset,
@@ -354,6 +516,9 @@ class CostBasisCalculator(CustomizableDateMixin):
     ) -> None:
         """Adds an acquisition event for an asset"""
         asset_event = AssetAcquisitionEvent.from_processed_event(event=event)
+        if self.fixed_point:
+            asset_event.amount = asset_event.remaining_amount = self._to_internal(asset_event.amount)  # noqa: E501
+            asset_event.rate = Price(self._to_internal(asset_event.rate))
         asset_events = self.get_events(event.asset)
         asset_events.acquisitions_manager.add_acquisition(asset_event)
 
@@ -443,8 +608,9 @@ class CostBasisCalculator(CustomizableDateMixin):
         Returns the information in a CostBasisInfo object if enough acquisitions have
         been found.
         """
-        remaining_sold_amount = spending_amount
-        taxfree_bought_cost = taxable_bought_cost = taxable_amount = taxfree_amount = ZERO  # noqa: E501
+        remaining_sold_amount = self._to_internal(spending_amount)
+        zero = self._to_internal(ZERO)
+        taxfree_bought_cost = taxable_bought_cost = taxable_amount = taxfree_amount = zero  # noqa: E501
         matched_acquisitions = []
         asset_events = self.get_events(spending_asset)
 
@@ -479,12 +645,12 @@ class CostBasisCalculator(CustomizableDateMixin):
                     time=self.timestamp_to_date(acquisition_event.timestamp),
                 )
                 matched_acquisitions.append(MatchedAcquisition(
-                    amount=remaining_sold_amount,
+                    amount=self._to_fval(remaining_sold_amount),
                     event=acquisition_event,
                     taxable=taxable,
                 ))
                 asset_events.acquisitions_manager.consume_result(remaining_sold_amount)
-                remaining_sold_amount = ZERO
+                remaining_sold_amount = zero
                 # stop iterating since we found all acquisitions to satisfy this spend
                 break
 
@@ -509,15 +675,17 @@ class CostBasisCalculator(CustomizableDateMixin):
                 time=self.timestamp_to_date(acquisition_event.timestamp),
             )
             matched_acquisitions.append(MatchedAcquisition(
-                amount=acquisition_event.remaining_amount,
+                amount=self._to_fval(acquisition_event.remaining_amount),
                 event=acquisition_event,
                 taxable=taxable,
             ))
             asset_events.used_acquisitions.append(acquisition_event)
             asset_events.acquisitions_manager.consume_result(acquisition_event.remaining_amount)
             # and since this event is going to be removed, reduce its remaining to zero
-            acquisition_event.remaining_amount = ZERO
+            acquisition_event.remaining_amount = zero
 
+        taxable_amount, taxfree_amount = self._to_fval(taxable_amount), self._to_fval(taxfree_amount)  # noqa: E501
+        remaining_sold_amount = self._to_fval(remaining_sold_amount)
         is_complete = True
         if remaining_sold_amount != ZERO:
             # if we still have sold amount but no acquisitions to satisfy it then we only
@@ -536,8 +704,8 @@ class CostBasisCalculator(CustomizableDateMixin):
 
         return CostBasisInfo(
             taxable_amount=taxable_amount,
-            taxable_bought_cost=taxable_bought_cost,
-            taxfree_bought_cost=taxfree_bought_cost,
+            taxable_bought_cost=self._to_fval(taxable_bought_cost),
+            taxfree_bought_cost=self._to_fval(taxfree_bought_cost),
             matched_acquisitions=matched_acquisitions,
             is_complete=is_complete,
         )
@@ -548,7 +716,7 @@ class CostBasisCalculator(CustomizableDateMixin):
         """
         asset_events = self.get_events(asset)
 
-        amount = ZERO
+        amount = self._to_internal(ZERO)
         for acquisition_event in asset_events.acquisitions_manager.get_acquisitions():
             amount += acquisition_event.remaining_amount
-        return amount if amount != ZERO else None
+        return self._to_fval(amount) if amount != 0 else None
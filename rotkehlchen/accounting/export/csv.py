@@ -1,9 +1,23 @@
 import json
 import logging
+from contextlib import closing
 from csv import DictWriter
+from io import TextIOWrapper
+from itertools import chain
 from pathlib import Path
 from tempfile import mkdtemp
-from typing import TYPE_CHECKING, Any, Dict, List, Literal, Tuple
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Tuple,
+)
 from zipfile import ZIP_DEFLATED, ZipFile
 
 from rotkehlchen.accounting.pnl import PnlTotals
@@ -34,32 +48,73 @@ ACCOUNTING_SETTINGS = (
 )
 
 CSV_INDEX_OFFSET = 2  # skip title row and since counting starts from 1
+# Rows written to a streamed zip between handing out the compressed bytes
+STREAM_ZIP_ROWS_PER_CHUNK = 500
 
 
 class CSVWriteError(Exception):
     pass
 
 
-def _dict_to_csv_file(path: Path, dictionary_list: List) -> None:
-    """Takes a filepath and a list of dictionaries representing the rows and writes them
-    into the file as a CSV
+def _write_csv_rows(f: IO[str], rows: Iterable[Dict[str, Any]], name: str) -> Iterator[None]:
+    """Writes the rows to the given text file as CSV, using the keys of the first
+    row as the header. Yields after each row so that the caller can consume the
+    file while it's being written.
+
+    May raise:
+    - CSVWriteError if DictWriter.writerow() tried to write a dict contains
+    fields not in fieldnames
+    """
+    writer = None
+    try:
+        for row in rows:
+            if writer is None:
+                writer = DictWriter(f, fieldnames=row.keys())
+                writer.writeheader()
+            writer.writerow(row)
+            yield None
+    except ValueError as e:
+        raise CSVWriteError(f'Failed to write {name} CSV due to {str(e)}') from e
+
+
+def _dict_to_csv_file(path: Path, dictionary_list: Iterable[Dict[str, Any]]) -> None:
+    """Takes a filepath and an iterable of dictionaries representing the rows and
+    writes them into the file as a CSV. The rows are written as they are consumed.
 
     May raise:
     - CSVWriteError if DictWriter.writerow() tried to write a dict contains
     fields not in fieldnames
     """
-    if len(dictionary_list) == 0:
+    rows = iter(dictionary_list)
+    first_row = next(rows, None)
+    if first_row is None:
         log.debug('Skipping writting empty CSV for {}'.format(path))
         return
 
     with open(path, 'w', newline='') as f:
-        w = DictWriter(f, fieldnames=dictionary_list[0].keys())
-        w.writeheader()
-        try:
-            for dic in dictionary_list:
-                w.writerow(dic)
-        except ValueError as e:
-            raise CSVWriteError(f'Failed to write {path} CSV due to {str(e)}') from e
+        for _ in _write_csv_rows(f=f, rows=chain((first_row,), rows), name=str(path)):
+            pass
+
+
+class _ZipStreamBuffer():
+    """A write only file object for ZipFile that keeps the written bytes until
+    they are drained. Since it can't seek or tell ZipFile writes the archive
+    sequentially, which is what allows streaming it."""
+
+    def __init__(self) -> None:
+        self.chunks: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
 
 
 class CSVExporter(CustomizableDateMixin):
@@ -154,13 +209,13 @@ class CSVExporter(CustomizableDateMixin):
 
         dict_event[f'cost_basis_{name}'] = cost_basis
 
-    def _maybe_add_summary(self, events: List[Dict[str, Any]], pnls: PnlTotals) -> None:
-        """Depending on given settings, adds a few summary lines at the end of
-        the all events PnL report"""
+    def _summary_rows(self, events_num: int, pnls: PnlTotals) -> Iterator[Dict[str, Any]]:
+        """Depending on given settings, yields a few summary lines to add at the end
+        of the all events PnL report"""
         if self.settings.pnl_csv_have_summary is False:
             return
 
-        length = len(events) + 1
+        length = events_num + 1
         template: Dict[str, Any] = {
             'type': '',
             'notes': '',
@@ -175,13 +230,13 @@ class CSVExporter(CustomizableDateMixin):
             'pnl_free': '',
             'cost_basis_free': '',
         }
-        events.append(template)  # separate with 2 new lines
-        events.append(template)
+        yield template  # separate with 2 new lines
+        yield template
 
         entry = template.copy()
         entry['taxable_amount'] = 'TAXABLE'
         entry['price'] = 'FREE'
-        events.append(entry)
+        yield entry
 
         start_sums_index = length + 4
         sums = 0
@@ -203,7 +258,7 @@ class CSVExporter(CustomizableDateMixin):
                 sum_range=f'J2:J{length}',
                 actual_value=value.free,
             )
-            events.append(entry)
+            yield entry
 
         entry = template.copy()
         entry['free_amount'] = 'TOTAL'
@@ -212,52 +267,101 @@ class CSVExporter(CustomizableDateMixin):
             entry['price'] = f'=SUM(H{start_sums_index}:H{start_sums_index+sums-1})'
         else:
             entry['taxable_amount'] = entry['price'] = 0
-        events.append(entry)
+        yield entry
 
-        events.append(template)  # separate with 2 new lines
-        events.append(template)
+        yield template  # separate with 2 new lines
+        yield template
 
         version_result = get_current_version(check_for_updates=False)
         entry = template.copy()
         entry['free_amount'] = 'rotki version'
         entry['taxable_amount'] = version_result.our_version
-        events.append(entry)
+        yield entry
 
         for setting in ACCOUNTING_SETTINGS:
             entry = template.copy()
             entry['free_amount'] = setting
             entry['taxable_amount'] = str(getattr(self.settings, setting))
-            events.append(entry)
+            yield entry
+
+    def iter_rows(
+            self,
+            events: Iterable['ProcessedAccountingEvent'],
+            pnls: Optional[PnlTotals] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Yields the CSV rows of the given events followed by the summary rows.
+
+        If no pnls are given the summary is computed from running totals of the
+        events' PnL, so that the events can be streamed without keeping them around.
+        """
+        running_pnls = PnlTotals() if pnls is None else pnls
+        events_num = 0
+        for event in events:
+            events_num += 1
+            if pnls is None:
+                running_pnls[event.type] += event.pnl
+            yield self.to_csv_entry(event)
+
+        yield from self._summary_rows(events_num=events_num, pnls=running_pnls)
+
+    def _write_zip_entry(self, csv_zip: ZipFile, rows: Iterable[Dict[str, Any]]) -> Iterator[None]:  # noqa: E501
+        """Writes the rows as the all events CSV of the zip. Yields after each row.
+
+        May raise:
+        - CSVWriteError if a row can't be written
+        """
+        # the size is not known in advance so allow for a zip64 entry
+        with TextIOWrapper(
+            csv_zip.open(FILENAME_ALL_CSV, mode='w', force_zip64=True),
+            encoding='utf-8',
+            newline='',
+        ) as f:
+            yield from _write_csv_rows(f=f, rows=rows, name=FILENAME_ALL_CSV)
 
     def create_zip(
             self,
-            events: List['ProcessedAccountingEvent'],
-            pnls: PnlTotals,
+            events: Iterable['ProcessedAccountingEvent'],
+            pnls: Optional[PnlTotals] = None,
     ) -> Tuple[bool, str]:
+        """Writes the CSV of the events directly in a zip file and returns its path"""
         # TODO: Find a way to properly delete the directory after send is complete
         dirpath = Path(mkdtemp())
-        success, msg = self.export(events=events, pnls=pnls, directory=dirpath)
-        if not success:
-            return False, msg
-
-        files: List[Tuple[Path, str]] = [
-            (dirpath / FILENAME_ALL_CSV, FILENAME_ALL_CSV),
-        ]
-        with ZipFile(file=dirpath / 'csv.zip', mode='w', compression=ZIP_DEFLATED) as csv_zip:
-            for path, filename in files:
-                if not path.exists():
-                    continue
+        try:
+            with ZipFile(file=dirpath / 'csv.zip', mode='w', compression=ZIP_DEFLATED) as csv_zip:  # noqa: E501
+                for _ in self._write_zip_entry(csv_zip, self.iter_rows(events=events, pnls=pnls)):  # noqa: E501
+                    pass
+        except (CSVWriteError, PermissionError) as e:
+            return False, str(e)
 
-                csv_zip.write(path, filename)
-                path.unlink()
+        if csv_zip.filename is None:
+            return False, ''
 
-        success = False
-        filename = ''
-        if csv_zip.filename is not None:
-            success = True
-            filename = csv_zip.filename
+        return True, csv_zip.filename
 
-        return success, filename
+    def stream_zip(
+            self,
+            events: Iterable['ProcessedAccountingEvent'],
+            pnls: Optional[PnlTotals] = None,
+    ) -> Iterator[bytes]:
+        """Yields the bytes of a zip with the CSV of the events as it is being written.
+        Only a few rows and their compressed bytes are in memory at any time.
+
+        May raise:
+        - CSVWriteError if a row can't be written. Since the stream has already
+        started, the consumer gets a truncated zip.
+        """
+        buffer = _ZipStreamBuffer()
+        with ZipFile(file=buffer, mode='w', compression=ZIP_DEFLATED) as csv_zip:  # type: ignore  # noqa: E501  # ZipFile only needs write and flush
+            rows = self.iter_rows(events=events, pnls=pnls)
+            # close the entry before the zip if the consumer stops early
+            with closing(self._write_zip_entry(csv_zip, rows)) as written_rows:
+                for idx, _ in enumerate(written_rows, start=1):
+                    if idx % STREAM_ZIP_ROWS_PER_CHUNK == 0:
+                        data = buffer.drain()
+                        if len(data) != 0:
+                            yield data
+
+        yield buffer.drain()  # the rest of the entry and the central directory
 
     def to_csv_entry(self, event: 'ProcessedAccountingEvent') -> Dict[str, Any]:
         dict_event = event.to_exported_dict(
@@ -277,17 +381,17 @@ class CSVExporter(CustomizableDateMixin):
 
     def export(
             self,
-            events: List['ProcessedAccountingEvent'],
-            pnls: PnlTotals,
+            events: Iterable['ProcessedAccountingEvent'],
+            pnls: Optional[PnlTotals],
             directory: Path,
     ) -> Tuple[bool, str]:
-        serialized_events = [self.to_csv_entry(x) for idx, x in enumerate(events)]
-        self._maybe_add_summary(events=serialized_events, pnls=pnls)
+        """Writes the CSV of the events in the directory as they are consumed.
+        If no pnls are given the summary is computed from the events."""
         try:
             directory.mkdir(parents=True, exist_ok=True)
             _dict_to_csv_file(
                 directory / FILENAME_ALL_CSV,
-                serialized_events,
+                self.iter_rows(events=events, pnls=pnls),
             )
         except (CSVWriteError, PermissionError) as e:
             return False, str(e)
@@ -4,7 +4,7 @@ from dataclasses import dataclass
 from typing import TYPE_CHECKING, Any, Dict, Iterator, Optional
 
 from rotkehlchen.constants import ZERO
-from rotkehlchen.fval import FVal
+from rotkehlchen.fval import FixedFVal, FVal
 
 if TYPE_CHECKING:
     from rotkehlchen.accounting.mixins.event import AccountingEventType
@@ -31,7 +31,7 @@ class PNL():
     def __add__(self, x: Any) -> 'PNL':
         if isinstance(x, PNL):
             return PNL(taxable=self.taxable + x.taxable, free=self.free + x.free)
-        if isinstance(x, (FVal, int)):
+        if isinstance(x, (FVal, FixedFVal, int)):
             return PNL(taxable=self.taxable + x, free=self.free + x)
 
         raise TypeError(f'Cant add type {type(x)} to PNL')
@@ -41,7 +41,7 @@ class PNL():
     def __sub__(self, x: Any) -> 'PNL':
         if isinstance(x, PNL):
             return PNL(taxable=self.taxable - x.taxable, free=self.free - x.free)
-        if isinstance(x, (FVal, int)):
+        if isinstance(x, (FVal, FixedFVal, int)):
             return PNL(taxable=self.taxable - x, free=self.free - x)
 
         raise TypeError(f'Cant sub type {type(x)} from PNL')
@@ -51,7 +51,7 @@ class PNL():
     def __mul__(self, x: Any) -> 'PNL':
         if isinstance(x, PNL):
             return PNL(taxable=self.taxable * x.taxable, free=self.free * x.free)
-        if isinstance(x, (FVal, int)):
+        if isinstance(x, (FVal, FixedFVal, int)):
             return PNL(taxable=self.taxable * x, free=self.free * x)
 
         raise TypeError(f'Cant mul type {type(x)} with PNL')
@@ -59,16 +59,30 @@ class PNL():
     __rmul__ = __mul__
 
 
-class PnlTotals(MutableMapping):
+def _fixed_pnl() -> PNL:
+    return PNL(free=FixedFVal(0), taxable=FixedFVal(0))  # type: ignore  # same interface as FVal
+
 
-    def __init__(self, totals: Optional[Dict['AccountingEventType', PNL]] = None) -> None:
-        self.totals: Dict['AccountingEventType', PNL] = defaultdict(PNL)
+class PnlTotals(MutableMapping):
+    """The PnL per event type.
+
+    If `fixed_point` is True the totals are accumulated as FixedFVal, which is
+    much faster for big histories. The taxable and free properties are always FVal.
+    """
+
+    def __init__(
+            self,
+            totals: Optional[Dict['AccountingEventType', PNL]] = None,
+            fixed_point: bool = False,
+    ) -> None:
+        self.fixed_point = fixed_point
+        self.reset()
         if totals is not None:
             for event_type, entry in totals.items():
                 self.totals[event_type] = entry
 
     def reset(self) -> None:
-        self.totals = defaultdict(PNL)
+        self.totals: Dict['AccountingEventType', PNL] = defaultdict(_fixed_pnl if self.fixed_point else PNL)  # noqa: E501
 
     def __repr__(self) -> str:
         result = ','.join(f'{event_type}: {totals}' for event_type, totals in self.totals.items())
@@ -1,4 +1,5 @@
 import logging
+from itertools import islice
 from typing import TYPE_CHECKING, Any, Dict, List, Literal, Optional, Tuple
 
 from rotkehlchen.accounting.cost_basis import CostBasisCalculator
@@ -8,12 +9,13 @@ from rotkehlchen.accounting.cost_basis.prefork import (
 )
 from rotkehlchen.accounting.mixins.event import AccountingEventType
 from rotkehlchen.accounting.pnl import PNL, PnlTotals
+from rotkehlchen.accounting.prices import AccountingPriceTable
 from rotkehlchen.accounting.structures.processed_event import ProcessedAccountingEvent
 from rotkehlchen.accounting.transactions import TransactionsAccountant
 from rotkehlchen.assets.asset import Asset
 from rotkehlchen.constants.assets import A_KFEE
 from rotkehlchen.constants.misc import ONE, ZERO
-from rotkehlchen.db.reports import DBAccountingReports
+from rotkehlchen.db.reports import ReportDataWriter
 from rotkehlchen.db.settings import DBSettings
 from rotkehlchen.errors.misc import InputError, RemoteError
 from rotkehlchen.errors.price import NoPriceForGivenTimestamp, PriceQueryUnsupportedAsset
@@ -44,14 +46,18 @@ class AccountingPot(CustomizableDateMixin):
             database: 'DBHandler',
             evm_accounting_aggregator: 'EVMAccountingAggregator',
             msg_aggregator: MessagesAggregator,
+            fixed_point: bool = False,
     ) -> None:
+        """If `fixed_point` is True cost basis and PnL totals use FixedFVal arithmetic"""
         super().__init__(database=database)
         self.profit_currency = self.settings.main_currency.resolve_to_asset_with_oracles()
         self.cost_basis = CostBasisCalculator(
             database=database,
             msg_aggregator=msg_aggregator,
+            fixed_point=fixed_point,
         )
-        self.pnls = PnlTotals()
+        self.pnls = PnlTotals(fixed_point=fixed_point)
+        self.price_table = AccountingPriceTable()
         self.processed_events: List[ProcessedAccountingEvent] = []
         self.transactions = TransactionsAccountant(
             evm_accounting_aggregator=evm_accounting_aggregator,
@@ -59,23 +65,28 @@ class AccountingPot(CustomizableDateMixin):
         )
         self.query_start_ts = self.query_end_ts = Timestamp(0)
         self.report_id: Optional[int] = None
+        self.report_writer = ReportDataWriter(
+            database=database,
+            ts_converter=self.timestamp_to_date,
+        )
 
     def _add_processed_event(self, event: ProcessedAccountingEvent) -> None:
-        dbpnl = DBAccountingReports(self.database)
         self.processed_events.append(event)
         try:
-            dbpnl.add_report_data(
-                report_id=self.report_id,  # type: ignore # report id is initialized by now
-                time=event.timestamp,
-                ts_converter=self.timestamp_to_date,
-                event=event,
-            )
+            self.report_writer.add(event)
         except (DeserializationError, InputError) as e:
             log.error(str(e))
             return
 
         log.debug(event.to_string(self.timestamp_to_date))
 
+    def flush_report_data(self) -> None:
+        """Write the processed events that are still buffered to the report"""
+        try:
+            self.report_writer.flush()
+        except InputError as e:
+            log.error(str(e))
+
     def get_rate_in_profit_currency(self, asset: Asset, timestamp: Timestamp) -> Price:
         """Get the profit_currency price of asset in the given timestamp
 
@@ -88,6 +99,8 @@ class AccountingPot(CustomizableDateMixin):
         """
         if asset == self.profit_currency:
             rate = Price(ONE)
+        elif (prefetched_rate := self.price_table.get_price(asset, self.profit_currency, timestamp)) is not None:  # noqa: E501
+            rate = prefetched_rate
         else:
             rate = PriceHistorian().query_historical_price(
                 from_asset=asset,
@@ -109,10 +122,58 @@ class AccountingPot(CustomizableDateMixin):
         self.query_start_ts = start_ts
         self.query_end_ts = end_ts
         self.pnls.reset()
+        self.price_table.reset()
+        self.report_writer.reset(report_id=report_id)
         self.cost_basis.reset(settings)
         self.transactions.reset()
         self.processed_events = []
 
+    def serialize_checkpoint_state(self) -> Dict[str, Any]:
+        """Serialize the state needed to resume processing from the current point.
+
+        The processed events so far are not included. They are referenced by the report
+        they are saved in and their number, so that a resumed report can copy them and
+        contain the same events as a full run. PnL totals are not included since
+        checkpoints are only used for events before a report's start, for which no PnL
+        is counted.
+        """
+        return {
+            'cost_basis': self.cost_basis.serialize_state(),
+            'evm_accountants': self.transactions.evm_accounting_aggregator.serialize_state(),
+            'report_id': self.report_id,
+            'processed_events': len(self.processed_events),
+        }
+
+    def restore_checkpoint_state(self, data: Dict[str, Any]) -> None:
+        """Restore the state serialized by serialize_checkpoint_state(). Should be
+        called right after reset().
+
+        May raise:
+        - DeserializationError if the data is malformed or the processed events of the
+        checkpoint can't be read from its report, e.g. because it got deleted
+        """
+        try:
+            self.cost_basis.restore_state(data['cost_basis'])
+            self.transactions.evm_accounting_aggregator.restore_state(data['evm_accountants'])
+            events_num = data['processed_events']
+            events = list(islice(
+                self.report_writer.dbreports.iter_report_events(report_id=data['report_id']),
+                events_num,
+            ))
+        except (KeyError, ValueError, TypeError, InputError) as e:
+            raise DeserializationError(
+                f'Could not restore accounting checkpoint due to {str(e)}',
+            ) from e
+
+        if len(events) != events_num:
+            raise DeserializationError(
+                f'Could not restore accounting checkpoint since its report {data["report_id"]} '
+                f'has {len(events)} instead of {events_num} processed events',
+            )
+
+        for event in events:  # added only once all were read so that nothing is half added
+            self._add_processed_event(event)
+
     def add_acquisition(
             self,  # pylint: disable=unused-argument
             event_type: AccountingEventType,
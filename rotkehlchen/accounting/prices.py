@@ -0,0 +1,89 @@
+import logging
+from collections import defaultdict
+from typing import TYPE_CHECKING, DefaultDict, Dict, Iterable, List, Optional, Tuple
+
+import gevent
+
+from rotkehlchen.errors.asset import UnknownAsset, UnprocessableTradePair, UnsupportedAsset
+from rotkehlchen.history.price import PriceHistorian
+from rotkehlchen.logging import RotkehlchenLogsAdapter
+from rotkehlchen.types import Price, Timestamp
+
+if TYPE_CHECKING:
+    from rotkehlchen.accounting.mixins.event import AccountingEventMixin
+    from rotkehlchen.assets.asset import Asset
+
+logger = logging.getLogger(__name__)
+log = RotkehlchenLogsAdapter(logger)
+
+
+class AccountingPriceTable():
+    """In-memory table of historical prices needed during a PnL report.
+
+    Filled by a pre-pass over the events before processing so that the prices
+    found in the DB cache are resolved with one range query per asset pair instead
+    of one query per event. Anything not in the table is queried normally.
+    """
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.prices: Dict[Tuple[str, str], Dict[Timestamp, Price]] = {}
+        self.hits = self.misses = 0
+
+    def get_price(self, from_asset: 'Asset', to_asset: 'Asset', timestamp: Timestamp) -> Optional[Price]:  # noqa: E501
+        pair_prices = self.prices.get((from_asset.identifier, to_asset.identifier))
+        price = None if pair_prices is None else pair_prices.get(timestamp)
+        if price is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return price
+
+    def prefetch(
+            self,
+            events: Iterable['AccountingEventMixin'],
+            to_asset: 'Asset',
+            start_ts: Timestamp,
+            end_ts: Timestamp,
+            ignored_assets: List['Asset'],
+    ) -> None:
+        """Collect the (asset, timestamp) combinations the given sorted events in
+        [start_ts, end_ts] need a price for in to_asset and resolve them in bulk per asset"""
+        needed: DefaultDict['Asset', List[Timestamp]] = defaultdict(list)
+        ignored = set(ignored_assets)
+        for idx, event in enumerate(events):
+            timestamp = event.get_timestamp()
+            if timestamp > end_ts:
+                break
+            if timestamp < start_ts:
+                continue
+
+            try:
+                assets = event.get_assets()
+            except (UnknownAsset, UnsupportedAsset, UnprocessableTradePair):
+                continue  # will be reported during processing
+
+            for asset in assets:
+                if asset != to_asset and asset not in ignored:
+                    needed[asset].append(timestamp)
+
+            if idx % 10000 == 0:
+                gevent.sleep(0)  # don't block other greenlets for big histories
+
+        total = 0
+        for asset, timestamps in needed.items():
+            pair_prices = PriceHistorian().query_cached_historical_prices(
+                from_asset=asset,
+                to_asset=to_asset,
+                timestamps=timestamps,
+            )
+            self.prices[(asset.identifier, to_asset.identifier)] = pair_prices
+            total += len(pair_prices)
+            gevent.sleep(0)
+
+        log.debug(
+            f'Prefetched {total} historical prices in {to_asset.identifier} '
+            f'for {len(needed)} assets',
+        )
@@ -26,7 +26,7 @@ from uuid import uuid4
 from zipfile import ZipFile
 
 import gevent
-from flask import Response, make_response, send_file
+from flask import Response, make_response, send_file, stream_with_context
 from gevent.event import Event
 from gevent.lock import Semaphore
 from marshmallow.exceptions import ValidationError
@@ -93,6 +93,7 @@ from rotkehlchen.data_import.manager import DataImportSource
 from rotkehlchen.db.addressbook import DBAddressbook
 from rotkehlchen.db.constants import HISTORY_MAPPING_CUSTOMIZED
 from rotkehlchen.db.custom_assets import DBCustomAssets
+from rotkehlchen.db.drivers.query_stats import QUERY_STATS
 from rotkehlchen.db.ens import DBEns
 from rotkehlchen.db.ethtx import DBEthTx
 from rotkehlchen.db.filtering import (
@@ -497,6 +498,12 @@ class RestAPI():
             status_code=HTTPStatus.OK,
         )
 
+    def get_exchanges_rate_limits(self) -> Response:
+        return api_response(
+            _wrap_in_ok_result(self.rotkehlchen.exchange_manager.get_rate_limits_info()),
+            status_code=HTTPStatus.OK,
+        )
+
     def setup_exchange(
             self,
             name: str,
@@ -1443,7 +1450,7 @@ class RestAPI():
             return api_response(wrap_in_fail_result(str(e)), status_code=HTTPStatus.CONFLICT)
 
         # Also clear the in-memory cache of the asset resolver to requery DB
-        AssetResolver().assets_cache.remove(data['identifier'])
+        AssetResolver().clean_memory_cache(data['identifier'])
         return api_response(OK_RESULT, status_code=HTTPStatus.OK)
 
     def delete_asset(self, identifier: str) -> Response:
@@ -1457,7 +1464,7 @@ class RestAPI():
             return api_response(wrap_in_fail_result(str(e)), status_code=HTTPStatus.CONFLICT)
 
         # Also clear the in-memory cache of the asset resolver
-        AssetResolver().assets_cache.remove(identifier)
+        AssetResolver().clean_memory_cache(identifier)
         return api_response(OK_RESULT, status_code=HTTPStatus.OK)
 
     def replace_asset(self, source_identifier: str, target_asset: Asset) -> Response:
@@ -1467,7 +1474,7 @@ class RestAPI():
             return api_response(wrap_in_fail_result(str(e)), status_code=HTTPStatus.CONFLICT)
 
         # Also clear the in-memory cache of the asset resolver
-        AssetResolver().assets_cache.remove(source_identifier)
+        AssetResolver().clean_memory_cache(source_identifier)
         return api_response(OK_RESULT, status_code=HTTPStatus.OK)
 
     @staticmethod
@@ -1525,7 +1532,7 @@ class RestAPI():
             return api_response(wrap_in_fail_result(str(e)), status_code=HTTPStatus.CONFLICT)
 
         # Also clear the in-memory cache of the asset resolver to requery DB
-        AssetResolver().assets_cache.remove(identifier)
+        AssetResolver().clean_memory_cache(identifier)
 
         return api_response(
             result=_wrap_in_ok_result({'identifier': identifier}),
@@ -1553,7 +1560,7 @@ class RestAPI():
             return api_response(wrap_in_fail_result(str(e)), status_code=HTTPStatus.CONFLICT)
 
         # Also clear the in-memory cache of the asset resolver
-        AssetResolver().assets_cache.remove(identifier)
+        AssetResolver().clean_memory_cache(identifier)
 
         return api_response(
             result=_wrap_in_ok_result({'identifier': identifier}),
@@ -1805,7 +1812,19 @@ class RestAPI():
 
         return api_response(OK_RESULT, status_code=HTTPStatus.OK)
 
-    def download_processed_history_csv(self) -> Response:
+    def download_processed_history_csv(self, stream: bool, report_id: Optional[int]) -> Response:  # noqa: E501
+        if stream is True:
+            try:
+                chunks = self.rotkehlchen.accountant.stream_export(report_id=report_id)
+            except InputError as e:
+                return api_response(wrap_in_fail_result(str(e)), status_code=HTTPStatus.CONFLICT)
+
+            return Response(
+                stream_with_context(chunks),
+                mimetype='application/zip',
+                headers={'Content-Disposition': 'attachment; filename=report.zip'},
+            )
+
         success, zipfile = self.rotkehlchen.accountant.export(directory_path=None)
         if success is False:
             return api_response(wrap_in_fail_result('Could not create a zip archive'), status_code=HTTPStatus.CONFLICT)  # noqa: E501
@@ -2633,6 +2652,40 @@ class RestAPI():
         manager.connect_to_multiple_nodes(nodes_to_connect)
         return api_response(OK_RESULT, status_code=HTTPStatus.OK)
 
+    def get_ethereum_nodes_stats(self) -> Response:
+        ethereum = self.rotkehlchen.chain_manager.ethereum
+        result = {
+            'hedged_requests': ethereum.hedged_requests,
+            'nodes': ethereum.node_health.serialize(),
+        }
+        return api_response(_wrap_in_ok_result(result), status_code=HTTPStatus.OK)
+
+    def configure_ethereum_nodes(self, hedged_requests: bool) -> Response:
+        self.rotkehlchen.chain_manager.ethereum.hedged_requests = hedged_requests
+        return self.get_ethereum_nodes_stats()
+
+    def reset_ethereum_nodes_stats(self) -> Response:
+        self.rotkehlchen.chain_manager.ethereum.node_health.reset()
+        return api_response(OK_RESULT, status_code=HTTPStatus.OK)
+
+    def get_paused_ethereum_transactions_queries(self) -> Response:
+        result = sorted(self.rotkehlchen.eth_transactions.paused_addresses)
+        return api_response(_wrap_in_ok_result(result), status_code=HTTPStatus.OK)
+
+    def pause_ethereum_transactions_queries(
+            self,
+            addresses: List[ChecksumEvmAddress],
+    ) -> Response:
+        self.rotkehlchen.eth_transactions.pause_queries(addresses)
+        return self.get_paused_ethereum_transactions_queries()
+
+    def resume_ethereum_transactions_queries(
+            self,
+            addresses: List[ChecksumEvmAddress],
+    ) -> Response:
+        self.rotkehlchen.eth_transactions.resume_queries(addresses)
+        return self.get_paused_ethereum_transactions_queries()
+
     def purge_module_data(self, module_name: Optional[ModuleName]) -> Response:
         self.rotkehlchen.data.db.purge_module_data(module_name)
         return api_response(OK_RESULT, status_code=HTTPStatus.OK)
@@ -3976,6 +4029,23 @@ class RestAPI():
 
         return api_response(_wrap_in_ok_result(result_dict), status_code=HTTPStatus.OK)
 
+    @staticmethod
+    def get_database_query_stats() -> Response:
+        return api_response(_wrap_in_ok_result(QUERY_STATS.get_stats()), status_code=HTTPStatus.OK)  # noqa: E501
+
+    @staticmethod
+    def configure_database_query_stats(
+            enabled: bool,
+            slow_query_threshold_ms: Optional[int],
+    ) -> Response:
+        QUERY_STATS.configure(enabled=enabled, slow_query_threshold_ms=slow_query_threshold_ms)
+        return api_response(_wrap_in_ok_result(QUERY_STATS.get_stats()), status_code=HTTPStatus.OK)  # noqa: E501
+
+    @staticmethod
+    def reset_database_query_stats() -> Response:
+        QUERY_STATS.reset()
+        return api_response(OK_RESULT, status_code=HTTPStatus.OK)
+
     def create_database_backup(self) -> Response:
         try:
             db_backup_path = self.rotkehlchen.data.db.create_db_backup()
@@ -4674,7 +4744,7 @@ class RestAPI():
             return api_response(wrap_in_fail_result(str(e)), status_code=HTTPStatus.CONFLICT)
 
         # Also clear the in-memory cache of the asset resolver to requery DB
-        AssetResolver().assets_cache.remove(custom_asset.identifier)
+        AssetResolver().clean_memory_cache(custom_asset.identifier)
         return api_response(OK_RESULT, status_code=HTTPStatus.OK)
 
     def get_custom_asset_types(self) -> Response:
@@ -57,6 +57,7 @@ from rotkehlchen.api.v1.resources import (
     CustomAssetsTypesResource,
     DatabaseBackupsResource,
     DatabaseInfoResource,
+    DatabaseQueriesResource,
     DataImportResource,
     DBSnapshotsResource,
     DefiBalancesResource,
@@ -70,10 +71,13 @@ from rotkehlchen.api.v1.resources import (
     EthereumAssetsResource,
     EthereumModuleDataResource,
     EthereumModuleResource,
+    EthereumNodesStatsResource,
+    EthereumTransactionsPausedResource,
     EthereumTransactionsResource,
     ExchangeBalancesResource,
     ExchangeRatesResource,
     ExchangesDataResource,
+    ExchangesRateLimitsResource,
     ExchangesResource,
     ExternalServicesResource,
     HistoricalAssetsPriceResource,
@@ -183,6 +187,7 @@ URLS_V1: URLS = [
     ('/exchanges/binance/pairs/<string:name>', BinanceUserMarkets),
     ('/exchanges/data', ExchangesDataResource),
     ('/exchanges/data/<string:location>', ExchangesDataResource, 'named_exchanges_data_resource'),
+    ('/exchanges/rate_limits', ExchangesRateLimitsResource),
     ('/balances/blockchains', BlockchainBalancesResource),
     (
         '/balances/blockchains/<string:blockchain>',
@@ -217,6 +222,7 @@ URLS_V1: URLS = [
     ),
     ('/queried_addresses', QueriedAddressesResource),
     ('/blockchains/ETH/transactions', EthereumTransactionsResource),
+    ('/blockchains/ETH/transactions/paused', EthereumTransactionsPausedResource),
     (
         '/blockchains/ETH/transactions/<string:address>',
         EthereumTransactionsResource,
@@ -263,6 +269,7 @@ URLS_V1: URLS = [
     ('/blockchains/ETH/modules/loopring/balances', LoopringBalancesResource),
     ('/blockchains/<string:blockchain>', BlockchainsAccountsResource),
     ('/blockchains/<string:blockchain>/nodes', Web3NodesResource),
+    ('/blockchains/ETH/nodes/stats', EthereumNodesStatsResource),
     ('/blockchains/<string:blockchain>/xpub', BTCXpubResource),
     ('/blockchains/AVAX/transactions', AvalancheTransactionsResource),
     (
@@ -292,6 +299,7 @@ URLS_V1: URLS = [
     ('/nfts/balances', NFTSBalanceResource),
     ('/nfts/prices', NFTSPricesResource),
     ('/database/info', DatabaseInfoResource),
+    ('/database/queries', DatabaseQueriesResource),
     ('/database/backups', DatabaseBackupsResource),
     ('/locations/associated', AssociatedLocations),
     ('/staking/kraken', StakingResource),
@@ -54,6 +54,7 @@ from rotkehlchen.api.v1.schemas import (
     CryptoAssetSchema,
     CurrentAssetsPriceSchema,
     CustomAssetsQuerySchema,
+    DatabaseQueryStatsSchema,
     DataImportSchema,
     DetectTokensSchema,
     EditCustomAssetSchema,
@@ -63,8 +64,10 @@ from rotkehlchen.api.v1.schemas import (
     Eth2ValidatorDeleteSchema,
     Eth2ValidatorPatchSchema,
     Eth2ValidatorPutSchema,
+    EthereumNodesStatsSchema,
     EthereumTransactionDecodingSchema,
     EthereumTransactionQuerySchema,
+    EthereumTransactionsPausedSchema,
     ExchangeBalanceQuerySchema,
     ExchangeRatesSchema,
     ExchangesDataResourceSchema,
@@ -76,6 +79,7 @@ from rotkehlchen.api.v1.schemas import (
     FileListSchema,
     HistoricalAssetsPriceSchema,
     HistoryBaseEntrySchema,
+    HistoryDownloadingSchema,
     HistoryExportingSchema,
     HistoryProcessingDebugImportSchema,
     HistoryProcessingExportSchema,
@@ -452,6 +456,13 @@ class ExchangesDataResource(BaseMethodView):
         return self.rest_api.purge_exchange_data(location=location)
 
 
+class ExchangesRateLimitsResource(BaseMethodView):
+
+    @require_loggedin_user()
+    def get(self) -> Response:
+        return self.rest_api.get_exchanges_rate_limits()
+
+
 class AssociatedLocations(BaseMethodView):
     @require_loggedin_user()
     def get(self) -> Response:
@@ -642,12 +653,67 @@ class OwnedAssetsResource(BaseMethodView):
         return self.rest_api.query_owned_assets()
 
 
+class EthereumNodesStatsResource(BaseMethodView):
+
+    put_schema = EthereumNodesStatsSchema()
+
+    @require_loggedin_user()
+    def get(self) -> Response:
+        return self.rest_api.get_ethereum_nodes_stats()
+
+    @require_loggedin_user()
+    @use_kwargs(put_schema, location='json')
+    def put(self, hedged_requests: bool) -> Response:
+        return self.rest_api.configure_ethereum_nodes(hedged_requests=hedged_requests)
+
+    @require_loggedin_user()
+    def delete(self) -> Response:
+        return self.rest_api.reset_ethereum_nodes_stats()
+
+
+class EthereumTransactionsPausedResource(BaseMethodView):
+
+    modify_schema = EthereumTransactionsPausedSchema()
+
+    @require_loggedin_user()
+    def get(self) -> Response:
+        return self.rest_api.get_paused_ethereum_transactions_queries()
+
+    @require_loggedin_user()
+    @use_kwargs(modify_schema, location='json')
+    def put(self, addresses: List[ChecksumEvmAddress]) -> Response:
+        return self.rest_api.pause_ethereum_transactions_queries(addresses=addresses)
+
+    @require_loggedin_user()
+    @use_kwargs(modify_schema, location='json')
+    def delete(self, addresses: List[ChecksumEvmAddress]) -> Response:
+        return self.rest_api.resume_ethereum_transactions_queries(addresses=addresses)
+
+
 class DatabaseInfoResource(BaseMethodView):
 
     def get(self) -> Response:
         return self.rest_api.get_database_info()
 
 
+class DatabaseQueriesResource(BaseMethodView):
+
+    put_schema = DatabaseQueryStatsSchema()
+
+    def get(self) -> Response:
+        return self.rest_api.get_database_query_stats()
+
+    @use_kwargs(put_schema, location='json')
+    def put(self, enabled: bool, slow_query_threshold_ms: Optional[int]) -> Response:
+        return self.rest_api.configure_database_query_stats(
+            enabled=enabled,
+            slow_query_threshold_ms=slow_query_threshold_ms,
+        )
+
+    def delete(self) -> Response:
+        return self.rest_api.reset_database_query_stats()
+
+
 class DatabaseBackupsResource(BaseMethodView):
 
     delete_schema = FileListSchema()
@@ -1360,9 +1426,12 @@ class HistoryExportingResource(BaseMethodView):
 
 class HistoryDownloadingResource(BaseMethodView):
 
+    get_schema = HistoryDownloadingSchema()
+
     @require_loggedin_user()
-    def get(self) -> Response:
-        return self.rest_api.download_processed_history_csv()
+    @use_kwargs(get_schema, location='json_and_query')
+    def get(self, stream: bool, report_id: Optional[int]) -> Response:
+        return self.rest_api.download_processed_history_csv(stream=stream, report_id=report_id)
 
 
 class PeriodicDataResource(BaseMethodView):
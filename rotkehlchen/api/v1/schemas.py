@@ -1231,6 +1231,11 @@ class HistoryExportingSchema(Schema):
     directory_path = DirectoryField(required=True)
 
 
+class HistoryDownloadingSchema(Schema):
+    stream = fields.Boolean(load_default=False)
+    report_id = fields.Integer(load_default=None)
+
+
 class BlockchainAccountDataSchema(Schema):
     address = fields.String(required=True)
     label = fields.String(load_default=None)
@@ -2114,6 +2119,18 @@ class AssetUpdatesRequestSchema(AsyncQueryArgumentSchema):
     conflicts = AssetConflictsField(load_default=None)
 
 
+class DatabaseQueryStatsSchema(Schema):
+    enabled = fields.Boolean(required=True)
+    slow_query_threshold_ms = fields.Integer(
+        strict=True,
+        validate=webargs.validate.Range(
+            min=0,
+            error='Slow query threshold should be >= 0',
+        ),
+        load_default=None,
+    )
+
+
 class AssetResetRequestSchema(Schema):
     reset = fields.String(required=True)
     ignore_warnings = fields.Boolean(load_default=False)
@@ -2553,6 +2570,18 @@ class Web3NodeEditSchema(Web3AddNodeSchema):
             )
 
 
+class EthereumNodesStatsSchema(Schema):
+    hedged_requests = fields.Boolean(required=True)
+
+
+class EthereumTransactionsPausedSchema(Schema):
+    addresses = fields.List(
+        EthereumAddressField(),
+        required=True,
+        validate=webargs.validate.Length(min=1),
+    )
+
+
 class Web3NodeListDeleteSchema(Schema):
     blockchain = BlockchainField(required=True, exclude_types=(SupportedBlockchain.ETHEREUM_BEACONCHAIN,))  # noqa: E501
     identifier = fields.Integer(required=True)
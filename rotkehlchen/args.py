@@ -5,6 +5,8 @@ from typing import Any, List, Sequence, Union
 from rotkehlchen.constants.misc import (
     DEFAULT_MAX_LOG_BACKUP_FILES,
     DEFAULT_MAX_LOG_SIZE_IN_MB,
+    DEFAULT_OWNED_ASSETS_CACHE_SIZE,
+    DEFAULT_SQL_READ_CONNECTIONS,
     DEFAULT_SQL_VM_INSTRUCTIONS_CB,
 )
 from rotkehlchen.utils.misc import get_system_spec
@@ -130,6 +132,24 @@ def app_args(prog: str, description: str) -> argparse.ArgumentParser:
         default=DEFAULT_SQL_VM_INSTRUCTIONS_CB,
         type=_positive_int_or_zero,
     )
+    p.add_argument(
+        '--sqlite-read-connections',
+        help=(
+            'Number of read only connections to the global DB. If positive the DB is switched '
+            'to WAL mode so that reads do not wait for writes. Zero to disable.'
+        ),
+        default=DEFAULT_SQL_READ_CONNECTIONS,
+        type=_positive_int_or_zero,
+    )
+    p.add_argument(
+        '--owned-assets-cache-size',
+        help=(
+            'Max number of the assets owned by the user that are kept in memory after '
+            'login, on top of the cache of recently used assets.'
+        ),
+        default=DEFAULT_OWNED_ASSETS_CACHE_SIZE,
+        type=_positive_int_or_zero,
+    )
     p.add_argument(
         'version',
         help='Shows the rotkehlchen version',
@@ -1,7 +1,10 @@
-from typing import TYPE_CHECKING, Optional, Type, TypeVar
+import logging
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Type, TypeVar
 
 from rotkehlchen.assets.types import AssetType
+from rotkehlchen.constants.misc import DEFAULT_OWNED_ASSETS_CACHE_SIZE
 from rotkehlchen.errors.asset import WrongAssetType
+from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.utils.data_structures import LRUCacheWithRemove
 
 if TYPE_CHECKING:
@@ -17,6 +20,9 @@ if TYPE_CHECKING:
     )
 
 
+logger = logging.getLogger(__name__)
+log = RotkehlchenLogsAdapter(logger)
+
 T = TypeVar('T', 'FiatAsset', 'CryptoAsset', 'EvmToken', 'Nft', 'AssetWithNameAndType', 'AssetWithSymbol', 'AssetWithOracles')  # noqa: E501
 
 
@@ -26,6 +32,15 @@ class AssetResolver():
     # the cache maps identifier -> final representation of the asset
     assets_cache: LRUCacheWithRemove['Asset'] = LRUCacheWithRemove(maxsize=512)
     types_cache: LRUCacheWithRemove[AssetType] = LRUCacheWithRemove(maxsize=512)
+    # Second tier cache with the assets owned by the user. It is not subject to LRU
+    # eviction so that users with many assets don't thrash the first tier. Maps the
+    # lowercase identifier to the asset. Owned assets are kept in it also after they
+    # are removed from it due to an edit, so that they return on their next resolution.
+    owned_assets_cache: Dict[str, 'AssetWithNameAndType'] = {}
+    owned_identifiers: Set[str] = set()
+    owned_assets_cache_size: int = DEFAULT_OWNED_ASSETS_CACHE_SIZE
+    hits: int = 0
+    misses: int = 0
 
     def __new__(cls) -> 'AssetResolver':
         """Lazily initializes AssetResolver
@@ -45,9 +60,65 @@ class AssetResolver():
         if identifier is not None:
             AssetResolver.__instance.assets_cache.remove(identifier)
             AssetResolver.__instance.types_cache.remove(identifier)
+            AssetResolver.__instance.owned_assets_cache.pop(identifier.lower(), None)
         else:
             AssetResolver.__instance.assets_cache.clear()
             AssetResolver.__instance.types_cache.clear()
+            AssetResolver.__instance.owned_assets_cache.clear()
+
+    def _get_cached(self, identifier: str) -> Optional['Asset']:
+        cached_data = self.assets_cache.get(identifier)
+        if cached_data is None:
+            cached_data = self.owned_assets_cache.get(identifier.lower())
+        return cached_data
+
+    def _cache(self, identifier: str, asset: 'AssetWithNameAndType') -> None:
+        lowered_identifier = identifier.lower()
+        if lowered_identifier in self.owned_identifiers:
+            self.owned_assets_cache[lowered_identifier] = asset
+        else:
+            self.assets_cache.set(identifier, asset)
+
+    def warm_owned_assets(self, identifiers: List[str], max_size: Optional[int] = None) -> None:
+        """Replace the second tier cache with the assets of the given identifiers, resolved
+        in bulk. Meant to be called with the user owned assets at unlock.
+
+        If more than max_size assets are given then only the first max_size are kept.
+        """
+        # TODO: This is ugly here but is here to avoid a cyclic import in the Assets file
+        # Couldn't find a reorg that solves this cyclic import
+        from rotkehlchen.globaldb.handler import GlobalDBHandler  # pylint: disable=import-outside-toplevel  # isort:skip  # noqa: E501
+
+        if max_size is not None:
+            self.owned_assets_cache_size = max_size
+        if len(identifiers) > self.owned_assets_cache_size:
+            log.warning(
+                f'User owns {len(identifiers)} assets which is more than the '
+                f'{self.owned_assets_cache_size} the owned assets cache can hold. '
+                f'Caching only the first {self.owned_assets_cache_size}',
+            )
+            identifiers = identifiers[:self.owned_assets_cache_size]
+
+        resolved = GlobalDBHandler().resolve_assets(
+            identifiers=identifiers,
+            form_with_incomplete_data=False,
+        )
+        self.owned_identifiers = {x.lower() for x in identifiers}
+        self.owned_assets_cache = resolved
+        log.debug(f'Warmed up the owned assets cache with {len(resolved)} assets')
+
+    def clear_owned_assets(self) -> None:
+        """Clear the second tier cache. For example when the user logs out"""
+        self.owned_identifiers = set()
+        self.owned_assets_cache = {}
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'cached_assets': len(self.assets_cache.cache),
+            'cached_owned_assets': len(self.owned_assets_cache),
+        }
 
     @staticmethod
     def resolve_asset(
@@ -65,19 +136,68 @@ class AssetResolver():
         from rotkehlchen.globaldb.handler import GlobalDBHandler  # pylint: disable=import-outside-toplevel  # isort:skip  # noqa: E501
 
         instance = AssetResolver()
-        cached_data = instance.assets_cache.get(identifier)
+        cached_data = instance._get_cached(identifier)
         if cached_data is not None:
+            instance.hits += 1
             return cached_data
 
         # If was not found in the cache try querying it in the globaldb
+        instance.misses += 1
         asset = GlobalDBHandler().resolve_asset(
             identifier=identifier,
             form_with_incomplete_data=form_with_incomplete_data,
         )
         # Save it in the cache
-        instance.assets_cache.set(identifier, asset)
+        instance._cache(identifier, asset)
         return asset
 
+    @staticmethod
+    def resolve_many(
+            identifiers: List[str],
+            form_with_incomplete_data: bool = False,
+    ) -> Dict[str, 'Asset']:
+        """Resolve many identifiers at once. All the identifiers that are not cached
+        are queried from the globaldb together.
+
+        Returns a mapping of each given identifier to its asset. Identifiers of
+        unknown assets are not in the result.
+        """
+        # TODO: This is ugly here but is here to avoid a cyclic import in the Assets file
+        # Couldn't find a reorg that solves this cyclic import
+        from rotkehlchen.globaldb.handler import GlobalDBHandler  # pylint: disable=import-outside-toplevel  # isort:skip  # noqa: E501
+
+        instance = AssetResolver()
+        result: Dict[str, 'Asset'] = {}
+        missing = []
+        for identifier in identifiers:
+            cached_data = instance._get_cached(identifier)
+            if cached_data is not None:
+                result[identifier] = cached_data
+            else:
+                missing.append(identifier)
+
+        instance.hits += len(result)
+        if len(missing) == 0:
+            return result
+
+        instance.misses += len(missing)
+        resolved = GlobalDBHandler().resolve_assets(
+            identifiers=missing,
+            form_with_incomplete_data=form_with_incomplete_data,
+        )
+        # Don't flush the whole first tier for a bulk query that would not fit in it anyway
+        cache_results = len(resolved) <= instance.assets_cache.maxsize // 2
+        for identifier in missing:
+            asset = resolved.get(identifier.lower())
+            if asset is None:
+                continue
+
+            result[identifier] = asset
+            if cache_results or identifier.lower() in instance.owned_identifiers:
+                instance._cache(identifier, asset)
+
+        return result
+
     @staticmethod
     def get_asset_type(identifier: str) -> AssetType:
         # TODO: This is ugly here but is here to avoid a cyclic import in the Assets file
@@ -89,6 +209,10 @@ class AssetResolver():
         if cached_data is not None:
             return cached_data
 
+        owned_asset = instance.owned_assets_cache.get(identifier.lower())
+        if owned_asset is not None:
+            return owned_asset.asset_type
+
         asset_type = GlobalDBHandler().get_asset_type(identifier)
         instance.types_cache.set(identifier, asset_type)
         return asset_type
@@ -2,7 +2,7 @@ import importlib
 import logging
 import pkgutil
 from types import ModuleType
-from typing import TYPE_CHECKING, Dict, Union
+from typing import TYPE_CHECKING, Any, Dict, Union
 
 from rotkehlchen.accounting.structures.types import HistoryEventSubType, HistoryEventType
 from rotkehlchen.chain.ethereum.constants import MODULES_PACKAGE, MODULES_PREFIX_LENGTH
@@ -118,3 +118,19 @@ class EVMAccountingAggregator():
         """Reset the state of all initialized submodule accountants"""
         for accountant in self.accountants.values():
             accountant.reset()
+
+    def serialize_state(self) -> Dict[str, Dict[str, Any]]:
+        """Serialize the state of all submodule accountants that keep any"""
+        result = {}
+        for name, accountant in self.accountants.items():
+            state = accountant.serialize_state()
+            if len(state) != 0:
+                result[name] = state
+        return result
+
+    def restore_state(self, data: Dict[str, Dict[str, Any]]) -> None:
+        """Restore the state of the submodule accountants from serialize_state() data"""
+        for name, state in data.items():
+            accountant = self.accountants.get(name)
+            if accountant is not None:
+                accountant.restore_state(state)
@@ -10,6 +10,10 @@ GNOSIS_CHAIN_BRIDGE_RECEIVE = b'\x9a\xfdG\x90~%\x02\x8c\xda\xca\x89\xd1\x93Q\x8c
 GOVERNORALPHA_PROPOSE = b"}\x84\xa6&:\xe0\xd9\x8d3)\xbd{F\xbbN\x8do\x98\xcd5\xa7\xad\xb4\\'L\x8b\x7f\xd5\xeb\xd5\xe0"  # noqa: E501
 GOVERNORALPHA_PROPOSE_ABI = '{"anonymous":false,"inputs":[{"indexed":false,"internalType":"uint256","name":"id","type":"uint256"},{"indexed":false,"internalType":"address","name":"proposer","type":"address"},{"indexed":false,"internalType":"address[]","name":"targets","type":"address[]"},{"indexed":false,"internalType":"uint256[]","name":"values","type":"uint256[]"},{"indexed":false,"internalType":"string[]","name":"signatures","type":"string[]"},{"indexed":false,"internalType":"bytes[]","name":"calldatas","type":"bytes[]"},{"indexed":false,"internalType":"uint256","name":"startBlock","type":"uint256"},{"indexed":false,"internalType":"uint256","name":"endBlock","type":"uint256"},{"indexed":false,"internalType":"string","name":"description","type":"string"}],"name":"ProposalCreated","type":"event"}'  # noqa: E501
 
+GTC_DISTRIBUTOR = string_to_evm_address('0xDE3e5a990bCE7fC60a6f017e7c4a95fc4939299E')
+ONEINCH_DISTRIBUTOR = string_to_evm_address('0xE295aD71242373C37C5FdA7B57F26f9eA1088AFe')
+GNOSIS_CHAIN_BRIDGE = string_to_evm_address('0x88ad09518695c6c3712AC10a214bE5109a655671')
+
 
 NAUGHTY_ERC721 = (  # list of ERC721 NFT tokens, not really following the standard
     # Cryptovoxels
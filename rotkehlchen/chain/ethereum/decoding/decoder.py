@@ -1,8 +1,21 @@
 import importlib
 import logging
 import pkgutil
+import time
+from collections import defaultdict
 from types import ModuleType
-from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Set, Tuple, Union
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    DefaultDict,
+    Dict,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
 
 from gevent.lock import Semaphore
 
@@ -38,6 +51,7 @@ from rotkehlchen.types import (
 from rotkehlchen.user_messages import MessagesAggregator
 from rotkehlchen.utils.misc import (
     from_wei,
+    get_chunks,
     hex_or_bytes_to_address,
     hex_or_bytes_to_int,
     ts_sec_to_ms,
@@ -50,13 +64,16 @@ from .constants import (
     CPT_GNOSIS_CHAIN,
     ERC20_APPROVE,
     ERC20_OR_ERC721_TRANSFER,
+    GNOSIS_CHAIN_BRIDGE,
     GNOSIS_CHAIN_BRIDGE_RECEIVE,
     GOVERNORALPHA_PROPOSE,
     GOVERNORALPHA_PROPOSE_ABI,
     GTC_CLAIM,
+    GTC_DISTRIBUTOR,
     ONEINCH_CLAIM,
+    ONEINCH_DISTRIBUTOR,
 )
-from .structures import ActionItem
+from .structures import ActionItem, TopicDecodingRule
 from .utils import maybe_reshuffle_events
 
 if TYPE_CHECKING:
@@ -69,6 +86,19 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
+# Transactions whose data are loaded together and whose events are written together
+DECODING_BATCH_SIZE = 100
+
+
+class RuleStats():
+    """Counters of a decoding rule. Time is wall time in seconds"""
+    __slots__ = ('calls', 'hits', 'duration')
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.hits = 0
+        self.duration = 0.0
+
 
 class EVMTransactionDecoder():
 
@@ -87,12 +117,18 @@ class EVMTransactionDecoder():
         self.dbethtx = DBEthTx(self.database)
         self.dbevents = DBHistoryEvents(self.database)
         self.base = BaseDecoderTools(database=database)
-        self.event_rules = [  # rules to try for all tx receipt logs decoding
-            self._maybe_decode_erc20_approve,
-            self._maybe_decode_erc20_721_transfer,
-            self._maybe_enrich_transfers,
-            self._maybe_decode_governance,
+        self.event_rules: List[Callable] = []  # rules to try for all tx receipt logs decoding
+        self.topic_rules = [  # rules to try only for tx receipt logs of a specific topic
+            TopicDecodingRule(topic=ERC20_APPROVE, rule=self._maybe_decode_erc20_approve),
+            TopicDecodingRule(topic=ERC20_OR_ERC721_TRANSFER, rule=self._maybe_decode_erc20_721_transfer),  # noqa: E501
+            TopicDecodingRule(topic=GTC_CLAIM, rule=self._maybe_enrich_transfers, address=GTC_DISTRIBUTOR),  # noqa: E501
+            TopicDecodingRule(topic=ONEINCH_CLAIM, rule=self._maybe_enrich_transfers, address=ONEINCH_DISTRIBUTOR),  # noqa: E501
+            TopicDecodingRule(topic=GNOSIS_CHAIN_BRIDGE_RECEIVE, rule=self._maybe_enrich_transfers, address=GNOSIS_CHAIN_BRIDGE),  # noqa: E501
+            TopicDecodingRule(topic=GOVERNORALPHA_PROPOSE, rule=self._maybe_decode_governance),
         ]
+        # topic -> (address or None for any address, rule). Built from the topic rules
+        self.topic_dispatch: Dict[bytes, List[Tuple[Optional[ChecksumEvmAddress], Callable]]] = {}  # noqa: E501
+        self.rule_stats: DefaultDict[str, RuleStats] = defaultdict(RuleStats)
         self.token_enricher_rules: List[Callable] = []  # enrichers to run for token transfers
         self.initialize_all_decoders()
         self.undecoded_tx_query_lock = Semaphore()
@@ -102,12 +138,14 @@ class EVMTransactionDecoder():
     ) -> Tuple[
             Dict[ChecksumEvmAddress, Tuple[Any, ...]],
             List[Callable],
+            List[TopicDecodingRule],
             List[Callable],
     ]:
         if isinstance(package, str):
             package = importlib.import_module(package)
         address_results = {}
         rules_results = []
+        topic_rules_results = []
         enricher_results = []
         for _, name, is_pkg in pkgutil.walk_packages(package.__path__):
             full_name = package.__name__ + '.' + name
@@ -132,23 +170,30 @@ class EVMTransactionDecoder():
                     )
                     address_results.update(self.decoders[class_name].addresses_to_decoders())
                     rules_results.extend(self.decoders[class_name].decoding_rules())
+                    topic_rules_results.extend(self.decoders[class_name].topic_decoding_rules())
                     enricher_results.extend(self.decoders[class_name].enricher_rules())
                     self.all_counterparties.update(self.decoders[class_name].counterparties())
 
-                recursive_addrs, recursive_rules, recurisve_enricher_results = self._recursively_initialize_decoders(full_name)  # noqa: E501
+                recursive_addrs, recursive_rules, recursive_topic_rules, recurisve_enricher_results = self._recursively_initialize_decoders(full_name)  # noqa: E501
                 address_results.update(recursive_addrs)
                 rules_results.extend(recursive_rules)
+                topic_rules_results.extend(recursive_topic_rules)
                 enricher_results.extend(recurisve_enricher_results)
 
-        return address_results, rules_results, enricher_results
+        return address_results, rules_results, topic_rules_results, enricher_results
 
     def initialize_all_decoders(self) -> None:
         """Recursively check all submodules to get all decoder address mappings and rules
         """
         self.decoders: Dict[str, 'DecoderInterface'] = {}
-        address_result, rules_result, enrichers_result = self._recursively_initialize_decoders(MODULES_PACKAGE)  # noqa: E501
+        address_result, rules_result, topic_rules_result, enrichers_result = self._recursively_initialize_decoders(MODULES_PACKAGE)  # noqa: E501
         self.address_mappings = address_result
         self.event_rules.extend(rules_result)
+        self.topic_rules.extend(topic_rules_result)
+        for topic_rule in self.topic_rules:
+            self.topic_dispatch.setdefault(topic_rule.topic, []).append(
+                (topic_rule.address, topic_rule.rule),
+            )
         self.token_enricher_rules.extend(enrichers_result)
         # update with counterparties not in any module
         self.all_counterparties.update([CPT_GAS, CPT_GNOSIS_CHAIN])
@@ -168,13 +213,40 @@ class EVMTransactionDecoder():
             decoded_events: List[HistoryBaseEntry],
             action_items: List[ActionItem],
     ) -> Optional[HistoryBaseEntry]:
-        for rule in self.event_rules:
+        """Tries the rules registered for the log's topic and address and then the
+        generic rules until one of them decodes the log"""
+        rules: List[Callable] = []
+        if len(tx_log.topics) != 0:
+            for address, rule in self.topic_dispatch.get(tx_log.topics[0], []):
+                if address is None or address == tx_log.address:
+                    rules.append(rule)
+
+        for rule in rules + self.event_rules:
+            start = time.perf_counter()
             event = rule(token=token, tx_log=tx_log, transaction=transaction, decoded_events=decoded_events, action_items=action_items)  # noqa: E501
+            stats = self.rule_stats[rule.__qualname__]
+            stats.duration += time.perf_counter() - start
+            stats.calls += 1
             if event:
+                stats.hits += 1
                 return event
 
         return None
 
+    def get_rules_stats(self) -> List[Dict[str, Any]]:
+        """Returns the counters of each decoding rule tried so far, sorted by
+        descending total time"""
+        result = []
+        for name, stats in self.rule_stats.items():
+            result.append({
+                'rule': name,
+                'calls': stats.calls,
+                'hits': stats.hits,
+                'hit_rate': round(stats.hits / stats.calls, 4),
+                'total_ms': round(stats.duration * 1000, 3),
+            })
+        return sorted(result, key=lambda x: x['total_ms'], reverse=True)
+
     def decode_by_address_rules(
             self,
             tx_log: EthereumTxReceiptLog,
@@ -209,13 +281,12 @@ class EVMTransactionDecoder():
 
         return result
 
-    def decode_transaction(
+    def _decode_events(
             self,
-            write_cursor: 'DBCursor',
             transaction: EvmTransaction,
             tx_receipt: EthereumTxReceipt,
     ) -> List[HistoryBaseEntry]:
-        """Decodes an ethereum transaction and its receipt and saves result in the DB"""
+        """Decodes an ethereum transaction and its receipt without saving anything"""
         self.base.reset_sequence_counter()
         # check if any eth transfer happened in the transaction, including in internal transactions
         events = self._maybe_decode_simple_transactions(transaction, tx_receipt)
@@ -235,13 +306,33 @@ class EVMTransactionDecoder():
             if event:
                 events.append(event)
 
-        self.dbevents.add_history_events(write_cursor=write_cursor, history=events)
-        write_cursor.execute(
+        return sorted(events, key=lambda x: x.sequence_index, reverse=False)
+
+    def _save_decoded_events(
+            self,
+            write_cursor: 'DBCursor',
+            decoded: List[Tuple[EVMTxHash, List[HistoryBaseEntry]]],
+    ) -> None:
+        """Saves the decoded events of the transactions and marks them as decoded"""
+        self.dbevents.add_history_events(
+            write_cursor=write_cursor,
+            history=[event for _, events in decoded for event in events],
+        )
+        write_cursor.executemany(
             'INSERT OR IGNORE INTO evm_tx_mappings(tx_hash, blockchain, value) VALUES(?, ?, ?)',  # noqa: E501
-            (transaction.tx_hash, 'ETH', HISTORY_MAPPING_DECODED),
+            [(tx_hash, 'ETH', HISTORY_MAPPING_DECODED) for tx_hash, _ in decoded],
         )
 
-        return sorted(events, key=lambda x: x.sequence_index, reverse=False)
+    def decode_transaction(
+            self,
+            write_cursor: 'DBCursor',
+            transaction: EvmTransaction,
+            tx_receipt: EthereumTxReceipt,
+    ) -> List[HistoryBaseEntry]:
+        """Decodes an ethereum transaction and its receipt and saves result in the DB"""
+        events = self._decode_events(transaction, tx_receipt)
+        self._save_decoded_events(write_cursor, [(transaction.tx_hash, events)])
+        return events
 
     def get_and_decode_undecoded_transactions(self, limit: Optional[int] = None) -> None:
         """Checks the DB for up to `limit` undecoded transactions and decodes them.
@@ -251,10 +342,18 @@ class EVMTransactionDecoder():
             hashes = self.dbethtx.get_transaction_hashes_not_decoded(limit=limit)
             self.decode_transaction_hashes(ignore_cache=False, tx_hashes=hashes)
 
-    def decode_transaction_hashes(self, ignore_cache: bool, tx_hashes: Optional[List[EVMTxHash]]) -> List[HistoryBaseEntry]:  # noqa: E501
+    def decode_transaction_hashes(
+            self,
+            ignore_cache: bool,
+            tx_hashes: Optional[List[EVMTxHash]],
+            batch_size: int = DECODING_BATCH_SIZE,
+    ) -> List[HistoryBaseEntry]:
         """Make sure that receipts are pulled + events decoded for the given transaction hashes.
 
-        The transaction hashes must exist in the DB at the time of the call
+        The transaction hashes must exist in the DB at the time of the call.
+        They are processed in batches of `batch_size`. For each batch the transactions
+        and receipts are loaded with a query each, the missing receipts are queried
+        concurrently and the decoded events are written together in one DB transaction.
 
         May raise:
         - DeserializationError if there is a problem with conacting a remote to get receipts
@@ -270,28 +369,107 @@ class EVMTransactionDecoder():
                 for entry in cursor.execute('SELECT tx_hash FROM ethereum_transactions'):
                     tx_hashes.append(EVMTxHash(entry[0]))
 
-        with self.database.user_write() as cursor:
-            for tx_hash in tx_hashes:
-                try:
-                    receipt = self.transactions.get_or_query_transaction_receipt(cursor, tx_hash)  # noqa: E501
-                except RemoteError as e:
-                    raise InputError(f'Hash {tx_hash.hex()} does not correspond to a transaction') from e  # noqa: E501
-
-                # TODO: Change this if transaction filter query can accept multiple hashes
-                txs = self.dbethtx.get_ethereum_transactions(
-                    cursor=cursor,
-                    filter_=ETHTransactionsFilterQuery.make(tx_hash=tx_hash),
-                    has_premium=True,  # ignore limiting here
+        for batch in get_chunks(tx_hashes, n=batch_size):
+            events.extend(self._decode_transaction_hashes_batch(
+                tx_hashes=batch,
+                ignore_cache=ignore_cache,
+            ))
+
+        if logger.isEnabledFor(logging.DEBUG):
+            log.debug(f'Decoding rules stats so far: {self.get_rules_stats()}')
+        return events
+
+    def _decode_transaction_hashes_batch(
+            self,
+            tx_hashes: List[EVMTxHash],
+            ignore_cache: bool,
+    ) -> List[HistoryBaseEntry]:
+        """Decodes a batch of transactions. Returns the events of each transaction,
+        in the order of the given hashes.
+
+        May raise:
+        - DeserializationError if there is a problem with conacting a remote to get receipts
+        - RemoteError if there is a problem with contacting a remote to get receipts
+        - InputError if the transaction hash is not found in the DB
+        """
+        with self.database.conn.read_ctx() as cursor:
+            transactions = {x.tx_hash: x for x in self.dbethtx.get_ethereum_transactions(
+                cursor=cursor,
+                filter_=ETHTransactionsFilterQuery.make(tx_hashes=tx_hashes),
+                has_premium=True,  # ignore limiting here
+            )}
+            receipts = self.dbethtx.get_receipts(cursor, tx_hashes)
+
+        missing_receipts = [x for x in tx_hashes if x in transactions and x not in receipts]
+        if len(missing_receipts) != 0:
+            self.transactions.query_and_save_receipts(missing_receipts)
+            with self.database.conn.read_ctx() as cursor:
+                receipts.update(self.dbethtx.get_receipts(cursor, missing_receipts))
+
+        events: List[HistoryBaseEntry] = []
+        with self.database.user_write() as write_cursor:
+            if ignore_cache is True:  # delete all decoded events
+                self.dbevents.delete_events_by_tx_hash(write_cursor, tx_hashes)
+                write_cursor.executemany(
+                    'DELETE from evm_tx_mappings WHERE tx_hash=? AND blockchain=? AND value=?',
+                    [(x, 'ETH', HISTORY_MAPPING_DECODED) for x in tx_hashes],
                 )
-                events.extend(self.get_or_decode_transaction_events(
-                    write_cursor=cursor,
-                    transaction=txs[0],
-                    tx_receipt=receipt,
-                    ignore_cache=ignore_cache,
-                ))
+                decoded_events: Dict[bytes, List[HistoryBaseEntry]] = {}
+            else:  # see which events are already decoded and get them
+                decoded_events = self._get_decoded_events(write_cursor, tx_hashes)
+
+            newly_decoded = []
+            for tx_hash in tx_hashes:
+                if tx_hash in decoded_events:
+                    events.extend(decoded_events[tx_hash])
+                    continue
+
+                transaction, receipt = transactions.get(tx_hash), receipts.get(tx_hash)
+                if transaction is None or receipt is None:
+                    # not loaded in bulk so the transaction itself needs to be queried
+                    try:
+                        receipt = self.transactions.get_or_query_transaction_receipt(write_cursor, tx_hash)  # noqa: E501
+                    except RemoteError as e:
+                        raise InputError(f'Hash {tx_hash.hex()} does not correspond to a transaction') from e  # noqa: E501
+                    transaction = self.dbethtx.get_ethereum_transactions(
+                        cursor=write_cursor,
+                        filter_=ETHTransactionsFilterQuery.make(tx_hash=tx_hash),
+                        has_premium=True,  # ignore limiting here
+                    )[0]
+
+                tx_events = self._decode_events(transaction, receipt)
+                newly_decoded.append((tx_hash, tx_events))
+                events.extend(tx_events)
+
+            self._save_decoded_events(write_cursor, newly_decoded)
 
         return events
 
+    def _get_decoded_events(
+            self,
+            cursor: 'DBCursor',
+            tx_hashes: List[EVMTxHash],
+    ) -> Dict[bytes, List[HistoryBaseEntry]]:
+        """Returns the events of those of the given transactions that are already decoded"""
+        cursor.execute(
+            f'SELECT tx_hash from evm_tx_mappings WHERE blockchain=? AND value=? AND '
+            f'tx_hash IN ({", ".join(["?"] * len(tx_hashes))})',
+            ('ETH', HISTORY_MAPPING_DECODED, *tx_hashes),
+        )
+        decoded_hashes = [x[0] for x in cursor]
+        if len(decoded_hashes) == 0:
+            return {}
+
+        decoded_events: Dict[bytes, List[HistoryBaseEntry]] = {x: [] for x in decoded_hashes}
+        for event in self.dbevents.get_history_events(
+                cursor=cursor,
+                filter_query=HistoryEventFilterQuery.make(event_identifiers=decoded_hashes),
+                has_premium=True,  # for this function we don't limit anything
+        ):
+            decoded_events[event.event_identifier].append(event)
+
+        return decoded_events
+
     def get_or_decode_transaction_events(
             self,
             write_cursor: 'DBCursor',
@@ -580,21 +758,21 @@ class EVMTransactionDecoder():
             decoded_events: List[HistoryBaseEntry],
             action_items: List[ActionItem],  # pylint: disable=unused-argument
     ) -> Optional[HistoryBaseEntry]:
-        if tx_log.topics[0] == GTC_CLAIM and tx_log.address == '0xDE3e5a990bCE7fC60a6f017e7c4a95fc4939299E':  # noqa: E501
+        if tx_log.topics[0] == GTC_CLAIM and tx_log.address == GTC_DISTRIBUTOR:
             for event in decoded_events:
                 if event.asset == A_GTC and event.event_type == HistoryEventType.RECEIVE:
                     event.event_subtype = HistoryEventSubType.AIRDROP
                     event.notes = f'Claim {event.balance.amount} GTC from the GTC airdrop'
             return None
 
-        if tx_log.topics[0] == ONEINCH_CLAIM and tx_log.address == '0xE295aD71242373C37C5FdA7B57F26f9eA1088AFe':  # noqa: E501
+        if tx_log.topics[0] == ONEINCH_CLAIM and tx_log.address == ONEINCH_DISTRIBUTOR:
             for event in decoded_events:
                 if event.asset == A_1INCH and event.event_type == HistoryEventType.RECEIVE:
                     event.event_subtype = HistoryEventSubType.AIRDROP
                     event.notes = f'Claim {event.balance.amount} 1INCH from the 1INCH airdrop'  # noqa: E501
             return None
 
-        if tx_log.topics[0] == GNOSIS_CHAIN_BRIDGE_RECEIVE and tx_log.address == '0x88ad09518695c6c3712AC10a214bE5109a655671':  # noqa: E501
+        if tx_log.topics[0] == GNOSIS_CHAIN_BRIDGE_RECEIVE and tx_log.address == GNOSIS_CHAIN_BRIDGE:  # noqa: E501
             for event in decoded_events:
                 if event.event_type == HistoryEventType.RECEIVE:
                     # user bridged from gnosis chain
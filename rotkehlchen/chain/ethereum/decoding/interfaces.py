@@ -5,6 +5,7 @@ from rotkehlchen.types import ChecksumEvmAddress
 
 if TYPE_CHECKING:
     from rotkehlchen.chain.ethereum.decoding.base import BaseDecoderTools
+    from rotkehlchen.chain.ethereum.decoding.structures import TopicDecodingRule
     from rotkehlchen.chain.ethereum.manager import EthereumManager
     from rotkehlchen.user_messages import MessagesAggregator
 
@@ -42,6 +43,14 @@ class DecoderInterface(metaclass=ABCMeta):
         """
         return []
 
+    def topic_decoding_rules(self) -> List['TopicDecodingRule']:  # pylint: disable=no-self-use
+        """
+        Subclasses may implement this to add decoding rules that are only attempted for logs
+        with a specific topic and optionally emitted by a specific address. Prefer this to
+        decoding_rules since the generic rules are attempted for every log
+        """
+        return []
+
     def enricher_rules(self) -> List[Callable]:  # pylint: disable=no-self-use
         """
         Subclasses may implement this to add new generic decoding rules to be attempted
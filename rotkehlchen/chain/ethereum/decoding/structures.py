@@ -1,9 +1,10 @@
-from typing import Dict, NamedTuple, Optional, Tuple
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
 
 from rotkehlchen.accounting.structures.base import HistoryBaseEntry
 from rotkehlchen.accounting.structures.types import HistoryEventSubType, HistoryEventType
 from rotkehlchen.assets.asset import CryptoAsset
 from rotkehlchen.fval import FVal
+from rotkehlchen.types import ChecksumEvmAddress
 
 
 class ActionItem(NamedTuple):
@@ -22,3 +23,11 @@ class ActionItem(NamedTuple):
     # Optional event data that pairs it with the event of the action item
     # Contains a tuple with the paired event and whether it's an out event (True) or in event
     paired_event_data: Optional[Tuple[HistoryBaseEntry, bool]] = None
+
+
+class TopicDecodingRule(NamedTuple):
+    """A decoding rule that is only attempted for logs whose first topic is `topic`
+    and, if an address is given, that are emitted by that address"""
+    topic: bytes
+    rule: Callable
+    address: Optional[ChecksumEvmAddress] = None
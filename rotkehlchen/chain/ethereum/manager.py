@@ -1,6 +1,7 @@
 import json
 import logging
 import random
+import time
 from typing import (
     TYPE_CHECKING,
     Any,
@@ -10,24 +11,33 @@ from typing import (
     Literal,
     Optional,
     Sequence,
+    Set,
     Tuple,
+    TypeVar,
     Union,
     overload,
 )
 from urllib.parse import urlparse
 
+import gevent
 import requests
+from gevent.local import local
+from gevent.lock import BoundedSemaphore
+from gevent.pool import Pool
+from gevent.queue import Empty, Queue
 from ens import ENS
 from ens.abis import ENS as ENS_ABI, RESOLVER as ENS_RESOLVER_ABI
 from ens.exceptions import InvalidName
 from ens.main import ENS_MAINNET_ADDR
 from ens.utils import is_none_or_zero_address, normal_name_to_hash, normalize_name
-from eth_abi.exceptions import InsufficientDataBytes
+from eth_abi.exceptions import DecodingError, InsufficientDataBytes
 from eth_typing import BlockNumber, HexStr
 from web3 import HTTPProvider, Web3
-from web3._utils.abi import get_abi_output_types
+from web3._utils.abi import get_abi_output_types, map_abi_data
 from web3._utils.contracts import find_matching_event_abi
 from web3._utils.filters import construct_event_filter_params
+from web3._utils.normalizers import BASE_RETURN_NORMALIZERS
+from web3.contract import Contract
 from web3.datastructures import MutableAttributeDict
 from web3.exceptions import (
     BadFunctionCallOutput,
@@ -41,9 +51,10 @@ from rotkehlchen.chain.constants import DEFAULT_EVM_RPC_TIMEOUT
 from rotkehlchen.chain.ethereum.constants import ETHERSCAN_NODE
 from rotkehlchen.chain.ethereum.graph import Graph
 from rotkehlchen.chain.ethereum.modules.eth2.constants import ETH2_DEPOSIT
+from rotkehlchen.chain.ethereum.node_health import NodeHealthTracker
 from rotkehlchen.chain.ethereum.types import string_to_evm_address
 from rotkehlchen.chain.ethereum.utils import MULTICALL_CHUNKS
-from rotkehlchen.chain.evm.contracts import EvmContract
+from rotkehlchen.chain.evm.contracts import WEB3, EvmContract
 from rotkehlchen.constants import ONE
 from rotkehlchen.constants.ethereum import (
     ENS_REVERSE_RECORDS,
@@ -53,8 +64,10 @@ from rotkehlchen.constants.ethereum import (
     ETH_SCAN,
     UNIV1_LP_ABI,
 )
+from rotkehlchen.db.contract_call_cache import ContractCallCache
 from rotkehlchen.errors.misc import (
     BlockchainQueryError,
+    CallTooBigError,
     InputError,
     RemoteError,
     UnableToDecryptRemoteData,
@@ -92,6 +105,36 @@ logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
 
+# How many queries can run at the same time on a node when spreading jobs over nodes
+OWNED_NODE_CONCURRENT_QUERIES = 4
+OPEN_NODE_CONCURRENT_QUERIES = 2
+ETHERSCAN_CONCURRENT_QUERIES = 1  # etherscan is rate limited per api key
+# Successful multicall chunks after which the multicall chunk limit is doubled
+MULTICALL_CHUNK_LIMIT_GROWTH_SUCCESSES = 50
+
+T = TypeVar('T')
+
+# Errors of a node query after which the next node is tried
+NODE_QUERY_ERRORS = (
+    RemoteError,
+    requests.exceptions.RequestException,
+    BlockchainQueryError,
+    TransactionNotFound,
+    BlockNotFound,
+    BadResponseFormat,
+    ValueError,  # Yabir saw this happen with mew node for unavailable method at node. Since it's generic we should replace if web3 implements https://github.com/ethereum/web3.py/issues/2448  # noqa: E501
+)
+
+# Parts of node errors for calls that need too much gas or return too big a response
+CALL_TOO_BIG_ERRORS = (
+    'out of gas',
+    'gas required exceeds',
+    'exceeds block gas limit',
+    'too large',
+    'too big',
+    'response size',
+)
+
 CURVE_POOLS_MAPPING_TYPE = Dict[
     ChecksumEvmAddress,  # lp token address
     Tuple[
@@ -127,6 +170,88 @@ WEB3_LOGQUERY_BLOCK_RANGE = 250000
 MAX_ADDRESSES_IN_REVERSE_ENS_QUERY = 80
 
 
+def _deserialize_raw_tx_receipt(tx_receipt: Dict[str, Any], source: str) -> Dict[str, Any]:
+    """Turns the hex numbers of a receipt as returned by the JSON-RPC API to ints
+
+    May raise:
+    - RemoteError if the receipt can't be deserialized
+    """
+    try:
+        block_number = int(tx_receipt['blockNumber'], 16)
+        tx_receipt['blockNumber'] = block_number
+        tx_receipt['cumulativeGasUsed'] = int(tx_receipt['cumulativeGasUsed'], 16)
+        tx_receipt['gasUsed'] = int(tx_receipt['gasUsed'], 16)
+        tx_receipt['status'] = int(tx_receipt.get('status', '0x1'), 16)
+        tx_index = int(tx_receipt['transactionIndex'], 16)
+        tx_receipt['transactionIndex'] = tx_index
+        for receipt_log in tx_receipt['logs']:
+            receipt_log['blockNumber'] = block_number
+            receipt_log['logIndex'] = deserialize_int_from_hex(
+                symbol=receipt_log['logIndex'],
+                location=f'{source} tx receipt',
+            )
+            receipt_log['transactionIndex'] = tx_index
+    except (DeserializationError, ValueError, KeyError, TypeError) as e:
+        msg = str(e)
+        if isinstance(e, KeyError):
+            msg = f'missing key {msg}'
+        log.error(
+            f'Couldnt deserialize transaction receipt {tx_receipt} data from '
+            f'{source} due to {msg}',
+        )
+        raise RemoteError(
+            f'Couldnt deserialize transaction receipt data from {source} '
+            f'due to {msg}. Check logs for details',
+        ) from e
+
+    return tx_receipt
+
+
+def _decode_call_result(
+        web3: Web3,
+        contract: Contract,
+        method_name: str,
+        arguments: Optional[List[Any]],
+        result: bytes,
+) -> Any:
+    """Decodes the raw result of a contract call the same way web3's contract caller does
+
+    May raise:
+    - BlockchainQueryError if the result can't be decoded for the method's outputs
+    """
+    fn_abi = contract._find_matching_fn_abi(
+        fn_identifier=method_name,
+        args=arguments if arguments else [],
+    )
+    output_types = get_abi_output_types(fn_abi)
+    try:
+        output_data = web3.codec.decode_abi(output_types, result)
+    except DecodingError as e:
+        raise BlockchainQueryError(
+            f'Error decoding result of {method_name} call on contract {contract.address}: {str(e)}',  # noqa: E501
+        ) from e
+
+    normalized_data = map_abi_data(BASE_RETURN_NORMALIZERS, output_types, output_data)
+    if len(normalized_data) == 1:
+        return normalized_data[0]
+    return normalized_data
+
+
+def _node_concurrent_queries(node: NodeName) -> int:
+    if node.name == ETHERSCAN_NODE_NAME:
+        return ETHERSCAN_CONCURRENT_QUERIES
+    if node.owned:
+        return OWNED_NODE_CONCURRENT_QUERIES
+    return OPEN_NODE_CONCURRENT_QUERIES
+
+
+def _is_call_too_big(error: Exception) -> bool:
+    """Whether a node error means that the call needs too much gas or returns
+    too big a response"""
+    error_msg = str(error).lower()
+    return any(x in error_msg for x in CALL_TOO_BIG_ERRORS)
+
+
 def _query_web3_get_logs(
         web3: Web3,
         filter_args: FilterParams,
@@ -223,6 +348,17 @@ class EthereumManager():
         self.eth_rpc_timeout = eth_rpc_timeout
         self.archive_connection = False
         self.queried_archive_connection = False
+        # endpoints that answered a JSON-RPC batch request with something other than a batch
+        self.batch_unsupported_endpoints: Set[str] = set()
+        self.node_health = NodeHealthTracker()
+        # if True a query also goes to the next node if the first is slower than usual
+        self.hedged_requests = False
+        # max calls per multicall chunk, lowered when chunks fail due to their size
+        self.multicall_chunk_limit: Optional[int] = None
+        self.multicall_chunk_successes = 0
+        # bound the concurrent queries of map_over_nodes jobs per node, also when nested
+        self.node_semaphores: Dict[NodeName, BoundedSemaphore] = {}
+        self.map_job_state = local()
         self.connect_to_multiple_nodes(connect_at_start)
         self.blocks_subgraph = Graph(
             'https://api.thegraph.com/subgraphs/name/blocklytics/ethereum-blocks',
@@ -238,6 +374,7 @@ class EthereumManager():
             },
         }
         self.database = database
+        self.contract_call_cache = ContractCallCache(database)
 
         # Contracts
         self.contract_scan = ETH_SCAN[ChainID.ETHEREUM]
@@ -254,22 +391,124 @@ class EthereumManager():
             calls_chunk_size: int = MULTICALL_CHUNKS,
     ) -> Any:
         """Uses MULTICALL contract. Failure of one call is a failure of the entire multicall.
-        source: https://etherscan.io/address/0xeefBa1e63905eF1D7ACbA5a8513c70307C1cE441#code"""
+        source: https://etherscan.io/address/0xeefBa1e63905eF1D7ACbA5a8513c70307C1cE441#code
+
+        The calls are split in chunks which are queried concurrently, spread over
+        the nodes of the call order. The output is in the order of the calls.
 
+        May raise:
+        - RemoteError if a chunk could not be queried from any node
+        """
+        if self.multicall_chunk_limit is not None:
+            calls_chunk_size = min(calls_chunk_size, self.multicall_chunk_limit)
         calls_chunked = list(get_chunks(calls, n=calls_chunk_size))
+        if call_order is None:
+            call_order = self.default_call_order()
+
         output = []
-        for call_chunk in calls_chunked:
-            multicall_result = self.contract_multicall.call(
+        for chunk_output in self.map_over_nodes(
+                function=self._multicall_chunk,
+                jobs=calls_chunked,
+                call_order=call_order,
+                block_identifier=block_identifier,
+        ):
+            output += chunk_output
+        return output
+
+    def _multicall_chunk(
+            self,
+            calls: List[Tuple[ChecksumEvmAddress, str]],
+            call_order: Sequence[WeightedNode],
+            block_identifier: BlockIdentifier,
+    ) -> List[Any]:
+        """Queries a chunk of calls with the MULTICALL contract. If all nodes reject
+        the chunk because it needs too much gas or returns too big a response it's
+        split in halves which are queried separately. If both halves succeed, the
+        multicall chunk limit is lowered. Any other failure is raised right away.
+
+        May raise:
+        - RemoteError if the chunk could not be queried from any node
+        """
+        try:
+            _, output = self.contract_multicall.call(
                 manager=self,
                 method_name='aggregate',
-                arguments=[call_chunk],
+                arguments=[calls],
                 call_order=call_order,
                 block_identifier=block_identifier,
             )
-            _, chunk_output = multicall_result
-            output += chunk_output
+        except CallTooBigError as e:
+            if len(calls) == 1:
+                raise
+
+            log.debug(f'Multicall chunk of {len(calls)} calls failed due to {str(e)}. Splitting it')  # noqa: E501
+            half = len(calls) // 2
+            output = (
+                self._multicall_chunk(calls[:half], call_order, block_identifier) +
+                self._multicall_chunk(calls[half:], call_order, block_identifier)
+            )
+            if self.multicall_chunk_limit is None or half < self.multicall_chunk_limit:
+                log.debug(f'Lowering the multicall chunk limit to {half} calls')
+                self.multicall_chunk_limit = half
+                self.multicall_chunk_successes = 0
+            return output
+
+        if self.multicall_chunk_limit is not None and len(calls) == self.multicall_chunk_limit:
+            # try bigger chunks again from time to time since the failure may be temporary
+            self.multicall_chunk_successes += 1
+            if self.multicall_chunk_successes >= MULTICALL_CHUNK_LIMIT_GROWTH_SUCCESSES:
+                self.multicall_chunk_limit *= 2
+                self.multicall_chunk_successes = 0
         return output
 
+    def map_over_nodes(
+            self,
+            function: Callable[..., T],
+            jobs: Sequence[Any],
+            call_order: Sequence[WeightedNode],
+            **kwargs: Any,
+    ) -> List[T]:
+        """Calls `function(job, call_order, **kwargs)` for every job concurrently and
+        returns the results in the order of the jobs.
+
+        Jobs are assigned to the nodes of the call order round robin, proportionally
+        to the number of queries each node can handle at the same time. Each job gets
+        the call order starting from its node so that the rest of the nodes are
+        still tried if its node fails. The queries of the jobs wait for their node's
+        semaphore, which is shared by all jobs including those of nested calls.
+
+        May raise whatever `function` raises. The first exception is raised.
+        """
+        if len(jobs) <= 1:
+            return [function(job, call_order, **kwargs) for job in jobs]
+
+        call_order = [  # only nodes that can be queried
+            x for x in call_order
+            if x.node_info.name == ETHERSCAN_NODE_NAME or x.node_info in self.web3_mapping
+        ]
+        if len(call_order) == 0:
+            # nothing to spread over. Let the function raise the right error for this
+            return [function(job, call_order, **kwargs) for job in jobs]
+
+        slots = [
+            idx for idx, node in enumerate(call_order)
+            for _ in range(_node_concurrent_queries(node.node_info))
+        ]
+
+        def run(job_idx: int) -> T:
+            node_idx = slots[job_idx % len(slots)]
+            # the semaphore is taken per node query and not for the whole job. A job
+            # waiting for nested jobs would otherwise hold it and could deadlock them
+            self.map_job_state.bounded = True
+            return function(
+                jobs[job_idx],
+                call_order[node_idx:] + call_order[:node_idx],
+                **kwargs,
+            )
+
+        pool = Pool(size=min(len(slots), len(jobs)))
+        return list(pool.imap(run, range(len(jobs))))
+
     def multicall_2(
             self,
             calls: List[Tuple[ChecksumEvmAddress, str]],
@@ -328,6 +567,10 @@ class EthereumManager():
         - Without weights
         ===> Runs: 66, 82, 72, 58, 72 seconds
         ---> Average: 70 seconds
+
+        The weights are divided by the average response time of each node, so that
+        faster nodes are preferred. Nodes not queried yet get the mean response time.
+        The order is ranked again by node health at each query.
         """
         open_nodes = self.database.get_web3_nodes(blockchain=SupportedBlockchain.ETHEREUM, only_active=True)  # noqa: E501
         if skip_etherscan:
@@ -335,11 +578,13 @@ class EthereumManager():
         else:
             selection = [wnode for wnode in open_nodes if wnode.node_info.owned is False]
 
+        default_latency = self.node_health.mean_latency() or 1.0
         ordered_list = []
         while len(selection) != 0:
             weights = []
             for entry in selection:
-                weights.append(float(entry.weight))
+                latency = self.node_health.latency(entry.node_info) or default_latency
+                weights.append(float(entry.weight) / max(latency, 0.001))
             node = random.choices(selection, weights, k=1)
             ordered_list.append(node[0])
             selection.remove(node[0])
@@ -480,37 +725,126 @@ class EthereumManager():
     def query(self, method: Callable, call_order: Sequence[WeightedNode], **kwargs: Any) -> Any:
         """Queries ethereum related data by performing the provided method to all given nodes
 
+        The nodes that failed recently or fail often are moved after the healthy ones.
         The first node in the call order that gets a succcesful response returns.
-        If none get a result then a remote error is raised
+        If none get a result then a remote error is raised. It's a CallTooBigError
+        if all nodes failed because the call needs too much gas or returns too big
+        a response.
         """
-        for weighted_node in call_order:
+        nodes = []
+        for weighted_node in self.node_health.rank(call_order):
             node = weighted_node.node_info
             web3 = self.web3_mapping.get(node, None)
             if web3 is None and node.name != ETHERSCAN_NODE_NAME:
                 continue
+            nodes.append((node, web3))
+
+        bounded = getattr(self.map_job_state, 'bounded', False)
+        errors: List[Exception] = []
+        if self.hedged_requests and len(nodes) > 1:
+            success, result = self._query_hedged(method, nodes, bounded, errors, **kwargs)
+            if success:
+                return result
+        else:
+            for node, web3 in nodes:
+                success, result = self._query_node(method, node, web3, bounded, **kwargs)
+                if success:
+                    return result
+                errors.append(result)
 
+        # no node in the call order list was succesfully queried
+        message = (
+            f'Failed to query {str(method)} after trying the following '
+            f'nodes: {[str(x) for x in call_order]}. Check logs for details.'
+        )
+        if len(errors) != 0 and all(_is_call_too_big(x) for x in errors):
+            raise CallTooBigError(message)
+        raise RemoteError(message)
+
+    def _query_node(
+            self,
+            method: Callable,
+            node: NodeName,
+            web3: Optional[Web3],
+            bounded: bool,
+            **kwargs: Any,
+    ) -> Tuple[bool, Any]:
+        """Queries a single node and records its health. Returns whether the query
+        succeeded and its result, or the error if it failed.
+
+        If bounded, the query waits for the node's semaphore first"""
+        if bounded:
+            semaphore = self.node_semaphores.get(node)
+            if semaphore is None:
+                semaphore = BoundedSemaphore(_node_concurrent_queries(node))
+                self.node_semaphores[node] = semaphore
+            with semaphore:
+                return self._query_node(method, node, web3, False, **kwargs)
+
+        start = time.perf_counter()
+        try:
+            result = method(web3, **kwargs)
+        except NODE_QUERY_ERRORS as e:
+            log.warning(f'Failed to query {node} for {str(method)} due to {str(e)}')
+            self.node_health.record_failure(node, time.perf_counter() - start)
+            # Catch all possible errors here and just try next node call
+            return False, e
+
+        self.node_health.record_success(node, time.perf_counter() - start)
+        return True, result
+
+    def _query_hedged(
+            self,
+            method: Callable,
+            nodes: List[Tuple[NodeName, Optional[Web3]]],
+            bounded: bool,
+            errors: List[Exception],
+            **kwargs: Any,
+    ) -> Tuple[bool, Any]:
+        """Queries the nodes in order, but if a node has not responded after its 95th
+        percentile latency the next node is queried too. The first successful response
+        is returned. A failed query fires the next node right away and its error is
+        appended to errors.
+
+        Queries that lose the race are left to finish in the background so that
+        they still count in their node's health.
+        """
+        responses: Queue = Queue()
+        pending, next_idx = 0, 0
+
+        def attempt(node: NodeName, web3: Optional[Web3]) -> None:
             try:
-                result = method(web3, **kwargs)
-            except (
-                    RemoteError,
-                    requests.exceptions.RequestException,
-                    BlockchainQueryError,
-                    TransactionNotFound,
-                    BlockNotFound,
-                    BadResponseFormat,
-                    ValueError,  # Yabir saw this happen with mew node for unavailable method at node. Since it's generic we should replace if web3 implements https://github.com/ethereum/web3.py/issues/2448  # noqa: E501
-            ) as e:
-                log.warning(f'Failed to query {node} for {str(method)} due to {str(e)}')
-                # Catch all possible errors here and just try next node call
+                responses.put(self._query_node(method, node, web3, bounded, **kwargs))
+            except Exception as e:  # pylint: disable=broad-except
+                responses.put(e)  # unexpected errors are raised as in non hedged queries
+
+        def fire_next() -> None:
+            nonlocal pending, next_idx
+            gevent.spawn(attempt, *nodes[next_idx])
+            pending, next_idx = pending + 1, next_idx + 1
+
+        while next_idx < len(nodes) or pending != 0:
+            if pending == 0:  # nothing to wait for
+                fire_next()
+
+            timeout = None
+            if next_idx < len(nodes):
+                timeout = self.node_health.hedge_delay(nodes[next_idx - 1][0])
+            try:
+                response = responses.get(timeout=timeout)
+            except Empty:  # slower than usual. Hedge with the next node
+                log.debug(f'Hedging query {str(method)} with {nodes[next_idx][0]}')
+                fire_next()
                 continue
 
-            return result
+            pending -= 1
+            if isinstance(response, Exception):
+                raise response
+            if response[0] is True:
+                return response
+            errors.append(response[1])
 
-        # no node in the call order list was succesfully queried
-        raise RemoteError(
-            f'Failed to query {str(method)} after trying the following '
-            f'nodes: {[str(x) for x in call_order]}. Check logs for details.',
-        )
+        return False, None
 
     def _get_latest_block_number(self, web3: Optional[Web3]) -> int:
         if web3 is not None:
@@ -870,35 +1204,7 @@ class EthereumManager():
     ) -> Dict[str, Any]:
         if web3 is None:
             tx_receipt = self.etherscan.get_transaction_receipt(tx_hash)
-            try:
-                # Turn hex numbers to int
-                block_number = int(tx_receipt['blockNumber'], 16)
-                tx_receipt['blockNumber'] = block_number
-                tx_receipt['cumulativeGasUsed'] = int(tx_receipt['cumulativeGasUsed'], 16)
-                tx_receipt['gasUsed'] = int(tx_receipt['gasUsed'], 16)
-                tx_receipt['status'] = int(tx_receipt.get('status', '0x1'), 16)
-                tx_index = int(tx_receipt['transactionIndex'], 16)
-                tx_receipt['transactionIndex'] = tx_index
-                for receipt_log in tx_receipt['logs']:
-                    receipt_log['blockNumber'] = block_number
-                    receipt_log['logIndex'] = deserialize_int_from_hex(
-                        symbol=receipt_log['logIndex'],
-                        location='etherscan tx receipt',
-                    )
-                    receipt_log['transactionIndex'] = tx_index
-            except (DeserializationError, ValueError, KeyError) as e:
-                msg = str(e)
-                if isinstance(e, KeyError):
-                    msg = f'missing key {msg}'
-                log.error(
-                    f'Couldnt deserialize transaction receipt {tx_receipt} data from '
-                    f'etherscan due to {msg}',
-                )
-                raise RemoteError(
-                    f'Couldnt deserialize transaction receipt data from etherscan '
-                    f'due to {msg}. Check logs for details',
-                ) from e
-            return tx_receipt
+            return _deserialize_raw_tx_receipt(tx_receipt, source='etherscan')
 
         # Can raise TransactionNotFound if the user's node is pruned and transaction is old
         tx_receipt = web3.eth.get_transaction_receipt(tx_hash)  # type: ignore
@@ -915,6 +1221,81 @@ class EthereumManager():
             tx_hash=tx_hash,
         )
 
+    def _get_transaction_receipts(
+            self,
+            web3: Optional[Web3],
+            tx_hashes: List[EVMTxHash],
+    ) -> Dict[EVMTxHash, Dict[str, Any]]:
+        """Queries the receipts of the given transactions. For nodes, a single JSON-RPC
+        batch request is used if the node supports it. Receipts the node does not
+        know of are missing from the result.
+
+        May raise:
+        - RemoteError if the node can't be queried or returns invalid data
+        - requests.exceptions.RequestException if the batch request fails
+        """
+        endpoint = None if web3 is None else getattr(web3.manager.provider, 'endpoint_uri', None)  # noqa: E501
+        if web3 is None or endpoint is None or endpoint in self.batch_unsupported_endpoints:
+            receipts = {}
+            for tx_hash in tx_hashes:
+                if web3 is None:
+                    tx_receipt = self.etherscan.get_transaction_receipt(tx_hash)
+                    if tx_receipt is not None:  # etherscan returns null for unknown hashes
+                        receipts[tx_hash] = _deserialize_raw_tx_receipt(tx_receipt, source='etherscan')  # noqa: E501
+                    continue
+
+                try:
+                    receipts[tx_hash] = self._get_transaction_receipt(web3=web3, tx_hash=tx_hash)  # noqa: E501
+                except TransactionNotFound:
+                    continue
+            return receipts
+
+        response = requests.post(
+            url=endpoint,
+            json=[{
+                'jsonrpc': '2.0',
+                'id': idx,
+                'method': 'eth_getTransactionReceipt',
+                'params': [tx_hash.hex()],
+            } for idx, tx_hash in enumerate(tx_hashes)],
+            timeout=self.eth_rpc_timeout,
+        )
+        try:
+            result = response.json()
+        except json.JSONDecodeError as e:
+            raise RemoteError(f'{endpoint} returned invalid JSON for a batch request') from e
+
+        if not isinstance(result, list):
+            log.debug(f'{endpoint} does not support JSON-RPC batch requests. Querying one by one')  # noqa: E501
+            self.batch_unsupported_endpoints.add(endpoint)
+            return self._get_transaction_receipts(web3=web3, tx_hashes=tx_hashes)
+
+        receipts = {}
+        for entry in result:
+            try:
+                tx_hash = tx_hashes[entry['id']]
+            except (TypeError, KeyError, IndexError) as e:
+                raise RemoteError(f'{endpoint} returned unexpected batch entry {entry}') from e
+
+            if entry.get('result') is None:  # unknown to the node or an error
+                continue
+            receipts[tx_hash] = _deserialize_raw_tx_receipt(entry['result'], source=endpoint)
+
+        return receipts
+
+    def get_transaction_receipts(
+            self,
+            tx_hashes: List[EVMTxHash],
+            call_order: Optional[Sequence[WeightedNode]] = None,
+    ) -> Dict[EVMTxHash, Dict[str, Any]]:
+        """Queries the receipts of many transactions from the first node that responds.
+        Receipts that node could not find are missing from the result."""
+        return self.query(
+            method=self._get_transaction_receipts,
+            call_order=call_order if call_order is not None else self.default_call_order(),
+            tx_hashes=tx_hashes,
+        )
+
     def _get_transaction_by_hash(
             self,
             web3: Optional[Web3],
@@ -954,6 +1335,20 @@ class EthereumManager():
             call_order: Optional[Sequence[WeightedNode]] = None,
             block_identifier: BlockIdentifier = 'latest',
     ) -> Any:
+        """Performs an eth_call to an ethereum contract. Results of calls at a specific
+        block number never change so they are served from the contract call cache when cached"""
+        if isinstance(block_identifier, int):
+            contract = WEB3.eth.contract(address=contract_address, abi=abi)
+            calldata = contract.encodeABI(method_name, args=arguments if arguments else [])
+            cached_result = self.contract_call_cache.get(
+                chain=ChainID.ETHEREUM,
+                address=contract_address,
+                calldata=bytes.fromhex(calldata[2:]),
+                block_number=block_identifier,
+            )
+            if cached_result is not None:
+                return _decode_call_result(WEB3, contract, method_name, arguments, cached_result)
+
         return self.query(
             method=self._call_contract,
             call_order=call_order if call_order is not None else self.default_call_order(),
@@ -989,13 +1384,36 @@ class EthereumManager():
             )
 
         contract = web3.eth.contract(address=contract_address, abi=abi)
+        if not isinstance(block_identifier, int):
+            try:
+                method = getattr(contract.caller(block_identifier=block_identifier), method_name)
+                result = method(*arguments if arguments else [])
+            except (ValueError, BadFunctionCallOutput) as e:
+                raise BlockchainQueryError(
+                    f'Error doing call on contract {contract_address}: {str(e)}',
+                ) from e
+            return result
+
+        # call at a specific block. Get the raw result to keep it in the cache
+        calldata = contract.encodeABI(method_name, args=arguments if arguments else [])
         try:
-            method = getattr(contract.caller(block_identifier=block_identifier), method_name)
-            result = method(*arguments if arguments else [])
-        except (ValueError, BadFunctionCallOutput) as e:
+            raw_result = web3.eth.call(
+                {'to': contract_address, 'data': calldata},
+                block_identifier=block_identifier,
+            )
+        except ValueError as e:
             raise BlockchainQueryError(
                 f'Error doing call on contract {contract_address}: {str(e)}',
             ) from e
+
+        result = _decode_call_result(web3, contract, method_name, arguments, bytes(raw_result))
+        self.contract_call_cache.set(  # only cache results that could be decoded
+            chain=ChainID.ETHEREUM,
+            address=contract_address,
+            calldata=bytes.fromhex(calldata[2:]),
+            block_number=block_identifier,
+            result=bytes(raw_result),
+        )
         return result
 
     def get_logs(
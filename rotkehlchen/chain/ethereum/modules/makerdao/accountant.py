@@ -1,5 +1,5 @@
 from collections import defaultdict
-from typing import TYPE_CHECKING, Dict, List, cast
+from typing import TYPE_CHECKING, Any, Dict, List, cast
 
 from rotkehlchen.accounting.mixins.event import AccountingEventType
 from rotkehlchen.accounting.structures.base import HistoryBaseEntry, get_tx_event_type_identifier
@@ -23,6 +23,18 @@ class MakerdaoAccountant(ModuleAccountantInterface):
         self.vault_balances: Dict[str, FVal] = defaultdict(FVal)
         self.dsr_balances: Dict[ChecksumEvmAddress, FVal] = defaultdict(FVal)
 
+    def serialize_state(self) -> Dict[str, Any]:
+        return {
+            'vault_balances': {k: str(v) for k, v in self.vault_balances.items()},
+            'dsr_balances': {k: str(v) for k, v in self.dsr_balances.items()},
+        }
+
+    def restore_state(self, data: Dict[str, Any]) -> None:
+        for cdp_id, amount in data.get('vault_balances', {}).items():
+            self.vault_balances[cdp_id] = FVal(amount)
+        for address, amount in data.get('dsr_balances', {}).items():
+            self.dsr_balances[address] = FVal(amount)
+
     def _process_vault_dai_generation(
             self,
             pot: 'AccountingPot',  # pylint: disable=unused-argument
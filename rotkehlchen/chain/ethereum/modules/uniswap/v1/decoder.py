@@ -1,10 +1,10 @@
-from typing import Callable, List, Optional
+from typing import List, Optional
 
 from rotkehlchen.accounting.structures.base import HistoryBaseEntry
 from rotkehlchen.accounting.structures.types import HistoryEventSubType, HistoryEventType
 from rotkehlchen.assets.asset import EvmToken
 from rotkehlchen.chain.ethereum.decoding.interfaces import DecoderInterface
-from rotkehlchen.chain.ethereum.decoding.structures import ActionItem
+from rotkehlchen.chain.ethereum.decoding.structures import ActionItem, TopicDecodingRule
 from rotkehlchen.chain.ethereum.decoding.utils import maybe_reshuffle_events
 from rotkehlchen.chain.ethereum.structures import EthereumTxReceiptLog
 from rotkehlchen.types import EvmTransaction
@@ -62,9 +62,10 @@ class Uniswapv1Decoder(DecoderInterface):  # lgtm[py/missing-call-to-init]
 
     # -- DecoderInterface methods
 
-    def decoding_rules(self) -> List[Callable]:
+    def topic_decoding_rules(self) -> List[TopicDecodingRule]:
         return [
-            self._maybe_decode_swap,
+            TopicDecodingRule(topic=TOKEN_PURCHASE, rule=self._maybe_decode_swap),
+            TopicDecodingRule(topic=ETH_PURCHASE, rule=self._maybe_decode_swap),
         ]
 
     def counterparties(self) -> List[str]:
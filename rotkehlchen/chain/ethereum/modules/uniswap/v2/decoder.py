@@ -1,9 +1,9 @@
-from typing import TYPE_CHECKING, Callable, List, Optional
+from typing import TYPE_CHECKING, List, Optional
 
 from rotkehlchen.accounting.structures.base import HistoryBaseEntry
 from rotkehlchen.assets.asset import EvmToken
 from rotkehlchen.chain.ethereum.decoding.interfaces import DecoderInterface
-from rotkehlchen.chain.ethereum.decoding.structures import ActionItem
+from rotkehlchen.chain.ethereum.decoding.structures import ActionItem, TopicDecodingRule
 from rotkehlchen.chain.ethereum.modules.uniswap.constants import CPT_UNISWAP_V2
 from rotkehlchen.chain.ethereum.modules.uniswap.v2.common import decode_uniswap_v2_like_swap
 from rotkehlchen.chain.ethereum.structures import EthereumTxReceiptLog
@@ -54,9 +54,9 @@ class Uniswapv2Decoder(DecoderInterface):
 
     # -- DecoderInterface methods
 
-    def decoding_rules(self) -> List[Callable]:
+    def topic_decoding_rules(self) -> List[TopicDecodingRule]:
         return [
-            self._maybe_decode_v2_swap,
+            TopicDecodingRule(topic=SWAP_SIGNATURE, rule=self._maybe_decode_v2_swap),
         ]
 
     def counterparties(self) -> List[str]:
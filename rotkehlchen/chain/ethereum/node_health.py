@@ -0,0 +1,134 @@
+import statistics
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Sequence
+
+from rotkehlchen.chain.ethereum.types import NodeName, WeightedNode
+
+# Weight of the latest query in the moving averages of each node's latency and error rate
+NODE_LATENCY_EWMA_ALPHA = 0.2
+NODE_ERROR_RATE_EWMA_ALPHA = 0.1
+# Latencies of the latest successful queries of a node kept to compute percentiles
+NODE_LATENCY_SAMPLES = 100
+# Nodes that failed that recently or with a higher error rate are tried after the others
+NODE_FAILURE_COOLDOWN_SECS = 60
+UNHEALTHY_ERROR_RATE = 0.5
+# Delay after which a hedged request fires the next node if too few latencies are known
+DEFAULT_HEDGE_DELAY_SECS = 1.0
+MIN_HEDGE_DELAY_SECS = 0.05
+MIN_SAMPLES_FOR_HEDGE_DELAY = 10
+
+
+class NodeStats():
+    """Health statistics of a node. Latencies are wall time in seconds"""
+    __slots__ = ('latency', 'samples', 'queries', 'failures', 'error_rate', 'last_failure_ts')
+
+    def __init__(self) -> None:
+        self.latency: Optional[float] = None  # moving average of all queries
+        self.samples: Deque[float] = deque(maxlen=NODE_LATENCY_SAMPLES)  # successful queries
+        self.queries = 0
+        self.failures = 0
+        self.error_rate = 0.0  # moving average of failures
+        self.last_failure_ts: Optional[float] = None
+
+    def p95(self) -> Optional[float]:
+        if len(self.samples) < MIN_SAMPLES_FOR_HEDGE_DELAY:
+            return None
+        return statistics.quantiles(self.samples, n=20)[-1]
+
+    def serialize(self) -> Dict[str, Any]:
+        p95 = self.p95()
+        return {
+            'queries': self.queries,
+            'failures': self.failures,
+            'error_rate': round(self.error_rate, 4),
+            'latency_ms': None if self.latency is None else round(self.latency * 1000, 3),
+            'p95_latency_ms': None if p95 is None else round(p95 * 1000, 3),
+            'last_failure_ts': None if self.last_failure_ts is None else int(self.last_failure_ts),  # noqa: E501
+        }
+
+
+class NodeHealthTracker():
+    """Keeps the health statistics of the queried nodes of a chain and uses them to
+    order the nodes to query and to decide when to hedge a request"""
+
+    def __init__(self) -> None:
+        self.stats: Dict[NodeName, NodeStats] = {}
+
+    def reset(self) -> None:
+        self.stats = {}
+
+    def _record(self, node: NodeName, latency: float, failed: bool) -> NodeStats:
+        stats = self.stats.get(node)
+        if stats is None:
+            stats = self.stats[node] = NodeStats()
+
+        stats.queries += 1
+        if stats.latency is None:
+            stats.latency = latency
+        else:
+            stats.latency = (
+                NODE_LATENCY_EWMA_ALPHA * latency + (1 - NODE_LATENCY_EWMA_ALPHA) * stats.latency
+            )
+        stats.error_rate = (
+            NODE_ERROR_RATE_EWMA_ALPHA * failed +
+            (1 - NODE_ERROR_RATE_EWMA_ALPHA) * stats.error_rate
+        )
+        return stats
+
+    def record_success(self, node: NodeName, latency: float) -> None:
+        self._record(node=node, latency=latency, failed=False).samples.append(latency)
+
+    def record_failure(self, node: NodeName, latency: float) -> None:
+        """A failure that takes a timeout to happen also counts as slow"""
+        stats = self._record(node=node, latency=latency, failed=True)
+        stats.failures += 1
+        stats.last_failure_ts = time.time()
+
+    def latency(self, node: NodeName) -> Optional[float]:
+        stats = self.stats.get(node)
+        return None if stats is None else stats.latency
+
+    def mean_latency(self) -> Optional[float]:
+        latencies = [x.latency for x in self.stats.values() if x.latency is not None]
+        if len(latencies) == 0:
+            return None
+        return statistics.mean(latencies)
+
+    def is_healthy(self, node: NodeName, now: float) -> bool:
+        stats = self.stats.get(node)
+        if stats is None:
+            return True
+        if stats.last_failure_ts is not None and now - stats.last_failure_ts < NODE_FAILURE_COOLDOWN_SECS:  # noqa: E501
+            return False
+        return stats.error_rate < UNHEALTHY_ERROR_RATE
+
+    def rank(self, call_order: Sequence[WeightedNode]) -> List[WeightedNode]:
+        """Moves the nodes that failed recently or fail often after the healthy ones.
+        Otherwise the given order is kept"""
+        now = time.time()
+        healthy, unhealthy = [], []
+        for node in call_order:
+            if self.is_healthy(node.node_info, now):
+                healthy.append(node)
+            else:
+                unhealthy.append(node)
+        return healthy + unhealthy
+
+    def hedge_delay(self, node: NodeName) -> float:
+        """How long to wait for the node before also querying the next one"""
+        stats = self.stats.get(node)
+        p95 = None if stats is None else stats.p95()
+        if p95 is None:
+            return DEFAULT_HEDGE_DELAY_SECS
+        return max(p95, MIN_HEDGE_DELAY_SECS)
+
+    def serialize(self) -> List[Dict[str, Any]]:
+        now = time.time()
+        return [{
+            'name': node.name,
+            'endpoint': node.endpoint,
+            'owned': node.owned,
+            'healthy': self.is_healthy(node, now),
+            **stats.serialize(),
+        } for node, stats in self.stats.items()]
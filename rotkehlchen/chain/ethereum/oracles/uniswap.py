@@ -1,14 +1,13 @@
 import abc
 import logging
-from functools import reduce
-from operator import mul
-from typing import TYPE_CHECKING, List, NamedTuple, Optional
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
 
 from eth_utils import to_checksum_address
 from web3.types import BlockIdentifier
 
 from rotkehlchen.assets.asset import AssetWithOracles, EvmToken
 from rotkehlchen.chain.ethereum.constants import ZERO_ADDRESS
+from rotkehlchen.chain.ethereum.types import string_to_evm_address
 from rotkehlchen.chain.ethereum.utils import token_normalized_value
 from rotkehlchen.chain.evm.contracts import EvmContract
 from rotkehlchen.constants.assets import A_DAI, A_ETH, A_USD, A_USDC, A_USDT, A_WETH
@@ -20,20 +19,26 @@ from rotkehlchen.constants.ethereum import (
     UNISWAP_V3_POOL_ABI,
 )
 from rotkehlchen.constants.misc import ONE, ZERO
-from rotkehlchen.constants.resolver import ethaddress_to_identifier
+from rotkehlchen.constants.timing import DAY_IN_SECONDS, WEEK_IN_SECONDS
 from rotkehlchen.errors.asset import WrongAssetType
 from rotkehlchen.errors.defi import DefiPoolError
 from rotkehlchen.errors.price import PriceQueryUnsupportedAsset
 from rotkehlchen.fval import FVal
+from rotkehlchen.globaldb.handler import GlobalDBHandler
 from rotkehlchen.inquirer import Inquirer
 from rotkehlchen.interfaces import CurrentPriceOracleInterface
 from rotkehlchen.logging import RotkehlchenLogsAdapter
-from rotkehlchen.types import ChecksumEvmAddress, Price
-from rotkehlchen.utils.mixins.cacheable import CacheableMixIn, cache_response_timewise
+from rotkehlchen.types import ChecksumEvmAddress, GeneralCacheType, Price, Timestamp
+from rotkehlchen.utils.misc import ts_now
 
 if TYPE_CHECKING:
     from rotkehlchen.chain.ethereum.manager import EthereumManager
 UNISWAP_FACTORY_DEPLOYED_BLOCK = 12369621
+# How long found pools are cached. Pairs without a pool are queried again sooner
+UNISWAP_POOL_CACHE_TTL = WEEK_IN_SECONDS
+UNISWAP_NO_POOL_CACHE_TTL = DAY_IN_SECONDS
+# Max number of pools to jump through from one asset to the other
+MAX_ROUTE_HOPS = 3
 
 
 logger = logging.getLogger(__name__)
@@ -53,20 +58,40 @@ class PoolPrice(NamedTuple):
         )
 
 
-class UniswapOracle(CurrentPriceOracleInterface, CacheableMixIn):
+class RouteHop(NamedTuple):
+    """A swap through a pool. token_0 and token_1 are sorted by address like in the pool"""
+    pool: ChecksumEvmAddress
+    token_0: EvmToken
+    token_1: EvmToken
+
+
+def sort_tokens(token_a: EvmToken, token_b: EvmToken) -> Tuple[EvmToken, EvmToken]:
+    """Sorts two tokens by address, which is how uniswap pools order them"""
+    if token_a.evm_address.lower() < token_b.evm_address.lower():
+        return token_a, token_b
+    return token_b, token_a
+
+
+class UniswapOracle(CurrentPriceOracleInterface):
     """
     Provides shared logic between Uniswap V2 and Uniswap V3 to use them as price oracles.
+
+    The pools found between pairs of tokens form the routing graph. They are kept in
+    memory and in the global DB's general cache, so that routes can be found without
+    any remote query until the cached pools expire.
     """
     def __init__(self, eth_manager: 'EthereumManager', version: int):
-        CacheableMixIn.__init__(self)
         CurrentPriceOracleInterface.__init__(self, oracle_name=f'Uniswap V{version} oracle')
         self.eth_manager = eth_manager
+        self.version = version
         self.weth = A_WETH.resolve_to_evm_token()
         self.routing_assets = [
             self.weth,
             A_DAI.resolve_to_evm_token(),
             A_USDT.resolve_to_evm_token(),
         ]
+        # sorted token addresses -> best pool (zero address if none) and when it was queried
+        self.pools: Dict[Tuple[ChecksumEvmAddress, ChecksumEvmAddress], Tuple[ChecksumEvmAddress, Timestamp]] = {}  # noqa: E501
 
     def rate_limited_in_last(
             self,
@@ -75,114 +100,220 @@ class UniswapOracle(CurrentPriceOracleInterface, CacheableMixIn):
         return False
 
     @abc.abstractmethod
-    def get_pool(
-        self,
-        token_0: EvmToken,
-        token_1: EvmToken,
-    ) -> List[str]:
-        """Given two tokens returns a list of pools where they can be swapped"""
+    def query_pools(
+            self,
+            pairs: List[Tuple[EvmToken, EvmToken]],
+    ) -> List[ChecksumEvmAddress]:
+        """Given pairs of tokens sorted by address returns the best pool where each pair can
+        be swapped, or the zero address if there is none. Queries the chain in batch.
+
+        May raise:
+        - RemoteError
+        """
         ...
 
     @abc.abstractmethod
-    def get_pool_price(
-        self,
-        pool_addr: ChecksumEvmAddress,
-        block_identifier: BlockIdentifier = 'latest',
-    ) -> PoolPrice:
-        """Returns the price for the tokens in the given pool and the token0 and
-        token1 of the pool.
+    def pool_price_call(self, hop: RouteHop) -> Tuple[ChecksumEvmAddress, str]:
+        """Returns the contract call, for a multicall, needed to get the price of the pool"""
+        ...
+
+    @abc.abstractmethod
+    def decode_pool_price(self, hop: RouteHop, result: bytes) -> PoolPrice:
+        """Returns the units of token1 that one token0 can buy in the pool from the
+        output of its price call.
+
         May raise:
         - DefiPoolError
         """
         ...
 
-    def _find_pool_for(
-        self,
-        asset: EvmToken,
-        link_asset: EvmToken,
-        path: List[str],
-    ) -> bool:
-        pools = self.get_pool(asset, link_asset)
-        for pool in pools:
-            if pool != ZERO_ADDRESS:
-                path.append(pool)
-                return True
+    def _pool_cache_key(self, token_0: EvmToken, token_1: EvmToken) -> List[Union[str, GeneralCacheType]]:  # noqa: E501
+        return [GeneralCacheType.UNISWAP_POOL, str(self.version), token_0.evm_address, token_1.evm_address]  # noqa: E501
 
-        return False
+    def get_pools(
+            self,
+            pairs: Sequence[Tuple[EvmToken, EvmToken]],
+    ) -> Dict[Tuple[ChecksumEvmAddress, ChecksumEvmAddress], ChecksumEvmAddress]:
+        """Returns the best pool of each of the pairs of tokens, keyed by their sorted
+        addresses. The zero address means there is no pool.
+
+        Pools come from memory or the global DB unless they expired. All missing pools
+        are queried in one batch and saved in the global DB.
+
+        May raise:
+        - RemoteError
+        """
+        now = ts_now()
+        result: Dict[Tuple[ChecksumEvmAddress, ChecksumEvmAddress], ChecksumEvmAddress] = {}
+        missing: Dict[Tuple[ChecksumEvmAddress, ChecksumEvmAddress], Tuple[EvmToken, EvmToken]] = {}  # noqa: E501
+        for token_a, token_b in pairs:
+            token_0, token_1 = sort_tokens(token_a, token_b)
+            key = (token_0.evm_address, token_1.evm_address)
+            if key in result or key in missing:
+                continue
+
+            cached = self.pools.get(key)
+            if cached is None:
+                cache_key = self._pool_cache_key(token_0, token_1)
+                values = GlobalDBHandler().get_general_cache_values(key_parts=cache_key)
+                if len(values) != 0:
+                    last_queried_ts = GlobalDBHandler().get_general_cache_last_queried_ts(
+                        key_parts=cache_key,
+                        value=values[0],
+                    )
+                    cached = (string_to_evm_address(values[0]), Timestamp(last_queried_ts or 0))
+                    self.pools[key] = cached
+
+            if cached is not None:
+                ttl = UNISWAP_POOL_CACHE_TTL if cached[0] != ZERO_ADDRESS else UNISWAP_NO_POOL_CACHE_TTL  # noqa: E501
+                if now - cached[1] < ttl:
+                    result[key] = cached[0]
+                    continue
+
+            missing[key] = (token_0, token_1)
+
+        if len(missing) == 0:
+            return result
 
-    def find_route(self, from_asset: EvmToken, to_asset: EvmToken) -> List[str]:
+        log.debug(f'Querying {self.name} pools for {len(missing)} pairs of tokens')
+        pools = self.query_pools(list(missing.values()))
+        with GlobalDBHandler().conn.write_ctx() as write_cursor:
+            for (key, (token_0, token_1)), pool in zip(missing.items(), pools):
+                result[key] = pool
+                self.pools[key] = (pool, now)
+                cache_key = self._pool_cache_key(token_0, token_1)
+                GlobalDBHandler().delete_general_cache(write_cursor, key_parts=cache_key)
+                GlobalDBHandler().set_general_cache_values(write_cursor, key_parts=cache_key, values=[pool])  # noqa: E501
+
+        return result
+
+    def _route_pairs(
+            self,
+            from_asset: EvmToken,
+            to_asset: EvmToken,
+    ) -> List[Tuple[EvmToken, EvmToken]]:
+        """The pairs whose pools are edges of the routing graph between the two assets.
+        Only routing assets can be intermediate steps and from_asset and to_asset can
+        only be swapped directly if one of them is a routing asset"""
+        pairs = []
+        if any(x in self.routing_assets for x in (to_asset, from_asset)):
+            pairs.append((from_asset, to_asset))
+        for idx, asset in enumerate(self.routing_assets):
+            pairs.extend((x, asset) for x in (from_asset, to_asset) if x != asset)
+            pairs.extend((asset, x) for x in self.routing_assets[idx + 1:])
+        return pairs
+
+    def find_route(self, from_asset: EvmToken, to_asset: EvmToken) -> List[RouteHop]:
         """
         Calculate the path needed to go from from_asset to to_asset and return a
         list of the pools needed to jump through to do that.
-        """
-        output: List[str] = []
-        # If any of the assets is in the glue assets let's see if we find any path
-        # (avoids iterating the list of glue assets)
-        if any(x in self.routing_assets for x in (to_asset, from_asset)):
-            output = []
-            found_path = self._find_pool_for(
-                asset=from_asset,
-                link_asset=to_asset,
-                path=output,
-            )
-            if found_path:
-                return output
 
+        The route is the shortest path in the routing graph, up to MAX_ROUTE_HOPS
+        pools. Between routes of the same length the routing assets are preferred
+        in their order.
+
+        May raise:
+        - RemoteError
+        """
         if from_asset == to_asset:
             return []
 
-        # Try to find one asset that can be used between from_asset and to_asset
-        # from_asset < first link > glue asset < second link > to_asset
-        link_asset = None
-        found_first_link, found_second_link = False, False
-        for asset in self.routing_assets:
-            if asset != from_asset:
-                found_first_link = self._find_pool_for(
-                    asset=from_asset,
-                    link_asset=asset,
-                    path=output,
-                )
-                if found_first_link:
-                    link_asset = asset
-                    found_second_link = self._find_pool_for(
-                        asset=to_asset,
-                        link_asset=link_asset,
-                        path=output,
-                    )
-                    if found_second_link:
-                        return output
+        pools = self.get_pools(self._route_pairs(from_asset, to_asset))
+
+        def edge(token_a: EvmToken, token_b: EvmToken) -> Optional[RouteHop]:
+            token_0, token_1 = sort_tokens(token_a, token_b)
+            pool = pools.get((token_0.evm_address, token_1.evm_address), ZERO_ADDRESS)
+            return None if pool == ZERO_ADDRESS else RouteHop(pool=pool, token_0=token_0, token_1=token_1)  # noqa: E501
+
+        # breadth first search from from_asset where only routing assets are intermediate
+        paths: Dict[EvmToken, List[RouteHop]] = {from_asset: []}
+        frontier = [from_asset]
+        for _ in range(MAX_ROUTE_HOPS):
+            next_frontier = []
+            for node in frontier:
+                for neighbor in (to_asset, *self.routing_assets):
+                    if neighbor in paths:
+                        continue
+                    hop = edge(node, neighbor)
+                    if hop is None:
+                        continue
+                    paths[neighbor] = paths[node] + [hop]
+                    if neighbor == to_asset:
+                        return paths[neighbor]
+                    next_frontier.append(neighbor)
+            frontier = next_frontier
 
-        if not found_first_link:
-            return []
+        return []
 
-        # if we reach this point it means that we need 2 more jumps
-        # from asset <1st link> glue asset A <2nd link> glue asset B <3rd link> to asset
-        # find now the part for glue asset B <3rd link> to asset
-        second_link_asset = None
-        for asset in self.routing_assets:
-            if asset != to_asset:
-                found_second_link = self._find_pool_for(
-                    asset=to_asset,
-                    link_asset=asset,
-                    path=output,
-                )
-                if found_second_link:
-                    second_link_asset = asset
-                    break
-
-        if not found_second_link:
-            return []
+    def _resolve_tokens(
+            self,
+            from_asset: AssetWithOracles,
+            to_asset: AssetWithOracles,
+    ) -> Tuple[EvmToken, EvmToken]:
+        """May raise:
+        - PriceQueryUnsupportedAsset if any of the assets is not an ethereum token
+        """
+        # Uniswap V2 and V3 use in their contracts WETH instead of ETH
+        if from_asset == A_ETH:
+            from_asset = self.weth
+        if to_asset == A_ETH:
+            to_asset = self.weth
+
+        try:
+            return from_asset.resolve_to_evm_token(), to_asset.resolve_to_evm_token()
+        except WrongAssetType as e:
+            raise PriceQueryUnsupportedAsset(e.identifier) from e
 
-        # finally find the step of glue asset A <2nd link> glue asset B
-        assert second_link_asset is not None
-        assert link_asset is not None
-        pools = self.get_pool(link_asset, second_link_asset)
-        for pool in pools:
-            if pool != ZERO_ADDRESS:
-                output.insert(1, pool)
-                return output
+    def get_pools_prices(
+            self,
+            hops: Sequence[RouteHop],
+            block_identifier: BlockIdentifier = 'latest',
+    ) -> Dict[ChecksumEvmAddress, Union[PoolPrice, DefiPoolError]]:
+        """Queries the prices of all the given pools in a single multicall. Pools that
+        can't be used to get a price map to the error explaining why.
 
-        return []
+        May raise:
+        - RemoteError
+        """
+        unique_hops = list({x.pool: x for x in hops}.values())
+        if len(unique_hops) == 0:
+            return {}
+
+        output = self.eth_manager.multicall(
+            calls=[self.pool_price_call(x) for x in unique_hops],
+            require_success=True,
+            block_identifier=block_identifier,
+        )
+        prices: Dict[ChecksumEvmAddress, Union[PoolPrice, DefiPoolError]] = {}
+        for hop, result in zip(unique_hops, output):
+            try:
+                prices[hop.pool] = self.decode_pool_price(hop, result)
+            except DefiPoolError as e:
+                prices[hop.pool] = e
+        return prices
+
+    @staticmethod
+    def _route_price(
+            from_token: EvmToken,
+            route: List[RouteHop],
+            prices: Dict[ChecksumEvmAddress, Union[PoolPrice, DefiPoolError]],
+    ) -> Price:
+        """Multiplies the prices of the route's pools, in the direction of the swaps
+
+        May raise:
+        - DefiPoolError if any of the pools can't be used
+        """
+        price, current_token = ONE, from_token
+        for hop in route:
+            pool_price = prices[hop.pool]
+            if isinstance(pool_price, DefiPoolError):
+                raise pool_price
+            # the pool price is the units of token1 that one token0 can buy
+            if current_token == hop.token_0:
+                price, current_token = price * pool_price.price, hop.token_1
+            else:
+                price, current_token = price / pool_price.price, hop.token_0
+        return Price(price)
 
     def get_price(
         self,
@@ -201,54 +332,18 @@ class UniswapOracle(CurrentPriceOracleInterface, CacheableMixIn):
             f'Searching price for {from_asset} to {to_asset} at '
             f'{block_identifier!r} with {self.name}',
         )
-
-        # Uniswap V2 and V3 use in their contracts WETH instead of ETH
-        if from_asset == A_ETH:
-            from_asset = self.weth
-        if to_asset == A_ETH:
-            to_asset = self.weth
-
-        try:
-            from_token = from_asset.resolve_to_evm_token()
-            to_token = to_asset.resolve_to_evm_token()
-        except WrongAssetType as e:
-            raise PriceQueryUnsupportedAsset(e.identifier) from e
-
+        from_token, to_token = self._resolve_tokens(from_asset, to_asset)
         if from_token == to_token:
             return Price(ONE)
 
         route = self.find_route(from_token, to_token)
-
         if len(route) == 0:
             log.debug(f'Failed to find uniswap price for {from_token} to {to_token}')
             return Price(ZERO)
         log.debug(f'Found price route {route} for {from_token} to {to_token} using {self.name}')
 
-        prices_and_tokens = []
-        for step in route:
-            log.debug(f'Getting pool price for {step}')
-            prices_and_tokens.append(
-                self.get_pool_price(
-                    pool_addr=to_checksum_address(step),
-                    block_identifier=block_identifier,
-                ),
-            )
-
-        # Looking at which one is token0 and token1 we need to see if we need price or 1/price
-        if prices_and_tokens[0].token_0 != from_token:
-            prices_and_tokens[0] = prices_and_tokens[0].swap_tokens()
-
-        # For the possible intermediate steps also make sure that we use the correct price
-        for pos, item in enumerate(prices_and_tokens[1:-1]):
-            if item.token_0 != prices_and_tokens[pos - 1].token_1:
-                prices_and_tokens[pos - 1] = prices_and_tokens[pos - 1].swap_tokens()
-
-        # Finally for the tail query the price
-        if prices_and_tokens[-1].token_1 != to_token:
-            prices_and_tokens[-1] = prices_and_tokens[-1].swap_tokens()
-
-        price = FVal(reduce(mul, [item.price for item in prices_and_tokens], 1))
-        return Price(price)
+        prices = self.get_pools_prices(hops=route, block_identifier=block_identifier)
+        return self._route_price(from_token=from_token, route=route, prices=prices)
 
     def query_current_price(
             self,
@@ -278,49 +373,60 @@ class UniswapV3Oracle(UniswapOracle):
     def __init__(self, eth_manager: 'EthereumManager'):
         super().__init__(eth_manager=eth_manager, version=3)
 
-    @cache_response_timewise()
-    def get_pool(
-        self,
-        token_0: EvmToken,
-        token_1: EvmToken,
-    ) -> List[str]:
+    def query_pools(
+            self,
+            pairs: List[Tuple[EvmToken, EvmToken]],
+    ) -> List[ChecksumEvmAddress]:
+        """Finds the pools of all the fee tiers of each pair and chooses the one with
+        the highest liquidity. Two multicalls for all the pairs."""
+        fees = (3000, 500, 10000)
         result = self.eth_manager.multicall_specific(
             contract=UNISWAP_V3_FACTORY,
             method_name='getPool',
-            arguments=[[
-                token_0.evm_address,
-                token_1.evm_address,
-                fee,
-            ] for fee in (3000, 500, 10000)],
+            arguments=[
+                [token_0.evm_address, token_1.evm_address, fee]
+                for token_0, token_1 in pairs for fee in fees
+            ],
+        )
+        existing_pools = list({
+            to_checksum_address(x[0]) for x in result if x[0] != ZERO_ADDRESS
+        })
+        pool_contract = EvmContract(
+            address=ZERO_ADDRESS,
+            abi=UNISWAP_V3_POOL_ABI,
+            deployed_block=UNISWAP_FACTORY_DEPLOYED_BLOCK,
         )
+        liquidity_output = self.eth_manager.multicall(
+            calls=[(x, pool_contract.encode(method_name='liquidity')) for x in existing_pools],
+        ) if len(existing_pools) != 0 else []
+        liquidities = {
+            pool: pool_contract.decode(output, 'liquidity')[0]  # pylint: disable=unsubscriptable-object  # noqa: E501
+            for pool, output in zip(existing_pools, liquidity_output)
+        }
+
+        # choose the pool with the highest liquidity for each pair
+        pools = []
+        for idx in range(len(pairs)):
+            best_pool, max_liquidity = ZERO_ADDRESS, -1
+            for query in result[idx * len(fees):(idx + 1) * len(fees)]:
+                if query[0] == ZERO_ADDRESS:
+                    continue
+                pool_address = to_checksum_address(query[0])
+                if liquidities[pool_address] > max_liquidity:
+                    best_pool, max_liquidity = pool_address, liquidities[pool_address]
+            pools.append(best_pool)
+
+        return pools
+
+    def pool_price_call(self, hop: RouteHop) -> Tuple[ChecksumEvmAddress, str]:
+        pool_contract = EvmContract(
+            address=hop.pool,
+            abi=UNISWAP_V3_POOL_ABI,
+            deployed_block=UNISWAP_FACTORY_DEPLOYED_BLOCK,
+        )
+        return pool_contract.address, pool_contract.encode(method_name='slot0')
 
-        # get liquidity for each pool and choose the pool with the highest liquidity
-        best_pool, max_liquidity = to_checksum_address(result[0][0]), 0
-        for query in result:
-            if query[0] == ZERO_ADDRESS:
-                continue
-            pool_address = to_checksum_address(query[0])
-            pool_contract = EvmContract(
-                address=pool_address,
-                abi=UNISWAP_V3_POOL_ABI,
-                deployed_block=UNISWAP_FACTORY_DEPLOYED_BLOCK,
-            )
-            pool_liquidity = pool_contract.call(
-                manager=self.eth_manager,
-                method_name='liquidity',
-                arguments=[],
-                call_order=None,
-            )
-            if pool_liquidity > max_liquidity:
-                best_pool = pool_address
-
-        return [best_pool]
-
-    def get_pool_price(
-        self,
-        pool_addr: ChecksumEvmAddress,
-        block_identifier: BlockIdentifier = 'latest',
-    ) -> PoolPrice:
+    def decode_pool_price(self, hop: RouteHop, result: bytes) -> PoolPrice:
         """
         Returns the units of token1 that one token0 can buy
 
@@ -328,35 +434,12 @@ class UniswapV3Oracle(UniswapOracle):
         - DefiPoolError
         """
         pool_contract = EvmContract(
-            address=pool_addr,
+            address=hop.pool,
             abi=UNISWAP_V3_POOL_ABI,
             deployed_block=UNISWAP_FACTORY_DEPLOYED_BLOCK,
         )
-        calls = [
-            (
-                pool_contract.address,
-                pool_contract.encode(method_name='slot0'),
-            ), (
-                pool_contract.address,
-                pool_contract.encode(method_name='token0'),
-            ), (
-                pool_contract.address,
-                pool_contract.encode(method_name='token1'),
-            ),
-        ]
-        output = self.eth_manager.multicall(
-            calls=calls,
-            require_success=True,
-            block_identifier=block_identifier,
-        )
-        token_0 = EvmToken(
-            ethaddress_to_identifier(to_checksum_address(pool_contract.decode(output[1], 'token0')[0])),  # noqa: E501 pylint:disable=unsubscriptable-object
-        )
-        token_1 = EvmToken(
-            ethaddress_to_identifier(to_checksum_address(pool_contract.decode(output[2], 'token1')[0])),  # noqa: E501 pylint:disable=unsubscriptable-object
-        )
-
-        sqrt_price_x96, _, _, _, _, _, _ = pool_contract.decode(output[0], 'slot0')
+        token_0, token_1 = hop.token_0, hop.token_1
+        sqrt_price_x96, _, _, _, _, _, _ = pool_contract.decode(result, 'slot0')
         if token_0.decimals is None:
             raise DefiPoolError(f'Token {token_0} has None as decimals')
         if token_1.decimals is None:
@@ -374,29 +457,28 @@ class UniswapV3Oracle(UniswapOracle):
 class UniswapV2Oracle(UniswapOracle):
 
     def __init__(self, eth_manager: 'EthereumManager'):
-        super().__init__(eth_manager=eth_manager, version=3)
+        super().__init__(eth_manager=eth_manager, version=2)
 
-    @cache_response_timewise()
-    def get_pool(
-        self,
-        token_0: EvmToken,
-        token_1: EvmToken,
-    ) -> List[str]:
-        result = UNISWAP_V2_FACTORY.call(
-            manager=self.eth_manager,
+    def query_pools(
+            self,
+            pairs: List[Tuple[EvmToken, EvmToken]],
+    ) -> List[ChecksumEvmAddress]:
+        result = self.eth_manager.multicall_specific(
+            contract=UNISWAP_V2_FACTORY,
             method_name='getPair',
-            arguments=[
-                token_0.evm_address,
-                token_1.evm_address,
-            ],
+            arguments=[[token_0.evm_address, token_1.evm_address] for token_0, token_1 in pairs],
         )
-        return [result]
+        return [to_checksum_address(x[0]) for x in result]
 
-    def get_pool_price(
-        self,
-        pool_addr: ChecksumEvmAddress,
-        block_identifier: BlockIdentifier = 'latest',
-    ) -> PoolPrice:
+    def pool_price_call(self, hop: RouteHop) -> Tuple[ChecksumEvmAddress, str]:
+        pool_contract = EvmContract(
+            address=hop.pool,
+            abi=UNISWAP_V2_LP_ABI,
+            deployed_block=10000835,  # Factory deployment block
+        )
+        return pool_contract.address, pool_contract.encode(method_name='getReserves')
+
+    def decode_pool_price(self, hop: RouteHop, result: bytes) -> PoolPrice:
         """
         Returns the units of token1 that one token0 can buy
 
@@ -404,39 +486,16 @@ class UniswapV2Oracle(UniswapOracle):
         - DefiPoolError
         """
         pool_contract = EvmContract(
-            address=pool_addr,
+            address=hop.pool,
             abi=UNISWAP_V2_LP_ABI,
             deployed_block=10000835,  # Factory deployment block
         )
-        calls = [
-            (
-                pool_contract.address,
-                pool_contract.encode(method_name='getReserves'),
-            ), (
-                pool_contract.address,
-                pool_contract.encode(method_name='token0'),
-            ), (
-                pool_contract.address,
-                pool_contract.encode(method_name='token1'),
-            ),
-        ]
-        output = self.eth_manager.multicall(
-            calls=calls,
-            require_success=True,
-            block_identifier=block_identifier,
-        )
-        token_0 = EvmToken(
-            ethaddress_to_identifier(to_checksum_address(pool_contract.decode(output[1], 'token0')[0])),  # noqa: E501 pylint:disable=unsubscriptable-object
-        )
-        token_1 = EvmToken(
-            ethaddress_to_identifier(to_checksum_address(pool_contract.decode(output[2], 'token1')[0])),  # noqa: E501 pylint:disable=unsubscriptable-object
-        )
-
+        token_0, token_1 = hop.token_0, hop.token_1
         if token_0.decimals is None:
             raise DefiPoolError(f'Token {token_0} has None as decimals')
         if token_1.decimals is None:
             raise DefiPoolError(f'Token {token_1} has None as decimals')
-        reserve_0, reserve_1, _ = pool_contract.decode(output[0], 'getReserves')
+        reserve_0, reserve_1, _ = pool_contract.decode(result, 'getReserves')
         decimals_constant = 10**(token_0.decimals - token_1.decimals)
 
         if ZERO in (reserve_0, reserve_1):
@@ -1,10 +1,25 @@
 import logging
+import time
 from collections import defaultdict
 from contextlib import contextmanager
-from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    TypeVar,
+)
 
 import gevent
-from gevent.lock import Semaphore
+from gevent.lock import BoundedSemaphore, Semaphore
+from gevent.pool import Pool
+from gevent.queue import Queue
 from pysqlcipher3 import dbapi2 as sqlcipher
 
 from rotkehlchen.api.websockets.typedefs import TransactionStatusStep, WSMessageType
@@ -13,6 +28,7 @@ from rotkehlchen.chain.ethereum.constants import (
     RANGE_PREFIX_ETHTOKENTX,
     RANGE_PREFIX_ETHTX,
 )
+from rotkehlchen.chain.ethereum.types import ETHERSCAN_NODE_NAME, PipelineTimings
 from rotkehlchen.db.ethtx import DBEthTx
 from rotkehlchen.db.filtering import ETHTransactionsFilterQuery
 from rotkehlchen.db.ranges import DBQueryRanges
@@ -20,16 +36,18 @@ from rotkehlchen.errors.misc import RemoteError
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.types import (
     ChecksumEvmAddress,
+    EvmInternalTransaction,
     EvmTransaction,
     EVMTxHash,
     Timestamp,
     deserialize_evm_tx_hash,
 )
-from rotkehlchen.utils.misc import ts_now
+from rotkehlchen.utils.misc import get_chunks, ts_now
 
 if TYPE_CHECKING:
     from rotkehlchen.chain.ethereum.manager import EthereumManager
     from rotkehlchen.chain.ethereum.structures import EthereumTxReceipt
+    from rotkehlchen.chain.ethereum.types import WeightedNode
     from rotkehlchen.db.dbhandler import DBHandler
     from rotkehlchen.db.drivers.gevent import DBCursor
 
@@ -37,6 +55,28 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
+# Receipts queried with a single (batch) request and written in a single DB transaction
+RECEIPTS_CHUNK_SIZE = 50
+# How many receipt chunks can be queried from a node at the same time
+OWNED_NODE_RECEIPT_QUERIES = 8
+OPEN_NODE_RECEIPT_QUERIES = 2
+ETHERSCAN_RECEIPT_QUERIES = 1  # etherscan is rate limited per api key
+# Batches of transactions queried from etherscan ahead of the ones being saved in the DB
+PIPELINE_QUEUE_SIZE = 4
+# Addresses whose transactions are queried at the same time. Their etherscan calls
+# all share the etherscan rate limiter
+MAX_CONCURRENT_ADDRESS_QUERIES = 4
+
+T = TypeVar('T', bound=Sequence)
+
+
+def _node_receipt_queries(node: 'WeightedNode') -> int:
+    if node.node_info.name == ETHERSCAN_NODE_NAME:
+        return ETHERSCAN_RECEIPT_QUERIES
+    if node.node_info.owned:
+        return OWNED_NODE_RECEIPT_QUERIES
+    return OPEN_NODE_RECEIPT_QUERIES
+
 
 class EthTransactions:
 
@@ -50,7 +90,11 @@ class EthTransactions:
         self.database = database
         self.address_tx_locks: Dict[ChecksumEvmAddress, Semaphore] = defaultdict(Semaphore)
         self.missing_receipts_lock = Semaphore()
+        # the etherscan queries of an address and of different addresses run concurrently
+        self.query_write_lock = Semaphore()
         self.msg_aggregator = database.msg_aggregator
+        self.pipeline_timings: Dict[str, PipelineTimings] = defaultdict(PipelineTimings)
+        self.paused_addresses: Set[ChecksumEvmAddress] = set()
 
     @contextmanager
     def wait_until_no_query_for(self, addresses: List[ChecksumEvmAddress]) -> Iterator[None]:
@@ -66,6 +110,13 @@ class EthTransactions:
         for lock in locks:  # clean up
             lock.release()
 
+    @contextmanager
+    def _query_write_ctx(self) -> Iterator['DBCursor']:
+        """Write transaction for the results of the etherscan queries. Only one of them
+        is open at a time and nothing is queried while it is open"""
+        with self.query_write_lock, self.database.user_write() as cursor:
+            yield cursor
+
     def single_address_query_transactions(
             self,
             address: ChecksumEvmAddress,
@@ -79,7 +130,14 @@ class EthTransactions:
         the only open indexing service for "appearances" of an address.
 
         Trueblocks ... we need you.
+
+        If the address is paused nothing is queried. If it gets paused while querying
+        the query stops after the current etherscan page.
         """
+        if address in self.paused_addresses:
+            log.debug(f'Skipping transactions query of paused address {address}')
+            return
+
         lock = self.address_tx_locks[address]
         with lock:
             self.msg_aggregator.add_message(
@@ -90,17 +148,28 @@ class EthTransactions:
                     'status': str(TransactionStatusStep.QUERYING_TRANSACTIONS_STARTED),
                 },
             )
-            self._get_transactions_for_range(address=address, start_ts=start_ts, end_ts=end_ts)
-            self._get_internal_transactions_for_ranges(
+            # most parents of internal transactions and erc20 transfers are normal
+            # transactions of the address. Query those first so that they are in the DB
+            self._get_transactions_for_range(
                 address=address,
                 start_ts=start_ts,
                 end_ts=end_ts,
             )
-            self._get_erc20_transfers_for_ranges(
+            # the remaining two etherscan queries are independent. Run them concurrently
+            # under the etherscan rate limiter
+            greenlets = [gevent.spawn(
+                method,
                 address=address,
                 start_ts=start_ts,
                 end_ts=end_ts,
-            )
+            ) for method in (
+                self._get_internal_transactions_for_ranges,
+                self._get_erc20_transfers_for_ranges,
+            )]
+            try:
+                gevent.joinall(greenlets, raise_error=True)
+            finally:
+                gevent.killall(greenlets)  # only alive if the query stopped early
         self.msg_aggregator.add_message(
             message_type=WSMessageType.ETHEREUM_TRANSACTION_STATUS,
             data={
@@ -110,6 +179,56 @@ class EthTransactions:
             },
         )
 
+    def query_addresses_transactions(
+            self,
+            addresses: Sequence[ChecksumEvmAddress],
+            start_ts: Timestamp,
+            end_ts: Timestamp,
+    ) -> None:
+        """Queries the new transactions of many addresses, MAX_CONCURRENT_ADDRESS_QUERIES
+        of them at a time. Addresses whose transactions were queried the least recently
+        go first. Paused addresses are skipped.
+
+        Query ranges are saved after each etherscan page, so the query of an address
+        that got paused or failed continues from where it stopped the next time.
+
+        May raise:
+        - RemoteError if etherscan is used and there is a problem with reaching it or
+        with parsing the response. Raised after all addresses have been queried.
+        """
+        dbethtx = DBEthTx(self.database)
+        with self.database.conn.read_ctx() as cursor:
+            queried_until = {x: dbethtx.get_queried_range(cursor, x)[1] for x in addresses}
+
+        pool = Pool(MAX_CONCURRENT_ADDRESS_QUERIES)
+        greenlets = []
+        try:
+            for address in sorted(queried_until, key=lambda x: queried_until[x]):
+                if address in self.paused_addresses:
+                    continue
+
+                greenlets.append(pool.spawn(  # blocks while the pool is full
+                    self.single_address_query_transactions,
+                    address=address,
+                    start_ts=start_ts,
+                    end_ts=end_ts,
+                ))
+
+            gevent.joinall(greenlets)
+        finally:
+            pool.kill()  # only has greenlets if the query stopped early, e.g. timed out
+
+        for greenlet in greenlets:
+            if greenlet.exception is not None:
+                raise greenlet.exception
+
+    def pause_queries(self, addresses: List[ChecksumEvmAddress]) -> None:
+        """Stops querying the transactions of the given addresses until they are resumed"""
+        self.paused_addresses.update(addresses)
+
+    def resume_queries(self, addresses: List[ChecksumEvmAddress]) -> None:
+        self.paused_addresses.difference_update(addresses)
+
     def query(
             self,
             filter_query: ETHTransactionsFilterQuery,
@@ -139,12 +258,11 @@ class EthTransactions:
                 f_to_ts = filter_query.to_ts
                 from_ts = Timestamp(0) if f_from_ts is None else f_from_ts
                 to_ts = ts_now() if f_to_ts is None else f_to_ts
-                for address in accounts:
-                    self.single_address_query_transactions(
-                        address=address,
-                        start_ts=from_ts,
-                        end_ts=to_ts,
-                    )
+                self.query_addresses_transactions(
+                    addresses=accounts,
+                    start_ts=from_ts,
+                    end_ts=to_ts,
+                )
 
             dbethtx = DBEthTx(self.database)
             return dbethtx.get_ethereum_transactions_and_limit_info(
@@ -153,6 +271,70 @@ class EthTransactions:
                 has_premium=has_premium,
             )
 
+    def _pipeline(
+            self,
+            batches: Iterator[T],
+            consume: Callable[..., None],
+            timings: PipelineTimings,
+            address: ChecksumEvmAddress,
+            query_start_ts: Timestamp,
+    ) -> bool:
+        """Iterates the batches in another greenlet, staying up to PIPELINE_QUEUE_SIZE
+        batches ahead of consuming them with consume(batch, address, query_start_ts).
+        So the next page is fetched from etherscan and deserialized while the previous
+        is saved.
+
+        Returns False if the address got paused before all batches were consumed.
+
+        An exception raised while producing the batches is raised here, once the
+        batches produced before it have been consumed.
+        """
+        queue: Queue = Queue(maxsize=PIPELINE_QUEUE_SIZE)
+
+        def produce() -> None:
+            try:
+                for batch in batches:
+                    queue.put((True, batch))
+            except Exception as e:  # pylint: disable=broad-except
+                queue.put((False, e))
+            else:
+                queue.put((False, None))
+
+        producer = gevent.spawn(produce)
+        try:
+            while True:
+                is_batch, value = queue.get()
+                if is_batch is False:
+                    if value is not None:
+                        raise value
+                    return True
+
+                if address in self.paused_addresses:
+                    log.debug(f'Stopping transactions query of paused address {address}')
+                    return False
+
+                start = time.perf_counter()
+                consume(value, address=address, query_start_ts=query_start_ts)
+                timings.insert += time.perf_counter() - start
+                timings.batches += 1
+                timings.entries += len(value)
+        finally:
+            producer.kill()  # only alive if consuming stopped early
+
+    def _record_timings(
+            self,
+            action: str,
+            address: ChecksumEvmAddress,
+            timings: PipelineTimings,
+    ) -> None:
+        log.debug(f'Etherscan {action} query of {address} timings: {timings.serialize()}')
+        self.pipeline_timings[action].add(timings)
+
+    def get_pipeline_timings(self) -> Dict[str, Dict[str, Any]]:
+        """Time spent at each stage of the transaction queries since the start,
+        per etherscan action"""
+        return {action: x.serialize() for action, x in self.pipeline_timings.items()}
+
     def _get_transactions_for_range(
             self,
             address: ChecksumEvmAddress,
@@ -172,41 +354,24 @@ class EthTransactions:
                 start_ts=start_ts,
                 end_ts=end_ts,
             )
-        dbethtx = DBEthTx(self.database)
 
+        timings = PipelineTimings()
         for query_start_ts, query_end_ts in ranges_to_query:
             log.debug(f'Querying Transactions for {address} -> {query_start_ts} - {query_end_ts}')
             try:
-                for new_transactions in self.ethereum.etherscan.get_transactions(
-                    account=address,
-                    from_ts=query_start_ts,
-                    to_ts=query_end_ts,
-                    action='txlist',
-                ):
-                    # add new transactions to the DB
-                    if len(new_transactions) != 0:
-                        with self.database.user_write() as cursor:
-                            dbethtx.add_ethereum_transactions(
-                                write_cursor=cursor,
-                                ethereum_transactions=new_transactions,
-                                relevant_address=address,
-                            )
-                            # update last queried time for the address
-                            ranges.update_used_query_range(
-                                write_cursor=cursor,
-                                location_string=location_string,
-                                queried_ranges=[(query_start_ts, new_transactions[-1].timestamp)],
-                            )
-
-                        self.msg_aggregator.add_message(
-                            message_type=WSMessageType.ETHEREUM_TRANSACTION_STATUS,
-                            data={
-                                'address': address,
-                                'period': [query_start_ts, new_transactions[-1].timestamp],
-                                'status': str(TransactionStatusStep.QUERYING_TRANSACTIONS),
-                            },
-                        )
-
+                completed = self._pipeline(
+                    batches=self.ethereum.etherscan.get_transactions(
+                        account=address,
+                        from_ts=query_start_ts,
+                        to_ts=query_end_ts,
+                        action='txlist',
+                        timings=timings,
+                    ),
+                    consume=self._save_transactions,
+                    timings=timings,
+                    address=address,
+                    query_start_ts=query_start_ts,
+                )
             except RemoteError as e:
                 self.ethereum.msg_aggregator.add_error(
                     f'Got error "{str(e)}" while querying ethereum transactions '
@@ -215,16 +380,55 @@ class EthTransactions:
                     f'from_ts: {query_start_ts} '
                     f'to_ts: {query_end_ts} ',
                 )
+                self._record_timings(action='txlist', address=address, timings=timings)
+                return
+
+            if completed is False:
+                self._record_timings(action='txlist', address=address, timings=timings)
                 return
 
+        self._record_timings(action='txlist', address=address, timings=timings)
         log.debug(f'Transactions done for {address}. Update range {start_ts} - {end_ts}')
-        with self.database.user_write() as cursor:
+        with self._query_write_ctx() as cursor:
             ranges.update_used_query_range(  # entire range is now considered queried
                 write_cursor=cursor,
                 location_string=location_string,
                 queried_ranges=[(start_ts, end_ts)],
             )
 
+    def _save_transactions(
+            self,
+            new_transactions: List[EvmTransaction],
+            address: ChecksumEvmAddress,
+            query_start_ts: Timestamp,
+    ) -> None:
+        """Adds a batch of queried transactions to the DB"""
+        if len(new_transactions) == 0:
+            return
+
+        location_string = f'{RANGE_PREFIX_ETHTX}_{address}'
+        with self._query_write_ctx() as cursor:
+            DBEthTx(self.database).add_ethereum_transactions(
+                write_cursor=cursor,
+                ethereum_transactions=new_transactions,
+                relevant_address=address,
+            )
+            # update last queried time for the address
+            DBQueryRanges(self.database).update_used_query_range(
+                write_cursor=cursor,
+                location_string=location_string,
+                queried_ranges=[(query_start_ts, new_transactions[-1].timestamp)],
+            )
+
+        self.msg_aggregator.add_message(
+            message_type=WSMessageType.ETHEREUM_TRANSACTION_STATUS,
+            data={
+                'address': address,
+                'period': [query_start_ts, new_transactions[-1].timestamp],
+                'status': str(TransactionStatusStep.QUERYING_TRANSACTIONS),
+            },
+        )
+
     def _get_internal_transactions_for_ranges(
             self,
             address: ChecksumEvmAddress,
@@ -237,7 +441,6 @@ class EthTransactions:
         """
         location_string = f'{RANGE_PREFIX_ETHINTERNALTX}_{address}'
         ranges = DBQueryRanges(self.database)
-        dbethtx = DBEthTx(self.database)
         with self.database.conn.read_ctx() as cursor:
             ranges_to_query = ranges.get_location_query_ranges(
                 cursor=cursor,
@@ -245,60 +448,24 @@ class EthTransactions:
                 start_ts=start_ts,
                 end_ts=end_ts,
             )
-        new_internal_txs = []
+
+        timings = PipelineTimings()
         for query_start_ts, query_end_ts in ranges_to_query:
             log.debug(f'Querying Internal Transactions for {address} -> {query_start_ts} - {query_end_ts}')  # noqa: E501
             try:
-                for new_internal_txs in self.ethereum.etherscan.get_transactions(
-                    account=address,
-                    from_ts=query_start_ts,
-                    to_ts=query_end_ts,
-                    action='txlistinternal',
-                ):
-                    if len(new_internal_txs) != 0:
-                        with self.database.user_write() as cursor:
-                            for internal_tx in new_internal_txs:
-                                # make sure internal transaction parent transactions are in the DB
-                                gevent.sleep(0)
-                                result = dbethtx.get_ethereum_transactions(
-                                    cursor,
-                                    ETHTransactionsFilterQuery.make(tx_hash=internal_tx.parent_tx_hash),  # noqa: E501
-                                    has_premium=True,  # ignore limiting here
-                                )
-                                if len(result) == 0:  # parent transaction is not in the DB. Get it
-                                    transaction = self.ethereum.get_transaction_by_hash(internal_tx.parent_tx_hash)  # noqa: E501
-                                    gevent.sleep(0)
-                                    dbethtx.add_ethereum_transactions(
-                                        write_cursor=cursor,
-                                        ethereum_transactions=[transaction],
-                                        relevant_address=address,
-                                    )
-                                    timestamp = transaction.timestamp
-                                else:
-                                    timestamp = result[0].timestamp
-
-                                dbethtx.add_ethereum_internal_transactions(
-                                    write_cursor=cursor,
-                                    transactions=[internal_tx],
-                                    relevant_address=address,
-                                )
-                                log.debug(f'Internal Transactions for {address} -> update range {query_start_ts} - {timestamp}')  # noqa: E501
-                                # update last queried time for address
-                                ranges.update_used_query_range(
-                                    write_cursor=cursor,
-                                    location_string=location_string,
-                                    queried_ranges=[(query_start_ts, timestamp)],
-                                )
-
-                            self.msg_aggregator.add_message(
-                                message_type=WSMessageType.ETHEREUM_TRANSACTION_STATUS,
-                                data={
-                                    'address': address,
-                                    'period': [query_start_ts, timestamp],
-                                    'status': str(TransactionStatusStep.QUERYING_INTERNAL_TRANSACTIONS),  # noqa: E501
-                                },
-                            )
-
+                completed = self._pipeline(
+                    batches=self.ethereum.etherscan.get_transactions(
+                        account=address,
+                        from_ts=query_start_ts,
+                        to_ts=query_end_ts,
+                        action='txlistinternal',
+                        timings=timings,
+                    ),
+                    consume=self._save_internal_transactions,
+                    timings=timings,
+                    address=address,
+                    query_start_ts=query_start_ts,
+                )
             except RemoteError as e:
                 self.ethereum.msg_aggregator.add_error(
                     f'Got error "{str(e)}" while querying internal ethereum transactions '
@@ -307,16 +474,68 @@ class EthTransactions:
                     f'from_ts: {query_start_ts} '
                     f'to_ts: {query_end_ts} ',
                 )
+                self._record_timings(action='txlistinternal', address=address, timings=timings)
                 return
 
+            if completed is False:
+                self._record_timings(action='txlistinternal', address=address, timings=timings)
+                return
+
+        self._record_timings(action='txlistinternal', address=address, timings=timings)
         log.debug(f'Internal Transactions for address {address} done. Update range {start_ts} - {end_ts}')  # noqa: E501
-        with self.database.user_write() as cursor:
+        with self._query_write_ctx() as cursor:
             ranges.update_used_query_range(  # entire range is now considered queried
                 write_cursor=cursor,
                 location_string=location_string,
                 queried_ranges=[(start_ts, end_ts)],
             )
 
+    def _save_internal_transactions(
+            self,
+            new_internal_txs: List[EvmInternalTransaction],
+            address: ChecksumEvmAddress,
+            query_start_ts: Timestamp,
+    ) -> None:
+        """Adds a batch of queried internal transactions to the DB together with
+        their parent transactions"""
+        if len(new_internal_txs) == 0:
+            return
+
+        location_string = f'{RANGE_PREFIX_ETHINTERNALTX}_{address}'
+        # make sure internal transaction parent transactions are in the DB
+        timestamps, parent_txs = self._query_missing_transactions(
+            [x.parent_tx_hash for x in new_internal_txs],
+        )
+        timestamp = timestamps[new_internal_txs[-1].parent_tx_hash]
+        dbethtx = DBEthTx(self.database)
+        with self._query_write_ctx() as cursor:
+            dbethtx.add_ethereum_transactions(
+                write_cursor=cursor,
+                ethereum_transactions=parent_txs,
+                relevant_address=address,
+            )
+            dbethtx.add_ethereum_internal_transactions(
+                write_cursor=cursor,
+                transactions=new_internal_txs,
+                relevant_address=address,
+            )
+            log.debug(f'Internal Transactions for {address} -> update range {query_start_ts} - {timestamp}')  # noqa: E501
+            # update last queried time for address
+            DBQueryRanges(self.database).update_used_query_range(
+                write_cursor=cursor,
+                location_string=location_string,
+                queried_ranges=[(query_start_ts, timestamp)],
+            )
+
+        self.msg_aggregator.add_message(
+            message_type=WSMessageType.ETHEREUM_TRANSACTION_STATUS,
+            data={
+                'address': address,
+                'period': [query_start_ts, timestamp],
+                'status': str(TransactionStatusStep.QUERYING_INTERNAL_TRANSACTIONS),
+            },
+        )
+
     def _get_erc20_transfers_for_ranges(
             self,
             address: ChecksumEvmAddress,
@@ -328,7 +547,6 @@ class EthTransactions:
         If any transfers are found, they are added in the DB
         """
         location_string = f'{RANGE_PREFIX_ETHTOKENTX}_{address}'
-        dbethtx = DBEthTx(self.database)
         ranges = DBQueryRanges(self.database)
         with self.database.conn.read_ctx() as cursor:
             ranges_to_query = ranges.get_location_query_ranges(
@@ -338,50 +556,22 @@ class EthTransactions:
                 end_ts=end_ts,
             )
 
+        timings = PipelineTimings()
         for query_start_ts, query_end_ts in ranges_to_query:
             log.debug(f'Querying ERC20 Transfers for {address} -> {query_start_ts} - {query_end_ts}')  # noqa: E501
             try:
-                for erc20_tx_hashes in self.ethereum.etherscan.get_token_transaction_hashes(
-                    account=address,
-                    from_ts=query_start_ts,
-                    to_ts=query_end_ts,
-                ):
-                    with self.database.user_write() as cursor:
-                        for tx_hash in erc20_tx_hashes:
-                            tx_hash_bytes = deserialize_evm_tx_hash(tx_hash)
-                            result = dbethtx.get_ethereum_transactions(
-                                cursor,
-                                ETHTransactionsFilterQuery.make(tx_hash=tx_hash_bytes),
-                                has_premium=True,  # ignore limiting here
-                            )
-                            if len(result) == 0:  # if transaction is not there add it
-                                gevent.sleep(0)
-                                transaction = self.ethereum.get_transaction_by_hash(tx_hash_bytes)
-                                dbethtx.add_ethereum_transactions(
-                                    write_cursor=cursor,
-                                    ethereum_transactions=[transaction],
-                                    relevant_address=address,
-                                )
-                                timestamp = transaction.timestamp
-                            else:
-                                timestamp = result[0].timestamp
-
-                            log.debug(f'ERC20 Transfers for {address} -> update range {query_start_ts} - {timestamp}')  # noqa: E501
-                            # update last queried time for the address
-                            ranges.update_used_query_range(
-                                write_cursor=cursor,
-                                location_string=location_string,
-                                queried_ranges=[(query_start_ts, timestamp)],
-                            )
-
-                            self.msg_aggregator.add_message(
-                                message_type=WSMessageType.ETHEREUM_TRANSACTION_STATUS,
-                                data={
-                                    'address': address,
-                                    'period': [query_start_ts, timestamp],
-                                    'status': str(TransactionStatusStep.QUERYING_ETHEREUM_TOKENS_TRANSACTIONS),  # noqa: E501
-                                },
-                            )
+                completed = self._pipeline(
+                    batches=self.ethereum.etherscan.get_token_transaction_hashes(
+                        account=address,
+                        from_ts=query_start_ts,
+                        to_ts=query_end_ts,
+                        timings=timings,
+                    ),
+                    consume=self._save_erc20_transfers,
+                    timings=timings,
+                    address=address,
+                    query_start_ts=query_start_ts,
+                )
             except RemoteError as e:
                 self.ethereum.msg_aggregator.add_error(
                     f'Got error "{str(e)}" while querying token transactions '
@@ -390,15 +580,92 @@ class EthTransactions:
                     f'from_ts: {query_start_ts} '
                     f'to_ts: {query_end_ts} ',
                 )
+                continue
 
+            if completed is False:
+                self._record_timings(action='tokentx', address=address, timings=timings)
+                return
+
+        self._record_timings(action='tokentx', address=address, timings=timings)
         log.debug(f'ERC20 Transfers done for address {address}. Update range {start_ts} - {end_ts}')  # noqa: E501
-        with self.database.user_write() as cursor:
+        with self._query_write_ctx() as cursor:
             ranges.update_used_query_range(  # entire range is now considered queried
                 write_cursor=cursor,
                 location_string=location_string,
                 queried_ranges=[(start_ts, end_ts)],
             )
 
+    def _save_erc20_transfers(
+            self,
+            erc20_tx_hashes: List[str],
+            address: ChecksumEvmAddress,
+            query_start_ts: Timestamp,
+    ) -> None:
+        """Adds the transactions of a batch of queried ERC20 transfers to the DB"""
+        if len(erc20_tx_hashes) == 0:
+            return
+
+        location_string = f'{RANGE_PREFIX_ETHTOKENTX}_{address}'
+        tx_hashes = [deserialize_evm_tx_hash(x) for x in erc20_tx_hashes]
+        timestamps, transactions = self._query_missing_transactions(tx_hashes)
+        timestamp = timestamps[tx_hashes[-1]]
+        with self._query_write_ctx() as cursor:
+            DBEthTx(self.database).add_ethereum_transactions(
+                write_cursor=cursor,
+                ethereum_transactions=transactions,
+                relevant_address=address,
+            )
+            log.debug(f'ERC20 Transfers for {address} -> update range {query_start_ts} - {timestamp}')  # noqa: E501
+            # update last queried time for the address
+            DBQueryRanges(self.database).update_used_query_range(
+                write_cursor=cursor,
+                location_string=location_string,
+                queried_ranges=[(query_start_ts, timestamp)],
+            )
+
+        self.msg_aggregator.add_message(
+            message_type=WSMessageType.ETHEREUM_TRANSACTION_STATUS,
+            data={
+                'address': address,
+                'period': [query_start_ts, timestamp],
+                'status': str(TransactionStatusStep.QUERYING_ETHEREUM_TOKENS_TRANSACTIONS),
+            },
+        )
+
+    def _query_missing_transactions(
+            self,
+            tx_hashes: List[EVMTxHash],
+    ) -> Tuple[Dict[EVMTxHash, Timestamp], List[EvmTransaction]]:
+        """Queries the given transactions that are not in the DB. Nothing is written,
+        so the queries don't happen inside a DB write transaction.
+
+        Returns the timestamps of all given transactions and the queried transactions.
+
+        May raise:
+        - RemoteError if a missing transaction can't be queried
+        """
+        dbethtx = DBEthTx(self.database)
+        timestamps: Dict[EVMTxHash, Timestamp] = {}
+        with self.database.conn.read_ctx() as cursor:
+            for tx_hash in tx_hashes:
+                result = dbethtx.get_ethereum_transactions(
+                    cursor,
+                    ETHTransactionsFilterQuery.make(tx_hash=tx_hash),
+                    has_premium=True,  # ignore limiting here
+                )
+                if len(result) != 0:
+                    timestamps[tx_hash] = result[0].timestamp
+
+        transactions = []
+        for tx_hash in tx_hashes:
+            if tx_hash in timestamps:
+                continue
+            transaction = self.ethereum.get_transaction_by_hash(tx_hash)
+            timestamps[tx_hash] = transaction.timestamp
+            transactions.append(transaction)
+
+        return timestamps, transactions
+
     def get_or_query_transaction_receipt(
             self,
             write_cursor: 'DBCursor',
@@ -452,10 +719,108 @@ class EthTransactions:
 
         return tx_receipt  # type: ignore  # tx_receipt was just added in the DB so should be there  # noqa: E501
 
+    def _query_receipts_chunk(
+            self,
+            tx_hashes: List[EVMTxHash],
+            call_order: Sequence['WeightedNode'],
+            node_semaphore: BoundedSemaphore,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """Queries the receipts of a chunk of transactions starting from the first node
+        of the call order, whose semaphore bounds its concurrent queries. Receipts that
+        the batch query misses are queried one by one from all nodes.
+
+        Returns the receipts data and the number of receipts that could not be queried.
+        """
+        with node_semaphore:
+            try:
+                receipts = self.ethereum.get_transaction_receipts(
+                    tx_hashes=tx_hashes,
+                    call_order=call_order,
+                )
+            except RemoteError as e:
+                log.warning(f'Failed to query a chunk of receipts due to {str(e)}')
+                receipts = {}
+
+        results, failed = list(receipts.values()), 0
+        for tx_hash in tx_hashes:
+            if tx_hash in receipts:
+                continue
+            try:
+                results.append(self.ethereum.get_transaction_receipt(
+                    tx_hash=tx_hash,
+                    call_order=call_order,
+                ))
+            except RemoteError as e:
+                log.error(f'Could not query receipt of {tx_hash.hex()} due to {str(e)}')
+                failed += 1
+
+        return results, failed
+
+    def _write_receipts(self, receipts: List[Dict[str, Any]]) -> None:
+        dbethtx = DBEthTx(self.database)
+        with self.database.user_write() as write_cursor:
+            for tx_receipt_data in receipts:
+                try:
+                    dbethtx.add_receipt_data(write_cursor, tx_receipt_data)
+                except sqlcipher.IntegrityError as e:  # pylint: disable=no-member
+                    if 'UNIQUE constraint failed: ethtx_receipts.tx_hash' not in str(e):
+                        raise
+                    # else something else added the receipt before so we just continue
+
+    def query_and_save_receipts(self, tx_hashes: List[EVMTxHash]) -> int:
+        """Queries the receipts of the given transactions and saves them in the DB.
+
+        The receipts are queried in chunks, concurrently from all connected nodes with
+        a bounded number of queries per node. Each chunk is written in its own short DB
+        transaction as soon as it is queried and the progress is sent via websockets.
+
+        Returns the number of receipts that could not be queried.
+        """
+        call_order = [
+            x for x in self.ethereum.default_call_order()
+            if x.node_info.name == ETHERSCAN_NODE_NAME or x.node_info in self.ethereum.web3_mapping  # noqa: E501
+        ]
+        if len(call_order) == 0:
+            self.msg_aggregator.add_error('Could not query receipts since no node is connected')  # noqa: E501
+            return len(tx_hashes)
+
+        # chunks are assigned to the nodes round robin, proportionally to their queries
+        node_semaphores = [BoundedSemaphore(_node_receipt_queries(x)) for x in call_order]
+        slots = [
+            idx for idx, node in enumerate(call_order)
+            for _ in range(_node_receipt_queries(node))
+        ]
+        jobs = []
+        for chunk_idx, chunk in enumerate(get_chunks(tx_hashes, n=RECEIPTS_CHUNK_SIZE)):
+            node_idx = slots[chunk_idx % len(slots)]
+            jobs.append((
+                chunk,
+                call_order[node_idx:] + call_order[:node_idx],
+                node_semaphores[node_idx],
+            ))
+
+        processed, failed = 0, 0
+        pool = Pool(size=len(slots))
+        results = pool.imap_unordered(lambda job: self._query_receipts_chunk(*job), jobs)
+        try:
+            for receipts, chunk_failed in results:
+                self._write_receipts(receipts)
+                processed += len(receipts) + chunk_failed
+                failed += chunk_failed
+                self.msg_aggregator.add_message(
+                    message_type=WSMessageType.ETHEREUM_RECEIPTS_STATUS,
+                    data={'total': len(tx_hashes), 'processed': processed, 'failed': failed},
+                )
+        finally:  # only alive if the query stopped early, e.g. timed out
+            results.kill()
+            pool.kill()
+
+        return failed
+
     def get_receipts_for_transactions_missing_them(self, limit: Optional[int] = None) -> None:
         """
         Searches the database for up to `limit` transactions that have no corresponding receipt
-        and for each one of them queries the receipt and saves it in the DB.
+        and queries their receipts and saves them in the DB.
 
         It's protected by a lock to not enter the same code twice
         (i.e. from periodic tasks and from pnl report history events gathering)
@@ -471,7 +836,9 @@ class EthTransactions:
             if len(hash_results) == 0:
                 return  # nothing to do
 
-            with self.database.user_write() as cursor:
-                for entry in hash_results:
-                    tx_receipt_data = self.ethereum.get_transaction_receipt(tx_hash=entry)
-                    dbethtx.add_receipt_data(cursor, tx_receipt_data)
+            failed = self.query_and_save_receipts(hash_results)
+            if failed != 0:
+                self.msg_aggregator.add_warning(
+                    f'Could not query the receipts of {failed} ethereum transactions. '
+                    f'Will retry later. Check the logs for details.',
+                )
@@ -9,6 +9,35 @@ from rotkehlchen.types import ChecksumEvmAddress, SupportedBlockchain
 ETHERSCAN_NODE_NAME = 'etherscan'
 
 
+class PipelineTimings():
+    """Seconds spent at each stage of querying transactions from etherscan page by
+    page and saving them in the DB. The stages run concurrently"""
+    __slots__ = ('fetch', 'deserialize', 'insert', 'batches', 'entries')
+
+    def __init__(self) -> None:
+        self.fetch = 0.0
+        self.deserialize = 0.0
+        self.insert = 0.0
+        self.batches = 0
+        self.entries = 0
+
+    def add(self, other: 'PipelineTimings') -> None:
+        self.fetch += other.fetch
+        self.deserialize += other.deserialize
+        self.insert += other.insert
+        self.batches += other.batches
+        self.entries += other.entries
+
+    def serialize(self) -> Dict[str, Any]:
+        return {
+            'fetch_ms': round(self.fetch * 1000, 3),
+            'deserialize_ms': round(self.deserialize * 1000, 3),
+            'insert_ms': round(self.insert * 1000, 3),
+            'batches': self.batches,
+            'entries': self.entries,
+        }
+
+
 def string_to_evm_address(value: str) -> ChecksumEvmAddress:
     """This is a conversion without any checks of a string to ethereum address
 
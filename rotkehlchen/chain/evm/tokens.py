@@ -3,18 +3,25 @@ from collections import defaultdict
 from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
 
 from rotkehlchen.assets.asset import EvmToken
-from rotkehlchen.chain.ethereum.constants import ETHERSCAN_NODE
+from rotkehlchen.chain.ethereum.constants import ETHERSCAN_NODE, RANGE_PREFIX_ETHTOKENTX
+from rotkehlchen.chain.ethereum.decoding.constants import ERC20_OR_ERC721_TRANSFER
 from rotkehlchen.chain.ethereum.manager import EthereumManager
 from rotkehlchen.chain.ethereum.types import WeightedNode, string_to_evm_address
 from rotkehlchen.chain.ethereum.utils import token_normalized_value
 from rotkehlchen.constants.ethereum import ETH_SCAN
+from rotkehlchen.constants.resolver import ethaddress_to_identifier
+from rotkehlchen.constants.timing import WEEK_IN_SECONDS
 from rotkehlchen.db.dbhandler import DBHandler
+from rotkehlchen.db.ethtx import DBEthTx
+from rotkehlchen.db.filtering import HistoryEventFilterQuery
+from rotkehlchen.db.history_events import DBHistoryEvents
+from rotkehlchen.errors.misc import CallTooBigError
 from rotkehlchen.fval import FVal
 from rotkehlchen.globaldb.handler import GlobalDBHandler
 from rotkehlchen.inquirer import Inquirer
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.types import ChainID, ChecksumEvmAddress, Price, SupportedBlockchain, Timestamp
-from rotkehlchen.utils.misc import combine_dicts, get_chunks
+from rotkehlchen.utils.misc import combine_dicts, get_chunks, ts_now
 
 if TYPE_CHECKING:
     from rotkehlchen.db.drivers.gevent import DBCursor
@@ -61,6 +68,9 @@ DetectedTokensType = Dict[
 
 OTHER_MAX_TOKEN_CHUNK_LENGTH = 590
 
+# Between full detections only the tokens an address held or transferred are checked
+FULL_TOKEN_DETECTION_INTERVAL = WEEK_IN_SECONDS
+
 # maximum 32-bytes arguments in one call to a contract (either tokensBalance or multicall)
 ETHERSCAN_MAX_ARGUMENTS_TO_CONTRACT = 122
 
@@ -185,23 +195,37 @@ class EvmTokens():
                 balances[address][token] += normalized_balance
         return balances
 
-    def _query_chunks(
+    def _query_chunk(
             self,
-            address: ChecksumEvmAddress,
-            tokens: List[EvmToken],
-            chunk_size: int,
-            call_order: List[WeightedNode],
+            chunk: Tuple[ChecksumEvmAddress, List[EvmToken]],
+            call_order: Sequence[WeightedNode],
     ) -> Dict[EvmToken, FVal]:
-        total_token_balances: Dict[EvmToken, FVal] = defaultdict(FVal)
-        chunks = get_chunks(tokens, n=chunk_size)
-        for chunk in chunks:
-            new_token_balances = self._get_token_balances(
+        """Queries the balances of a chunk of tokens for an address. If all nodes
+        reject the chunk because it needs too much gas or returns too big a response
+        it's split in halves which are queried separately.
+
+        May raise:
+        - RemoteError if the chunk could not be queried from any node
+        - BadFunctionCallOutput if a local node is used and the contract for the
+          token has no code. That means the chain is not synced
+        """
+        address, tokens = chunk
+        try:
+            return self._get_token_balances(
                 address=address,
-                tokens=chunk,
+                tokens=tokens,
                 call_order=call_order,
             )
-            total_token_balances = combine_dicts(total_token_balances, new_token_balances)
-        return total_token_balances
+        except CallTooBigError as e:
+            if len(tokens) == 1:
+                raise
+
+            log.debug(f'Token balances query of {len(tokens)} tokens failed due to {str(e)}. Splitting it')  # noqa: E501
+            half = len(tokens) // 2
+            return combine_dicts(
+                self._query_chunk((address, tokens[:half]), call_order),
+                self._query_chunk((address, tokens[half:]), call_order),
+            )
 
     def detect_tokens(
             self,
@@ -277,6 +301,11 @@ class EvmTokens():
             exceptions=exceptions,
             except_protocols=['balancer'],
         )
+        addresses_to_tokens, detection_state = self._get_tokens_to_check(
+            cursor=cursor,
+            addresses=addresses,
+            all_tokens=all_tokens,
+        )
         if self.manager.connected_to_any_web3():
             chunk_size = OTHER_MAX_TOKEN_CHUNK_LENGTH
             # skipping etherscan because chunk size is too big for etherscan
@@ -284,22 +313,127 @@ class EvmTokens():
         else:
             chunk_size = ETHERSCAN_MAX_ARGUMENTS_TO_CONTRACT
             call_order = [ETHERSCAN_NODE]
-        for address in addresses:
-            token_balances = self._query_chunks(
-                address=address,
-                tokens=all_tokens,
-                chunk_size=chunk_size,
-                call_order=call_order,
-            )
-            detected_tokens = list(token_balances.keys())
-            with self.db.user_write() as write_cursor:
+        # query the chunks of all addresses concurrently, spread over the nodes
+        chunks = [
+            (address, tokens_chunk) for address, tokens in addresses_to_tokens.items()
+            for tokens_chunk in get_chunks(tokens, n=chunk_size)
+        ]
+        chunk_balances = self.manager.map_over_nodes(
+            function=self._query_chunk,
+            jobs=chunks,
+            call_order=call_order,
+        )
+        detected_tokens: Dict[ChecksumEvmAddress, List[EvmToken]] = {x: [] for x in addresses}
+        for (address, _), token_balances in zip(chunks, chunk_balances):
+            detected_tokens[address].extend(token_balances.keys())
+
+        with self.db.user_write() as write_cursor:
+            for address, tokens in detected_tokens.items():
                 self.db.save_tokens_for_address(
                     write_cursor=write_cursor,
                     address=address,
                     blockchain=SupportedBlockchain.ETHEREUM,
-                    tokens=detected_tokens,
+                    tokens=tokens,
+                )
+                self.db.save_token_detection_state(
+                    write_cursor=write_cursor,
+                    address=address,
+                    blockchain=SupportedBlockchain.ETHEREUM,
+                    last_full_detection_ts=detection_state[address][0],
+                    transfers_cursor_ts=detection_state[address][1],
                 )
 
+    def _get_tokens_to_check(
+            self,
+            cursor: 'DBCursor',
+            addresses: List[ChecksumEvmAddress],
+            all_tokens: List[EvmToken],
+    ) -> Tuple[
+        Dict[ChecksumEvmAddress, List[EvmToken]],
+        Dict[ChecksumEvmAddress, Tuple[Optional[Timestamp], Optional[Timestamp]]],
+    ]:
+        """Decides which of all the tokens to query the balances of for each address
+        and the detection state to save once they are queried.
+
+        If the address had a full detection recently and its token transfers are synced
+        then only the tokens it held at the last detection and the tokens of its saved
+        transfers since then are checked. Otherwise all tokens are checked.
+
+        The transfers cursor is the time up to which the address' token transfers are
+        synced and decoded, so transfers that get saved later are still checked at the
+        next detection.
+        """
+        now = ts_now()
+        dbethtx = DBEthTx(self.db)
+        dbevents = DBHistoryEvents(self.db)
+        identifiers_to_tokens = {x.identifier: x for x in all_tokens}
+        addresses_to_tokens: Dict[ChecksumEvmAddress, List[EvmToken]] = {}
+        detection_state: Dict[ChecksumEvmAddress, Tuple[Optional[Timestamp], Optional[Timestamp]]] = {}  # noqa: E501
+        for address in addresses:
+            last_full_detection_ts, transfers_cursor_ts = self.db.get_token_detection_state(
+                cursor=cursor,
+                address=address,
+                blockchain=SupportedBlockchain.ETHEREUM,
+            )
+            transfers_range = self.db.get_used_query_range(
+                cursor=cursor,
+                name=f'{RANGE_PREFIX_ETHTOKENTX}_{address}',
+            )
+            if transfers_range is None:  # transfers never synced. Can't detect incrementally
+                addresses_to_tokens[address] = all_tokens
+                detection_state[address] = (now, None)
+                continue
+
+            if (
+                last_full_detection_ts is not None and transfers_cursor_ts is not None and
+                now - last_full_detection_ts < FULL_TOKEN_DETECTION_INTERVAL
+            ):
+                incremental, from_ts = True, transfers_cursor_ts
+            else:
+                incremental, from_ts = False, transfers_range[0]
+
+            new_cursor_ts = transfers_range[1]
+            no_receipt_ts = dbethtx.get_earliest_transaction_no_receipt_ts(
+                cursor=cursor,
+                address=address,
+                from_ts=from_ts,
+            )
+            if no_receipt_ts is not None:  # check it again once decoded
+                new_cursor_ts = min(new_cursor_ts, no_receipt_ts)
+            if incremental is False:
+                addresses_to_tokens[address] = all_tokens
+                detection_state[address] = (now, new_cursor_ts)
+                continue
+
+            saved_tokens, _ = self.db.get_tokens_for_address(
+                cursor=cursor,
+                address=address,
+                blockchain=SupportedBlockchain.ETHEREUM,
+            )
+            candidates = {x.identifier for x in saved_tokens or []}
+            transfer_contracts = dbethtx.get_transfer_log_contracts(
+                cursor=cursor,
+                address=address,
+                transfer_topic=ERC20_OR_ERC721_TRANSFER,
+                from_ts=from_ts,
+            )
+            candidates.update(ethaddress_to_identifier(x) for x in transfer_contracts)
+            candidates.update(x.identifier for x in dbevents.get_entries_assets_history_events(
+                cursor=cursor,
+                query_filter=HistoryEventFilterQuery.make(location_label=address, from_ts=from_ts),
+            ))
+            # tokens not in all_tokens are ignored or excluded from detection
+            addresses_to_tokens[address] = [
+                identifiers_to_tokens[x] for x in candidates if x in identifiers_to_tokens
+            ]
+            detection_state[address] = (last_full_detection_ts, new_cursor_ts)
+            log.debug(
+                f'Incremental token detection of {address} checks '
+                f'{len(addresses_to_tokens[address])} tokens',
+            )
+
+        return addresses_to_tokens, detection_state
+
     def query_tokens_for_addresses(
             self,
             addresses: List[ChecksumEvmAddress],
@@ -337,11 +471,14 @@ class EvmTokens():
             addresses_to_tokens=addresses_to_tokens,
             chunk_length=chunk_size,
         )
-        for chunk in multicall_chunks:
-            addresses_to_balances.update(self._get_multicall_token_balances(
-                chunk=chunk,
+        for chunk_balances in self.manager.map_over_nodes(
+                function=self._get_multicall_token_balances,
+                jobs=multicall_chunks,
                 call_order=call_order,
-            ))
+        ):
+            for address, balances in chunk_balances.items():
+                # an address' tokens can be split over many chunks
+                addresses_to_balances.setdefault(address, {}).update(balances)
 
         token_usd_price: Dict[EvmToken, Price] = {}
         for token in all_tokens:
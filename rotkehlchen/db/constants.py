@@ -1,6 +1,8 @@
 KRAKEN_ACCOUNT_TYPE_KEY = 'kraken_account_type'
 FTX_SUBACCOUNT_NAME_KEY = 'ftx_subaccount'
 BINANCE_MARKETS_KEY = 'binance_selected_trade_pairs'
+# Query state of a binance exchange. Not a setting, so not in USER_CREDENTIAL_MAPPING_KEYS
+BINANCE_TRADES_CURSORS_KEY = 'binance_trades_cursors'
 USER_CREDENTIAL_MAPPING_KEYS = (
     KRAKEN_ACCOUNT_TYPE_KEY,
     FTX_SUBACCOUNT_NAME_KEY,
@@ -10,3 +12,5 @@ HISTORY_MAPPING_CUSTOMIZED = 'customized'
 HISTORY_MAPPING_DECODED = 'decoded'
 ACCOUNTS_DETAILS_LAST_QUERIED_TS = 'last_queried_timestamp'
 ACCOUNTS_DETAILS_TOKENS = 'tokens'
+ACCOUNTS_DETAILS_LAST_FULL_DETECTION_TS = 'last_full_detection_timestamp'
+ACCOUNTS_DETAILS_TRANSFERS_CURSOR_TS = 'token_transfers_cursor_timestamp'
@@ -0,0 +1,142 @@
+import logging
+from typing import TYPE_CHECKING, Optional, Tuple
+
+from rotkehlchen.logging import RotkehlchenLogsAdapter
+from rotkehlchen.types import ChainID, ChecksumEvmAddress
+from rotkehlchen.utils.misc import ts_now
+
+if TYPE_CHECKING:
+    from rotkehlchen.db.dbhandler import DBHandler
+    from rotkehlchen.db.drivers.gevent import DBCursor
+
+logger = logging.getLogger(__name__)
+log = RotkehlchenLogsAdapter(logger)
+
+DEFAULT_CONTRACT_CALL_CACHE_MAX_ENTRIES = 200_000
+DEFAULT_CONTRACT_CALL_CACHE_MAX_BYTES = 256 * 1024 * 1024
+# Results bigger than this are not cached. Big multicall results are rarely repeated exactly
+MAX_CACHED_RESULT_SIZE = 256 * 1024
+# An entry's last use is only updated if older than this to avoid a write at every hit
+LAST_USED_UPDATE_SECS = 86400
+# Fraction of the limits to keep when evicting so that eviction does not run at every insert
+EVICTION_TARGET_RATIO = 0.9
+
+
+class ContractCallCache():
+    """Cache of the raw results of contract calls at a specific block.
+
+    The calldata and the results contain the user's addresses and balances so the
+    cache lives in the user's encrypted transient DB. Results at a given block never
+    change, so they can be kept forever. The cache is bounded both by max_entries and
+    by max_bytes of calldata and results and the least recently used entries are
+    evicted first. Calls at 'latest' or any non numeric block identifier should not
+    be cached.
+    """
+
+    def __init__(
+            self,
+            database: 'DBHandler',
+            max_entries: int = DEFAULT_CONTRACT_CALL_CACHE_MAX_ENTRIES,
+            max_bytes: int = DEFAULT_CONTRACT_CALL_CACHE_MAX_BYTES,
+    ) -> None:
+        self.database = database
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # number of rows and their total size in the table. None if not counted yet
+        self.entries: Optional[int] = None
+        self.size: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+
+    def get(
+            self,
+            chain: ChainID,
+            address: ChecksumEvmAddress,
+            calldata: bytes,
+            block_number: int,
+    ) -> Optional[bytes]:
+        """Returns the raw result of the call if it is cached"""
+        key = (chain.serialize_for_db(), address, calldata, block_number)
+        with self.database.conn_transient.read_ctx() as cursor:
+            result = cursor.execute(
+                'SELECT result, last_used_ts FROM contract_call_cache WHERE chain_id=? AND '
+                'address=? AND calldata=? AND block_number=?',
+                key,
+            ).fetchone()
+
+        if result is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        now = ts_now()
+        if now - result[1] > LAST_USED_UPDATE_SECS:
+            with self.database.transient_write() as write_cursor:
+                write_cursor.execute(
+                    'UPDATE contract_call_cache SET last_used_ts=? WHERE chain_id=? AND '
+                    'address=? AND calldata=? AND block_number=?',
+                    (now, *key),
+                )
+        return result[0]
+
+    def set(
+            self,
+            chain: ChainID,
+            address: ChecksumEvmAddress,
+            calldata: bytes,
+            block_number: int,
+            result: bytes,
+    ) -> None:
+        """Caches the raw result of a call and evicts the least recently used
+        entries if the cache grew past its limits"""
+        if len(result) > MAX_CACHED_RESULT_SIZE:
+            return
+
+        with self.database.transient_write() as write_cursor:
+            if self.entries is None or self.size is None:
+                self.entries, self.size = write_cursor.execute(
+                    'SELECT COUNT(*), COALESCE(SUM(LENGTH(calldata) + LENGTH(result)), 0) '
+                    'FROM contract_call_cache',
+                ).fetchone()
+
+            write_cursor.execute(
+                'INSERT OR IGNORE INTO contract_call_cache(chain_id, address, calldata, '
+                'block_number, result, last_used_ts) VALUES(?, ?, ?, ?, ?, ?)',
+                (chain.serialize_for_db(), address, calldata, block_number, result, ts_now()),
+            )
+            if write_cursor.rowcount == 1:
+                self.entries += 1
+                self.size += len(calldata) + len(result)
+            if self.entries <= self.max_entries and self.size <= self.max_bytes:
+                return
+
+            self.entries, self.size = self._evict(write_cursor, self.entries, self.size)
+
+    def _evict(self, write_cursor: 'DBCursor', entries: int, size: int) -> Tuple[int, int]:
+        """Evicts the least recently used entries until both the number of entries
+        and their size are down to EVICTION_TARGET_RATIO of the limits.
+
+        Returns the number of entries and their size after the eviction"""
+        target_entries = int(self.max_entries * EVICTION_TARGET_RATIO)
+        target_bytes = int(self.max_bytes * EVICTION_TARGET_RATIO)
+        to_evict = []
+        cursor = write_cursor.execute(
+            'SELECT rowid, LENGTH(calldata) + LENGTH(result) FROM contract_call_cache '
+            'ORDER BY last_used_ts ASC',
+        )
+        for rowid, entry_size in cursor:
+            if entries <= target_entries and size <= target_bytes:
+                break
+            to_evict.append((rowid,))
+            entries -= 1
+            size -= entry_size
+
+        write_cursor.executemany('DELETE FROM contract_call_cache WHERE rowid=?', to_evict)
+        log.debug(f'Evicted {len(to_evict)} entries from the contract call cache')
+        return entries, size
+
+    def clear(self) -> None:
+        with self.database.transient_write() as write_cursor:
+            write_cursor.execute('DELETE FROM contract_call_cache')
+        self.entries = 0
+        self.size = 0
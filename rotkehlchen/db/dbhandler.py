@@ -28,6 +28,7 @@ from pysqlcipher3 import dbapi2 as sqlcipher
 from rotkehlchen.accounting.structures.balance import BalanceType
 from rotkehlchen.accounting.structures.types import ActionType
 from rotkehlchen.assets.asset import Asset, AssetWithOracles, EvmToken
+from rotkehlchen.assets.resolver import AssetResolver
 from rotkehlchen.balances.manual import ManuallyTrackedBalance
 from rotkehlchen.chain.bitcoin.hdkey import HDKey
 from rotkehlchen.chain.bitcoin.xpub import (
@@ -61,9 +62,12 @@ from rotkehlchen.constants.limits import (
 from rotkehlchen.constants.misc import NFT_DIRECTIVE, ONE, ZERO
 from rotkehlchen.constants.timing import HOUR_IN_SECONDS
 from rotkehlchen.db.constants import (
+    ACCOUNTS_DETAILS_LAST_FULL_DETECTION_TS,
     ACCOUNTS_DETAILS_LAST_QUERIED_TS,
     ACCOUNTS_DETAILS_TOKENS,
+    ACCOUNTS_DETAILS_TRANSFERS_CURSOR_TS,
     BINANCE_MARKETS_KEY,
+    BINANCE_TRADES_CURSORS_KEY,
     KRAKEN_ACCOUNT_TYPE_KEY,
     USER_CREDENTIAL_MAPPING_KEYS,
 )
@@ -562,7 +566,7 @@ class DBHandler:
         try:
             yield cursor
         except Exception:
-            self.conn.rollback()
+            self.conn_transient.rollback()
             raise
         else:
             self.conn_transient.commit()
@@ -1125,6 +1129,11 @@ class DBHandler:
             'DELETE FROM used_query_ranges WHERE name LIKE ? ESCAPE ?;',
             (f'{str(location)}\\_%', '\\'),
         )
+        write_cursor.execute(  # binance trades are queried from these cursors
+            'DELETE FROM user_credentials_mappings WHERE credential_location=? AND '
+            'setting_name=?',
+            (location.serialize_for_db(), BINANCE_TRADES_CURSORS_KEY),
+        )
 
     def purge_exchange_data(self, write_cursor: 'DBCursor', location: Location) -> None:
         self.delete_used_query_range_for_exchange(write_cursor=write_cursor, location=location)
@@ -1366,6 +1375,54 @@ class DBHandler:
             insert_rows,
         )
 
+    def get_token_detection_state(
+            self,
+            cursor: 'DBCursor',
+            address: ChecksumEvmAddress,
+            blockchain: SupportedBlockchain,
+    ) -> Tuple[Optional[Timestamp], Optional[Timestamp]]:
+        """Gets the timestamp of the last full token detection of the address and the
+        timestamp since which its token transfers have not been checked for new tokens"""
+        cursor.execute(
+            'SELECT key, value FROM accounts_details WHERE account=? AND blockchain=? AND (key=? OR key=?)',  # noqa: E501
+            (address, blockchain.serialize(), ACCOUNTS_DETAILS_LAST_FULL_DETECTION_TS, ACCOUNTS_DETAILS_TRANSFERS_CURSOR_TS),  # noqa: E501
+        )
+        state: Dict[str, Timestamp] = {}
+        for key, value in cursor:
+            try:
+                state[key] = deserialize_timestamp(value)
+            except DeserializationError as e:
+                log.error(f'Could not read {key} of {address} from the DB due to {str(e)}')
+
+        return (
+            state.get(ACCOUNTS_DETAILS_LAST_FULL_DETECTION_TS),
+            state.get(ACCOUNTS_DETAILS_TRANSFERS_CURSOR_TS),
+        )
+
+    def save_token_detection_state(
+            self,
+            write_cursor: 'DBCursor',
+            address: ChecksumEvmAddress,
+            blockchain: SupportedBlockchain,
+            last_full_detection_ts: Optional[Timestamp],
+            transfers_cursor_ts: Optional[Timestamp],
+    ) -> None:
+        """Saves the state of the token detection of an address. None values are removed"""
+        for key, value in (
+                (ACCOUNTS_DETAILS_LAST_FULL_DETECTION_TS, last_full_detection_ts),
+                (ACCOUNTS_DETAILS_TRANSFERS_CURSOR_TS, transfers_cursor_ts),
+        ):
+            write_cursor.execute(
+                'DELETE FROM accounts_details WHERE account=? AND blockchain=? AND key=?',
+                (address, blockchain.serialize(), key),
+            )
+            if value is not None:
+                write_cursor.execute(
+                    'INSERT INTO accounts_details (account, blockchain, key, value) '
+                    'VALUES (?, ?, ?, ?)',
+                    (address, blockchain.serialize(), key, value),
+                )
+
     def get_blockchain_accounts(self, cursor: 'DBCursor') -> BlockchainAccounts:
         """Returns a Blockchain accounts instance containing all blockchain account addresses"""
         eth_list = []
@@ -1559,12 +1616,19 @@ class DBHandler:
                 f'manually tracked balance ids that do not exist',
             )
 
-    def save_balances_data(self, write_cursor: 'DBCursor', data: Dict[str, Any], timestamp: Timestamp) -> None:  # noqa: E501
+    def save_balances_data(
+            self,
+            write_cursor: 'DBCursor',
+            data: Dict[str, Any],
+            timestamp: Timestamp,
+            durations: Optional[Dict[str, float]] = None,
+    ) -> None:
         """The keys of the data dictionary can be any kind of asset plus 'location'
         and 'net_usd'. This gives us the balance data per assets, the balance data
         per location and finally the total balance
 
-        The balances are saved in the DB at the given timestamp
+        The balances are saved in the DB at the given timestamp along with how
+        long the query of each of their sources took, if given
         """
         balances = []
         locations = []
@@ -1608,6 +1672,14 @@ class DBHandler:
             self.add_multiple_location_data(write_cursor, locations)
         except InputError as err:
             self.msg_aggregator.add_warning(str(err))
+            return
+
+        if durations is not None:
+            write_cursor.executemany(
+                'INSERT OR REPLACE INTO balance_snapshot_durations(timestamp, source, duration) '
+                'VALUES(?, ?, ?)',
+                [(timestamp, source, duration) for source, duration in durations.items()],
+            )
 
     def add_exchange(
             self,
@@ -1705,6 +1777,13 @@ class DBHandler:
                 raise InputError(f'Could not update DB user_credentials_mappings due to {str(e)}') from e  # noqa: E501
 
         location_is_binance = location in (Location.BINANCE, Location.BINANCEUS)
+        if location_is_binance and api_key is not None:
+            # the key may be of another account whose trade ids are unrelated
+            write_cursor.execute(
+                'DELETE FROM user_credentials_mappings WHERE credential_name=? AND '
+                'credential_location=? AND setting_name=?',
+                (name, location.serialize_for_db(), BINANCE_TRADES_CURSORS_KEY),
+            )
         if location_is_binance and binance_selected_trade_pairs is not None:
             try:
                 exchange_name = new_name if new_name is not None else name
@@ -1803,6 +1882,9 @@ class DBHandler:
             )
             extras = {}
             for entry in cursor:
+                if entry[0] == BINANCE_TRADES_CURSORS_KEY:
+                    continue  # query state and not a setting
+
                 if entry[0] not in USER_CREDENTIAL_MAPPING_KEYS:
                     log.error(
                         f'Unknown credential setting {entry[0]} found in the DB. Skipping.',
@@ -1849,6 +1931,40 @@ class DBHandler:
                 return json.loads(data[0])
             return []
 
+    def set_binance_trades_query_state(
+            self,
+            write_cursor: 'DBCursor',
+            name: str,
+            location: Location,
+            state: Dict[str, Any],
+    ) -> None:
+        """Sets the trades query state of a specific binance exchange. That is the id
+        of the next trade to query per market and which markets to query"""
+        write_cursor.execute(
+            'INSERT OR REPLACE INTO user_credentials_mappings '
+            '(credential_name, credential_location, setting_name, setting_value) '
+            'VALUES (?, ?, ?, ?)',
+            (name, location.serialize_for_db(), BINANCE_TRADES_CURSORS_KEY, json.dumps(state)),
+        )
+
+    def get_binance_trades_query_state(self, name: str, location: Location) -> Dict[str, Any]:
+        """Gets the trades query state of a specific binance exchange. Empty if never queried"""
+        with self.conn.read_ctx() as cursor:
+            cursor.execute(
+                'SELECT setting_value FROM user_credentials_mappings WHERE '
+                'credential_name=? AND credential_location=? AND setting_name=?',
+                (name, location.serialize_for_db(), BINANCE_TRADES_CURSORS_KEY),
+            )
+            data = cursor.fetchone()
+            if data is None:
+                return {}
+
+            try:
+                return json.loads(data[0])
+            except json.JSONDecodeError as e:
+                log.error(f'Could not decode the {name} {location} trades query state: {str(e)}')
+                return {}
+
     def set_ftx_subaccount(self, write_cursor: 'DBCursor', ftx_name: str, subaccount_name: str) -> None:  # noqa: E501
         """This function may raise sqlcipher.DatabaseError"""
         write_cursor.execute(
@@ -2492,24 +2608,26 @@ class DBHandler:
                 continue
 
             for result in cursor:
-                for _, asset_id in enumerate(result):
-                    try:
-                        if asset_id is not None:
-                            results.add(Asset(asset_id).check_existence())
-                    except UnknownAsset:
-                        self.msg_aggregator.add_warning(
-                            f'Unknown/unsupported asset {asset_id} found in the database. '
-                            f'If you believe this should be supported open an issue in github',
-                        )
+                for asset_id in result:
+                    if asset_id is None:
                         continue
-                    except DeserializationError:
+                    if not isinstance(asset_id, str):
                         self.msg_aggregator.add_error(
                             f'Asset with non-string type {type(asset_id)} found in the '
                             f'database. Skipping it.',
                         )
                         continue
+                    results.add(asset_id)
+
+        # check the existence of all the assets at once
+        existing = AssetResolver().resolve_many(list(results))
+        for asset_id in results - existing.keys():
+            self.msg_aggregator.add_warning(
+                f'Unknown/unsupported asset {asset_id} found in the database. '
+                f'If you believe this should be supported open an issue in github',
+            )
 
-        return list(results)
+        return [Asset(x) for x in existing]
 
     def update_owned_assets_in_globaldb(self, cursor: 'DBCursor') -> None:
         """Makes sure all owned assets of the user are in the Global DB"""
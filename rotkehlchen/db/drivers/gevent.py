@@ -4,13 +4,16 @@ but heavily modified"""
 
 import random
 import sqlite3
+import time
 from contextlib import contextmanager
 from enum import Enum, auto
+from functools import partial
 from pathlib import Path
 from types import TracebackType
 from typing import (
     TYPE_CHECKING,
     Any,
+    Callable,
     Dict,
     Generator,
     List,
@@ -19,13 +22,17 @@ from typing import (
     Sequence,
     Tuple,
     Type,
+    TypeVar,
     Union,
 )
 from uuid import uuid4
 
 import gevent
+from gevent.queue import Queue
 from pysqlcipher3 import dbapi2 as sqlcipher
 
+from rotkehlchen.db.drivers.query_stats import QUERY_STATS, QueryRecord
+
 if TYPE_CHECKING:
     from rotkehlchen.logging import RotkehlchenLogger
 
@@ -37,6 +44,8 @@ import logging
 
 logger: 'RotkehlchenLogger' = logging.getLogger(__name__)  # type: ignore
 
+T = TypeVar('T')
+
 
 class ContextError(Exception):
     """Intended to be raised when something is wrong with db context management"""
@@ -44,9 +53,11 @@ class ContextError(Exception):
 
 class DBCursor:
 
-    def __init__(self, connection: 'DBConnection', cursor: UnderlyingCursor) -> None:  # noqa: E501
+    def __init__(self, connection: Union['DBConnection', 'DBReadConnection'], cursor: UnderlyingCursor) -> None:  # noqa: E501
         self._cursor = cursor
         self.connection = connection
+        # the query being recorded when query stats are enabled
+        self._query: Optional[QueryRecord] = None
 
     def __iter__(self) -> 'DBCursor':
         if __debug__:
@@ -61,7 +72,14 @@ class DBCursor:
         """  # noqa: E501
         if __debug__:
             logger.trace(f'Get next item for cursor {self._cursor}')
-        result = next(self._cursor, None)
+        if self._query is not None:
+            start = time.perf_counter()
+            result = next(self._cursor, None)
+            self._query.duration += time.perf_counter() - start
+            if result is not None:
+                self._query.rows += 1
+        else:
+            result = next(self._cursor, None)
         if result is None:
             if __debug__:
                 logger.trace(f'Stopping iteration for cursor {self._cursor}')
@@ -83,10 +101,46 @@ class DBCursor:
         self.close()
         return True
 
+    def _finish_query(self) -> None:
+        if self._query is not None:
+            QUERY_STATS.finish(self._query, self.connection.yields, self.connection._conn)
+            self._query = None
+
+    def _recorded_execute(
+            self,
+            method: Callable,
+            statement: str,
+            bindings: Tuple[Sequence, ...],
+            explain_bindings: Optional[Sequence],
+    ) -> None:
+        """Execute the statement with the given cursor method while recording it in the
+        query stats. explain_bindings are the bindings to get the query plan with"""
+        self._finish_query()
+        yields_start = self.connection.yields
+        start = time.perf_counter()
+        method(statement, *bindings)
+        self._query = QUERY_STATS.start(
+            statement=statement,
+            bindings=explain_bindings,
+            duration=time.perf_counter() - start,
+            rows=max(self._cursor.rowcount, 0),  # -1 for selects. Those count fetched rows
+            yields_start=yields_start,
+            connection=self.connection._conn,
+        )
+
     def execute(self, statement: str, *bindings: Sequence) -> 'DBCursor':
         if __debug__:
             logger.trace(f'EXECUTE {statement}')
-        self._cursor.execute(statement, *bindings)
+        if QUERY_STATS.enabled:
+            self._recorded_execute(
+                method=self._cursor.execute,
+                statement=statement,
+                bindings=bindings,
+                explain_bindings=bindings[0] if len(bindings) != 0 else None,
+            )
+        else:
+            self._finish_query()
+            self._cursor.execute(statement, *bindings)
         if __debug__:
             logger.trace(f'FINISH EXECUTE {statement}')
         return self
@@ -94,7 +148,17 @@ class DBCursor:
     def executemany(self, statement: str, *bindings: Sequence[Sequence]) -> 'DBCursor':
         if __debug__:
             logger.trace(f'EXECUTEMANY {statement}')
-        self._cursor.executemany(statement, *bindings)
+        if QUERY_STATS.enabled:
+            # bindings may be a generator so can't get the query plan with the first of them
+            self._recorded_execute(
+                method=self._cursor.executemany,
+                statement=statement,
+                bindings=bindings,
+                explain_bindings=None,
+            )
+        else:
+            self._finish_query()
+            self._cursor.executemany(statement, *bindings)
         if __debug__:
             logger.trace(f'FINISH EXECUTEMANY {statement}')
         return self
@@ -113,7 +177,14 @@ class DBCursor:
     def fetchone(self) -> Any:
         if __debug__:
             logger.trace('CURSOR FETCHONE')
-        result = self._cursor.fetchone()
+        if self._query is not None:
+            start = time.perf_counter()
+            result = self._cursor.fetchone()
+            self._query.duration += time.perf_counter() - start
+            if result is not None:
+                self._query.rows += 1
+        else:
+            result = self._cursor.fetchone()
         if __debug__:
             logger.trace('FINISH CURSOR FETCHONE')
         return result
@@ -123,7 +194,13 @@ class DBCursor:
             logger.trace(f'CURSOR FETCHMANY with {size=}')
         if size is None:
             size = self._cursor.arraysize
-        result = self._cursor.fetchmany(size)
+        if self._query is not None:
+            start = time.perf_counter()
+            result = self._cursor.fetchmany(size)
+            self._query.duration += time.perf_counter() - start
+            self._query.rows += len(result)
+        else:
+            result = self._cursor.fetchmany(size)
         if __debug__:
             logger.trace('FINISH CURSOR FETCHMANY')
         return result
@@ -131,7 +208,14 @@ class DBCursor:
     def fetchall(self) -> List[Any]:
         if __debug__:
             logger.trace('CURSOR FETCHALL')
-        result = self._cursor.fetchall()
+        if self._query is not None:
+            start = time.perf_counter()
+            result = self._cursor.fetchall()
+            self._query.duration += time.perf_counter() - start
+            self._query.rows += len(result)
+            self._finish_query()
+        else:
+            result = self._cursor.fetchall()
         if __debug__:
             logger.trace('FINISH CURSOR FETCHALL')
         return result
@@ -145,6 +229,7 @@ class DBCursor:
         return self._cursor.lastrowid  # type: ignore
 
     def close(self) -> None:
+        self._finish_query()
         self._cursor.close()
 
 
@@ -185,6 +270,7 @@ def _progress_callback(connection: Optional['DBConnection']) -> int:
     with connection.in_callback:
         if __debug__:
             logger.trace(f'Got in locked section of the progress callback for {connection.connection_type} with id {identifier}')  # noqa: E501
+        connection.yields += 1
         gevent.sleep(0)
         if __debug__:
             logger.trace(f'Going out of the progress callback for {connection.connection_type} with id {identifier}')  # noqa: E501
@@ -212,6 +298,123 @@ CALLBACK_MAP = {
     DBConnectionType.GLOBAL: global_callback,
 }
 
+# Same as CONNECTION_MAP but for the read only connections of the pools. Keyed by
+# connection type and index of the connection in the pool.
+READ_CONNECTION_MAP: Dict[Tuple[DBConnectionType, int], 'DBReadConnection'] = {}
+
+
+def read_callback(key: Tuple[DBConnectionType, int]) -> int:
+    return _progress_callback(READ_CONNECTION_MAP.get(key))  # type: ignore  # same interface
+
+
+def _connect(path: Union[str, Path], connection_type: DBConnectionType) -> UnderlyingConnection:
+    if connection_type == DBConnectionType.GLOBAL:
+        return sqlite3.connect(path, check_same_thread=False)
+    return sqlcipher.connect(path, check_same_thread=False)  # pylint: disable=no-member
+
+
+class DBReadConnection:
+    """A read only connection to the same DB as a DBConnection. Part of a DBReadPool"""
+
+    def __init__(
+            self,
+            path: Union[str, Path],
+            connection_type: DBConnectionType,
+            index: int,
+            sql_vm_instructions_cb: int,
+            setup_script: str,
+    ) -> None:
+        self.key = (connection_type, index)
+        READ_CONNECTION_MAP[self.key] = self
+        self.in_callback = gevent.lock.Semaphore()
+        self.yields = 0  # context switches done by the progress callback
+        self.connection_type = connection_type
+        self.sql_vm_instructions_cb = sql_vm_instructions_cb
+        self._conn = _connect(path, connection_type)
+        if setup_script != '':
+            self._conn.executescript(setup_script)
+        self._conn.execute('PRAGMA query_only=ON')
+        self.set_progress_handler()
+
+    def set_progress_handler(self) -> None:
+        self._conn.set_progress_handler(partial(read_callback, self.key), self.sql_vm_instructions_cb)  # noqa: E501
+
+    def unset_progress_handler(self) -> None:
+        with self.in_callback:
+            self._conn.set_progress_handler(None, 0)
+
+    def cursor(self) -> DBCursor:
+        return DBCursor(connection=self, cursor=self._conn.cursor())
+
+    def close(self) -> None:
+        self._conn.close()
+        READ_CONNECTION_MAP.pop(self.key, None)
+
+
+class DBReadPool:
+    """A pool of read only connections used by DBConnection.read_ctx().
+
+    Needs the DB to be in WAL mode so that readers don't block and are not blocked by
+    the writer. Each connection has its own progress handler so a long read only
+    yields to other greenlets and does not hold back any other connection.
+    """
+
+    def __init__(
+            self,
+            path: Union[str, Path],
+            connection_type: DBConnectionType,
+            size: int,
+            sql_vm_instructions_cb: int,
+            setup_script: str,
+    ) -> None:
+        self.size = size
+        self.connections = [
+            DBReadConnection(
+                path=path,
+                connection_type=connection_type,
+                index=idx,
+                sql_vm_instructions_cb=sql_vm_instructions_cb,
+                setup_script=setup_script,
+            ) for idx in range(size)
+        ]
+        self._available: Queue = Queue()
+        for connection in self.connections:
+            self._available.put(connection)
+        self.checkouts = 0
+        self.waited_checkouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    @contextmanager
+    def checkout(self) -> Generator[DBReadConnection, None, None]:
+        """Get a connection from the pool, waiting for one if all are in use"""
+        start = time.monotonic()
+        connection = self._available.get()
+        wait = time.monotonic() - start
+        self.checkouts += 1
+        if wait > 0.001:
+            self.waited_checkouts += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        try:
+            yield connection
+        finally:
+            self._available.put(connection)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'size': self.size,
+            'available': self._available.qsize(),
+            'checkouts': self.checkouts,
+            'waited_checkouts': self.waited_checkouts,
+            'total_wait_ms': round(self.total_wait * 1000, 3),
+            'max_wait_ms': round(self.max_wait * 1000, 3),
+        }
+
+    def close(self) -> None:
+        for connection in self.connections:
+            connection.close()
+
 
 class DBConnection:
 
@@ -228,20 +431,72 @@ class DBConnection:
         CONNECTION_MAP[connection_type] = self
         self._conn: UnderlyingConnection
         self.in_callback = gevent.lock.Semaphore()
+        self.yields = 0  # context switches done by the progress callback
         self.connection_type = connection_type
         self.sql_vm_instructions_cb = sql_vm_instructions_cb
         # We need an ordered set. Python doesn't have such thing as a standalone object, but has
         # `dict` which preserves the order of its keys. So we use dict with None values.
         self.savepoints: Dict[str, None] = {}
-        if connection_type == DBConnectionType.GLOBAL:
-            self._conn = sqlite3.connect(path, check_same_thread=False)
-        else:
-            self._conn = sqlcipher.connect(path, check_same_thread=False)  # pylint: disable=no-member  # noqa: E501
+        self.path = path
+        self.read_pool: Optional[DBReadPool] = None
+        # greenlets that are inside a write context. Their reads should see their own writes
+        self._writer_greenlets: Dict[Any, int] = {}
+        self._conn = _connect(path, connection_type)
         self._set_progress_handler()
 
+    def enable_read_pool(self, size: int, setup_script: str = '') -> bool:
+        """Switch the DB to WAL mode and serve read_ctx() from a pool of `size` read only
+        connections. Writes keep using this connection. `setup_script` is run on each
+        new read connection, for example to set the key of an encrypted DB.
+
+        Returns False if the pool could not be enabled, for example for in-memory DBs.
+        """
+        if size <= 0 or self.read_pool is not None:
+            return False
+        if str(self.path) == ':memory:':
+            logger.warning(f'Not enabling a read pool for in-memory {self.connection_type} DB')
+            return False
+
+        journal_mode = self._conn.execute('PRAGMA journal_mode=WAL').fetchone()[0]
+        if journal_mode.lower() != 'wal':
+            logger.warning(f'Could not switch {self.connection_type} DB to WAL. Got {journal_mode}')  # noqa: E501
+            return False
+
+        self.read_pool = DBReadPool(
+            path=self.path,
+            connection_type=self.connection_type,
+            size=size,
+            sql_vm_instructions_cb=self.sql_vm_instructions_cb,
+            setup_script=setup_script,
+        )
+        return True
+
+    def _should_read_from_writer(self) -> bool:
+        """Reads should go to the writer connection if there is no pool or if the current
+        greenlet has uncommitted writes which the read connections can't see"""
+        return (
+            self.read_pool is None or
+            len(self.savepoints) != 0 or
+            gevent.getcurrent() in self._writer_greenlets
+        )
+
+    @contextmanager
+    def _track_writer(self) -> Generator[None, None, None]:
+        current = gevent.getcurrent()
+        self._writer_greenlets[current] = self._writer_greenlets.get(current, 0) + 1
+        try:
+            yield
+        finally:
+            if self._writer_greenlets[current] == 1:
+                del self._writer_greenlets[current]
+            else:
+                self._writer_greenlets[current] -= 1
+
     def execute(self, statement: str, *bindings: Sequence) -> DBCursor:
         if __debug__:
             logger.trace(f'DB CONNECTION EXECUTE {statement}')
+        if QUERY_STATS.enabled:
+            return self.cursor().execute(statement, *bindings)
         underlying_cursor = self._conn.execute(statement, *bindings)
         if __debug__:
             logger.trace(f'FINISH DB CONNECTION EXECUTEMANY {statement}')
@@ -250,6 +505,8 @@ class DBConnection:
     def executemany(self, statement: str, *bindings: Sequence[Sequence]) -> DBCursor:
         if __debug__:
             logger.trace(f'DB CONNECTION EXECUTEMANY {statement}')
+        if QUERY_STATS.enabled:
+            return self.cursor().executemany(statement, *bindings)
         underlying_cursor = self._conn.executemany(statement, *bindings)
         if __debug__:
             logger.trace(f'FINISH DB CONNECTION EXECUTEMANY {statement}')
@@ -290,29 +547,63 @@ class DBConnection:
         return DBCursor(connection=self, cursor=self._conn.cursor())
 
     def close(self) -> None:
+        if self.read_pool is not None:
+            self.read_pool.close()
+            self.read_pool = None
         self._conn.close()
         CONNECTION_MAP.pop(self.connection_type, None)
 
     @contextmanager
     def read_ctx(self) -> Generator['DBCursor', None, None]:
-        cursor = self.cursor()
-        try:
-            yield cursor
-        finally:
-            cursor.close()  # lgtm [py/should-use-with]
+        if self._should_read_from_writer():
+            cursor = self.cursor()
+            try:
+                yield cursor
+            finally:
+                cursor.close()  # lgtm [py/should-use-with]
+            return
+
+        with self.read_pool.checkout() as connection:  # type: ignore  # checked above
+            cursor = connection.cursor()
+            try:
+                yield cursor
+            finally:
+                cursor.close()  # lgtm [py/should-use-with]
+
+    def read_in_thread(self, callback: Callable[['DBCursor'], T]) -> T:
+        """Run a heavy read in an OS thread of the hub's threadpool so that it does not
+        block the other greenlets. Falls back to running it in the current greenlet if
+        there is no read pool or if the greenlet has uncommitted writes.
+
+        The callback gets a read cursor and should return everything it needs from it.
+        """
+        if self._should_read_from_writer():
+            with self.read_ctx() as cursor:
+                return callback(cursor)
+
+        with self.read_pool.checkout() as connection:  # type: ignore  # checked above
+            # the progress handler switches greenlets and can't run outside the hub's thread
+            connection.unset_progress_handler()
+            cursor = connection.cursor()
+            try:
+                return gevent.get_hub().threadpool.apply(callback, (cursor,))
+            finally:
+                cursor.close()
+                connection.set_progress_handler()
 
     @contextmanager
     def write_ctx(self) -> Generator['DBCursor', None, None]:
         cursor = self.cursor()
-        try:
-            yield cursor
-        except Exception:
-            self._conn.rollback()
-            raise
-        else:
-            self._conn.commit()
-        finally:
-            cursor.close()  # lgtm [py/should-use-with]
+        with self._track_writer():
+            try:
+                yield cursor
+            except Exception:
+                self._conn.rollback()
+                raise
+            else:
+                self._conn.commit()
+            finally:
+                cursor.close()  # lgtm [py/should-use-with]
 
     @contextmanager
     def savepoint_ctx(
@@ -325,15 +616,16 @@ class DBConnection:
         Savepoints work like nested transactions, more information here: https://www.sqlite.org/lang_savepoint.html  # noqa: E501
         """
         cursor, savepoint_name = self.enter_savepoint(savepoint_name)
-        try:
-            yield cursor
-        except Exception:
-            self.rollback_savepoint(savepoint_name)
-            raise
-        else:
-            self.release_savepoint(savepoint_name)
-        finally:
-            cursor.close()  # lgtm [py/should-use-with]
+        with self._track_writer():
+            try:
+                yield cursor
+            except Exception:
+                self.rollback_savepoint(savepoint_name)
+                raise
+            else:
+                self.release_savepoint(savepoint_name)
+            finally:
+                cursor.close()  # lgtm [py/should-use-with]
 
     def enter_savepoint(self, savepoint_name: Optional[str] = None) -> Tuple['DBCursor', str]:
         """
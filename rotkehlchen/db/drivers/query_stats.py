@@ -0,0 +1,181 @@
+import logging
+import re
+import sqlite3
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Any, Deque, Dict, List, Optional, Sequence
+
+from pysqlcipher3 import dbapi2 as sqlcipher
+
+if TYPE_CHECKING:
+    from rotkehlchen.db.drivers.gevent import UnderlyingConnection
+    from rotkehlchen.logging import RotkehlchenLogger
+
+logger: 'RotkehlchenLogger' = logging.getLogger(__name__)  # type: ignore
+
+DEFAULT_QUERY_STATS_SIZE = 5000
+DEFAULT_SLOW_QUERY_THRESHOLD_MS = 200
+MAX_SLOW_QUERIES = 100
+
+_STRING_LITERAL_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDERS_LIST_RE = re.compile(r'\?(?:\s*,\s*\?)+')
+_WHITESPACE_RE = re.compile(r'\s+')
+# Statements for which a query plan makes sense
+_EXPLAINABLE_RE = re.compile(r'^\s*(SELECT|WITH|INSERT|UPDATE|DELETE|REPLACE)\b', re.IGNORECASE)
+
+
+def normalize_statement(statement: str) -> str:
+    """Turn a statement to a form that is the same for all executions of a query,
+    independent of literals, whitespace and the number of bindings in IN lists"""
+    result = _STRING_LITERAL_RE.sub('?', statement)
+    result = _NUMBER_LITERAL_RE.sub('?', result)
+    result = _PLACEHOLDERS_LIST_RE.sub('?,...', result)
+    return _WHITESPACE_RE.sub(' ', result).strip()
+
+
+class QueryRecord():
+    """An executed query. Rows and duration keep getting updated while its rows
+    are fetched and yields are counted once the cursor moves on to another
+    statement or gets closed"""
+    __slots__ = ('statement', 'raw_statement', 'bindings', 'duration', 'rows', 'yields', 'yields_start', 'logged')  # noqa: E501
+
+    def __init__(
+            self,
+            statement: str,
+            bindings: Optional[Sequence],
+            duration: float,
+            rows: int,
+            yields_start: int,
+    ) -> None:
+        self.statement = normalize_statement(statement)
+        self.raw_statement = statement
+        self.bindings = bindings
+        self.duration = duration  # wall time in seconds
+        self.rows = rows  # rows returned for reads or modified for writes
+        self.yields = 0  # times the progress callback switched greenlets during the query
+        self.yields_start = yields_start
+        self.logged = False
+
+
+class QueryStats():
+    """Keeps the latest executed queries in a ring buffer and aggregates them per
+    normalized statement on request. Queries slower than the threshold are logged
+    together with their query plan.
+
+    When disabled, the only overhead is a check of `enabled` per statement.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.slow_query_threshold = DEFAULT_SLOW_QUERY_THRESHOLD_MS / 1000
+        self.records: Deque[QueryRecord] = deque(maxlen=DEFAULT_QUERY_STATS_SIZE)
+        self.slow_queries: Deque[Dict[str, Any]] = deque(maxlen=MAX_SLOW_QUERIES)
+
+    def configure(self, enabled: bool, slow_query_threshold_ms: Optional[int] = None) -> None:
+        self.enabled = enabled
+        if slow_query_threshold_ms is not None:
+            self.slow_query_threshold = slow_query_threshold_ms / 1000
+
+    def reset(self) -> None:
+        self.records.clear()
+        self.slow_queries.clear()
+
+    def start(
+            self,
+            statement: str,
+            bindings: Optional[Sequence],
+            duration: float,
+            rows: int,
+            yields_start: int,
+            connection: 'UnderlyingConnection',
+    ) -> QueryRecord:
+        """Record a just executed query and log it if it was already slow"""
+        record = QueryRecord(
+            statement=statement,
+            bindings=bindings,
+            duration=duration,
+            rows=rows,
+            yields_start=yields_start,
+        )
+        self.records.append(record)
+        if duration >= self.slow_query_threshold:
+            self._log_slow(record, connection)
+        return record
+
+    def finish(self, record: QueryRecord, yields_end: int, connection: 'UnderlyingConnection') -> None:  # noqa: E501
+        """Called when all rows of the query have been fetched, or the cursor moved on"""
+        record.yields = yields_end - record.yields_start
+        if record.logged is False and record.duration >= self.slow_query_threshold:
+            self._log_slow(record, connection)
+
+    def _log_slow(self, record: QueryRecord, connection: 'UnderlyingConnection') -> None:
+        record.logged = True
+        plan = self._explain(record, connection)
+        logger.warning(
+            f'Slow DB query took {record.duration * 1000:.1f} ms and returned '
+            f'{record.rows} rows: {record.statement}. Query plan: {plan}',
+        )
+        self.slow_queries.append({
+            'statement': record.statement,
+            'duration_ms': round(record.duration * 1000, 3),
+            'rows': record.rows,
+            'query_plan': plan,
+            'timestamp': int(time.time()),
+        })
+
+    @staticmethod
+    def _explain(record: QueryRecord, connection: 'UnderlyingConnection') -> List[str]:
+        """Get the query plan of the record's statement. Runs directly on the underlying
+        connection so that it does not get recorded itself"""
+        if _EXPLAINABLE_RE.match(record.raw_statement) is None:
+            return []
+
+        try:
+            cursor = connection.execute(
+                f'EXPLAIN QUERY PLAN {record.raw_statement}',
+                *(() if record.bindings is None else (record.bindings,)),
+            )
+            return [entry[-1] for entry in cursor.fetchall()]
+        except (sqlite3.Error, sqlcipher.Error) as e:  # pylint: disable=no-member
+            logger.debug(f'Could not get query plan for {record.statement} due to {str(e)}')
+            return []
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Aggregate the queries in the ring buffer per normalized statement, sorted
+        by descending total time"""
+        aggregated: Dict[str, Dict[str, Any]] = {}
+        for record in self.records:
+            entry = aggregated.get(record.statement)
+            if entry is None:
+                entry = aggregated[record.statement] = {
+                    'statement': record.statement,
+                    'count': 0,
+                    'total_ms': 0.0,
+                    'max_ms': 0.0,
+                    'rows': 0,
+                    'yields': 0,
+                }
+            duration_ms = record.duration * 1000
+            entry['count'] += 1
+            entry['total_ms'] += duration_ms
+            entry['max_ms'] = max(entry['max_ms'], duration_ms)
+            entry['rows'] += record.rows
+            entry['yields'] += record.yields
+
+        statements = sorted(aggregated.values(), key=lambda x: x['total_ms'], reverse=True)
+        for entry in statements:
+            entry['avg_ms'] = round(entry['total_ms'] / entry['count'], 3)
+            entry['total_ms'] = round(entry['total_ms'], 3)
+            entry['max_ms'] = round(entry['max_ms'], 3)
+
+        return {
+            'enabled': self.enabled,
+            'slow_query_threshold_ms': round(self.slow_query_threshold * 1000),
+            'recorded_queries': len(self.records),
+            'statements': statements,
+            'slow_queries': list(self.slow_queries),
+        }
+
+
+QUERY_STATS = QueryStats()
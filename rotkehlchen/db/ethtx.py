@@ -371,6 +371,63 @@ class DBEthTx():
 
         return tx_receipt
 
+    def get_receipts(  # pylint: disable=no-self-use
+            self,
+            cursor: 'DBCursor',
+            tx_hashes: List[EVMTxHash],
+    ) -> Dict[EVMTxHash, EthereumTxReceipt]:
+        """Gets the receipts of the given transactions that are in the DB, with one
+        query per table instead of per transaction and log. The caller should keep
+        the number of hashes below the SQLite bindings limit."""
+        if len(tx_hashes) == 0:
+            return {}
+
+        placeholders = ', '.join(['?'] * len(tx_hashes))
+        receipts: Dict[EVMTxHash, EthereumTxReceipt] = {}
+        cursor.execute(
+            f'SELECT tx_hash, contract_address, status, type FROM ethtx_receipts '
+            f'WHERE tx_hash IN ({placeholders})',
+            tx_hashes,
+        )
+        for entry in cursor:
+            receipts[EVMTxHash(entry[0])] = EthereumTxReceipt(
+                tx_hash=make_evm_tx_hash(entry[0]),
+                contract_address=entry[1],
+                status=bool(entry[2]),  # works since value is either 0 or 1
+                type=entry[3],
+            )
+
+        logs: Dict[Tuple[bytes, int], EthereumTxReceiptLog] = {}
+        cursor.execute(
+            f'SELECT tx_hash, log_index, data, address, removed FROM ethtx_receipt_logs '
+            f'WHERE tx_hash IN ({placeholders}) ORDER BY tx_hash, log_index ASC',
+            tx_hashes,
+        )
+        for entry in cursor:
+            receipt = receipts.get(EVMTxHash(entry[0]))
+            if receipt is None:
+                continue
+            tx_receipt_log = EthereumTxReceiptLog(
+                log_index=entry[1],
+                data=entry[2],
+                address=entry[3],
+                removed=bool(entry[4]),  # works since value is either 0 or 1
+            )
+            logs[(entry[0], entry[1])] = tx_receipt_log
+            receipt.logs.append(tx_receipt_log)
+
+        cursor.execute(
+            f'SELECT tx_hash, log_index, topic FROM ethtx_receipt_log_topics '
+            f'WHERE tx_hash IN ({placeholders}) ORDER BY tx_hash, log_index, topic_index ASC',
+            tx_hashes,
+        )
+        for entry in cursor:
+            tx_receipt_log = logs.get((entry[0], entry[1]))
+            if tx_receipt_log is not None:
+                tx_receipt_log.topics.append(entry[2])
+
+        return receipts
+
     def delete_transactions(self, write_cursor: 'DBCursor', address: ChecksumEvmAddress) -> None:
         """Delete all transactions related data to the given address from the DB
 
@@ -424,6 +481,58 @@ class DBEthTx():
 
         return max(starts), min(ends)
 
+    def get_transfer_log_contracts(  # pylint: disable=no-self-use
+            self,
+            cursor: 'DBCursor',
+            address: ChecksumEvmAddress,
+            transfer_topic: bytes,
+            from_ts: Timestamp,
+    ) -> List[ChecksumEvmAddress]:
+        """Gets the contracts that emitted a transfer log from or to the address in its
+        saved transactions since from_ts. Only transactions with a saved receipt are checked.
+
+        The transfer topic is the event's signature whose first two indexed topics are
+        the sender and the receiver, like the ERC20 Transfer event.
+        """
+        cursor.execute(
+            'SELECT DISTINCT L.address FROM ethtx_receipt_logs AS L '
+            'INNER JOIN ethtx_receipt_log_topics AS T0 ON L.tx_hash=T0.tx_hash AND '
+            'L.log_index=T0.log_index AND T0.topic_index=0 '
+            'INNER JOIN ethtx_receipt_log_topics AS T ON L.tx_hash=T.tx_hash AND '
+            'L.log_index=T.log_index AND T.topic_index IN (1, 2) '
+            'WHERE T0.topic=? AND T.topic=? AND L.tx_hash IN ('
+            'SELECT M.tx_hash FROM ethtx_address_mappings AS M INNER JOIN ethereum_transactions '
+            'AS E ON M.tx_hash=E.tx_hash WHERE M.address=? AND E.timestamp >= ?)',
+            (transfer_topic, b'\x00' * 12 + hexstring_to_bytes(address), address, from_ts),
+        )
+        contracts = []
+        for entry in cursor:
+            try:
+                contracts.append(deserialize_evm_address(entry[0]))
+            except DeserializationError as e:
+                log.debug(f'Got error {str(e)} while deserializing log address {entry[0]} from the DB')  # noqa: E501
+
+        return contracts
+
+    def get_earliest_transaction_no_receipt_ts(  # pylint: disable=no-self-use
+            self,
+            cursor: 'DBCursor',
+            address: ChecksumEvmAddress,
+            from_ts: Timestamp,
+    ) -> Optional[Timestamp]:
+        """Gets the timestamp of the earliest transaction of the address since from_ts
+        whose receipt is not saved, if any"""
+        result = cursor.execute(
+            'SELECT MIN(E.timestamp) FROM ethereum_transactions AS E INNER JOIN '
+            'ethtx_address_mappings AS M ON E.tx_hash=M.tx_hash WHERE M.address=? AND '
+            'E.timestamp >= ? AND E.tx_hash NOT IN (SELECT tx_hash FROM ethtx_receipts)',
+            (address, from_ts),
+        ).fetchone()
+        if result is None or result[0] is None:
+            return None
+
+        return Timestamp(result[0])
+
     def get_max_genesis_trace_id(self) -> int:
         """Get the max trace id of genesis internal transactions from the database.
         If no internal transactions were found, returns 0 (zero)."""
@@ -134,8 +134,12 @@ class DBETHTransactionJoinsFilter(DBFilter):
 @dataclass(init=True, repr=True, eq=True, order=False, unsafe_hash=False, frozen=False)
 class DBETHTransactionHashFilter(DBFilter):
     tx_hash: Optional[EVMTxHash] = None
+    tx_hashes: Optional[List[EVMTxHash]] = None
 
     def prepare(self) -> Tuple[List[str], List[Any]]:
+        if self.tx_hashes is not None:
+            return [f'tx_hash IN ({", ".join(["?"] * len(self.tx_hashes))})'], list(self.tx_hashes)  # noqa: E501
+
         if self.tx_hash is None:
             return [], []
 
@@ -336,6 +340,7 @@ class ETHTransactionsFilterQuery(DBFilterQuery, FilterWithTimestamp):
             protocols: Optional[List[str]] = None,
             asset: Optional[EvmToken] = None,
             exclude_ignored_assets: bool = False,
+            tx_hashes: Optional[List[EVMTxHash]] = None,
     ) -> 'ETHTransactionsFilterQuery':
         if order_by_rules is None:
             order_by_rules = [('timestamp', True)]
@@ -348,8 +353,12 @@ class ETHTransactionsFilterQuery(DBFilterQuery, FilterWithTimestamp):
         )
         filter_query = cast('ETHTransactionsFilterQuery', filter_query)
         filters: List[DBFilter] = []
-        if tx_hash is not None:  # tx_hash means single result so make it as single filter
-            filters.append(DBETHTransactionHashFilter(and_op=False, tx_hash=tx_hash))
+        if tx_hash is not None or tx_hashes is not None:  # hashes make it a single filter
+            filters.append(DBETHTransactionHashFilter(
+                and_op=False,
+                tx_hash=tx_hash,
+                tx_hashes=tx_hashes,
+            ))
         else:
             should_join_events = asset is not None or protocols is not None or exclude_ignored_assets is True  # noqa: E501
             if addresses is not None or should_join_events is True:
@@ -1,10 +1,13 @@
+import json
 import logging
+import time
 from copy import deepcopy
 from typing import (
     TYPE_CHECKING,
     Any,
     Callable,
     Dict,
+    Iterator,
     List,
     Literal,
     Optional,
@@ -15,6 +18,7 @@ from typing import (
 
 from pysqlcipher3 import dbapi2 as sqlcipher
 
+from rotkehlchen.accounting.checkpoints import MAX_PNL_CHECKPOINTS, AccountingCheckpoint
 from rotkehlchen.accounting.constants import FREE_PNL_EVENTS_LIMIT, FREE_REPORTS_LOOKUP_LIMIT
 from rotkehlchen.accounting.pnl import PnlTotals
 from rotkehlchen.accounting.structures.processed_event import ProcessedAccountingEvent
@@ -25,6 +29,7 @@ from rotkehlchen.errors.serialization import DeserializationError
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.types import Timestamp
 from rotkehlchen.utils.misc import ts_now
+from rotkehlchen.utils.serialization import jsonloads_dict, rlk_jsondumps
 
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
@@ -33,6 +38,9 @@ if TYPE_CHECKING:
     from rotkehlchen.db.dbhandler import DBHandler
     from rotkehlchen.db.drivers.gevent import DBCursor
 
+# Number of processed events of a report that are written to the DB together
+DEFAULT_REPORT_EVENTS_CHUNK_SIZE = 1000
+
 
 @overload
 def _get_reports_or_events_maybe_limit(
@@ -72,6 +80,70 @@ def _get_reports_or_events_maybe_limit(
     return entries[:returning_entries_length], entries_found
 
 
+class ReportDataWriter():
+    """Buffers the processed events of a PnL report and writes them to the transient DB
+    in chunks of chunk_size events, one transaction per chunk, instead of one
+    transaction per event.
+
+    flush() should be called at the end of the report and before anything that needs
+    all the events processed so far to be in the DB. A chunk is written atomically so
+    if processing aborts halfway the report contains exactly the flushed events.
+    """
+
+    def __init__(
+            self,
+            database: 'DBHandler',
+            ts_converter: Callable[[Timestamp], str],
+            chunk_size: int = DEFAULT_REPORT_EVENTS_CHUNK_SIZE,
+    ) -> None:
+        self.dbreports = DBAccountingReports(database)
+        self.ts_converter = ts_converter
+        self.chunk_size = chunk_size
+        self.reset(report_id=0)
+
+    def reset(self, report_id: int) -> None:
+        self.report_id = report_id
+        self.rows: List[Tuple[int, Timestamp, str]] = []
+        self.written = self.flushes = 0
+        self.write_time = 0.0
+
+    def add(self, event: ProcessedAccountingEvent) -> None:
+        """Adds an event to the report and writes the buffered ones if they reached chunk_size
+
+        May raise:
+        - DeserializationError if there is a conflict at serialization of the event
+        - InputError if the buffered events can not be written to the DB
+        """
+        self.rows.append((self.report_id, event.timestamp, event.serialize_for_db(self.ts_converter)))  # noqa: E501
+        if len(self.rows) >= self.chunk_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Writes all buffered events to the DB. The buffer is emptied even if writing
+        fails so that a failed chunk is not retried with every new event.
+
+        May raise:
+        - InputError if the events can not be written to the DB
+        """
+        if len(self.rows) == 0:
+            return
+
+        rows, self.rows = self.rows, []
+        start = time.perf_counter()
+        self.dbreports.add_report_data_rows(report_id=self.report_id, rows=rows)
+        self.write_time += time.perf_counter() - start
+        self.written += len(rows)
+        self.flushes += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'written_events': self.written,
+            'flushes': self.flushes,
+            'write_secs': round(self.write_time, 3),
+            'events_per_sec': round(self.written / self.write_time) if self.write_time != 0 else 0,  # noqa: E501
+        }
+
+
 class DBAccountingReports():
 
     def __init__(self, database: 'DBHandler'):
@@ -259,6 +331,19 @@ class DBAccountingReports():
         - InputError if the event can not be written to the DB. Probably report id does not exist.
         """
         data = event.serialize_for_db(ts_converter)
+        self.add_report_data_rows(report_id=report_id, rows=[(report_id, time, data)])
+
+    def add_report_data_rows(
+            self,
+            report_id: int,
+            rows: List[Tuple[int, Timestamp, str]],
+    ) -> None:
+        """Adds many already serialized (report_id, timestamp, data) entries to a transient
+        report in a single transaction. Either all or none of them are written.
+
+        May raise:
+        - InputError if the rows can not be written to the DB. Probably report id does not exist.
+        """
         query = """
         INSERT INTO pnl_events(
             report_id, timestamp, data
@@ -266,13 +351,134 @@ class DBAccountingReports():
         VALUES(?, ?, ?);"""
         with self.db.transient_write() as cursor:
             try:
-                cursor.execute(query, (report_id, time, data))
+                cursor.executemany(query, rows)
             except sqlcipher.IntegrityError as e:  # pylint: disable=no-member
                 raise InputError(
-                    f'Could not write {event} data to the DB due to {str(e)}. '
+                    f'Could not write {len(rows)} events to the DB due to {str(e)}. '
                     f'Probably report {report_id} does not exist?',
                 ) from e
 
+    def add_checkpoint(self, settings_hash: str, checkpoint: AccountingCheckpoint) -> None:
+        """Saves an accounting checkpoint for the given settings hash and prunes the oldest
+        ones so that at most MAX_PNL_CHECKPOINTS remain for it"""
+        with self.db.transient_write() as cursor:
+            cursor.execute(
+                'INSERT OR REPLACE INTO pnl_checkpoints(timestamp, settings_hash, '
+                'processed_events, events_hash, state) VALUES(?, ?, ?, ?, ?)',
+                (
+                    checkpoint.timestamp,
+                    settings_hash,
+                    checkpoint.processed_events,
+                    checkpoint.events_hash,
+                    rlk_jsondumps(checkpoint.state),
+                ),
+            )
+            cursor.execute(
+                'DELETE FROM pnl_checkpoints WHERE settings_hash=? AND timestamp NOT IN '
+                '(SELECT timestamp FROM pnl_checkpoints WHERE settings_hash=? '
+                'ORDER BY timestamp DESC LIMIT ?)',
+                (settings_hash, settings_hash, MAX_PNL_CHECKPOINTS),
+            )
+
+    def get_checkpoints(
+            self,
+            settings_hash: str,
+            to_ts: Timestamp,
+    ) -> List[AccountingCheckpoint]:
+        """Returns all checkpoints for the given settings hash up to and including to_ts
+        sorted by ascending timestamp. Checkpoints that can't be decoded are skipped."""
+        checkpoints = []
+        with self.db.conn_transient.read_ctx() as cursor:
+            cursor.execute(
+                'SELECT timestamp, processed_events, events_hash, state FROM pnl_checkpoints '
+                'WHERE settings_hash=? AND timestamp <= ? ORDER BY timestamp ASC',
+                (settings_hash, to_ts),
+            )
+            for entry in cursor:
+                try:
+                    state = jsonloads_dict(entry[3])
+                except json.JSONDecodeError as e:
+                    log.error(f'Could not decode PnL checkpoint at {entry[0]} due to {str(e)}')
+                    continue
+
+                checkpoints.append(AccountingCheckpoint(
+                    timestamp=Timestamp(entry[0]),
+                    processed_events=entry[1],
+                    events_hash=entry[2],
+                    state=state,
+                ))
+
+        return checkpoints
+
+    def delete_checkpoints(
+            self,
+            settings_hash: Optional[str] = None,
+            from_ts: Optional[Timestamp] = None,
+    ) -> None:
+        """Deletes checkpoints, optionally only those of the given settings hash and
+        only those taken at or after from_ts"""
+        query = 'DELETE FROM pnl_checkpoints'
+        conditions, bindings = [], []
+        if settings_hash is not None:
+            conditions.append('settings_hash=?')
+            bindings.append(settings_hash)
+        if from_ts is not None:
+            conditions.append('timestamp>=?')
+            bindings.append(from_ts)
+        if len(conditions) != 0:
+            query += ' WHERE ' + ' AND '.join(conditions)
+
+        with self.db.transient_write() as cursor:
+            cursor.execute(query, bindings)
+
+    def iter_report_events(
+            self,
+            report_id: int,
+            chunk_size: int = DEFAULT_REPORT_EVENTS_CHUNK_SIZE,
+    ) -> Iterator[ProcessedAccountingEvent]:
+        """Returns an iterator over the events of a report in the order they were processed.
+        They are read chunk_size at a time so the report is never entirely in memory.
+
+        May raise:
+        - InputError if the report ID does not exist in the DB
+        """
+        with self.db.conn_transient.read_ctx() as cursor:
+            cursor.execute('SELECT COUNT(*) FROM pnl_reports WHERE identifier=?', (report_id,))
+            if cursor.fetchone()[0] != 1:
+                raise InputError(
+                    f'Tried to get PnL events from non existing report with id {report_id}',
+                )
+
+        return self._iter_report_events(report_id=report_id, chunk_size=chunk_size)
+
+    def _iter_report_events(
+            self,
+            report_id: int,
+            chunk_size: int,
+    ) -> Iterator[ProcessedAccountingEvent]:
+        last_identifier = -1
+        while True:
+            # a new query per chunk so that no statement stays open while the consumer runs
+            with self.db.conn_transient.read_ctx() as cursor:
+                rows = cursor.execute(
+                    'SELECT identifier, timestamp, data FROM pnl_events WHERE report_id=? '
+                    'AND identifier > ? ORDER BY identifier ASC LIMIT ?',
+                    (report_id, last_identifier, chunk_size),
+                ).fetchall()
+
+            for identifier, timestamp, data in rows:
+                last_identifier = identifier
+                try:
+                    yield ProcessedAccountingEvent.deserialize_from_db(timestamp, data)
+                except DeserializationError as e:
+                    self.db.msg_aggregator.add_error(
+                        f'Error deserializing AccountingEvent from the DB. Skipping it.'
+                        f'Error was: {str(e)}',
+                    )
+
+            if len(rows) < chunk_size:
+                break
+
     def get_report_data(
             self,
             filter_: ReportDataFilterQuery,
@@ -193,6 +193,16 @@ CREATE TABLE IF NOT EXISTS timed_location_data (
 );
 """
 
+# How long the query of each source of a balance snapshot took, in seconds
+DB_CREATE_BALANCE_SNAPSHOT_DURATIONS = """
+CREATE TABLE IF NOT EXISTS balance_snapshot_durations (
+    timestamp INTEGER NOT NULL,
+    source TEXT NOT NULL,
+    duration REAL NOT NULL,
+    PRIMARY KEY (timestamp, source)
+);
+"""
+
 DB_CREATE_USER_CREDENTIALS = """
 CREATE TABLE IF NOT EXISTS user_credentials (
     name TEXT NOT NULL,
@@ -736,6 +746,7 @@ BEGIN TRANSACTION;
 {DB_CREATE_ASSETS}
 {DB_CREATE_TIMED_BALANCES}
 {DB_CREATE_TIMED_LOCATION_DATA}
+{DB_CREATE_BALANCE_SNAPSHOT_DURATIONS}
 {DB_CREATE_USER_CREDENTIALS}
 {DB_CREATE_USER_CREDENTIALS_MAPPINGS}
 {DB_CREATE_EXTERNAL_SERVICE_CREDENTIALS}
@@ -47,6 +47,33 @@ CREATE TABLE IF NOT EXISTS pnl_events (
 );
 """
 
+# Snapshots of the accounting pot state used to resume processing of new reports
+DB_CREATE_PNL_CHECKPOINTS = """
+CREATE TABLE IF NOT EXISTS pnl_checkpoints (
+    timestamp INTEGER NOT NULL,
+    settings_hash TEXT NOT NULL,
+    processed_events INTEGER NOT NULL,
+    events_hash TEXT NOT NULL,
+    state TEXT NOT NULL,
+    PRIMARY KEY(timestamp, settings_hash)
+);
+"""
+
+# Raw results of contract calls at a specific block. They never change so they are
+# cached forever, bounded in number and size with least recently used eviction.
+# Kept in the user DB since the calldata and results contain the user's addresses
+DB_CREATE_CONTRACT_CALL_CACHE = """
+CREATE TABLE IF NOT EXISTS contract_call_cache (
+    chain_id INTEGER NOT NULL,
+    address TEXT NOT NULL,
+    calldata BLOB NOT NULL,
+    block_number INTEGER NOT NULL,
+    result BLOB NOT NULL,
+    last_used_ts INTEGER NOT NULL,
+    PRIMARY KEY(chain_id, address, calldata, block_number)
+);
+"""
+
 DB_CREATE_SETTINGS = """
 CREATE TABLE IF NOT EXISTS settings (
     name VARCHAR[24] NOT NULL PRIMARY KEY,
@@ -61,6 +88,8 @@ BEGIN TRANSACTION;
 {DB_CREATE_REPORT_SETTINGS}
 {DB_CREATE_REPORT_TOTALS}
 {DB_CREATE_PNL_EVENTS}
+{DB_CREATE_PNL_CHECKPOINTS}
+{DB_CREATE_CONTRACT_CALL_CACHE}
 {DB_CREATE_SETTINGS}
 COMMIT;
 PRAGMA foreign_keys=on;
@@ -1,7 +1,7 @@
 import logging
 from pathlib import Path
 from tempfile import mkdtemp
-from typing import TYPE_CHECKING, List, Optional, Tuple
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 from zipfile import ZIP_DEFLATED, ZipFile
 
 from rotkehlchen.accounting.export.csv import CSVWriteError, _dict_to_csv_file
@@ -84,6 +84,18 @@ class DBSnapshot:
             )
         return location_data
 
+    @staticmethod
+    def get_balance_snapshot_durations(
+            cursor: 'DBCursor',
+            timestamp: Timestamp,
+    ) -> Dict[str, float]:
+        """Retrieves how long the query of each source of a snapshot took in seconds"""
+        cursor.execute(
+            'SELECT source, duration FROM balance_snapshot_durations WHERE timestamp=?',
+            (timestamp,),
+        )
+        return dict(cursor)
+
     def create_zip(
             self,
             timed_balances: List[DBAssetBalance],
@@ -257,6 +269,10 @@ class DBSnapshot:
         write_cursor.execute('DELETE FROM timed_location_data WHERE timestamp=?', (timestamp,))
         if write_cursor.rowcount == 0:
             raise InputError('No snapshot found for the specified timestamp')
+        write_cursor.execute(
+            'DELETE FROM balance_snapshot_durations WHERE timestamp=?',
+            (timestamp,),
+        )
 
     def add_nft_asset_ids(self, write_cursor: 'DBCursor', entries: List[str]) -> None:
         """Add NFT identifiers to the DB to prevent unknown asset error."""
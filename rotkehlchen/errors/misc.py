@@ -35,6 +35,11 @@ class RemoteError(Exception):
         super().__init__(message)
 
 
+class CallTooBigError(RemoteError):
+    """Thrown when all nodes failed a call because it needs too much gas or
+    returns too big a response. A smaller call may still succeed"""
+
+
 class XPUBError(Exception):
     """Error XPUB Parsing and address derivation"""
 
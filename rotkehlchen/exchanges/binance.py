@@ -12,21 +12,23 @@ from typing import (
     List,
     Literal,
     Optional,
+    Set,
     Tuple,
     Type,
     Union,
 )
-from urllib.parse import urlencode
+from urllib.parse import urlencode, urlparse
 
 import gevent
 import requests
+from gevent.pool import Pool
 
 from rotkehlchen.accounting.ledger_actions import LedgerAction
 from rotkehlchen.accounting.structures.balance import Balance
 from rotkehlchen.assets.asset import AssetWithOracles
 from rotkehlchen.assets.converters import asset_from_binance
 from rotkehlchen.constants.misc import ZERO
-from rotkehlchen.constants.timing import DEFAULT_TIMEOUT_TUPLE
+from rotkehlchen.constants.timing import DAY_IN_SECONDS, DEFAULT_TIMEOUT_TUPLE
 from rotkehlchen.db.constants import BINANCE_MARKETS_KEY
 from rotkehlchen.errors.asset import UnknownAsset, UnsupportedAsset
 from rotkehlchen.errors.misc import InputError, RemoteError
@@ -57,12 +59,13 @@ from rotkehlchen.serialization.deserialize import (
 )
 from rotkehlchen.types import ApiKey, ApiSecret, AssetMovementCategory, Fee, Location, Timestamp
 from rotkehlchen.user_messages import MessagesAggregator
-from rotkehlchen.utils.misc import ts_now_in_ms
+from rotkehlchen.utils.misc import ts_now, ts_now_in_ms
 from rotkehlchen.utils.mixins.cacheable import cache_response_timewise
 from rotkehlchen.utils.mixins.lockable import protect_with_lock
 
 if TYPE_CHECKING:
     from rotkehlchen.db.dbhandler import DBHandler
+    from rotkehlchen.db.drivers.gevent import DBCursor
 
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
@@ -82,6 +85,17 @@ V3_METHODS = (
 PUBLIC_METHODS = ('exchangeInfo', 'time')
 
 RETRY_AFTER_LIMIT = 60
+# Request weight of the api endpoints per minute that we allow ourselves to use. The
+# limit is 1200 per IP. Some is left for other clients and for concurrent queries
+REQUEST_WEIGHT_BUDGET = 1000
+# The sapi, fapi and dapi endpoints have limits of their own
+REQUEST_WEIGHT_ENDPOINT_CLASS = 'api'
+# https://binance-docs.github.io/apidocs/spot/en/#account-trade-list-user_data
+API_METHOD_WEIGHTS = {'account': 20, 'exchangeInfo': 20, 'myTrades': 20}
+USED_WEIGHT_HEADER = 'x-mbx-used-weight-1m'
+MAX_CONCURRENT_MARKET_QUERIES = 5
+# Markets of assets never owned are only queried for new trades this often
+FULL_TRADES_QUERY_INTERVAL = DAY_IN_SECONDS
 # Binance api error codes we check for (all below apis seem to have the same)
 # https://binance-docs.github.io/apidocs/spot/en/#error-codes-2
 # https://binance-docs.github.io/apidocs/futures/en/#error-codes-2
@@ -212,6 +226,13 @@ class Binance(ExchangeInterface):  # lgtm[py/missing-call-to-init]
         self.msg_aggregator = msg_aggregator
         self.offset_ms = 0
         self.selected_pairs = binance_selected_trade_pairs
+        # trades query state of the last trades query. Saved together with its trades
+        self.trades_query_state: Optional[Dict[str, Any]] = None
+        self.rate_limits.configure(
+            endpoint_class=REQUEST_WEIGHT_ENDPOINT_CLASS,
+            rate=REQUEST_WEIGHT_BUDGET / 60,
+            capacity=REQUEST_WEIGHT_BUDGET,
+        )
 
     def first_connection(self) -> None:
         if self.first_connection_made:
@@ -296,6 +317,42 @@ class Binance(ExchangeInterface):  # lgtm[py/missing-call-to-init]
 
         return True, ''
 
+    def rate_limit_endpoint(self, method: str, url: str) -> Tuple[str, float]:
+        path = urlparse(url).path.split('/')  # ['', api_type, version, method]
+        if path[1] == REQUEST_WEIGHT_ENDPOINT_CLASS:
+            return REQUEST_WEIGHT_ENDPOINT_CLASS, API_METHOD_WEIGHTS.get(path[-1], 1)
+        return path[1], 1
+
+    def update_rate_limits(self, endpoint_class: str, response: requests.Response) -> None:
+        """Binance returns the weight used by our IP in the current minute. It also
+        counts requests of other clients, but not of our requests still in flight"""
+        if endpoint_class != REQUEST_WEIGHT_ENDPOINT_CLASS:
+            return
+
+        used_weight = response.headers.get(USED_WEIGHT_HEADER)
+        if used_weight is None:
+            return
+
+        try:
+            self.rate_limits.limit_available(
+                endpoint_class=endpoint_class,
+                tokens=REQUEST_WEIGHT_BUDGET - int(used_weight),
+            )
+        except ValueError:
+            log.error(f'Got unexpected {self.name} used weight header {used_weight}')
+
+    def save_trades_query_state(self, write_cursor: 'DBCursor') -> None:
+        if self.trades_query_state is None:
+            return
+
+        self.db.set_binance_trades_query_state(
+            write_cursor=write_cursor,
+            name=self.name,
+            location=self.location,
+            state=self.trades_query_state,
+        )
+        self.trades_query_state = None
+
     def api_query(
             self,
             api_type: BINANCE_API_TYPE,
@@ -850,58 +907,146 @@ class Binance(ExchangeInterface):  # lgtm[py/missing-call-to-init]
         )
         return dict(returned_balances), ''
 
+    def _query_market_trades(
+            self,
+            symbol: str,
+            from_id: int,
+            end_ts: Timestamp,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """Queries the raw trades of a market with an id of at least from_id.
+
+        Returns the trades up to end_ts and the trade id to continue from next time.
+        Trades after end_ts are left for that next time.
+
+        May raise due to api query and unexpected id:
+        - RemoteError
+        - BinancePermissionError
+        """
+        raw_data = []
+        # Limit of results to return. 1000 is max limit according to docs
+        limit = 1000
+        last_trade_id = from_id
+        len_result = limit
+        while len_result == limit:
+            # We know that myTrades returns a list from the api docs
+            result = self.api_query_list(
+                'api',
+                'myTrades',
+                options={
+                    'symbol': symbol,
+                    'fromId': last_trade_id,
+                    'limit': limit,
+                    # Not specifying them since binance does not seem to
+                    # respect them and always return all trades
+                    # 'startTime': start_ts * 1000,
+                    # 'endTime': end_ts * 1000,
+                })
+            if result:
+                try:
+                    last_trade_id = int(result[-1]['id']) + 1
+                except (ValueError, KeyError, IndexError) as e:
+                    raise RemoteError(
+                        f'Could not parse id from Binance myTrades api query result: {result}',
+                    ) from e
+
+            len_result = len(result)
+            log.debug(f'{self.name} myTrades query result', results_num=len_result)
+            for r in result:
+                r['symbol'] = symbol
+            raw_data.extend(result)
+
+        next_id = from_id
+        for idx, raw_trade in enumerate(raw_data):
+            try:
+                if int(raw_trade['time']) > end_ts * 1000:
+                    return raw_data[:idx], next_id
+                next_id = int(raw_trade['id']) + 1
+            except (ValueError, KeyError, TypeError):
+                pass  # it is reported when the trade gets deserialized
+
+        return raw_data, next_id
+
+    def _markets_to_query(
+            self,
+            markets: List[str],
+            cursors: Dict[str, int],
+            owned_assets: Set[str],
+    ) -> List[str]:
+        """Markets of which either asset was ever owned according to the balance
+        snapshots and trades, or that were never queried. A trade needs one of them.
+
+        Assets acquired after the last snapshot are missed, but their markets
+        are queried again at the next full query"""
+        to_query = []
+        for symbol in markets:
+            pair = self._symbols_to_pair[symbol]
+            if (
+                symbol not in cursors or
+                pair.base_asset.identifier in owned_assets or
+                pair.quote_asset.identifier in owned_assets
+            ):
+                to_query.append(symbol)
+
+        return to_query
+
     def query_online_trade_history(
             self,
             start_ts: Timestamp,
             end_ts: Timestamp,
     ) -> Tuple[List[Trade], Tuple[Timestamp, Timestamp]]:
-        """
+        """Queries the trades of each market from the last trade id seen in it, so only
+        new trades are downloaded. Markets are queried concurrently. Markets of assets
+        that were never owned are only queried every FULL_TRADES_QUERY_INTERVAL.
+        All newly downloaded trades up to end_ts are returned, also those before start_ts.
+
+        The trade ids to continue from are kept in self.trades_query_state until
+        save_trades_query_state() saves them together with the returned trades.
 
         May raise due to api query and unexpected id:
         - RemoteError
         - BinancePermissionError
         """
+        self.trades_query_state = None
         self.first_connection()
         if self.selected_pairs is not None:
             iter_markets = list(set(self.selected_pairs).intersection(set(self._symbols_to_pair.keys())))  # noqa: E501
         else:
             iter_markets = list(self._symbols_to_pair.keys())
 
+        state = self.db.get_binance_trades_query_state(name=self.name, location=self.location)
+        cursors: Dict[str, int] = state.get('cursors', {})
+        now = ts_now()
+        full_query = now - state.get('last_full_query_ts', 0) >= FULL_TRADES_QUERY_INTERVAL
+        if full_query is False:
+            with self.db.conn.read_ctx() as cursor:
+                owned_assets = {x.identifier for x in self.db.query_owned_assets(cursor)}
+            if len(owned_assets) == 0:  # no balance history yet
+                full_query = True
+            else:
+                markets = self._markets_to_query(
+                    markets=iter_markets,
+                    cursors=cursors,
+                    owned_assets=owned_assets,
+                )
+                log.debug(f'Querying {len(markets)}/{len(iter_markets)} {self.name} markets')
+                iter_markets = markets
+
+        pool = Pool(MAX_CONCURRENT_MARKET_QUERIES)
+        greenlets = {symbol: pool.spawn(
+            self._query_market_trades,
+            symbol=symbol,
+            from_id=cursors.get(symbol, 0),
+            end_ts=end_ts,
+        ) for symbol in iter_markets}
+        pool.join()
         raw_data = []
-        # Limit of results to return. 1000 is max limit according to docs
-        limit = 1000
-        for symbol in iter_markets:
-            last_trade_id = 0
-            len_result = limit
-            while len_result == limit:
-                # We know that myTrades returns a list from the api docs
-                result = self.api_query_list(
-                    'api',
-                    'myTrades',
-                    options={
-                        'symbol': symbol,
-                        'fromId': last_trade_id,
-                        'limit': limit,
-                        # Not specifying them since binance does not seem to
-                        # respect them and always return all trades
-                        # 'startTime': start_ts * 1000,
-                        # 'endTime': end_ts * 1000,
-                    })
-                if result:
-                    try:
-                        last_trade_id = int(result[-1]['id']) + 1
-                    except (ValueError, KeyError, IndexError) as e:
-                        raise RemoteError(
-                            f'Could not parse id from Binance myTrades api query result: {result}',
-                        ) from e
-
-                len_result = len(result)
-                log.debug(f'{self.name} myTrades query result', results_num=len_result)
-                for r in result:
-                    r['symbol'] = symbol
-                raw_data.extend(result)
+        for symbol, greenlet in greenlets.items():
+            if greenlet.exception is not None:
+                raise greenlet.exception
+            result, cursors[symbol] = greenlet.value
+            raw_data.extend(result)
 
-            raw_data.sort(key=lambda x: x['time'])
+        raw_data.sort(key=lambda x: x['time'])
 
         trades = []
         for raw_trade in raw_data:
@@ -938,10 +1083,8 @@ class Binance(ExchangeInterface):  # lgtm[py/missing-call-to-init]
                 )
                 continue
 
-            # Since binance does not respect the given timestamp range, limit the range here
-            if trade.timestamp < start_ts:
-                continue
-
+            # Trades before start_ts are kept. The cursors are now past them so they
+            # would otherwise never be queried again. Duplicates are ignored by the DB
             if trade.timestamp > end_ts:
                 break
 
@@ -952,6 +1095,12 @@ class Binance(ExchangeInterface):  # lgtm[py/missing-call-to-init]
             trades += fiat_payments
             trades.sort(key=lambda x: x.timestamp)
 
+        # saved by save_trades_query_state() together with the trades. If it was saved
+        # before them and saving the trades failed, they would never be queried again
+        self.trades_query_state = {
+            'cursors': cursors,
+            'last_full_query_ts': now if full_query else state.get('last_full_query_ts', 0),
+        }
         return trades, (start_ts, end_ts)
 
     def _query_online_fiat_payments(self, start_ts: Timestamp, end_ts: Timestamp) -> List[Trade]:
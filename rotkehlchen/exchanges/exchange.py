@@ -1,5 +1,6 @@
 import logging
-from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+from collections import defaultdict
+from typing import TYPE_CHECKING, Any, Callable, DefaultDict, Dict, List, Optional, Tuple
 
 import requests
 
@@ -27,9 +28,11 @@ from rotkehlchen.types import (
 )
 from rotkehlchen.utils.mixins.cacheable import CacheableMixIn
 from rotkehlchen.utils.mixins.lockable import LockableQueryMixIn, protect_with_lock
+from rotkehlchen.utils.token_bucket import TokenBucket
 
 if TYPE_CHECKING:
     from rotkehlchen.db.dbhandler import DBHandler
+    from rotkehlchen.db.drivers.gevent import DBCursor
 
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
@@ -43,6 +46,87 @@ ExchangeHistorySuccessCallback = Callable[
 
 ExchangeHistoryFailCallback = Callable[[str], None]
 
+DEFAULT_ENDPOINT_CLASS = 'default'
+
+
+class RateLimitGovernor():
+    """Rate limits of an exchange. Keeps a token bucket per endpoint class, since
+    exchanges often limit groups of endpoints separately. The requests of endpoint
+    classes without a configured limit are only counted"""
+
+    def __init__(self) -> None:
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.requests: DefaultDict[str, int] = defaultdict(int)
+        self.waited: DefaultDict[str, float] = defaultdict(float)
+
+    def configure(self, endpoint_class: str, rate: float, capacity: float) -> None:
+        """Sets the limit of an endpoint class to capacity tokens, refilled with
+        rate tokens per second"""
+        bucket = self.buckets.get(endpoint_class)
+        if bucket is None:
+            self.buckets[endpoint_class] = TokenBucket(rate=rate, capacity=capacity)
+        else:
+            bucket.configure(rate=rate, capacity=capacity)
+
+    def acquire(self, endpoint_class: str, cost: float) -> None:
+        """Waits until a request of the given cost is allowed by the limit of its class"""
+        self.requests[endpoint_class] += 1
+        bucket = self.buckets.get(endpoint_class)
+        if bucket is None:
+            return
+
+        waited = bucket.acquire(cost)
+        if waited != 0:
+            log.debug(f'Waited {waited:.2f} secs for the {endpoint_class} rate limit')
+            self.waited[endpoint_class] += waited
+
+    def limit_available(self, endpoint_class: str, tokens: float) -> None:
+        """Lowers what is left of the limit of an endpoint class to what the exchange
+        reports. Other clients of the same account or IP count against it too"""
+        bucket = self.buckets.get(endpoint_class)
+        if bucket is not None:
+            bucket.limit(tokens)
+
+    def serialize(self) -> Dict[str, Dict[str, Any]]:
+        result = {}
+        for endpoint_class in set(self.requests) | set(self.buckets):
+            entry: Dict[str, Any] = {
+                'requests': self.requests[endpoint_class],
+                'waited_secs': round(self.waited[endpoint_class], 3),
+                'rate': None,
+                'capacity': None,
+                'utilization': None,
+            }
+            bucket = self.buckets.get(endpoint_class)
+            if bucket is not None:
+                entry['rate'] = bucket.rate
+                entry['capacity'] = bucket.capacity
+                entry['utilization'] = round(1 - max(bucket.available(), 0) / bucket.capacity, 4)  # noqa: E501
+            result[endpoint_class] = entry
+
+        return result
+
+
+class RateLimitedSession(requests.Session):
+    """Session of an exchange whose requests all go through its rate limit governor"""
+
+    def __init__(self, exchange: 'ExchangeInterface') -> None:
+        super().__init__()
+        self.exchange = exchange
+
+    def request(  # type: ignore  # pylint: disable=arguments-differ
+            self,
+            method: str,
+            url: str,
+            *args: Any,
+            **kwargs: Any,
+    ) -> requests.Response:
+        endpoint_class, cost = self.exchange.rate_limit_endpoint(method=method, url=url)
+        self.exchange.rate_limits.acquire(endpoint_class=endpoint_class, cost=cost)
+        response = super().request(method, url, *args, **kwargs)
+        self.exchange.update_rate_limits(endpoint_class=endpoint_class, response=response)
+        return response
+
 
 class ExchangeInterface(CacheableMixIn, LockableQueryMixIn):
 
@@ -67,7 +151,8 @@ class ExchangeInterface(CacheableMixIn, LockableQueryMixIn):
         self.api_key = api_key
         self.secret = secret
         self.first_connection_made = False
-        self.session = requests.session()
+        self.rate_limits = RateLimitGovernor()
+        self.session: requests.Session = RateLimitedSession(exchange=self)
         self.session.headers.update({'User-Agent': 'rotkehlchen'})
         log.info(f'Initialized {str(location)} exchange {name}')
 
@@ -75,6 +160,31 @@ class ExchangeInterface(CacheableMixIn, LockableQueryMixIn):
         """Returns unique location identifier for this exchange object (name + location)"""
         return ExchangeLocationID(name=self.name, location=self.location)
 
+    def rate_limit_endpoint(  # pylint: disable=no-self-use
+            self,
+            method: str,  # pylint: disable=unused-argument
+            url: str,  # pylint: disable=unused-argument
+    ) -> Tuple[str, float]:
+        """Returns the endpoint class of a request and how many tokens of the class's
+        rate limit it costs. Exchanges limiting endpoints differently override it"""
+        return DEFAULT_ENDPOINT_CLASS, 1
+
+    def update_rate_limits(  # pylint: disable=no-self-use
+            self,
+            endpoint_class: str,  # pylint: disable=unused-argument
+            response: requests.Response,  # pylint: disable=unused-argument
+    ) -> None:
+        """Exchanges that report the used or remaining rate limit in the response
+        headers override it to update self.rate_limits"""
+
+    def save_trades_query_state(  # pylint: disable=no-self-use
+            self,
+            write_cursor: 'DBCursor',  # pylint: disable=unused-argument
+    ) -> None:
+        """Called in the write transaction that saves the trades returned by the last
+        query_online_trade_history(). Exchanges that keep state about how far their
+        trades have been queried override it, so the state is saved with the trades"""
+
     def edit_exchange_credentials(
             self,
             api_key: Optional[ApiKey],
@@ -288,6 +398,7 @@ class ExchangeInterface(CacheableMixIn, LockableQueryMixIn):
                 with self.db.user_write() as cursor:
                     if new_trades != []:
                         self.db.add_trades(write_cursor=cursor, trades=new_trades)
+                    self.save_trades_query_state(write_cursor=cursor)
 
                     # and also set the used queried timestamp range for the exchange
                     ranges.update_used_query_range(
@@ -37,7 +37,11 @@ from rotkehlchen.errors.asset import UnknownAsset
 from rotkehlchen.errors.misc import InputError, RemoteError
 from rotkehlchen.errors.serialization import DeserializationError
 from rotkehlchen.exchanges.data_structures import AssetMovement, MarginPosition, Trade
-from rotkehlchen.exchanges.exchange import ExchangeInterface, ExchangeQueryBalances
+from rotkehlchen.exchanges.exchange import (
+    DEFAULT_ENDPOINT_CLASS,
+    ExchangeInterface,
+    ExchangeQueryBalances,
+)
 from rotkehlchen.inquirer import Inquirer
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.serialization.deserialize import (
@@ -57,7 +61,7 @@ from rotkehlchen.types import (
     TradeType,
 )
 from rotkehlchen.user_messages import MessagesAggregator
-from rotkehlchen.utils.misc import pairwise, ts_ms_to_sec, ts_now
+from rotkehlchen.utils.misc import pairwise, ts_ms_to_sec
 from rotkehlchen.utils.mixins.cacheable import cache_response_timewise
 from rotkehlchen.utils.mixins.lockable import protect_with_lock
 from rotkehlchen.utils.mixins.serializableenum import SerializableEnumMixin
@@ -75,7 +79,8 @@ KRAKEN_DELISTED = ('XDAO', 'XXVN', 'ZKRW', 'XNMC', 'BSV', 'XICN')
 KRAKEN_PUBLIC_METHODS = ('AssetPairs', 'Assets')
 KRAKEN_QUERY_TRIES = 8
 KRAKEN_BACKOFF_DIVIDEND = 15
-MAX_CALL_COUNTER_INCREASE = 2  # Trades and Ledger produce the max increase
+# https://docs.kraken.com/rest/#section/Rate-Limits/REST-API-Rate-Limits
+KRAKEN_COSTLY_METHODS = ('Ledgers', 'TradesHistory')  # increase the call counter by 2
 
 
 def kraken_ledger_entry_type_to_ours(value: str) -> HistoryEventType:
@@ -284,8 +289,6 @@ class Kraken(ExchangeInterface):  # lgtm[py/missing-call-to-init]
         self.msg_aggregator = msg_aggregator
         self.session.headers.update({'API-Key': self.api_key})
         self.set_account_type(kraken_account_type)
-        self.call_counter = 0
-        self.last_query_ts = 0
         self.history_events_db = DBHistoryEvents(self.db)
 
     def set_account_type(self, account_type: Optional[KrakenAccountType]) -> None:
@@ -303,6 +306,13 @@ class Kraken(ExchangeInterface):  # lgtm[py/missing-call-to-init]
             self.call_limit = 20
             self.reduction_every_secs = 1
 
+        # The call counter decreases by 1 every reduction_every_secs
+        self.rate_limits.configure(
+            endpoint_class=DEFAULT_ENDPOINT_CLASS,
+            rate=1 / self.reduction_every_secs,
+            capacity=self.call_limit,
+        )
+
     def edit_exchange_credentials(
             self,
             api_key: Optional[ApiKey],
@@ -397,12 +407,9 @@ class Kraken(ExchangeInterface):  # lgtm[py/missing-call-to-init]
     def first_connection(self) -> None:
         self.first_connection_made = True
 
-    def _manage_call_counter(self, method: str) -> None:
-        self.last_query_ts = ts_now()
-        if method in ('Ledgers', 'TradesHistory'):
-            self.call_counter += 2
-        else:
-            self.call_counter += 1
+    def rate_limit_endpoint(self, method: str, url: str) -> Tuple[str, float]:
+        kraken_method = url.rsplit('/', maxsplit=1)[-1]
+        return DEFAULT_ENDPOINT_CLASS, 2 if kraken_method in KRAKEN_COSTLY_METHODS else 1
 
     def _query_public(self, method: str, req: Optional[dict] = None) -> Union[Dict, str]:
         """API queries that do not require a valid key/secret pair.
@@ -419,7 +426,6 @@ class Kraken(ExchangeInterface):  # lgtm[py/missing-call-to-init]
         except requests.exceptions.RequestException as e:
             raise RemoteError(f'Kraken API request failed due to {str(e)}') from e
 
-        self._manage_call_counter(method)
         return _check_and_get_response(response, method)
 
     def api_query(self, method: str, req: Optional[dict] = None) -> dict:
@@ -428,32 +434,8 @@ class Kraken(ExchangeInterface):  # lgtm[py/missing-call-to-init]
             self._query_public if method in KRAKEN_PUBLIC_METHODS else self._query_private
         )
         while tries > 0:
-            if self.call_counter + MAX_CALL_COUNTER_INCREASE > self.call_limit:
-                # If we are close to the limit, check how much our call counter reduced
-                # https://www.kraken.com/features/api#api-call-rate-limit
-                secs_since_last_call = ts_now() - self.last_query_ts
-                self.call_counter = max(
-                    0,
-                    self.call_counter - int(secs_since_last_call / self.reduction_every_secs),
-                )
-                # If still at limit, sleep for an amount big enough for smallest tier reduction
-                if self.call_counter + MAX_CALL_COUNTER_INCREASE > self.call_limit:
-                    backoff_in_seconds = self.reduction_every_secs * 2
-                    log.debug(
-                        f'Doing a Kraken API call would now exceed our call counter limit. '
-                        f'Backing off for {backoff_in_seconds} seconds',
-                        call_counter=self.call_counter,
-                    )
-                    tries -= 1
-                    gevent.sleep(backoff_in_seconds)
-                    continue
-
-            log.debug(
-                'Kraken API query',
-                method=method,
-                data=req,
-                call_counter=self.call_counter,
-            )
+            # the call counter limit is respected by the session's rate limit governor
+            log.debug('Kraken API query', method=method, data=req)
             result = query_method(method, req)
             if isinstance(result, str):
                 # Got a recoverable error
@@ -506,7 +488,6 @@ class Kraken(ExchangeInterface):  # lgtm[py/missing-call-to-init]
             )
         except requests.exceptions.RequestException as e:
             raise RemoteError(f'Kraken API request failed due to {str(e)}') from e
-        self._manage_call_counter(method)
 
         return _check_and_get_response(response, method)
 
@@ -177,6 +177,13 @@ class ExchangeManager():
 
         return exchange_info
 
+    def get_rate_limits_info(self) -> List[Dict[str, Any]]:
+        return [{
+            'location': str(exchangeobj.location),
+            'name': exchangeobj.name,
+            'endpoints': exchangeobj.rate_limits.serialize(),
+        } for exchangeobj in self.iterate_exchanges()]
+
     def _get_exchange_module(self, location: Location) -> ModuleType:
         module_name = self._get_exchange_module_name(location)
         try:
@@ -1,4 +1,5 @@
 import logging
+import time
 from json.decoder import JSONDecodeError
 from typing import (
     Any,
@@ -18,6 +19,7 @@ import gevent
 import requests
 
 from rotkehlchen.chain.ethereum.constants import GENESIS_HASH, ZERO_ADDRESS
+from rotkehlchen.chain.ethereum.types import PipelineTimings
 from rotkehlchen.constants.timing import (
     DEFAULT_CONNECT_TIMEOUT,
     DEFAULT_READ_TIMEOUT,
@@ -45,9 +47,13 @@ from rotkehlchen.types import (
 from rotkehlchen.user_messages import MessagesAggregator
 from rotkehlchen.utils.misc import hex_or_bytes_to_int
 from rotkehlchen.utils.serialization import jsonloads_dict
+from rotkehlchen.utils.token_bucket import TokenBucket
 
 ETHERSCAN_TX_QUERY_LIMIT = 10000
 TRANSACTIONS_BATCH_NUM = 10
+# Calls per second allowed by etherscan with and without an api key
+ETHERSCAN_QUERIES_PER_SEC = 5
+ETHERSCAN_NO_KEY_QUERIES_PER_SEC = 0.2
 
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
@@ -68,6 +74,11 @@ class Etherscan(ExternalServiceWithApiKey):
         self.session = requests.session()
         self.warning_given = False
         self.session.headers.update({'User-Agent': 'rotkehlchen'})
+        # shared by all queries so that concurrent ones don't hit the rate limit
+        self.rate_limiter = TokenBucket(
+            rate=ETHERSCAN_QUERIES_PER_SEC,
+            capacity=ETHERSCAN_QUERIES_PER_SEC,
+        )
 
     @overload
     def _query(  # pylint: disable=no-self-use
@@ -148,9 +159,14 @@ class Etherscan(ExternalServiceWithApiKey):
         else:
             query_str += f'&apikey={api_key}'
 
+        rate = ETHERSCAN_QUERIES_PER_SEC if api_key is not None else ETHERSCAN_NO_KEY_QUERIES_PER_SEC  # noqa: E501
+        if self.rate_limiter.rate != rate:
+            self.rate_limiter.configure(rate=rate, capacity=max(rate, 1))
+
         backoff = 1
         backoff_limit = 33
         while backoff < backoff_limit:
+            self.rate_limiter.acquire()
             log.debug(f'Querying etherscan: {query_str}')
             try:
                 response = self.session.get(query_str, timeout=timeout if timeout else DEFAULT_TIMEOUT_TUPLE)  # noqa: E501
@@ -245,6 +261,7 @@ class Etherscan(ExternalServiceWithApiKey):
             action: Literal['txlistinternal'],
             from_ts: Optional[Timestamp] = None,
             to_ts: Optional[Timestamp] = None,
+            timings: Optional[PipelineTimings] = None,
     ) -> Iterator[List[EvmInternalTransaction]]:
         ...
 
@@ -255,6 +272,7 @@ class Etherscan(ExternalServiceWithApiKey):
             action: Literal['txlist'],
             from_ts: Optional[Timestamp] = None,
             to_ts: Optional[Timestamp] = None,
+            timings: Optional[PipelineTimings] = None,
     ) -> Iterator[List[EvmTransaction]]:
         ...
 
@@ -264,9 +282,12 @@ class Etherscan(ExternalServiceWithApiKey):
             action: Literal['txlist', 'txlistinternal'],
             from_ts: Optional[Timestamp] = None,
             to_ts: Optional[Timestamp] = None,
+            timings: Optional[PipelineTimings] = None,
     ) -> Union[Iterator[List[EvmTransaction]], Iterator[List[EvmInternalTransaction]]]:
         """Gets a list of transactions (either normal or internal) for account.
 
+        If timings are given, the time spent querying and deserializing is added to them.
+
         May raise:
         - RemoteError due to self._query(). Also if the returned result
         is not in the expected format
@@ -282,10 +303,14 @@ class Etherscan(ExternalServiceWithApiKey):
         transactions: Union[Sequence[EvmTransaction], Sequence[EvmInternalTransaction]] = []  # noqa: E501
         is_internal = action == 'txlistinternal'
         while True:
+            start = time.perf_counter()
             result = self._query(module='account', action=action, options=options)
+            if timings is not None:
+                timings.fetch += time.perf_counter() - start
             last_ts = deserialize_timestamp(result[0]['timeStamp']) if len(result) != 0 else None  # noqa: E501 pylint: disable=unsubscriptable-object
             for entry in result:
                 gevent.sleep(0)
+                start = time.perf_counter()
                 try:
                     # Handle genesis block transactions
                     if entry['hash'].startswith('GENESIS') is False:
@@ -317,6 +342,8 @@ class Etherscan(ExternalServiceWithApiKey):
                     self.msg_aggregator.add_warning(f'{str(e)}. Skipping transaction')
                     continue
 
+                if timings is not None:
+                    timings.deserialize += time.perf_counter() - start
                 if tx.timestamp > last_ts and len(transactions) >= TRANSACTIONS_BATCH_NUM:
                     yield transactions
                     last_ts = tx.timestamp
@@ -339,7 +366,12 @@ class Etherscan(ExternalServiceWithApiKey):
             account: ChecksumEvmAddress,
             from_ts: Optional[Timestamp] = None,
             to_ts: Optional[Timestamp] = None,
+            timings: Optional[PipelineTimings] = None,
     ) -> Iterator[List[str]]:
+        """Gets the hashes of the transactions with ERC20 transfers of the account.
+
+        If timings are given, the time spent querying and deserializing is added to them.
+        """
         options = {'address': str(account), 'sort': 'asc'}
         if from_ts is not None:
             from_block = self.get_blocknumber_by_time(from_ts)
@@ -350,11 +382,17 @@ class Etherscan(ExternalServiceWithApiKey):
 
         hashes: Set[Tuple[str, Timestamp]] = set()
         while True:
+            start = time.perf_counter()
             result = self._query(module='account', action='tokentx', options=options)
+            if timings is not None:
+                timings.fetch += time.perf_counter() - start
             last_ts = deserialize_timestamp(result[0]['timeStamp']) if len(result) != 0 else None  # noqa: E501 pylint: disable=unsubscriptable-object
             for entry in result:
                 gevent.sleep(0)
+                start = time.perf_counter()
                 timestamp = deserialize_timestamp(entry['timeStamp'])
+                if timings is not None:
+                    timings.deserialize += time.perf_counter() - start
                 if timestamp > last_ts and len(hashes) >= TRANSACTIONS_BATCH_NUM:  # type: ignore
                     yield _hashes_tuple_to_list(hashes)
                     hashes = set()
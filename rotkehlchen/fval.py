@@ -1,11 +1,26 @@
-from decimal import Decimal, InvalidOperation
+from decimal import (
+    MAX_EMAX,
+    MAX_PREC,
+    MIN_EMIN,
+    ROUND_HALF_EVEN,
+    Context,
+    Decimal,
+    InvalidOperation,
+)
 from typing import Any, Union
 
 from rotkehlchen.errors.serialization import ConversionError
 
 # Here even though we got __future__ annotations using FVal does not seem to work
-AcceptableFValInitInput = Union[float, bytes, Decimal, int, str, 'FVal']
-AcceptableFValOtherInput = Union[int, 'FVal']
+AcceptableFValInitInput = Union[float, bytes, Decimal, int, str, 'FVal', 'FixedFVal']
+AcceptableFValOtherInput = Union[int, 'FVal', 'FixedFVal']
+
+# Number of decimal digits kept by FixedFVal
+FIXED_DECIMALS = 18
+FIXED_SCALE = 10 ** FIXED_DECIMALS
+_FIXED_HALF_SCALE = FIXED_SCALE // 2
+# Used to scale Decimals without rounding to the default precision of 28 digits
+_FIXED_CONTEXT = Context(prec=MAX_PREC, rounding=ROUND_HALF_EVEN, Emax=MAX_EMAX, Emin=MIN_EMIN)
 
 
 class FVal():
@@ -36,6 +51,8 @@ class FVal():
                 self.num = Decimal(data)
             elif isinstance(data, FVal):
                 self.num = data.num
+            elif isinstance(data, FixedFVal):
+                self.num = data.num
             else:
                 raise ValueError(f'Invalid type {type(data)} of data given to FVal constructor')
 
@@ -51,84 +68,88 @@ class FVal():
     def __repr__(self) -> str:
         return 'FVal({})'.format(str(self.num))
 
+    @classmethod
+    def _from_decimal(cls, num: Decimal) -> 'FVal':
+        """Fast constructor for results of operations that are already Decimals"""
+        result = object.__new__(cls)
+        result.num = num
+        return result
+
+    # Plain Decimal comparisons are used instead of compare_signal() since they are much
+    # faster. They still raise InvalidOperation for NaN in ordering comparisons.
     def __gt__(self, other: AcceptableFValOtherInput) -> bool:
-        evaluated_other = _evaluate_input(other)
-        return self.num.compare_signal(evaluated_other) == Decimal('1')
+        return self.num > _evaluate_input(other)
 
     def __lt__(self, other: AcceptableFValOtherInput) -> bool:
-        evaluated_other = _evaluate_input(other)
-        return self.num.compare_signal(evaluated_other) == Decimal('-1')
+        return self.num < _evaluate_input(other)
 
     def __le__(self, other: AcceptableFValOtherInput) -> bool:
-        evaluated_other = _evaluate_input(other)
-        return self.num.compare_signal(evaluated_other) in (Decimal('-1'), Decimal('0'))
+        return self.num <= _evaluate_input(other)
 
     def __ge__(self, other: AcceptableFValOtherInput) -> bool:
-        evaluated_other = _evaluate_input(other)
-        return self.num.compare_signal(evaluated_other) in (Decimal('1'), Decimal('0'))
+        return self.num >= _evaluate_input(other)
 
     def __eq__(self, other: object) -> bool:
-        evaluated_other: Union[Decimal, int]
-        if isinstance(other, FVal):
-            evaluated_other = other.num
-        elif not isinstance(other, int):
+        if type(other) is FVal:
+            return self.num == other.num
+        if isinstance(other, (FVal, FixedFVal)):
+            return self.num == other.num
+        if not isinstance(other, int):
             return False
-        else:
-            evaluated_other = other
 
-        return self.num.compare_signal(evaluated_other) == Decimal('0')
+        return self.num == other
 
     def __add__(self, other: AcceptableFValOtherInput) -> 'FVal':
         evaluated_other = _evaluate_input(other)
-        return FVal(self.num.__add__(evaluated_other))
+        return FVal._from_decimal(self.num.__add__(evaluated_other))
 
     def __sub__(self, other: AcceptableFValOtherInput) -> 'FVal':
         evaluated_other = _evaluate_input(other)
-        return FVal(self.num.__sub__(evaluated_other))
+        return FVal._from_decimal(self.num.__sub__(evaluated_other))
 
     def __mul__(self, other: AcceptableFValOtherInput) -> 'FVal':
         evaluated_other = _evaluate_input(other)
-        return FVal(self.num.__mul__(evaluated_other))
+        return FVal._from_decimal(self.num.__mul__(evaluated_other))
 
     def __truediv__(self, other: AcceptableFValOtherInput) -> 'FVal':
         evaluated_other = _evaluate_input(other)
-        return FVal(self.num.__truediv__(evaluated_other))
+        return FVal._from_decimal(self.num.__truediv__(evaluated_other))
 
     def __floordiv__(self, other: AcceptableFValOtherInput) -> 'FVal':
         evaluated_other = _evaluate_input(other)
-        return FVal(self.num.__floordiv__(evaluated_other))
+        return FVal._from_decimal(self.num.__floordiv__(evaluated_other))
 
     def __pow__(self, other: AcceptableFValOtherInput) -> 'FVal':
         evaluated_other = _evaluate_input(other)
-        return FVal(self.num.__pow__(evaluated_other))
+        return FVal._from_decimal(self.num.__pow__(evaluated_other))
 
     def __radd__(self, other: AcceptableFValOtherInput) -> 'FVal':
         evaluated_other = _evaluate_input(other)
-        return FVal(self.num.__radd__(evaluated_other))
+        return FVal._from_decimal(self.num.__radd__(evaluated_other))
 
     def __rsub__(self, other: AcceptableFValOtherInput) -> 'FVal':
         evaluated_other = _evaluate_input(other)
-        return FVal(self.num.__rsub__(evaluated_other))
+        return FVal._from_decimal(self.num.__rsub__(evaluated_other))
 
     def __rmul__(self, other: AcceptableFValOtherInput) -> 'FVal':
         evaluated_other = _evaluate_input(other)
-        return FVal(self.num.__rmul__(evaluated_other))
+        return FVal._from_decimal(self.num.__rmul__(evaluated_other))
 
     def __rtruediv__(self, other: AcceptableFValOtherInput) -> 'FVal':
         evaluated_other = _evaluate_input(other)
-        return FVal(self.num.__rtruediv__(evaluated_other))
+        return FVal._from_decimal(self.num.__rtruediv__(evaluated_other))
 
     def __rfloordiv__(self, other: AcceptableFValOtherInput) -> 'FVal':
         evaluated_other = _evaluate_input(other)
-        return FVal(self.num.__rfloordiv__(evaluated_other))
+        return FVal._from_decimal(self.num.__rfloordiv__(evaluated_other))
 
     def __mod__(self, other: AcceptableFValOtherInput) -> 'FVal':
         evaluated_other = _evaluate_input(other)
-        return FVal(self.num.__mod__(evaluated_other))
+        return FVal._from_decimal(self.num.__mod__(evaluated_other))
 
     def __rmod__(self, other: AcceptableFValOtherInput) -> 'FVal':
         evaluated_other = _evaluate_input(other)
-        return FVal(self.num.__rmod__(evaluated_other))
+        return FVal._from_decimal(self.num.__rmod__(evaluated_other))
 
     def __float__(self) -> float:
         return float(self.num)
@@ -136,10 +157,10 @@ class FVal():
     # --- Unary operands
 
     def __neg__(self) -> 'FVal':
-        return FVal(self.num.__neg__())
+        return FVal._from_decimal(self.num.__neg__())
 
     def __abs__(self) -> 'FVal':
-        return FVal(self.num.copy_abs())
+        return FVal._from_decimal(self.num.copy_abs())
 
     # --- Other operations
 
@@ -150,7 +171,7 @@ class FVal():
         """
         evaluated_other = _evaluate_input(other)
         evaluated_third = _evaluate_input(third)
-        return FVal(self.num.fma(evaluated_other, evaluated_third))
+        return FVal._from_decimal(self.num.fma(evaluated_other, evaluated_third))
 
     def to_percentage(self, precision: int = 4, with_perc_sign: bool = True) -> str:
         return f'{self.num*100:.{precision}f}{"%" if with_perc_sign else ""}'
@@ -177,9 +198,264 @@ class FVal():
         return diff_num <= evaluated_max_diff.num
 
 
+def _round_div(numerator: int, denominator: int) -> int:
+    """Integer division rounding to the nearest integer, with ties to even.
+    Denominator is expected to be positive"""
+    quotient, remainder = divmod(numerator, denominator)
+    doubled = remainder * 2
+    if doubled > denominator or (doubled == denominator and quotient % 2 == 1):
+        quotient += 1
+    return quotient
+
+
+def _decimal_to_raw(num: Decimal) -> int:
+    """Turn a Decimal to an integer scaled by FIXED_SCALE, rounding half to even
+    if it has more than FIXED_DECIMALS decimal digits.
+
+    May raise:
+    - ValueError if the Decimal is not a finite number
+    """
+    if not num.is_finite():
+        raise ValueError(f'Can not represent {num} as a fixed point number')
+
+    scaled = num.scaleb(FIXED_DECIMALS, context=_FIXED_CONTEXT)
+    return int(scaled.to_integral_value(context=_FIXED_CONTEXT))
+
+
+class FixedFVal():
+    """A fixed point alternative to FVal with the same public interface.
+
+    The value is kept as an integer scaled by 10^18. Addition, subtraction and
+    comparisons are exact and much faster than the Decimal equivalents. Results of
+    multiplication and division are rounded half to even to 18 decimal digits.
+
+    Conversion to FVal is always lossless. Conversion from FVal and other inputs is
+    lossless if the value has at most 18 decimal digits and rounded half to even
+    otherwise. Mixing with FVal is allowed in both directions. The result has the
+    type of the left operand.
+    """
+
+    __slots__ = ('raw',)
+
+    def __init__(self, data: AcceptableFValInitInput = 0):
+        if type(data) is int:  # fast path
+            self.raw = data * FIXED_SCALE
+        elif isinstance(data, FixedFVal):
+            self.raw = data.raw
+        elif isinstance(data, FVal):
+            self.raw = _decimal_to_raw(data.num)
+        else:
+            self.raw = _decimal_to_raw(FVal(data).num)
+
+    @classmethod
+    def from_raw(cls, raw: int) -> 'FixedFVal':
+        """Create a FixedFVal from an integer already scaled by FIXED_SCALE"""
+        result = object.__new__(cls)
+        result.raw = raw
+        return result
+
+    @property
+    def num(self) -> Decimal:
+        """The exact Decimal representation of the value"""
+        return Decimal(str(self))
+
+    def to_fval(self) -> FVal:
+        return FVal(self.num)
+
+    def __str__(self) -> str:
+        integral, fractional = divmod(abs(self.raw), FIXED_SCALE)
+        result = f'-{integral}' if self.raw < 0 else str(integral)
+        if fractional != 0:
+            result += '.' + f'{fractional:0{FIXED_DECIMALS}d}'.rstrip('0')
+        return result
+
+    def __repr__(self) -> str:
+        return f'FixedFVal({str(self)})'
+
+    def __gt__(self, other: AcceptableFValOtherInput) -> bool:
+        if type(other) is FixedFVal:
+            return self.raw > other.raw
+        if isinstance(other, FVal):
+            return self.num > other.num
+        return self.raw > _evaluate_raw_input(other)
+
+    def __lt__(self, other: AcceptableFValOtherInput) -> bool:
+        if type(other) is FixedFVal:
+            return self.raw < other.raw
+        if isinstance(other, FVal):
+            return self.num < other.num
+        return self.raw < _evaluate_raw_input(other)
+
+    def __le__(self, other: AcceptableFValOtherInput) -> bool:
+        if type(other) is FixedFVal:
+            return self.raw <= other.raw
+        if isinstance(other, FVal):
+            return self.num <= other.num
+        return self.raw <= _evaluate_raw_input(other)
+
+    def __ge__(self, other: AcceptableFValOtherInput) -> bool:
+        if type(other) is FixedFVal:
+            return self.raw >= other.raw
+        if isinstance(other, FVal):
+            return self.num >= other.num
+        return self.raw >= _evaluate_raw_input(other)
+
+    def __eq__(self, other: object) -> bool:
+        if type(other) is FixedFVal:
+            return self.raw == other.raw
+        if isinstance(other, FVal):
+            return self.num == other.num
+        if not isinstance(other, int):
+            return False
+
+        return self.raw == other * FIXED_SCALE
+
+    # The most used operations avoid helper function calls since they dominate the runtime
+
+    def __add__(self, other: AcceptableFValOtherInput) -> 'FixedFVal':
+        result = object.__new__(FixedFVal)
+        result.raw = self.raw + (other.raw if type(other) is FixedFVal else _evaluate_raw_input(other))  # noqa: E501
+        return result
+
+    def __sub__(self, other: AcceptableFValOtherInput) -> 'FixedFVal':
+        result = object.__new__(FixedFVal)
+        result.raw = self.raw - (other.raw if type(other) is FixedFVal else _evaluate_raw_input(other))  # noqa: E501
+        return result
+
+    def __mul__(self, other: AcceptableFValOtherInput) -> 'FixedFVal':
+        result = object.__new__(FixedFVal)
+        if type(other) is int:
+            result.raw = self.raw * other
+            return result
+
+        product = self.raw * (other.raw if type(other) is FixedFVal else _evaluate_raw_input(other))  # noqa: E501
+        quotient, remainder = divmod(product, FIXED_SCALE)
+        # round half to even
+        if remainder > _FIXED_HALF_SCALE or (remainder == _FIXED_HALF_SCALE and quotient & 1):
+            quotient += 1
+        result.raw = quotient
+        return result
+
+    def __truediv__(self, other: AcceptableFValOtherInput) -> 'FixedFVal':
+        return FixedFVal.from_raw(_fixed_div(self.raw, _evaluate_raw_input(other)))
+
+    def __floordiv__(self, other: AcceptableFValOtherInput) -> 'FixedFVal':
+        return FixedFVal(_truncated_div(self.raw, _evaluate_raw_input(other)))
+
+    def __mod__(self, other: AcceptableFValOtherInput) -> 'FixedFVal':
+        other_raw = _evaluate_raw_input(other)
+        return FixedFVal.from_raw(self.raw - other_raw * _truncated_div(self.raw, other_raw))
+
+    def __pow__(self, other: AcceptableFValOtherInput) -> 'FixedFVal':
+        if isinstance(other, int):
+            exponent = other
+        else:
+            other_raw = _evaluate_raw_input(other)
+            if other_raw % FIXED_SCALE != 0:  # no exact way to do it. Go via Decimal
+                return FixedFVal(FVal(self.num ** Decimal(str(other))))
+            exponent = other_raw // FIXED_SCALE
+
+        # compute the exact power and round only once at the end
+        if exponent == 0:
+            return FixedFVal(1)
+        if exponent > 0:
+            return FixedFVal.from_raw(_round_div(self.raw ** exponent, FIXED_SCALE ** (exponent - 1)))  # noqa: E501
+        return FixedFVal.from_raw(_fixed_div(FIXED_SCALE ** -exponent, self.raw ** -exponent))  # noqa: E501
+
+    def __radd__(self, other: AcceptableFValOtherInput) -> 'FixedFVal':
+        return FixedFVal.from_raw(_evaluate_raw_input(other) + self.raw)
+
+    def __rsub__(self, other: AcceptableFValOtherInput) -> 'FixedFVal':
+        return FixedFVal.from_raw(_evaluate_raw_input(other) - self.raw)
+
+    def __rmul__(self, other: AcceptableFValOtherInput) -> 'FixedFVal':
+        return self.__mul__(other)
+
+    def __rtruediv__(self, other: AcceptableFValOtherInput) -> 'FixedFVal':
+        return FixedFVal.from_raw(_fixed_div(_evaluate_raw_input(other), self.raw))
+
+    def __rfloordiv__(self, other: AcceptableFValOtherInput) -> 'FixedFVal':
+        return FixedFVal(_truncated_div(_evaluate_raw_input(other), self.raw))
+
+    def __rmod__(self, other: AcceptableFValOtherInput) -> 'FixedFVal':
+        other_raw = _evaluate_raw_input(other)
+        return FixedFVal.from_raw(other_raw - self.raw * _truncated_div(other_raw, self.raw))
+
+    def __float__(self) -> float:
+        return self.raw / FIXED_SCALE
+
+    # --- Unary operands
+
+    def __neg__(self) -> 'FixedFVal':
+        return FixedFVal.from_raw(-self.raw)
+
+    def __abs__(self) -> 'FixedFVal':
+        return FixedFVal.from_raw(abs(self.raw))
+
+    # --- Other operations
+
+    def fma(self, other: AcceptableFValOtherInput, third: AcceptableFValOtherInput) -> 'FixedFVal':  # noqa: E501
+        """
+        Fused multiply-add. Return self*other+third with no rounding of the
+        intermediate product self*other
+        """
+        product = self.raw * _evaluate_raw_input(other)
+        return FixedFVal.from_raw(_round_div(product + _evaluate_raw_input(third) * FIXED_SCALE, FIXED_SCALE))  # noqa: E501
+
+    def to_percentage(self, precision: int = 4, with_perc_sign: bool = True) -> str:
+        return self.to_fval().to_percentage(precision=precision, with_perc_sign=with_perc_sign)
+
+    def to_int(self, exact: bool) -> int:
+        """
+        Tries to convert to int, If `exact` is true then it will convert only if
+        it is a whole decimal number; i.e.: if it has got nothing after the decimal point
+
+        Raises:
+            ConversionError: If exact was True but the FixedFVal is actually not an exact integer.
+        """
+        if exact and self.raw % FIXED_SCALE != 0:
+            raise ConversionError(f'Tried to ask for exact int from {self}')
+        return _truncated_div(self.raw, FIXED_SCALE)
+
+    def is_close(self, other: AcceptableFValInitInput, max_diff: str = "1e-6") -> bool:
+        return self.to_fval().is_close(other=FVal(other), max_diff=max_diff)
+
+
+def _truncated_div(numerator: int, denominator: int) -> int:
+    """Integer division rounding towards zero, like Decimal does"""
+    quotient = abs(numerator) // abs(denominator)
+    return quotient if (numerator < 0) == (denominator < 0) else -quotient
+
+
+def _fixed_div(numerator_raw: int, denominator_raw: int) -> int:
+    """Divide two scaled integers and return the scaled result rounded half to even
+
+    May raise:
+    - ZeroDivisionError
+    """
+    numerator = numerator_raw * FIXED_SCALE
+    if denominator_raw < 0:
+        numerator, denominator_raw = -numerator, -denominator_raw
+    return _round_div(numerator, denominator_raw)
+
+
+def _evaluate_raw_input(other: Any) -> int:
+    """Evaluate 'other' and return its representation as an integer scaled by FIXED_SCALE"""
+    if type(other) is FixedFVal:  # fast path for the most common case
+        return other.raw
+    if isinstance(other, FVal):
+        return _decimal_to_raw(other.num)
+    if not isinstance(other, int):
+        raise NotImplementedError("Expected either FixedFVal, FVal or int.")
+    # else
+    return other * FIXED_SCALE
+
+
 def _evaluate_input(other: Any) -> Union[Decimal, int]:
     """Evaluate 'other' and return its Decimal representation"""
-    if isinstance(other, FVal):
+    if type(other) is FVal:  # fast path for the most common case
+        return other.num
+    if isinstance(other, (FVal, FixedFVal)):
         return other.num
     if not isinstance(other, int):
         raise NotImplementedError("Expected either FVal or int.")
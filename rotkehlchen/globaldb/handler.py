@@ -28,12 +28,13 @@ from rotkehlchen.assets.asset import (
     Nft,
     UnderlyingToken,
 )
+from rotkehlchen.assets.resolver import AssetResolver
 from rotkehlchen.assets.types import AssetData, AssetType
 from rotkehlchen.chain.ethereum.types import string_to_evm_address
 from rotkehlchen.constants.assets import A_ETH, A_ETH2
 from rotkehlchen.constants.misc import NFT_DIRECTIVE
 from rotkehlchen.db.drivers.gevent import DBConnection, DBConnectionType, DBCursor
-from rotkehlchen.errors.asset import UnknownAsset
+from rotkehlchen.errors.asset import UnknownAsset, WrongAssetType
 from rotkehlchen.errors.misc import InputError
 from rotkehlchen.errors.serialization import DeserializationError
 from rotkehlchen.history.deserialization import deserialize_price
@@ -47,12 +48,13 @@ from rotkehlchen.types import (
     Price,
     Timestamp,
 )
-from rotkehlchen.utils.misc import timestamp_to_date, ts_now
+from rotkehlchen.utils.misc import get_chunks, timestamp_to_date, ts_now
 from rotkehlchen.utils.serialization import (
     deserialize_asset_with_oracles_from_db,
     deserialize_generic_asset_from_db,
 )
 
+from .price_index import HistoricalPriceIndex
 from .schema import DB_SCRIPT_CREATE_TABLES
 from .upgrades.manager import maybe_upgrade_globaldb
 from .utils import GLOBAL_DB_VERSION, _get_setting_value
@@ -83,7 +85,11 @@ def initialize_globaldb(dbpath: Path, sql_vm_instructions_cb: int) -> DBConnecti
     return connection
 
 
-def _initialize_global_db_directory(data_dir: Path, sql_vm_instructions_cb: int) -> DBConnection:
+def _initialize_global_db_directory(
+        data_dir: Path,
+        sql_vm_instructions_cb: int,
+        sql_read_connections: int,
+) -> DBConnection:
     global_dir = data_dir / 'global_data'
     global_dir.mkdir(parents=True, exist_ok=True)
     dbname = global_dir / 'global.db'
@@ -92,7 +98,9 @@ def _initialize_global_db_directory(data_dir: Path, sql_vm_instructions_cb: int)
         root_dir = Path(__file__).resolve().parent.parent
         builtin_data_dir = root_dir / 'data'
         shutil.copyfile(builtin_data_dir / 'global.db', global_dir / 'global.db')
-    return initialize_globaldb(dbname, sql_vm_instructions_cb)
+    connection = initialize_globaldb(dbname, sql_vm_instructions_cb)
+    connection.enable_read_pool(size=sql_read_connections)
+    return connection
 
 
 def _compute_cache_key(key_parts: Iterable[Union[str, GeneralCacheType]]) -> str:
@@ -118,12 +126,16 @@ class GlobalDBHandler():
             cls,
             data_dir: Path = None,
             sql_vm_instructions_cb: int = None,
+            sql_read_connections: int = 0,
     ) -> 'GlobalDBHandler':
         """
         Initializes the GlobalDB.
 
         If the data dir is given it uses the already existing global DB in that directory,
         of if there is none copies the built-in one there.
+
+        If sql_read_connections is positive reads are served by a pool of that many
+        read only connections.
         """
         if GlobalDBHandler.__instance is not None:
             return GlobalDBHandler.__instance
@@ -132,7 +144,12 @@ class GlobalDBHandler():
         assert sql_vm_instructions_cb is not None, 'First instantiation of GlobalDBHandler should have a sql_vm_instructions_cb'  # noqa: E501
         GlobalDBHandler.__instance = object.__new__(cls)
         GlobalDBHandler.__instance._data_directory = data_dir
-        GlobalDBHandler.__instance.conn = _initialize_global_db_directory(data_dir, sql_vm_instructions_cb)  # noqa: E501
+        GlobalDBHandler.__instance.conn = _initialize_global_db_directory(
+            data_dir=data_dir,
+            sql_vm_instructions_cb=sql_vm_instructions_cb,
+            sql_read_connections=sql_read_connections,
+        )
+        HistoricalPriceIndex().clear()  # in case a different global DB was used before
         return GlobalDBHandler.__instance
 
     @staticmethod
@@ -1052,6 +1069,8 @@ class GlobalDBHandler():
                     f'due to a constraint being hit. Make sure the new values are valid.',
                 ) from e
 
+        AssetResolver().clean_memory_cache(identifier)
+
     @staticmethod
     def add_user_owned_assets(assets: List['Asset']) -> None:
         """Make sure all assets in the list are included in the user owned assets
@@ -1083,6 +1102,9 @@ class GlobalDBHandler():
                     f'Tried to delete asset with identifier {identifier} '
                     f'but it was not found in the DB',
                 )
+        # prices of the asset are deleted by the foreign key cascade
+        HistoricalPriceIndex().invalidate_asset(identifier)
+        AssetResolver().clean_memory_cache(identifier)
 
     @staticmethod
     def get_assets_with_symbol(
@@ -1146,22 +1168,36 @@ class GlobalDBHandler():
     ) -> Optional['HistoricalPrice']:
         """Gets the price around a particular timestamp
 
+        If a source is given the lookup goes through the in-memory price index.
+
         If no price can be found returns None
         """
+        if source is not None:
+            entry = HistoricalPriceIndex().get_series(
+                from_asset=from_asset,
+                to_asset=to_asset,
+                source=source,
+            ).nearest(timestamp=timestamp, max_seconds_distance=max_seconds_distance)
+            if entry is None:
+                return None
+            return HistoricalPrice(
+                from_asset=from_asset,
+                to_asset=to_asset,
+                source=source,
+                timestamp=entry[0],
+                price=entry[1],
+            )
+
         querystr = (
             'SELECT from_asset, to_asset, source_type, timestamp, price FROM price_history '
             'WHERE from_asset=? AND to_asset=? AND ABS(timestamp - ?) <= ? '
+            'ORDER BY ABS(timestamp - ?) ASC LIMIT 1'
         )
-        querylist = [from_asset.identifier, to_asset.identifier, timestamp, max_seconds_distance]
-        if source is not None:
-            querystr += ' AND source_type=?'
-            querylist.append(source.serialize_for_db())
-
-        querystr += 'ORDER BY ABS(timestamp - ?) ASC LIMIT 1'
-        querylist.append(timestamp)
-
         with GlobalDBHandler().conn.read_ctx() as cursor:
-            query = cursor.execute(querystr, tuple(querylist))
+            query = cursor.execute(
+                querystr,
+                (from_asset.identifier, to_asset.identifier, timestamp, max_seconds_distance, timestamp),  # noqa: E501
+            )
             result = query.fetchone()
             if result is None:
                 return None
@@ -1203,6 +1239,11 @@ class GlobalDBHandler():
                             f'Failed to add {str(entry)} due to {str(entry_error)}. Skipping entry addition',  # noqa: E501
                         )
 
+        # only after the write is committed, so the index can't be rebuilt from stale data
+        price_index = HistoricalPriceIndex()
+        for pair in {(x.from_asset.identifier, x.to_asset.identifier, x.source) for x in entries}:
+            price_index.invalidate_pair(*pair)
+
     @staticmethod
     def add_single_historical_price(entry: HistoricalPrice) -> bool:
         """
@@ -1225,6 +1266,11 @@ class GlobalDBHandler():
             )
             return False
 
+        HistoricalPriceIndex().invalidate_pair(
+            from_identifier=entry.from_asset.identifier,
+            to_identifier=entry.to_asset.identifier,
+            source=entry.source,
+        )
         return True
 
     @staticmethod
@@ -1291,6 +1337,7 @@ class GlobalDBHandler():
             for entry in write_cursor:
                 pairs_to_invalidate.append((Asset(entry[0]), Asset(entry[1])))
 
+        HistoricalPriceIndex().invalidate_asset(from_asset.identifier)
         return pairs_to_invalidate
 
     @staticmethod
@@ -1412,6 +1459,11 @@ class GlobalDBHandler():
             )
             return False
 
+        HistoricalPriceIndex().invalidate_pair(
+            from_identifier=entry.from_asset.identifier,
+            to_identifier=entry.to_asset.identifier,
+            source=entry.source,
+        )
         return True
 
     @staticmethod
@@ -1436,12 +1488,19 @@ class GlobalDBHandler():
         )
         with GlobalDBHandler().conn.write_ctx() as write_cursor:
             write_cursor.execute(querystr, bindings)
-            if write_cursor.rowcount != 1:
-                log.error(
-                    f'Failed to delete historical price from {from_asset} to {to_asset} '
-                    f'and timestamp: {str(timestamp)}.',
-                )
-                return False
+            deleted = write_cursor.rowcount
+
+        HistoricalPriceIndex().invalidate_pair(
+            from_identifier=from_asset.identifier,
+            to_identifier=to_asset.identifier,
+            source=HistoricalPriceOracle.MANUAL,
+        )
+        if deleted != 1:
+            log.error(
+                f'Failed to delete historical price from {from_asset} to {to_asset} '
+                f'and timestamp: {str(timestamp)}.',
+            )
+            return False
 
         return True
 
@@ -1465,6 +1524,13 @@ class GlobalDBHandler():
                 f'Failed to delete historical prices from {from_asset} to {to_asset} '
                 f'and source: {str(source)} due to {str(e)}',
             )
+            return
+
+        HistoricalPriceIndex().invalidate_pair(
+            from_identifier=from_asset.identifier,
+            to_identifier=to_asset.identifier,
+            source=source,
+        )
 
     @staticmethod
     def get_historical_price_range(
@@ -1472,6 +1538,16 @@ class GlobalDBHandler():
             to_asset: 'Asset',
             source: Optional[HistoricalPriceOracle] = None,
     ) -> Optional[Tuple[Timestamp, Timestamp]]:
+        if source is not None:
+            series = HistoricalPriceIndex().get_series(
+                from_asset=from_asset,
+                to_asset=to_asset,
+                source=source,
+            )
+            if len(series) == 0:
+                return None
+            return Timestamp(series.timestamps[0]), Timestamp(series.timestamps[-1])
+
         querystr = 'SELECT MIN(timestamp), MAX(timestamp) FROM price_history WHERE from_asset=? AND to_asset=?'  # noqa: E501
         query_list = [from_asset.identifier, to_asset.identifier]
         if source is not None:
@@ -1631,6 +1707,7 @@ class GlobalDBHandler():
         with GlobalDBHandler().conn.write_ctx() as write_cursor:
             write_cursor.execute(detach_database)
 
+        HistoricalPriceIndex().clear()  # price_history entries may have been cascade deleted
         return True, ''
 
     @staticmethod
@@ -1681,6 +1758,7 @@ class GlobalDBHandler():
 
         with GlobalDBHandler().conn.write_ctx() as write_cursor:
             write_cursor.execute(detach_database)
+        HistoricalPriceIndex().clear()  # price_history entries may have been cascade deleted
         return True, ''
 
     @staticmethod
@@ -1763,6 +1841,78 @@ class GlobalDBHandler():
                 form_with_incomplete_data=form_with_incomplete_data,
             )
 
+    @staticmethod
+    def resolve_assets(
+            identifiers: List[str],
+            form_with_incomplete_data: bool,
+    ) -> Dict[str, AssetWithNameAndType]:
+        """Bulk version of resolve_asset. Resolves the given identifiers with one query
+        per chunk of identifiers and one for the underlying tokens of the chunk.
+
+        Returns a mapping of lowercase identifier to asset. Identifiers that are not
+        in the database are not included.
+        """
+        result: Dict[str, AssetWithNameAndType] = {}
+        to_query = []
+        for identifier in identifiers:
+            if identifier.startswith(NFT_DIRECTIVE):
+                result[identifier.lower()] = Nft(identifier)
+            else:
+                to_query.append(identifier)
+
+        # each identifier is bound 3 times and sqlite binds up to 999 variables
+        with GlobalDBHandler().conn.read_ctx() as cursor:
+            for chunk in get_chunks(to_query, n=300):
+                placeholders = ','.join('?' * len(chunk))
+                query = f"""
+                SELECT A.identifier, A.type, B.address, B.decimals, A.name, C.symbol, C.started, null, C.swapped_for, C.coingecko, C.cryptocompare, B.protocol, B.chain, B.token_kind, null, null FROM assets as A JOIN evm_tokens as B
+                ON B.identifier = A.identifier JOIN common_asset_details AS C ON C.identifier = B.identifier WHERE A.type = ? AND A.identifier IN ({placeholders})
+                UNION ALL
+                SELECT A.identifier, A.type, null, null, A.name, B.symbol, B.started, B.forked, B.swapped_for, B.coingecko, B.cryptocompare, null, null, null, null, null from assets as A JOIN common_asset_details as B
+                ON B.identifier = A.identifier WHERE A.type != ? AND A.type != ? AND A.identifier IN ({placeholders})
+                UNION ALL
+                SELECT A.identifier, A.type, null, null, A.name, null, null, null, null, null, null, null, null, null, B.notes, B.type FROM assets AS A JOIN custom_assets AS B on A.identifier=B.identifier WHERE A.identifier IN ({placeholders})
+                """  # noqa: E501
+                cursor.execute(
+                    query,
+                    (
+                        AssetType.EVM_TOKEN.serialize_for_db(),
+                        *chunk,
+                        AssetType.EVM_TOKEN.serialize_for_db(),
+                        AssetType.CUSTOM_ASSET.serialize_for_db(),
+                        *chunk,
+                        *chunk,
+                    ),
+                )
+                entries = [(AssetType.deserialize_from_db(x[1]), x) for x in cursor]
+                token_identifiers = [x[0] for asset_type, x in entries if asset_type == AssetType.EVM_TOKEN]  # noqa: E501
+                underlying_tokens: Dict[str, List[UnderlyingToken]] = defaultdict(list)
+                if len(token_identifiers) != 0:
+                    cursor.execute(
+                        f'SELECT A.parent_token_entry, B.address, B.token_kind, A.weight FROM '
+                        f'underlying_tokens_list AS A JOIN evm_tokens as B WHERE '
+                        f'A.identifier=B.identifier AND A.parent_token_entry IN '
+                        f'({",".join("?" * len(token_identifiers))})',
+                        token_identifiers,
+                    )
+                    for entry in cursor:
+                        underlying_tokens[entry[0]].append(UnderlyingToken.deserialize_from_db(entry[1:]))  # noqa: E501
+
+                for asset_type, asset_data in entries:
+                    try:
+                        asset = deserialize_generic_asset_from_db(
+                            asset_type=asset_type,
+                            asset_data=asset_data,
+                            underlying_tokens=underlying_tokens.get(asset_data[0]),
+                            form_with_incomplete_data=form_with_incomplete_data,
+                        )
+                    except (UnknownAsset, WrongAssetType, DeserializationError) as e:
+                        log.error(f'Failed to deserialize asset {asset_data[0]} from the DB due to {str(e)}')  # noqa: E501
+                        continue
+                    result[asset_data[0].lower()] = asset
+
+        return result
+
     @staticmethod
     def get_asset_type(identifier: str) -> AssetType:
         """
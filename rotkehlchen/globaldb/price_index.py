@@ -0,0 +1,174 @@
+import logging
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from decimal import Decimal, InvalidOperation
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+from rotkehlchen.fval import FVal
+from rotkehlchen.history.types import HistoricalPriceOracle
+from rotkehlchen.logging import RotkehlchenLogsAdapter
+from rotkehlchen.types import Price, Timestamp
+
+if TYPE_CHECKING:
+    from rotkehlchen.assets.asset import Asset
+
+logger = logging.getLogger(__name__)
+log = RotkehlchenLogsAdapter(logger)
+
+# Upper bound of the price points kept in memory across all series
+DEFAULT_PRICE_INDEX_MAX_POINTS = 1_000_000
+
+SeriesKey = Tuple[str, str, str]  # from_asset, to_asset, serialized source
+
+
+class PriceSeries():
+    """The prices of a pair from a single source sorted by timestamp"""
+    __slots__ = ('timestamps', 'prices')
+
+    def __init__(self, timestamps: array, prices: List[Decimal]) -> None:
+        self.timestamps = timestamps
+        self.prices = prices
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def nearest(
+            self,
+            timestamp: Timestamp,
+            max_seconds_distance: int,
+    ) -> Optional[Tuple[Timestamp, Price]]:
+        """Returns the timestamp and price of the entry closest to timestamp if within
+        max_seconds_distance. For equal distance the earlier entry is preferred."""
+        idx = bisect_left(self.timestamps, timestamp)
+        best_idx, best_distance = None, max_seconds_distance + 1
+        for candidate in (idx - 1, idx):
+            if 0 <= candidate < len(self.timestamps):
+                distance = abs(self.timestamps[candidate] - timestamp)
+                if distance < best_distance:
+                    best_idx, best_distance = candidate, distance
+
+        if best_idx is None:
+            return None
+        return Timestamp(self.timestamps[best_idx]), Price(FVal(self.prices[best_idx]))
+
+
+class HistoricalPriceIndex():
+    """In-memory index of the price_history table of the global DB.
+
+    Each (from_asset, to_asset, source) series is loaded with a single query the
+    first time it's needed and then lookups are binary searches. The least recently
+    used series are evicted once more than max_points are kept. Writes to
+    price_history should invalidate the affected series.
+    """
+    __instance: Optional['HistoricalPriceIndex'] = None
+    series: 'OrderedDict[SeriesKey, PriceSeries]'
+    total_points: int
+    max_points: int
+    generation: int  # increased at each invalidation to detect stale loads
+
+    def __new__(cls, max_points: int = DEFAULT_PRICE_INDEX_MAX_POINTS) -> 'HistoricalPriceIndex':
+        if HistoricalPriceIndex.__instance is not None:
+            return HistoricalPriceIndex.__instance
+
+        instance = object.__new__(cls)
+        instance.series = OrderedDict()
+        instance.total_points = 0
+        instance.max_points = max_points
+        instance.generation = 0
+        HistoricalPriceIndex.__instance = instance
+        return instance
+
+    @staticmethod
+    def _key(from_identifier: str, to_identifier: str, source: HistoricalPriceOracle) -> SeriesKey:  # noqa: E501
+        # price_history asset columns are case insensitive
+        return from_identifier.lower(), to_identifier.lower(), source.serialize_for_db()
+
+    def _load_series(self, key: SeriesKey) -> PriceSeries:
+        # the handler imports this module so import it here to avoid a cyclic import
+        from rotkehlchen.globaldb.handler import GlobalDBHandler  # pylint: disable=import-outside-toplevel  # isort:skip  # noqa: E501
+
+        timestamps, prices = array('q'), []
+        with GlobalDBHandler().conn.read_ctx() as cursor:
+            cursor.execute(
+                'SELECT timestamp, price FROM price_history WHERE from_asset=? AND '
+                'to_asset=? AND source_type=? ORDER BY timestamp ASC',
+                key,
+            )
+            for timestamp, price in cursor:
+                try:
+                    prices.append(Decimal(price))
+                except InvalidOperation:
+                    log.error(f'Found invalid price {price} in price_history for {key}. Skipping')
+                    continue
+                timestamps.append(timestamp)
+
+        return PriceSeries(timestamps=timestamps, prices=prices)
+
+    def get_series(
+            self,
+            from_asset: 'Asset',
+            to_asset: 'Asset',
+            source: HistoricalPriceOracle,
+    ) -> PriceSeries:
+        key = self._key(from_asset.identifier, to_asset.identifier, source)
+        series = self.series.get(key)
+        if series is not None:
+            self.series.move_to_end(key)
+            return series
+
+        generation = self.generation
+        series = self._load_series(key)
+        if len(series) > self.max_points or generation != self.generation:
+            # too big to keep in memory or invalidated while the query yielded
+            return series
+
+        old = self.series.pop(key, None)  # may have been loaded by another greenlet
+        if old is not None:
+            self.total_points -= len(old)
+        self.series[key] = series
+        self.total_points += len(series)
+        while self.total_points > self.max_points:
+            _, evicted = self.series.popitem(last=False)
+            self.total_points -= len(evicted)
+
+        return series
+
+    def get_price(
+            self,
+            from_asset: 'Asset',
+            to_asset: 'Asset',
+            source: HistoricalPriceOracle,
+            timestamp: Timestamp,
+            max_seconds_distance: int,
+    ) -> Optional[Price]:
+        """Gets the price of the given source closest to timestamp within max_seconds_distance"""
+        series = self.get_series(from_asset=from_asset, to_asset=to_asset, source=source)
+        entry = series.nearest(timestamp=timestamp, max_seconds_distance=max_seconds_distance)
+        return None if entry is None else entry[1]
+
+    def invalidate_pair(
+            self,
+            from_identifier: str,
+            to_identifier: str,
+            source: Optional[HistoricalPriceOracle] = None,
+    ) -> None:
+        """Drop the given pair's series of the given source or of all sources"""
+        self.generation += 1
+        sources = list(HistoricalPriceOracle) if source is None else [source]
+        for entry in sources:
+            evicted = self.series.pop(self._key(from_identifier, to_identifier, entry), None)
+            if evicted is not None:
+                self.total_points -= len(evicted)
+
+    def invalidate_asset(self, identifier: str) -> None:
+        """Drop all series involving the given asset"""
+        self.generation += 1
+        lowered = identifier.lower()
+        for key in [x for x in self.series if lowered in (x[0], x[1])]:
+            self.total_points -= len(self.series.pop(key))
+
+    def clear(self) -> None:
+        self.generation += 1
+        self.series.clear()
+        self.total_points = 0
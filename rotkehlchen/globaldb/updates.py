@@ -23,6 +23,7 @@ from rotkehlchen.types import ChainID, ChecksumEvmAddress, EvmTokenKind, Timesta
 from rotkehlchen.user_messages import MessagesAggregator
 
 from .handler import GlobalDBHandler, initialize_globaldb
+from .price_index import HistoricalPriceIndex
 
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
@@ -78,6 +79,7 @@ def _force_remote(cursor: DBCursor, local_asset: Asset, full_insert: str) -> Non
     # Insert new entry. Since identifiers are the same, no foreign key constrains should break
     executeall(cursor, full_insert)
     AssetResolver().clean_memory_cache(local_asset.identifier.lower())
+    HistoricalPriceIndex().invalidate_asset(local_asset.identifier)  # prices got cascade deleted
 
 
 class ParsedAssetData(NamedTuple):
@@ -1,6 +1,12 @@
+import heapq
 import logging
+from functools import partial
+from itertools import islice
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, List, Tuple
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Sequence, Tuple, TypeVar
+
+import gevent
+from gevent.pool import Group
 
 from rotkehlchen.accounting.structures.base import HistoryBaseEntry
 from rotkehlchen.constants.misc import ZERO
@@ -29,6 +35,7 @@ if TYPE_CHECKING:
     from rotkehlchen.chain.manager import ChainManager
     from rotkehlchen.db.dbhandler import DBHandler
     from rotkehlchen.db.drivers.gevent import DBCursor
+    from rotkehlchen.exchanges.exchange import ExchangeInterface
 
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
@@ -43,6 +50,45 @@ log = RotkehlchenLogsAdapter(logger)
 # base history entries
 # Please, update this number each time a history query step is either added or removed
 NUM_HISTORY_QUERY_STEPS_EXCL_EXCHANGES = 6 + len(EXTERNAL_LOCATION)
+# Exchanges, the ethereum transactions and eth2 are queried concurrently. A source that
+# takes longer than this is left out of the history so that it does not block the report
+EXCHANGE_HISTORY_QUERY_TIMEOUT = 1800
+CHAIN_HISTORY_QUERY_TIMEOUT = 3600
+
+E = TypeVar('E', bound='AccountingEventMixin')
+
+
+class HistorySourceTimeout(Exception):
+    """Raised in the query of a history source that took too long. It's not a RemoteError
+    so that the error handling of the query does not catch it and carry on"""
+
+
+def history_sort_key(event: 'AccountingEventMixin') -> Tuple[int, int]:
+    """Events are ordered by timestamp and history base entries also by sequence index"""
+    return (
+        event.get_timestamp(),
+        event.sequence_index if isinstance(event, HistoryBaseEntry) else 1,
+    )
+
+
+def ordered_source(events: List[E]) -> List[E]:
+    """Makes sure the events of a history source are in the history order.
+
+    DB sources are already returned ordered, so for them this is a linear check.
+    Only sources that are not, like some exchanges' results, are sorted.
+    """
+    keys = [history_sort_key(x) for x in events]
+    if any(a > b for a, b in zip(keys, islice(keys, 1, None))):
+        events.sort(key=history_sort_key)
+    return events
+
+
+def merge_history_sources(
+        sources: Sequence[Sequence['AccountingEventMixin']],
+) -> List['AccountingEventMixin']:
+    """Merges ordered history sources into the ordered history. Events with the same
+    key keep the order of their sources"""
+    return list(heapq.merge(*sources, key=history_sort_key))
 
 
 class EventsHistorian:
@@ -76,15 +122,126 @@ class EventsHistorian:
         # Keeps how many trades we have found per location. Used for free user limiting
         self.processing_state_name = 'Starting query of historical events'
         self.progress = ZERO
+        self.progress_step = 0
+        self.total_steps = 1
+        # processing state of each history source that is being queried concurrently
+        self.sources_state: Dict[str, str] = {}
         with self.db.conn.read_ctx() as cursor:
             db_settings = self.db.get_settings(cursor)
         self.dateformat = db_settings.date_display_format
         self.datelocaltime = db_settings.display_date_in_localtime
 
-    def _increase_progress(self, step: int, total_steps: int) -> int:
-        step += 1
-        self.progress = FVal(step / total_steps) * 100
-        return step
+    def _increase_progress(self) -> None:
+        self.progress_step += 1
+        self.progress = FVal(self.progress_step / self.total_steps) * 100
+
+    def _set_source_state(self, source: str, state: str) -> None:
+        """Sets the processing state of a concurrently queried source. The processing
+        state name shows the state of all sources still being queried"""
+        self.sources_state[source] = state
+        self.processing_state_name = ', '.join(self.sources_state.values())
+
+    def _query_source(
+            self,
+            source: str,
+            timeout: int,
+            errors: List[str],
+            method: Callable[..., None],
+            **kwargs: Any,
+    ) -> None:
+        """Runs the query of a history source. Errors and timeouts of the source are
+        reported and added to errors but don't affect the query of the other sources.
+
+        The timeout is raised as an Exception so that DB write transactions open at the
+        time get rolled back. The queries kill the greenlets they spawn when they exit,
+        so nothing of a timed out source keeps running.
+        """
+        timeout_error = HistorySourceTimeout(f'Querying {source} history timed out after {timeout} seconds')  # noqa: E501
+        try:
+            with gevent.Timeout(seconds=timeout, exception=timeout_error):
+                method(**kwargs)
+        except Exception as e:  # pylint: disable=broad-except
+            if e is timeout_error:
+                msg = str(e)
+                log.error(msg)
+            else:
+                msg = f'Querying {source} history failed due to {str(e)}'
+                log.exception(msg)
+            self.msg_aggregator.add_error(f'{msg}. The PnL report may be missing events')
+            errors.append(msg)
+        finally:
+            self.sources_state.pop(source, None)
+            if len(self.sources_state) != 0:
+                self.processing_state_name = ', '.join(self.sources_state.values())
+
+    def _query_exchange_history(
+            self,
+            exchange: 'ExchangeInterface',
+            end_ts: Timestamp,
+            success_callback: Callable[..., None],
+            fail_callback: Callable[[str], None],
+    ) -> None:
+        self._set_source_state(f'{exchange.name} exchange', f'Querying {exchange.name} exchange history')  # noqa: E501
+        exchange.query_history_with_callbacks(
+            # We need to have history of exchanges since before the range
+            start_ts=Timestamp(0),
+            end_ts=end_ts,
+            success_callback=success_callback,
+            fail_callback=fail_callback,
+        )
+        self._increase_progress()
+
+    def _query_ethereum_history(self, end_ts: Timestamp, failures: List[str]) -> None:
+        """Queries, gets the receipts of and decodes the ethereum transactions"""
+        self._set_source_state('ethereum', 'Querying ethereum transactions history')
+        tx_filter_query = ETHTransactionsFilterQuery.make(
+            limit=None,
+            offset=None,
+            addresses=None,
+            # We need to have history of transactions since before the range
+            from_ts=Timestamp(0),
+            to_ts=end_ts,
+        )
+        try:
+            _, _ = self.eth_tx_decoder.transactions.query(
+                filter_query=tx_filter_query,
+                has_premium=True,  # ignore limits here. Limit applied at processing
+                only_cache=False,
+            )
+        except RemoteError as e:
+            msg = str(e)
+            self.msg_aggregator.add_error(
+                f'There was an error when querying etherscan for ethereum transactions: {msg}'
+                f'The final history result will not include ethereum transactions',
+            )
+            failures.append(msg)
+        self._increase_progress()
+
+        self._set_source_state('ethereum', 'Querying ethereum transaction receipts')
+        self.eth_tx_decoder.transactions.get_receipts_for_transactions_missing_them()
+        self._increase_progress()
+
+        self._set_source_state('ethereum', 'Decoding raw transactions')
+        self.eth_tx_decoder.get_and_decode_undecoded_transactions(limit=None)
+        self._increase_progress()
+
+    def _query_eth2_history(
+            self,
+            end_ts: Timestamp,
+            sources: List[Sequence['AccountingEventMixin']],
+    ) -> None:
+        """Queries the eth2 staking events and adds them to the given sources"""
+        self._set_source_state('ETH2 staking', 'Querying ETH2 staking history')
+        try:
+            eth2_events = self.chain_manager.get_eth2_history_events(
+                from_timestamp=Timestamp(0),
+                to_timestamp=end_ts,
+            )
+            sources.append(ordered_source(eth2_events))
+        except RemoteError as e:
+            self.msg_aggregator.add_error(
+                f'Eth2 events are not included in the PnL report due to {str(e)}',
+            )
 
     def query_ledger_actions(
             self,
@@ -289,18 +446,23 @@ class EventsHistorian:
         sorted by ascending timestamp.
         """
         self._reset_variables()
-        step = 0
-        total_steps = len(self.exchange_manager.connected_exchanges) + NUM_HISTORY_QUERY_STEPS_EXCL_EXCHANGES  # noqa: E501
+        self.total_steps = len(self.exchange_manager.connected_exchanges) + NUM_HISTORY_QUERY_STEPS_EXCL_EXCHANGES  # noqa: E501
         log.info(
             'Get/create trade history',
             start_ts=start_ts,
             end_ts=end_ts,
         )
-        # start creating the all trades history list
-        history: List['AccountingEventMixin'] = []
-        empty_or_error = ''
+        # the events of each source, ordered. They are merged into the history at the end.
+        # The concurrently queried sources fill their own slot, so that the order of the
+        # sources, which is the order of events with equal keys, doesn't depend on which
+        # query finishes first
+        exchanges = list(self.exchange_manager.iterate_exchanges())
+        exchange_sources: List[List[Sequence['AccountingEventMixin']]] = [[] for _ in exchanges]  # noqa: E501
+        eth2_sources: List[Sequence['AccountingEventMixin']] = []
+        errors: List[str] = []
 
         def populate_history_cb(
+                sources: List[Sequence['AccountingEventMixin']],
                 trades_history: List[Trade],
                 margin_history: List[MarginPosition],
                 result_asset_movements: List[AssetMovement],
@@ -310,60 +472,60 @@ class EventsHistorian:
 
             We don't include ledger actions here since we simply gather all of them at the end
             """
-            history.extend(trades_history)
-            history.extend(margin_history)
-            history.extend(result_asset_movements)
+            sources.append(ordered_source(trades_history))
+            sources.append(ordered_source(margin_history))
+            sources.append(ordered_source(result_asset_movements))
 
             if exchange_specific_data:
                 pass  # this used to be only for polo loans -- removed now. TODO: Think if needed
 
         def fail_history_cb(error_msg: str) -> None:
             """This callback will run for failure in exchange history query"""
-            nonlocal empty_or_error
-            empty_or_error += '\n' + error_msg
-
-        for exchange in self.exchange_manager.iterate_exchanges():
-            self.processing_state_name = f'Querying {exchange.name} exchange history'
-            exchange.query_history_with_callbacks(
-                # We need to have history of exchanges since before the range
-                start_ts=Timestamp(0),
+            errors.append(error_msg)
+
+        # The exchanges and the chain sources are independent. Query them concurrently
+        # so that the time it takes is the one of the slowest source
+        queries = Group()
+        for exchange, exchange_source in zip(exchanges, exchange_sources):
+            queries.spawn(
+                self._query_source,
+                source=f'{exchange.name} exchange',
+                timeout=EXCHANGE_HISTORY_QUERY_TIMEOUT,
+                errors=errors,
+                method=self._query_exchange_history,
+                exchange=exchange,
                 end_ts=end_ts,
-                success_callback=populate_history_cb,
+                success_callback=partial(populate_history_cb, exchange_source),
                 fail_callback=fail_history_cb,
             )
-            step = self._increase_progress(step, total_steps)
-
-        self.processing_state_name = 'Querying ethereum transactions history'
-        tx_filter_query = ETHTransactionsFilterQuery.make(
-            limit=None,
-            offset=None,
-            addresses=None,
-            # We need to have history of transactions since before the range
-            from_ts=Timestamp(0),
-            to_ts=end_ts,
+        queries.spawn(
+            self._query_source,
+            source='ethereum',
+            timeout=CHAIN_HISTORY_QUERY_TIMEOUT,
+            errors=errors,
+            method=self._query_ethereum_history,
+            end_ts=end_ts,
+            failures=errors,
         )
-        try:
-            _, _ = self.eth_tx_decoder.transactions.query(
-                filter_query=tx_filter_query,
-                has_premium=True,  # ignore limits here. Limit applied at processing
-                only_cache=False,
-            )
-        except RemoteError as e:
-            msg = str(e)
-            self.msg_aggregator.add_error(
-                f'There was an error when querying etherscan for ethereum transactions: {msg}'
-                f'The final history result will not include ethereum transactions',
+        eth2 = self.chain_manager.get_module('eth2')
+        if eth2 is not None and has_premium:
+            queries.spawn(
+                self._query_source,
+                source='ETH2 staking',
+                timeout=CHAIN_HISTORY_QUERY_TIMEOUT,
+                errors=errors,
+                method=self._query_eth2_history,
+                end_ts=end_ts,
+                sources=eth2_sources,
             )
-            empty_or_error += '\n' + msg
-        step = self._increase_progress(step, total_steps)
-
-        self.processing_state_name = 'Querying ethereum transaction receipts'
-        self.eth_tx_decoder.transactions.get_receipts_for_transactions_missing_them()
-        step = self._increase_progress(step, total_steps)
-
-        self.processing_state_name = 'Decoding raw transactions'
-        self.eth_tx_decoder.get_and_decode_undecoded_transactions(limit=None)
-        step = self._increase_progress(step, total_steps)
+        queries.join()
+        sources: List[Sequence['AccountingEventMixin']] = [
+            x for slot in exchange_sources for x in slot
+        ]
+        # the steps of the exchanges, the 3 ethereum steps and eth2 are done. Even
+        # the ones of sources that failed
+        self.progress_step = len(self.exchange_manager.connected_exchanges) + 3
+        self._increase_progress()
 
         # Include all external trades and trades from external exchanges
         for location in EXTERNAL_LOCATION:
@@ -374,8 +536,8 @@ class EventsHistorian:
                     filter_query=TradesFilterQuery.make(location=location),
                     has_premium=True,  # we need all trades for accounting -- limit happens later
                 )
-            history.extend(external_trades)
-            step = self._increase_progress(step, total_steps)
+            sources.append(ordered_source(external_trades))
+            self._increase_progress()
 
         # include all ledger actions
         self.processing_state_name = 'Querying ledger actions history'
@@ -383,25 +545,9 @@ class EventsHistorian:
             filter_query=LedgerActionsFilterQuery.make(),
             only_cache=True,
         )
-        history.extend(ledger_actions)
-        step = self._increase_progress(step, total_steps)
-
-        # include eth2 staking events
-        eth2 = self.chain_manager.get_module('eth2')
-        if eth2 is not None and has_premium:
-            self.processing_state_name = 'Querying ETH2 staking history'
-            try:
-                eth2_events = self.chain_manager.get_eth2_history_events(
-                    from_timestamp=Timestamp(0),
-                    to_timestamp=end_ts,
-                )
-                history.extend(eth2_events)
-            except RemoteError as e:
-                self.msg_aggregator.add_error(
-                    f'Eth2 events are not included in the PnL report due to {str(e)}',
-                )
-
-        step = self._increase_progress(step, total_steps)
+        sources.append(ordered_source(ledger_actions))
+        sources.extend(eth2_sources)
+        self._increase_progress()
 
         # Include base history entries
         history_events_db = DBHistoryEvents(self.db)
@@ -415,13 +561,10 @@ class EventsHistorian:
                 ),
                 has_premium=True,  # ignore limits here. Limit applied at processing
             )
-        history.extend(base_entries)
-        self._increase_progress(step, total_steps)
-
-        history.sort(  # sort events first by timestamp and if history base by sequence index
-            key=lambda x: (
-                x.get_timestamp(),
-                x.sequence_index if isinstance(x, HistoryBaseEntry) else 1,
-            ),
-        )
-        return empty_or_error, history
+        sources.append(ordered_source(base_entries))
+        self._increase_progress()
+
+        # Sources are already ordered so merging them is O(n log k) for k sources
+        # instead of sorting the whole history
+        history = merge_history_sources(sources)
+        return ''.join('\n' + x for x in errors), history
@@ -1,16 +1,19 @@
 import logging
 from http import HTTPStatus
 from pathlib import Path
-from typing import TYPE_CHECKING, List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 
 from rotkehlchen.assets.asset import Asset
 from rotkehlchen.constants.assets import A_KFEE, A_USD
 from rotkehlchen.constants.misc import ZERO
-from rotkehlchen.errors.asset import UnknownAsset, WrongAssetType
+from rotkehlchen.constants.timing import DAY_IN_SECONDS, HOUR_IN_SECONDS
+from rotkehlchen.errors.asset import UnknownAsset, UnsupportedAsset, WrongAssetType
 from rotkehlchen.errors.misc import RemoteError
 from rotkehlchen.errors.price import NoPriceForGivenTimestamp, PriceQueryUnsupportedAsset
 from rotkehlchen.fval import FVal
+from rotkehlchen.globaldb.handler import GlobalDBHandler
 from rotkehlchen.globaldb.manual_price_oracles import ManualPriceOracle
+from rotkehlchen.globaldb.price_index import HistoricalPriceIndex, PriceSeries
 from rotkehlchen.inquirer import Inquirer
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.types import Price, Timestamp
@@ -25,6 +28,16 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
+# Max distance in seconds that each oracle accepts for a price found in the DB cache
+CACHED_PRICE_MAX_DISTANCE = {
+    HistoricalPriceOracle.MANUAL: HOUR_IN_SECONDS,
+    HistoricalPriceOracle.CRYPTOCOMPARE: HOUR_IN_SECONDS,
+    HistoricalPriceOracle.COINGECKO: DAY_IN_SECONDS,
+}
+# Minimum number of cryptocompare cache misses for a pair to justify fetching its
+# hourly price history in bulk instead of querying each missing price separately
+BULK_HISTOHOUR_MIN_MISSES = 50
+
 
 def query_usd_price_or_use_default(
         asset: Asset,
@@ -144,6 +157,124 @@ class PriceHistorian():
             return Price(usd_price * price_mapping)
         return None
 
+    @staticmethod
+    def _resolve_from_cached_prices(
+            oracles: List[HistoricalPriceOracle],
+            cached: Dict[HistoricalPriceOracle, PriceSeries],
+            timestamp: Timestamp,
+    ) -> Tuple[Optional[Price], Optional[HistoricalPriceOracle]]:
+        """Walks the oracles in order using only their DB cached prices, like
+        query_historical_price() would do. Returns the price found or the oracle that
+        would need to be queried remotely for it, in which case the price can't
+        be decided from the cache."""
+        for oracle in oracles:
+            max_distance = CACHED_PRICE_MAX_DISTANCE.get(oracle)
+            if max_distance is None:
+                return None, oracle  # unknown caching behaviour. Can't decide
+
+            entry = cached[oracle].nearest(timestamp=timestamp, max_seconds_distance=max_distance)
+            price = None if entry is None else entry[1]
+            if price is not None and (oracle != HistoricalPriceOracle.CRYPTOCOMPARE or price != ZERO):  # noqa: E501
+                return price, None
+
+            if oracle != HistoricalPriceOracle.MANUAL:
+                return None, oracle  # this oracle would be queried remotely
+
+        return None, None
+
+    @staticmethod
+    def _load_cached_prices(
+            from_asset: Asset,
+            to_asset: Asset,
+    ) -> Dict[HistoricalPriceOracle, PriceSeries]:
+        """Load the DB cached price series of a pair for all oracles that cache prices"""
+        price_index = HistoricalPriceIndex()
+        return {
+            oracle: price_index.get_series(from_asset=from_asset, to_asset=to_asset, source=oracle)
+            for oracle in CACHED_PRICE_MAX_DISTANCE
+        }
+
+    @staticmethod
+    def query_cached_historical_prices(
+            from_asset: Asset,
+            to_asset: Asset,
+            timestamps: List[Timestamp],
+    ) -> Dict[Timestamp, Price]:
+        """Bulk version of query_historical_price() for many timestamps of a single pair.
+
+        Prices are resolved using the in-memory index of the DB cache. If many
+        timestamps miss the cryptocompare cache then its hourly history for the pair
+        is fetched in bulk and the cache is reloaded.
+
+        Only prices that query_historical_price() would have returned from the DB
+        cache are included in the result. Anything else is left to be queried
+        one by one via query_historical_price().
+        """
+        instance = PriceHistorian()
+        oracles = instance._oracles
+        if oracles is None or len(timestamps) == 0 or from_asset == to_asset:
+            return {}
+        if from_asset == A_KFEE:
+            return {}  # special asset. Handled by query_historical_price()
+
+        try:
+            if from_asset.is_fiat():
+                return {}  # fiat prices are first queried from external forex apis
+        except UnknownAsset:
+            return {}
+
+        timestamps = sorted(set(timestamps))
+        cached = instance._load_cached_prices(from_asset, to_asset)
+        result, cc_misses = {}, []
+        for timestamp in timestamps:
+            price, missing_oracle = instance._resolve_from_cached_prices(oracles, cached, timestamp)  # noqa: E501
+            if price is not None:
+                result[timestamp] = price
+            elif missing_oracle == HistoricalPriceOracle.CRYPTOCOMPARE:
+                cc_misses.append(timestamp)
+
+        if len(cc_misses) < BULK_HISTOHOUR_MIN_MISSES or instance._cryptocompare.rate_limited_in_last():  # noqa: E501
+            return result
+
+        log.debug(
+            f'Fetching cryptocompare hourly prices of {from_asset.identifier} -> '
+            f'{to_asset.identifier} in bulk for {len(cc_misses)} missing prices',
+        )
+        try:
+            cc_from_asset = from_asset.resolve_to_asset_with_oracles()
+            cc_to_asset = to_asset.resolve_to_asset_with_oracles()
+            instance._cryptocompare.query_and_store_historical_data(
+                from_asset=cc_from_asset,
+                to_asset=cc_to_asset,
+                timestamp=cc_misses[-1],
+            )
+            # query_and_store_historical_data extends the cached range in one direction
+            data_range = GlobalDBHandler().get_historical_price_range(
+                from_asset=cc_from_asset,
+                to_asset=cc_to_asset,
+                source=HistoricalPriceOracle.CRYPTOCOMPARE,
+            )
+            if data_range is not None and cc_misses[0] < data_range[0]:
+                instance._cryptocompare.query_and_store_historical_data(
+                    from_asset=cc_from_asset,
+                    to_asset=cc_to_asset,
+                    timestamp=cc_misses[0],
+                )
+        except (RemoteError, UnknownAsset, UnsupportedAsset, WrongAssetType) as e:
+            log.debug(
+                f'Could not bulk fetch cryptocompare prices of {from_asset.identifier} -> '
+                f'{to_asset.identifier} due to {str(e)}. Will query them one by one',
+            )
+            return result
+
+        cached = instance._load_cached_prices(from_asset, to_asset)
+        for timestamp in cc_misses:
+            price, _ = instance._resolve_from_cached_prices(oracles, cached, timestamp)
+            if price is not None:
+                result[timestamp] = price
+
+        return result
+
     @staticmethod
     def query_historical_price(
             from_asset: Asset,
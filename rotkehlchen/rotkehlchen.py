@@ -10,12 +10,14 @@ from pathlib import Path
 from typing import (
     TYPE_CHECKING,
     Any,
+    Callable,
     DefaultDict,
     Dict,
     List,
     Literal,
     Optional,
     Tuple,
+    TypeVar,
     Union,
     cast,
 )
@@ -27,6 +29,7 @@ from rotkehlchen.accounting.structures.balance import Balance, BalanceType
 from rotkehlchen.api.websockets.notifier import RotkiNotifier
 from rotkehlchen.api.websockets.typedefs import WSMessageType
 from rotkehlchen.assets.asset import Asset, AssetWithOracles, CryptoAsset
+from rotkehlchen.assets.resolver import AssetResolver
 from rotkehlchen.balances.manual import (
     account_for_manually_tracked_asset_balances,
     get_manually_tracked_balances,
@@ -107,6 +110,12 @@ MAIN_LOOP_SECS_DELAY = 10
 ICONS_BATCH_SIZE = 3
 ICONS_QUERY_SLEEP = 60
 
+# Seconds after which the balances query of a source is considered failed
+EXCHANGE_BALANCES_QUERY_TIMEOUT = 300
+CHAIN_BALANCES_QUERY_TIMEOUT = 900
+
+T = TypeVar('T')
+
 
 class Rotkehlchen():
     def __init__(self, args: argparse.Namespace) -> None:
@@ -145,6 +154,7 @@ class Rotkehlchen():
         GlobalDBHandler(
             data_dir=self.data_dir,
             sql_vm_instructions_cb=self.args.sqlite_instructions,
+            sql_read_connections=self.args.sqlite_read_connections,
         )
         self.data = DataHandler(
             self.data_dir,
@@ -217,6 +227,12 @@ class Rotkehlchen():
             exception_is_error=False,
             method=self.data.db.ensure_data_integrity,
         )
+        self.greenlet_manager.spawn_and_track(
+            after_seconds=None,
+            task_name='warm up owned assets cache',
+            exception_is_error=False,
+            method=self._warm_up_owned_assets_cache,
+        )
         self.data_importer = CSVDataImporter(db=self.data.db)
         self.premium_sync_manager = PremiumSyncManager(data=self.data, password=password)
         # set the DB in the external services instances that need it
@@ -406,6 +422,7 @@ class Rotkehlchen():
         del self.data_importer
 
         self.data.logout()
+        AssetResolver().clear_owned_assets()
         self.password = ''
         self.cryptocompare.unset_database()
 
@@ -420,6 +437,15 @@ class Rotkehlchen():
             user=user,
         )
 
+    def _warm_up_owned_assets_cache(self) -> None:
+        """Resolve all assets owned by the user at once and keep them in memory"""
+        with self.data.db.conn.read_ctx() as cursor:
+            owned_assets = self.data.db.query_owned_assets(cursor)
+        AssetResolver().warm_owned_assets(
+            identifiers=[x.identifier for x in owned_assets],
+            max_size=self.args.owned_assets_cache_size,
+        )
+
     def logout(self) -> None:
         if self.task_manager is None:  # no user logged in?
             return
@@ -661,6 +687,79 @@ class Rotkehlchen():
         )
         return report_id, error_or_empty
 
+    def _query_balances_source(
+            self,
+            source: str,
+            timeout: int,
+            durations: Dict[str, float],
+            method: Callable[..., T],
+            **kwargs: Any,
+    ) -> T:
+        """Runs the balances query of a source and records how long it took.
+
+        May raise:
+        - RemoteError if the query took longer than timeout seconds
+        - Whatever the query of the source may raise
+        """
+        start = time.monotonic()
+        try:
+            with gevent.Timeout(
+                seconds=timeout,
+                exception=RemoteError(f'Querying {source} balances timed out after {timeout} seconds'),  # noqa: E501
+            ):
+                return method(**kwargs)
+        finally:
+            durations[source] = round(time.monotonic() - start, 3)
+
+    def _query_lp_and_nft_balances(self, durations: Dict[str, float]) -> Dict[Asset, Balance]:
+        """Queries the liquidity pool and NFT balances that are added to the blockchain
+        balances. Errors are ignored and the balance snapshot will still be saved"""
+        lp_balances: Dict[str, Dict[Asset, Balance]] = {}
+        uniswap_v3_balances = None
+        try:
+            uniswap_v3_balances = self._query_balances_source(
+                source='liquidity pools',
+                timeout=CHAIN_BALANCES_QUERY_TIMEOUT,
+                durations=durations,
+                method=self.chain_manager.query_ethereum_lp_balances,
+                balances=lp_balances,
+            )
+        except RemoteError as e:
+            log.error(
+                f'At balance snapshot LP balances query failed due to {str(e)}. Error '
+                f'is ignored and balance snapshot will still be saved.',
+            )
+
+        balances = lp_balances.get(str(Location.BLOCKCHAIN), {})
+        # retrieve nft balances if module is activated
+        nfts = self.chain_manager.get_module('nfts')
+        if nfts is not None:
+            try:
+                nft_mapping = self._query_balances_source(
+                    source='nfts',
+                    timeout=CHAIN_BALANCES_QUERY_TIMEOUT,
+                    durations=durations,
+                    method=nfts.get_balances,
+                    addresses=self.chain_manager.queried_addresses_for_module('nfts'),
+                    uniswap_nfts=uniswap_v3_balances,
+                    return_zero_values=False,
+                    ignore_cache=False,
+                )
+            except RemoteError as e:
+                log.error(
+                    f'At balance snapshot NFT balances query failed due to {str(e)}. Error '
+                    f'is ignored and balance snapshot will still be saved.',
+                )
+            else:
+                for nft_balances in nft_mapping.values():
+                    for balance_entry in nft_balances:
+                        balances[CryptoAsset(balance_entry['id'])] = Balance(
+                            amount=ONE,
+                            usd_value=balance_entry['usd_price'],
+                        )
+
+        return balances
+
     def query_balances(
             self,
             requested_save_data: bool = False,
@@ -688,10 +787,52 @@ class Rotkehlchen():
             save_despite_errors=save_despite_errors,
         )
 
+        # All sources are queried concurrently and their results combined at the end
+        durations: Dict[str, float] = {}
+        exchange_greenlets = [(exchange, gevent.spawn(
+            self._query_balances_source,
+            source=f'{exchange.name} ({exchange.location})',
+            timeout=EXCHANGE_BALANCES_QUERY_TIMEOUT,
+            durations=durations,
+            method=exchange.query_balances,
+            ignore_cache=ignore_cache,
+        )) for exchange in self.exchange_manager.iterate_exchanges()]
+        blockchain_greenlet = gevent.spawn(
+            self._query_balances_source,
+            source='blockchain',
+            timeout=CHAIN_BALANCES_QUERY_TIMEOUT,
+            durations=durations,
+            method=self.chain_manager.query_balances,
+            blockchain=None,
+            beaconchain_fetch_eth1=ignore_cache,
+            ignore_cache=ignore_cache,
+        )
+        loopring_greenlet = None
+        # retrieve loopring balances if module is activated
+        if self.chain_manager.get_module('loopring'):
+            loopring_greenlet = gevent.spawn(
+                self._query_balances_source,
+                source='loopring',
+                timeout=CHAIN_BALANCES_QUERY_TIMEOUT,
+                durations=durations,
+                method=self.chain_manager.get_loopring_balances,
+            )
+        lp_and_nfts_greenlet = gevent.spawn(
+            self._query_lp_and_nft_balances,
+            durations=durations,
+        )
+        gevent.joinall([x[1] for x in exchange_greenlets] + [
+            x for x in (blockchain_greenlet, loopring_greenlet, lp_and_nfts_greenlet)
+            if x is not None
+        ])
+
         balances: Dict[str, Dict[Asset, Balance]] = {}
         problem_free = True
-        for exchange in self.exchange_manager.iterate_exchanges():
-            exchange_balances, error_msg = exchange.query_balances(ignore_cache=ignore_cache)
+        for exchange, greenlet in exchange_greenlets:
+            try:
+                exchange_balances, error_msg = greenlet.get()
+            except RemoteError as e:  # timed out
+                exchange_balances, error_msg = None, str(e)
             # If we got an error, disregard that exchange but make sure we don't save data
             if not isinstance(exchange_balances, dict):
                 problem_free = False
@@ -714,11 +855,7 @@ class Rotkehlchen():
 
         liabilities: Dict[Asset, Balance]
         try:
-            blockchain_result = self.chain_manager.query_balances(
-                blockchain=None,
-                beaconchain_fetch_eth1=ignore_cache,
-                ignore_cache=ignore_cache,
-            )
+            blockchain_result = blockchain_greenlet.get()
             if len(blockchain_result.totals.assets) != 0:
                 balances[str(Location.BLOCKCHAIN)] = blockchain_result.totals.assets
             liabilities = blockchain_result.totals.liabilities
@@ -740,10 +877,9 @@ class Rotkehlchen():
             manual_liabilities_as_dict[manual_liability.asset] += manual_liability.value
 
         liabilities = combine_dicts(liabilities, manual_liabilities_as_dict)
-        # retrieve loopring balances if module is activated
-        if self.chain_manager.get_module('loopring'):
+        if loopring_greenlet is not None:
             try:
-                loopring_balances = self.chain_manager.get_loopring_balances()
+                loopring_balances = loopring_greenlet.get()
             except RemoteError as e:
                 problem_free = False
                 self.msg_aggregator.add_message(
@@ -754,43 +890,14 @@ class Rotkehlchen():
                 if len(loopring_balances) != 0:
                     balances[str(Location.LOOPRING)] = loopring_balances
 
-        uniswap_v3_balances = None
-        try:
-            uniswap_v3_balances = self.chain_manager.query_ethereum_lp_balances(balances=balances)
-        except RemoteError as e:
-            log.error(
-                f'At balance snapshot LP balances query failed due to {str(e)}. Error '
-                f'is ignored and balance snapshot will still be saved.',
-            )
-
-        # retrieve nft balances if module is activated
-        nfts = self.chain_manager.get_module('nfts')
-        if nfts is not None:
-            try:
-                nft_mapping = nfts.get_balances(
-                    addresses=self.chain_manager.queried_addresses_for_module('nfts'),
-                    uniswap_nfts=uniswap_v3_balances,
-                    return_zero_values=False,
-                    ignore_cache=False,
-                )
-            except RemoteError as e:
-                log.error(
-                    f'At balance snapshot NFT balances query failed due to {str(e)}. Error '
-                    f'is ignored and balance snapshot will still be saved.',
-                )
-            else:
-                if len(nft_mapping) != 0:
-                    if str(Location.BLOCKCHAIN) not in balances:
-                        balances[str(Location.BLOCKCHAIN)] = {}
-
-                    for nft_balances in nft_mapping.values():
-                        for balance_entry in nft_balances:
-                            balances[str(Location.BLOCKCHAIN)][CryptoAsset(
-                                balance_entry['id'])] = Balance(
-                                amount=ONE,
-                                usd_value=balance_entry['usd_price'],
-                            )
+        # LP and NFT balances replace the blockchain balances of the same assets
+        lp_and_nft_balances = lp_and_nfts_greenlet.get()
+        if len(lp_and_nft_balances) != 0:
+            if str(Location.BLOCKCHAIN) not in balances:
+                balances[str(Location.BLOCKCHAIN)] = {}
+            balances[str(Location.BLOCKCHAIN)].update(lp_and_nft_balances)
 
+        log.debug('query_balances sources queried', durations=durations)
         balances = account_for_manually_tracked_asset_balances(db=self.data.db, balances=balances)
 
         # Calculate usd totals
@@ -845,7 +952,12 @@ class Rotkehlchen():
             if (problem_free or save_despite_errors) and allowed_to_save:
                 if not timestamp:
                     timestamp = Timestamp(int(time.time()))
-                self.data.db.save_balances_data(cursor, data=result_dict, timestamp=timestamp)
+                self.data.db.save_balances_data(
+                    write_cursor=cursor,
+                    data=result_dict,
+                    timestamp=timestamp,
+                    durations=durations,
+                )
                 log.debug('query_balances data saved')
             else:
                 log.debug(
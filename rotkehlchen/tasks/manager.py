@@ -251,7 +251,10 @@ class TaskManager():
         self.last_xpub_derivation_ts = now
 
     def _maybe_query_ethereum_transactions(self) -> None:
-        """Schedules the ethereum transaction query task if enough time has passed"""
+        """Schedules the ethereum transaction query task if enough time has passed.
+
+        A single task queries all the addresses that need it, a few at a time"""
+        transactions = self.eth_tx_decoder.transactions
         with self.database.conn.read_ctx() as cursor:
             accounts = self.database.get_blockchain_accounts(cursor).eth
             if len(accounts) == 0:
@@ -261,6 +264,8 @@ class TaskManager():
             dbethtx = DBEthTx(self.database)
             queriable_accounts = []
             for account in accounts:
+                if account in transactions.paused_addresses:
+                    continue
                 _, end_ts = dbethtx.get_queried_range(cursor, account)
                 if now - max(self.last_eth_tx_query_ts[account], end_ts) > ETH_TX_QUERY_FREQUENCY:
                     queriable_accounts.append(account)
@@ -268,19 +273,19 @@ class TaskManager():
         if len(queriable_accounts) == 0:
             return
 
-        address = random.choice(queriable_accounts)
-        task_name = f'Query ethereum transactions for {address}'
+        task_name = f'Query ethereum transactions for {len(queriable_accounts)} addresses'
         log.debug(f'Scheduling task to {task_name}')
         self.greenlet_manager.spawn_and_track(
             after_seconds=None,
             task_name=task_name,
             exception_is_error=True,
-            method=self.eth_tx_decoder.transactions.single_address_query_transactions,
-            address=address,
+            method=transactions.query_addresses_transactions,
+            addresses=queriable_accounts,
             start_ts=0,
             end_ts=now,
         )
-        self.last_eth_tx_query_ts[address] = now
+        for address in queriable_accounts:
+            self.last_eth_tx_query_ts[address] = now
 
     def _maybe_schedule_ethereum_txreceipts(self) -> None:
         """Schedules the ethereum transaction receipts query task
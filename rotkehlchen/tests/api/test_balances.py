@@ -14,6 +14,7 @@ from rotkehlchen.balances.manual import ManuallyTrackedBalance
 from rotkehlchen.chain.bitcoin import get_bitcoin_addresses_balances
 from rotkehlchen.constants.assets import A_BTC, A_DAI, A_ETH, A_EUR
 from rotkehlchen.constants.misc import ZERO
+from rotkehlchen.db.snapshots import DBSnapshot
 from rotkehlchen.errors.misc import RemoteError
 from rotkehlchen.fval import FVal
 from rotkehlchen.tests.utils.api import (
@@ -35,6 +36,7 @@ from rotkehlchen.tests.utils.blockchain import (
 from rotkehlchen.tests.utils.constants import A_RDN
 from rotkehlchen.tests.utils.exchanges import (
     assert_binance_balances_result,
+    patch_poloniex_balances_query,
     try_get_first_exchange,
 )
 from rotkehlchen.tests.utils.factories import UNIT_BTC_ADDRESS1, UNIT_BTC_ADDRESS2
@@ -203,6 +205,10 @@ def test_query_all_balances(
 
     with rotki.data.db.conn.read_ctx() as cursor:
         last_save_timestamp = rotki.data.db.get_last_balance_save_time(cursor)
+        durations = DBSnapshot.get_balance_snapshot_durations(cursor, last_save_timestamp)
+        # each source's query duration is saved with the snapshot
+        assert {'blockchain', 'liquidity pools', 'binance (binance)'}.issubset(durations)
+        assert all(x >= 0 for x in durations.values())
         # now do the same but check to see if the balance save frequency delay works
         # and thus data will not be saved
         with ExitStack() as stack:
@@ -529,6 +535,49 @@ def test_balance_snapshot_error_message(
     assert websocket_connection.messages_num() == 0
 
 
+@pytest.mark.parametrize('number_of_eth_accounts', [0])
+@pytest.mark.parametrize('btc_accounts', [[]])
+@pytest.mark.parametrize('added_exchanges', [(Location.BINANCE, Location.POLONIEX)])
+def test_balance_snapshot_source_timeout(
+        rotkehlchen_api_server_with_exchanges,
+        websocket_connection,
+):
+    """Test that a balances source that takes too long is reported as failed
+    without holding back the other sources"""
+    rotki = rotkehlchen_api_server_with_exchanges.rest_api.rotkehlchen
+    binance = try_get_first_exchange(rotki.exchange_manager, Location.BINANCE)
+    poloniex = try_get_first_exchange(rotki.exchange_manager, Location.POLONIEX)
+
+    def mock_slow_query_balances(**kwargs):  # pylint: disable=unused-argument
+        gevent.sleep(10)
+
+    binance_patch = patch.object(binance, 'query_balances', side_effect=mock_slow_query_balances)
+    timeout_patch = patch('rotkehlchen.rotkehlchen.EXCHANGE_BALANCES_QUERY_TIMEOUT', new=1)
+    with ExitStack() as stack:
+        stack.enter_context(binance_patch)
+        stack.enter_context(timeout_patch)
+        stack.enter_context(patch_poloniex_balances_query(poloniex))
+        response = requests.get(
+            api_url_for(
+                rotkehlchen_api_server_with_exchanges,
+                'allbalancesresource',
+            ),
+        )
+
+    result = assert_proper_response_with_result(response)
+    assert 'poloniex' in result['location']
+    assert 'binance' not in result['location']
+    websocket_connection.wait_until_messages_num(num=1, timeout=10)
+    msg = websocket_connection.pop_message()
+    assert msg == {
+        'type': 'balance_snapshot_error',
+        'data': {
+            'location': 'binance',
+            'error': 'Querying binance (binance) balances timed out after 1 seconds',
+        },
+    }
+
+
 @pytest.mark.parametrize('number_of_eth_accounts', [2])
 @pytest.mark.parametrize('btc_accounts', [[UNIT_BTC_ADDRESS1, UNIT_BTC_ADDRESS2]])
 @pytest.mark.parametrize('separate_blockchain_calls', [True, False])
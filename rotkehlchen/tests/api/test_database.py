@@ -159,3 +159,44 @@ def test_delete_download_backup_errors(rotkehlchen_api_server, data_dir, usernam
     )
     assert undeletable_file.exists()
     assert filepath.exists()
+
+
+def test_database_query_stats(rotkehlchen_api_server):
+    """Test that query statistics can be enabled, queried and cleared via the API"""
+    response = requests.put(
+        api_url_for(rotkehlchen_api_server, 'databasequeriesresource'),
+        json={'enabled': True, 'slow_query_threshold_ms': 10000},
+    )
+    result = assert_proper_response_with_result(response)
+    assert result['enabled'] is True
+    assert result['slow_query_threshold_ms'] == 10000
+
+    # do something that queries the DB
+    response = requests.get(api_url_for(rotkehlchen_api_server, 'databaseinforesource'))
+    assert_proper_response_with_result(response)
+    response = requests.get(api_url_for(rotkehlchen_api_server, 'databasequeriesresource'))
+    result = assert_proper_response_with_result(response)
+    assert result['recorded_queries'] > 0
+    assert all(x['count'] >= 1 for x in result['statements'])
+    assert result['slow_queries'] == []
+
+    response = requests.put(
+        api_url_for(rotkehlchen_api_server, 'databasequeriesresource'),
+        json={'enabled': False, 'slow_query_threshold_ms': 200},
+    )
+    result = assert_proper_response_with_result(response)
+    assert result['enabled'] is False
+    response = requests.delete(api_url_for(rotkehlchen_api_server, 'databasequeriesresource'))
+    assert_simple_ok_response(response)
+    response = requests.get(api_url_for(rotkehlchen_api_server, 'databasequeriesresource'))
+    assert assert_proper_response_with_result(response)['recorded_queries'] == 0
+
+    response = requests.put(
+        api_url_for(rotkehlchen_api_server, 'databasequeriesresource'),
+        json={'enabled': True, 'slow_query_threshold_ms': -1},
+    )
+    assert_error_response(
+        response=response,
+        contained_in_msg='Slow query threshold should be >= 0',
+        status_code=HTTPStatus.BAD_REQUEST,
+    )
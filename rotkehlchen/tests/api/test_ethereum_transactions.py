@@ -162,23 +162,24 @@ EXPECTED_4193_TXS = [{
 
 
 def assert_force_redecode_txns_works(api_server: APIServer, hashes: Optional[List[EVMTxHash]]):
+    """Check that force redecoding decodes all transactions while loading them and their
+    receipts in bulk, so once per batch and not once per transaction"""
     rotki = api_server.rest_api.rotkehlchen
     get_eth_txns_patch = patch.object(
         rotki.eth_tx_decoder.dbethtx,
         'get_ethereum_transactions',
         wraps=rotki.eth_tx_decoder.dbethtx.get_ethereum_transactions,
     )
-    get_or_decode_txn_events_patch = patch.object(
+    decode_events_patch = patch.object(
         rotki.eth_tx_decoder,
-        'get_or_decode_transaction_events',
-        wraps=rotki.eth_tx_decoder.get_or_decode_transaction_events,
+        '_decode_events',
+        wraps=rotki.eth_tx_decoder._decode_events,
     )
     get_or_query_txn_receipt_patch = patch('rotkehlchen.chain.ethereum.transactions.EthTransactions.get_or_query_transaction_receipt')  # noqa: 501
     with ExitStack() as stack:
-        function_call_counters = []
-        function_call_counters.append(stack.enter_context(get_or_decode_txn_events_patch))
-        function_call_counters.append(stack.enter_context(get_eth_txns_patch))
-        function_call_counters.append(stack.enter_context(get_or_query_txn_receipt_patch))
+        decode_events_mock = stack.enter_context(decode_events_patch)
+        get_eth_txns_mock = stack.enter_context(get_eth_txns_patch)
+        get_or_query_txn_receipt_mock = stack.enter_context(get_or_query_txn_receipt_patch)
 
         response = requests.post(
             api_url_for(
@@ -191,13 +192,9 @@ def assert_force_redecode_txns_works(api_server: APIServer, hashes: Optional[Lis
             },
         )
         assert_proper_response(response)
-        if hashes is None:
-            for fn in function_call_counters:
-                assert fn.call_count == 14
-        else:
-            txn_hashes_len = len(hashes)
-            for fn in function_call_counters:
-                assert fn.call_count == txn_hashes_len
+        assert decode_events_mock.call_count == (14 if hashes is None else len(hashes))
+        assert get_eth_txns_mock.call_count == 1
+        assert get_or_query_txn_receipt_mock.call_count == 0
 
 
 @pytest.mark.parametrize('ethereum_accounts', [[
@@ -1183,3 +1183,25 @@ def test_binance_query_pairs(rotkehlchen_api_server_with_exchanges):
     assert some_pairs.issubset(result)
     assert 'FTTBNB' not in result
     assert binance_pairs_num > binanceus_pairs_num
+
+
+def test_query_exchanges_rate_limits(rotkehlchen_api_server_with_exchanges):
+    """Test that the rate limit usage of the connected exchanges can be queried"""
+    rotki = rotkehlchen_api_server_with_exchanges.rest_api.rotkehlchen
+    binance = try_get_first_exchange(rotki.exchange_manager, Location.BINANCE)
+    binance.rate_limits.acquire(endpoint_class='api', cost=500)
+    binance.rate_limits.acquire(endpoint_class='sapi', cost=1)
+
+    response = requests.get(
+        api_url_for(rotkehlchen_api_server_with_exchanges, 'exchangesratelimitsresource'),
+    )
+    result = assert_proper_response_with_result(response)
+    assert len(result) == len(list(rotki.exchange_manager.iterate_exchanges()))
+    binance_result = next(x for x in result if x['location'] == 'binance')
+    assert binance_result['name'] == binance.name
+    endpoints = binance_result['endpoints']
+    assert endpoints['api']['requests'] == 1
+    assert endpoints['api']['capacity'] == 1000
+    assert 0.4 < endpoints['api']['utilization'] <= 0.5
+    assert endpoints['sapi']['requests'] == 1
+    assert endpoints['sapi']['utilization'] is None
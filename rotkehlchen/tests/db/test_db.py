@@ -15,6 +15,7 @@ from rotkehlchen.constants import ONE, YEAR_IN_SECONDS
 from rotkehlchen.constants.assets import A_1INCH, A_BTC, A_DAI, A_ETH, A_ETH2, A_USD
 from rotkehlchen.constants.misc import ZERO
 from rotkehlchen.data_handler import DataHandler
+from rotkehlchen.db.contract_call_cache import ContractCallCache
 from rotkehlchen.db.dbhandler import DBHandler
 from rotkehlchen.db.filtering import AssetMovementsFilterQuery, TradesFilterQuery
 from rotkehlchen.db.misc import detect_sqlcipher_version
@@ -67,6 +68,7 @@ from rotkehlchen.tests.utils.constants import (
     A_XMR,
     DEFAULT_TESTS_MAIN_CURRENCY,
 )
+from rotkehlchen.tests.utils.factories import make_ethereum_address
 from rotkehlchen.tests.utils.rotkehlchen import add_starting_balances, add_starting_nfts
 from rotkehlchen.types import (
     ApiKey,
@@ -74,6 +76,7 @@ from rotkehlchen.types import (
     AssetAmount,
     AssetMovementCategory,
     BlockchainAccountData,
+    ChainID,
     CostBasisMethod,
     ExternalService,
     ExternalServiceApiCredentials,
@@ -93,6 +96,7 @@ TABLES_AT_INIT = [
     'yearn_vaults_events',
     'timed_balances',
     'timed_location_data',
+    'balance_snapshot_durations',
     'asset_movement_category',
     'balance_category',
     'external_service_credentials',
@@ -1518,3 +1522,43 @@ def test_fresh_db_adds_version(user_data_dir, sql_vm_instructions_cb):
     query = query.fetchall()
     assert len(query) != 0
     assert int(query[0][0]) == ROTKEHLCHEN_DB_VERSION
+
+
+def test_contract_call_cache(database):
+    """Test that contract call results are cached per block in the transient user DB and
+    that the least recently used entries are evicted once the cache is full"""
+    cache = ContractCallCache(database, max_entries=10, max_bytes=100)
+    address = make_ethereum_address()
+    calldata = bytes.fromhex('06fdde03')
+    assert cache.get(ChainID.ETHEREUM, address, calldata, 100) is None
+    cache.set(ChainID.ETHEREUM, address, calldata, 100, b'\x01')
+    assert cache.get(ChainID.ETHEREUM, address, calldata, 100) == b'\x01'
+    # other blocks, contracts and chains are different entries
+    assert cache.get(ChainID.ETHEREUM, address, calldata, 101) is None
+    assert cache.get(ChainID.ETHEREUM, make_ethereum_address(), calldata, 100) is None
+    assert cache.get(ChainID.OPTIMISM, address, calldata, 100) is None
+
+    with database.transient_write() as write_cursor:  # make the first entry the oldest
+        write_cursor.execute('UPDATE contract_call_cache SET last_used_ts=1')
+    for block_number in range(101, 111):
+        cache.set(ChainID.ETHEREUM, address, calldata, block_number, b'\x02')
+
+    # went down to 90% of the max entries, starting from the least recently used
+    assert cache.get(ChainID.ETHEREUM, address, calldata, 100) is None
+    with database.conn_transient.read_ctx() as cursor:
+        entries = cursor.execute('SELECT COUNT(*) FROM contract_call_cache').fetchone()[0]
+    assert entries == cache.entries == 9
+    assert cache.size == 9 * 5
+
+    # a big result pushes the size over the max bytes and the least recently used
+    # entries are evicted until the size is down to 90% of the max bytes
+    with database.transient_write() as write_cursor:
+        write_cursor.execute('UPDATE contract_call_cache SET last_used_ts=1')
+    cache.set(ChainID.ETHEREUM, address, calldata, 200, b'\x03' * 60)
+    assert cache.get(ChainID.ETHEREUM, address, calldata, 200) == b'\x03' * 60
+    with database.conn_transient.read_ctx() as cursor:
+        entries, size = cursor.execute(
+            'SELECT COUNT(*), SUM(LENGTH(calldata) + LENGTH(result)) FROM contract_call_cache',
+        ).fetchone()
+    assert entries == cache.entries == 6
+    assert size == cache.size == 64 + 5 * 5
@@ -8,6 +8,7 @@ from rotkehlchen.tests.utils.constants import (
     ETH_ADDRESS3,
     MOCK_INPUT_DATA,
 )
+from rotkehlchen.tests.utils.ethereum import setup_ethereum_transactions_test, txreceipt_to_data
 from rotkehlchen.tests.utils.factories import make_ethereum_address
 from rotkehlchen.types import (
     BlockchainAccountData,
@@ -284,3 +285,35 @@ def test_query_also_internal_ethereum_transactions(data_dir, username, sql_vm_in
             has_premium=True,
         )
         assert result == [tx1, tx3, tx4]
+
+
+def test_get_receipts_and_transactions_in_bulk(database):
+    """Test that transactions and receipts of many hashes are loaded in bulk as
+    they are when loaded one by one"""
+    transactions, receipts = setup_ethereum_transactions_test(
+        database=database,
+        transaction_already_queried=True,
+        one_receipt_in_db=True,
+    )
+    dbethtx = DBEthTx(database)
+    tx_hashes = [x.tx_hash for x in transactions]
+    with database.conn.read_ctx() as cursor:
+        result = dbethtx.get_receipts(cursor, tx_hashes)
+        assert list(result.values()) == [receipts[0]]  # only the first is in the DB
+
+    with database.user_write() as cursor:
+        dbethtx.add_receipt_data(cursor, txreceipt_to_data(receipts[1]))
+
+    with database.conn.read_ctx() as cursor:
+        result = dbethtx.get_receipts(cursor, tx_hashes)
+        assert result == {x.tx_hash: dbethtx.get_receipt(cursor, x.tx_hash) for x in receipts}
+        assert result[tx_hashes[0]] == receipts[0]
+        assert result[tx_hashes[1]] == receipts[1]
+        assert dbethtx.get_receipts(cursor, []) == {}
+
+        result_txs = dbethtx.get_ethereum_transactions(
+            cursor=cursor,
+            filter_=ETHTransactionsFilterQuery.make(tx_hashes=tx_hashes),
+            has_premium=True,
+        )
+        assert set(result_txs) == set(transactions)
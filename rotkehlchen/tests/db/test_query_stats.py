@@ -0,0 +1,55 @@
+import pytest
+
+from rotkehlchen.db.drivers.gevent import DBConnection, DBConnectionType
+from rotkehlchen.db.drivers.query_stats import QUERY_STATS, normalize_statement
+
+
+@pytest.fixture(name='query_stats')
+def fixture_query_stats():
+    QUERY_STATS.reset()
+    QUERY_STATS.configure(enabled=True, slow_query_threshold_ms=0)
+    yield QUERY_STATS
+    QUERY_STATS.configure(enabled=False, slow_query_threshold_ms=200)
+    QUERY_STATS.reset()
+
+
+def test_normalize_statement():
+    assert normalize_statement(
+        "SELECT *  FROM a\n WHERE b='x''y' AND c=42 AND d IN (?, ?,?)",
+    ) == 'SELECT * FROM a WHERE b=? AND c=? AND d IN (?,...)'
+    assert normalize_statement('SELECT * FROM a WHERE d IN (?)') == 'SELECT * FROM a WHERE d IN (?)'  # noqa: E501
+
+
+def test_query_stats(query_stats):
+    conn = DBConnection(
+        path=':memory:',
+        connection_type=DBConnectionType.GLOBAL,
+        sql_vm_instructions_cb=10,
+    )
+    conn.execute('CREATE TABLE a(b INTEGER PRIMARY KEY, c TEXT)')
+    with conn.write_ctx() as write_cursor:
+        write_cursor.executemany('INSERT INTO a VALUES (?, ?)', [(x, str(x)) for x in range(100)])
+        for value in (1, 5):
+            write_cursor.execute(f'SELECT * FROM a WHERE b >= {value}')
+            assert len(write_cursor.fetchmany(10)) == 10
+        result = list(write_cursor.execute('SELECT * FROM a WHERE c=?', ('5',)))
+        assert result == [(5, '5')]
+
+    stats = query_stats.get_stats()
+    assert stats['enabled'] is True
+    statements = {x['statement']: x for x in stats['statements']}
+    assert statements['INSERT INTO a VALUES (?,...)']['rows'] == 100
+    assert statements['SELECT * FROM a WHERE b >= ?']['count'] == 2
+    assert statements['SELECT * FROM a WHERE b >= ?']['rows'] == 20
+    assert statements['SELECT * FROM a WHERE c=?']['rows'] == 1
+    # with a 0ms threshold everything is slow and explainable queries get their plan
+    slow = {x['statement']: x for x in stats['slow_queries']}
+    assert any('SCAN' in x for x in slow['SELECT * FROM a WHERE c=?']['query_plan'])
+    assert slow['CREATE TABLE a(b INTEGER PRIMARY KEY, c TEXT)']['query_plan'] == []
+
+    query_stats.configure(enabled=False)
+    conn.execute('SELECT * FROM a').fetchall()
+    assert query_stats.get_stats()['recorded_queries'] == stats['recorded_queries']
+    query_stats.reset()
+    assert query_stats.get_stats()['statements'] == []
+    conn.close()
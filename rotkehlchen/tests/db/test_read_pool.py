@@ -0,0 +1,76 @@
+import gevent
+
+from rotkehlchen.db.drivers.gevent import DBConnection, DBConnectionType
+
+
+def _make_connection(path, pool_size=2):
+    conn = DBConnection(
+        path=path,
+        connection_type=DBConnectionType.GLOBAL,
+        sql_vm_instructions_cb=10,
+    )
+    conn.execute('CREATE TABLE a(b INTEGER PRIMARY KEY)')
+    conn.commit()
+    conn.enable_read_pool(size=pool_size)
+    return conn
+
+
+def _read_all(conn):
+    with conn.read_ctx() as cursor:
+        return cursor.execute('SELECT b FROM a').fetchall()
+
+
+def test_read_pool(tmpdir):
+    """Test that reads are served by the pool and see all committed writes while
+    a greenlet with uncommitted writes can read them"""
+    conn = _make_connection(tmpdir / 'test.db')
+    assert conn.read_pool is not None
+    assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+
+    with conn.write_ctx() as write_cursor:
+        write_cursor.execute('INSERT INTO a VALUES (1)')
+        # uncommitted writes are visible to the writing greenlet ...
+        assert _read_all(conn) == [(1,)]
+        # ... but not to others which read from the pool
+        assert gevent.spawn(_read_all, conn).get() == []
+
+    assert _read_all(conn) == [(1,)]
+    assert conn.read_in_thread(lambda cursor: cursor.execute('SELECT COUNT(*) FROM a').fetchone()[0]) == 1  # noqa: E501
+
+    stats = conn.read_pool.get_stats()
+    assert stats['size'] == 2
+    assert stats['available'] == 2
+    assert stats['checkouts'] == 3
+    conn.close()
+    assert conn.read_pool is None
+
+
+def test_read_pool_waits_for_free_connection(tmpdir):
+    conn = _make_connection(tmpdir / 'test.db', pool_size=1)
+    with conn.write_ctx() as write_cursor:
+        write_cursor.executemany('INSERT INTO a VALUES (?)', [(x,) for x in range(1000)])
+
+    def read():
+        with conn.read_ctx() as cursor:
+            result = cursor.execute('SELECT COUNT(*) FROM a a1, a a2').fetchone()[0]
+            gevent.sleep(0.01)
+            return result
+
+    greenlets = [gevent.spawn(read) for _ in range(3)]
+    assert [x.get() for x in greenlets] == [1000000] * 3
+    stats = conn.read_pool.get_stats()
+    assert stats['checkouts'] == 3
+    assert stats['waited_checkouts'] == 2
+    assert stats['max_wait_ms'] > 0
+    conn.close()
+
+
+def test_read_pool_not_enabled_in_memory():
+    conn = DBConnection(
+        path=':memory:',
+        connection_type=DBConnectionType.GLOBAL,
+        sql_vm_instructions_cb=0,
+    )
+    assert conn.enable_read_pool(size=2) is False
+    assert conn.read_pool is None
+    conn.close()
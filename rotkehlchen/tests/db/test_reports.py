@@ -1,7 +1,22 @@
-from rotkehlchen.accounting.pnl import PnlTotals
-from rotkehlchen.db.reports import DBAccountingReports
+import io
+from pathlib import Path
+from zipfile import ZipFile
+
+import pytest
+
+from rotkehlchen.accounting.export.csv import FILENAME_ALL_CSV, CSVExporter
+from rotkehlchen.accounting.mixins.event import AccountingEventType
+from rotkehlchen.accounting.pnl import PNL, PnlTotals
+from rotkehlchen.accounting.structures.processed_event import ProcessedAccountingEvent
+from rotkehlchen.constants.assets import A_ETH
+from rotkehlchen.constants.misc import ONE, ZERO
+from rotkehlchen.db.filtering import ReportDataFilterQuery
+from rotkehlchen.db.reports import DBAccountingReports, ReportDataWriter
 from rotkehlchen.db.settings import DBSettings
+from rotkehlchen.errors.misc import InputError
+from rotkehlchen.fval import FVal
 from rotkehlchen.tests.utils.constants import A_GBP
+from rotkehlchen.types import Location, Price, Timestamp
 
 
 def test_report_settings(database):
@@ -55,3 +70,103 @@ def test_report_settings(database):
         else:
             value = getattr(settings, setting_name)
         assert returned_settings[x] == value
+
+
+def test_report_data_writer(database):
+    """Test that processed events are written in chunks and that flushing writes the rest"""
+    dbreport = DBAccountingReports(database)
+    report_id = dbreport.add_report(
+        first_processed_timestamp=1,
+        start_ts=1,
+        end_ts=10,
+        settings=DBSettings(),
+    )
+    writer = ReportDataWriter(database=database, ts_converter=str, chunk_size=3)
+    writer.reset(report_id=report_id)
+
+    def count_events():
+        _, entries_num = dbreport.get_report_data(
+            filter_=ReportDataFilterQuery.make(report_id=report_id),
+            with_limit=False,
+        )
+        return entries_num
+
+    for idx in range(1, 8):
+        writer.add(ProcessedAccountingEvent(
+            type=AccountingEventType.TRADE,
+            notes=f'trade {idx}',
+            location=Location.KRAKEN,
+            timestamp=Timestamp(idx),
+            asset=A_ETH,
+            free_amount=ZERO,
+            taxable_amount=ONE,
+            price=Price(FVal(idx)),
+            pnl=PNL(taxable=ONE, free=ZERO),
+            cost_basis=None,
+            index=idx,
+        ))
+        assert count_events() == idx // 3 * 3
+
+    writer.flush()
+    assert count_events() == 7
+    stats = writer.get_stats()
+    assert stats['written_events'] == 7
+    assert stats['flushes'] == 3
+
+    # a chunk for a non existing report is not written at all
+    writer.reset(report_id=report_id + 1)
+    writer.rows = [(report_id + 1, Timestamp(1), '{}'), (report_id + 1, Timestamp(2), '{}')]
+    with pytest.raises(InputError):
+        writer.flush()
+    assert writer.rows == []
+    assert writer.get_stats()['written_events'] == 0
+
+
+def test_stream_report_export(database, tmpdir):
+    """Test that a report's events are read from the DB in chunks and that the
+    streamed zip has the same CSV as the file export, with the summary computed
+    from the events"""
+    dbreport = DBAccountingReports(database)
+    report_id = dbreport.add_report(
+        first_processed_timestamp=1,
+        start_ts=1,
+        end_ts=10,
+        settings=DBSettings(),
+    )
+    events = [ProcessedAccountingEvent(
+        type=AccountingEventType.TRADE,
+        notes=f'trade {idx}',
+        location=Location.KRAKEN,
+        timestamp=Timestamp(idx),
+        asset=A_ETH,
+        free_amount=ZERO,
+        taxable_amount=ONE,
+        price=Price(FVal(idx)),
+        pnl=PNL(taxable=FVal(idx), free=ZERO),
+        cost_basis=None,
+        index=idx,
+    ) for idx in range(7)]
+    dbreport.add_report_data_rows(
+        report_id=report_id,
+        rows=[(report_id, x.timestamp, x.serialize_for_db(str)) for x in events],
+    )
+
+    read_events = list(dbreport.iter_report_events(report_id=report_id, chunk_size=2))
+    assert [x.notes for x in read_events] == [x.notes for x in events]
+    with pytest.raises(InputError):
+        dbreport.iter_report_events(report_id=report_id + 1)
+
+    exporter = CSVExporter(database)
+    exporter.settings = exporter.settings._replace(pnl_csv_have_summary=True)
+    pnls = PnlTotals()
+    pnls[AccountingEventType.TRADE] = PNL(taxable=FVal(21), free=ZERO)
+    success, _ = exporter.export(events=events, pnls=pnls, directory=Path(tmpdir))
+    assert success is True
+    with open(Path(tmpdir) / FILENAME_ALL_CSV, 'rb') as f:
+        expected_csv = f.read()
+
+    zip_data = b''.join(exporter.stream_zip(
+        events=dbreport.iter_report_events(report_id=report_id, chunk_size=2),
+    ))
+    with ZipFile(io.BytesIO(zip_data)) as csv_zip:
+        assert csv_zip.read(FILENAME_ALL_CSV) == expected_csv
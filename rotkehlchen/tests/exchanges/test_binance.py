@@ -20,6 +20,7 @@ from rotkehlchen.errors.misc import RemoteError
 from rotkehlchen.exchanges.binance import (
     API_TIME_INTERVAL_CONSTRAINT_TS,
     BINANCE_LAUNCH_TS,
+    REQUEST_WEIGHT_BUDGET,
     RETRY_AFTER_LIMIT,
     Binance,
     trade_from_binance,
@@ -280,6 +281,92 @@ def test_binance_query_trade_history(function_scope_binance):
     assert trades == expected_trades
 
 
+def test_binance_query_trade_history_from_last_trade_id(function_scope_binance):
+    """Test that markets are queried again from the id after their last seen trade
+    and that the id is only saved together with the trades"""
+    binance = function_scope_binance
+    from_ids = {}
+
+    def mock_my_trades(url, **kwargs):  # pylint: disable=unused-argument
+        if 'fiat/payments' in url:
+            return MockResponse(200, '[]')
+
+        symbol = re.search(r'symbol=([A-Z]*)', url).group(1)
+        from_ids[symbol] = int(re.search(r'fromId=([0-9]*)', url).group(1))
+        text = BINANCE_MYTRADES_RESPONSE if symbol == 'BNBBTC' else '[]'
+        return MockResponse(200, text)
+
+    def get_state():
+        return binance.db.get_binance_trades_query_state(
+            name=binance.name,
+            location=binance.location,
+        )
+
+    with patch.object(binance.session, 'get', side_effect=mock_my_trades):
+        # if saving the trades fails the trade ids after them should not be saved
+        with patch.object(binance.db, 'add_trades', side_effect=ValueError):
+            with pytest.raises(ValueError):
+                binance.query_trade_history(start_ts=0, end_ts=1638529919, only_cache=False)
+        assert get_state() == {}
+
+        trades = binance.query_trade_history(start_ts=0, end_ts=1638529919, only_cache=False)
+        assert len(trades) == 1
+        assert from_ids['BNBBTC'] == 0
+        assert get_state()['cursors']['BNBBTC'] == 28458
+
+        from_ids = {}
+        binance.query_trade_history(start_ts=0, end_ts=1638529999, only_cache=False)
+
+    assert from_ids['BNBBTC'] == 28458
+
+
+def test_binance_query_trade_history_earlier_range_after_later(function_scope_binance):
+    """Test that trades before the start of a query whose market cursor moves past
+    them are still returned when a query of an earlier range follows"""
+    binance = function_scope_binance
+
+    def mock_my_trades(url, **kwargs):  # pylint: disable=unused-argument
+        if 'fiat/payments' in url:
+            return MockResponse(200, '[]')
+
+        from_id = int(re.search(r'fromId=([0-9]*)', url).group(1))
+        if 'symbol=BNBBTC' in url and from_id <= 28457:
+            return MockResponse(200, BINANCE_MYTRADES_RESPONSE)
+        return MockResponse(200, '[]')
+
+    with patch.object(binance.session, 'get', side_effect=mock_my_trades):
+        # the only trade is at 1499865549, before this query's range
+        trades = binance.query_trade_history(
+            start_ts=1500000000,
+            end_ts=1638529919,
+            only_cache=False,
+        )
+        assert trades == []
+        trades = binance.query_trade_history(start_ts=0, end_ts=1638529919, only_cache=False)
+
+    assert len(trades) == 1
+    assert trades[0].timestamp == 1499865549
+
+
+def test_binance_rate_limits_follow_used_weight_header(function_scope_binance):
+    """Test that the request weight of the api endpoints is rate limited and that
+    the weight binance reports as used is taken into account"""
+    binance = function_scope_binance
+
+    def mock_send(request, **kwargs):  # pylint: disable=unused-argument
+        return MockResponse(200, '[]', headers={'x-mbx-used-weight-1m': '900'})
+
+    with patch.object(binance.session, 'send', side_effect=mock_send):
+        binance.api_query_list('api', 'myTrades', options={'symbol': 'BNBBTC', 'fromId': 0})
+
+    endpoints = binance.rate_limits.serialize()
+    assert endpoints['api']['requests'] == 1
+    assert endpoints['api']['capacity'] == REQUEST_WEIGHT_BUDGET
+    # binance reported 900 used out of our budget of 1000
+    assert binance.rate_limits.buckets['api'].available() < REQUEST_WEIGHT_BUDGET - 880
+    assert endpoints['api']['utilization'] > 0.85
+
+
 def test_binance_query_trade_history_unexpected_data(function_scope_binance):
     """Test that turning a binance trade that contains unexpected data is handled gracefully"""
     binance = function_scope_binance
@@ -67,6 +67,7 @@ def _initialize_fixture_globaldb(
     # clean the previous resolver memory cache, as it
     # may have cached results from a discarded database
     AssetResolver().clean_memory_cache()
+    AssetResolver().clear_owned_assets()
     root_dir = Path(__file__).resolve().parent.parent.parent
     if globaldb_version is None:  # no specific version -- normal test
         source_db_path = root_dir / 'data' / 'global.db'
@@ -0,0 +1,125 @@
+from dataclasses import replace
+
+from unittest.mock import patch
+
+import pytest
+
+from rotkehlchen.accounting.checkpoints import settings_fingerprint
+from rotkehlchen.constants.assets import A_BTC, A_ETH
+from rotkehlchen.db.reports import DBAccountingReports
+from rotkehlchen.errors.price import NoPriceForGivenTimestamp
+from rotkehlchen.fval import FVal
+from rotkehlchen.tests.utils.accounting import accounting_history_process, history1
+from rotkehlchen.tests.utils.history import prices
+from rotkehlchen.tests.utils.messages import no_message_errors
+from rotkehlchen.types import AssetAmount, Timestamp
+
+
+def _get_checkpoints(accountant, start_ts):
+    with accountant.db.conn.read_ctx() as cursor:
+        settings_hash = settings_fingerprint(
+            settings=accountant.db.get_settings(cursor),
+            ignored_assets=accountant.db.get_ignored_assets(cursor),
+        )
+    dbpnl = DBAccountingReports(accountant.db)
+    return dbpnl.get_checkpoints(settings_hash=settings_hash, to_ts=start_ts)
+
+
+def _get_processed_events(accountant, report_id):
+    """The processed events of the report both in memory and in the DB"""
+    pot = accountant.pots[0]
+    dbpnl = DBAccountingReports(accountant.db)
+    events = [x.serialize_to_dict(pot.timestamp_to_date) for x in pot.processed_events]
+    report_events = [
+        x.serialize_to_dict(pot.timestamp_to_date)
+        for x in dbpnl.iter_report_events(report_id=report_id)
+    ]
+    assert events == report_events
+    return events
+
+
+def _process_history(accountant, start_ts, end_ts, history):
+    """Processes the history and returns the report and the index of the first
+    event that got processed"""
+    indices = []
+    process_event = accountant._process_event
+
+    def mock_process_event(events_iterator, **kwargs):
+        indices.append(events_iterator.index)
+        return process_event(events_iterator=events_iterator, **kwargs)
+
+    with patch.object(accountant, '_process_event', side_effect=mock_process_event):
+        report, _ = accounting_history_process(accountant, start_ts, end_ts, history)
+    return report, indices[0]
+
+
+@pytest.mark.parametrize('mocked_price_queries', [prices])
+def test_resume_from_checkpoint(accountant):
+    """Test that a report resumed from a checkpoint gives the same results as a full
+    run and that checkpoints get invalidated when the history before them changes"""
+    start_ts, end_ts = Timestamp(1474000000), Timestamp(1495751688)
+    report, _ = accounting_history_process(accountant, start_ts, end_ts, history1)
+    no_message_errors(accountant.msg_aggregator)
+    full_pnls = dict(accountant.pots[0].pnls.totals)
+    eth_amount = accountant.pots[0].cost_basis.get_calculated_asset_amount(A_ETH)
+    full_events = _get_processed_events(accountant, report['identifier'])
+
+    checkpoints = _get_checkpoints(accountant, start_ts)
+    assert [x.processed_events for x in checkpoints] == [2, 3]
+    assert checkpoints[-1].timestamp == start_ts
+    old_hashes = [x.events_hash for x in checkpoints]
+
+    # run again. Should resume after the first 3 events and give the same report
+    resumed_report, first_index = _process_history(accountant, start_ts, end_ts, history1)
+    no_message_errors(accountant.msg_aggregator)
+    assert first_index == 3
+    assert dict(accountant.pots[0].pnls.totals) == full_pnls
+    assert accountant.pots[0].cost_basis.get_calculated_asset_amount(A_ETH) == eth_amount
+    assert _get_processed_events(accountant, resumed_report['identifier']) == full_events
+
+    # the checkpoints copy their events from the first report. If it's deleted they
+    # can't be used and the history is processed from the start
+    DBAccountingReports(accountant.db).purge_report_data(report['identifier'])
+    report, first_index = _process_history(accountant, start_ts, end_ts, history1)
+    no_message_errors(accountant.msg_aggregator)
+    assert first_index == 0
+    assert dict(accountant.pots[0].pnls.totals) == full_pnls
+    assert _get_processed_events(accountant, report['identifier']) == full_events
+
+    # edit an event before the latest checkpoint. It should no longer be used
+    history = history1.copy()
+    history[2] = replace(history[2], amount=AssetAmount(FVal(49)))
+    accounting_history_process(accountant, start_ts, end_ts, history)
+    no_message_errors(accountant.msg_aggregator)
+    assert accountant.pots[0].cost_basis.get_calculated_asset_amount(A_ETH) == eth_amount - 1
+    assert accountant.pots[0].cost_basis.get_calculated_asset_amount(A_BTC) is not None
+    checkpoints = _get_checkpoints(accountant, start_ts)
+    assert [x.processed_events for x in checkpoints] == [2, 3]
+    assert checkpoints[0].events_hash == old_hashes[0]
+    assert checkpoints[1].events_hash != old_hashes[1]
+
+
+@pytest.mark.parametrize('mocked_price_queries', [prices])
+def test_no_checkpoint_after_missing_price(accountant):
+    """Test that no checkpoint is taken after an event whose price is missing, since
+    the price may be added later without invalidating the checkpoint"""
+    start_ts, end_ts = Timestamp(1474000000), Timestamp(1495751688)
+    process_event = accountant._process_event
+
+    def mock_process_event(events_iterator, **kwargs):
+        if events_iterator.peek_timestamp() == history1[2].timestamp:
+            event = next(events_iterator)
+            raise NoPriceForGivenTimestamp(
+                from_asset=A_ETH,
+                to_asset=accountant.pots[0].profit_currency,
+                time=event.get_timestamp(),
+            )
+        return process_event(events_iterator=events_iterator, **kwargs)
+
+    with patch.object(accountant, '_process_event', side_effect=mock_process_event):
+        accounting_history_process(accountant, start_ts, end_ts, history1)
+
+    assert len(accountant.pots[0].cost_basis.missing_prices) == 1
+    # only the checkpoint before the event with the missing price is taken
+    checkpoints = _get_checkpoints(accountant, start_ts)
+    assert [x.processed_events for x in checkpoints] == [2]
@@ -624,3 +624,59 @@ def test_symbol_or_name(database):
     assert Asset('xyz').symbol_or_name() == 'custom name'
     with pytest.raises(UnknownAsset):
         Asset('i-dont-exist').symbol_or_name()
+
+
+def test_resolve_many(globaldb):  # pylint: disable=unused-argument
+    """Test that many assets are resolved in bulk and then served from the cache"""
+    resolver = AssetResolver()
+    resolver.clean_memory_cache()
+    hits, misses = resolver.hits, resolver.misses
+    identifiers = ['ETH', 'BTC', A_DAI.identifier, '_nft_foo', 'NOT_EXISTING_ASSET']
+    result = resolver.resolve_many(identifiers)
+    assert resolver.misses == misses + 5
+    assert resolver.hits == hits
+    assert result.keys() == set(identifiers) - {'NOT_EXISTING_ASSET'}
+    assert isinstance(result['BTC'], CryptoAsset)
+    assert result['BTC'].name == 'Bitcoin'
+    assert isinstance(result[A_DAI.identifier], EvmToken)
+    assert result[A_DAI.identifier].decimals == 18
+    assert isinstance(result['_nft_foo'], Nft)
+
+    assert resolver.resolve_many(['ETH', 'eth', 'BTC']).keys() == {'ETH', 'eth', 'BTC'}
+    assert resolver.hits == hits + 3
+    assert resolver.misses == misses + 5
+
+
+def test_owned_assets_cache(globaldb):
+    """Test that owned assets survive the eviction of the first tier cache and that
+    editing an owned asset invalidates it"""
+    resolver = AssetResolver()
+    resolver.clean_memory_cache()
+    resolver.warm_owned_assets(identifiers=['ETH', A_DAI.identifier, 'BTC'], max_size=2)
+    assert resolver.get_stats()['cached_owned_assets'] == 2
+
+    resolver.assets_cache.clear()
+    resolver.types_cache.clear()
+    misses = resolver.misses
+    assert CryptoAsset('ETH').name == 'Ethereum'
+    assert EvmToken(A_DAI.identifier).symbol == 'DAI'
+    assert Asset('ETH').is_fiat() is False
+    assert resolver.misses == misses
+
+    eth = CryptoAsset('ETH')
+    globaldb.edit_user_asset({
+        'identifier': 'ETH',
+        'name': 'Ether',
+        'symbol': eth.symbol,
+        'asset_type': eth.asset_type,
+        'coingecko': eth.coingecko,
+        'cryptocompare': eth.cryptocompare,
+        'started': eth.started,
+    })
+    assert 'eth' not in resolver.owned_assets_cache
+    assert CryptoAsset('ETH').name == 'Ether'
+    assert resolver.misses == misses + 1
+    assert resolver.owned_assets_cache['eth'].name == 'Ether'  # back in the second tier
+
+    resolver.clear_owned_assets()
+    assert resolver.get_stats()['cached_owned_assets'] == 0
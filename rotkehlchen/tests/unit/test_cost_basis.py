@@ -1,11 +1,12 @@
 import pytest
 
 from rotkehlchen.accounting.cost_basis import AssetAcquisitionEvent
+from rotkehlchen.accounting.cost_basis.base import CostBasisCalculator
 from rotkehlchen.accounting.types import MissingAcquisition
 from rotkehlchen.constants.assets import A_BTC, A_ETH, A_WETH
 from rotkehlchen.constants.misc import ONE, ZERO
 from rotkehlchen.db.settings import DBSettings
-from rotkehlchen.fval import FVal
+from rotkehlchen.fval import FixedFVal, FVal
 from rotkehlchen.types import CostBasisMethod
 
 
@@ -517,6 +518,49 @@ def test_accounting_lifo_order(accountant):
     ]
 
 
+@pytest.mark.parametrize('accounting_initialize_parameters', [True])
+@pytest.mark.parametrize('cost_basis_method', [CostBasisMethod.HIFO, CostBasisMethod.LOFO])
+def test_accounting_sorted_order(accountant, cost_basis_method):
+    """Test that HIFO and LOFO use the acquisitions by rate and in insertion order
+    for equal rates, also after partially consuming one and restoring the state"""
+    cost_basis = accountant.pots[0].cost_basis
+    cost_basis.reset(DBSettings(cost_basis_method=cost_basis_method))
+    asset_events = cost_basis.get_events(A_ETH)
+    events = [
+        AssetAcquisitionEvent(amount=ONE, timestamp=idx, rate=FVal(rate), index=idx)
+        for idx, rate in enumerate((2, 5, 1, 5), start=1)
+    ]
+    for event in events:
+        asset_events.acquisitions_manager.add_acquisition(event)
+
+    if cost_basis_method == CostBasisMethod.HIFO:
+        expected_order = [events[1], events[3], events[0], events[2]]
+        expected_cost = FVal('7.5')
+    else:
+        expected_order = [events[2], events[0], events[1], events[3]]
+        expected_cost = FVal(2)
+    assert list(asset_events.acquisitions_manager.get_acquisitions()) == expected_order
+
+    cost_basis_info = cost_basis.calculate_spend_cost_basis(
+        spending_amount=FVal('1.5'),
+        spending_asset=A_ETH,
+        timestamp=5,
+    )
+    assert cost_basis_info.is_complete is True
+    assert cost_basis_info.taxable_bought_cost == expected_cost
+    acquisitions = asset_events.acquisitions_manager.get_acquisitions()
+    assert list(acquisitions) == expected_order[1:]
+    assert acquisitions[0].remaining_amount == FVal('0.5')
+
+    state = cost_basis.serialize_state()
+    cost_basis.reset(DBSettings(cost_basis_method=cost_basis_method))
+    cost_basis.restore_state(state)
+    restored = cost_basis.get_events(A_ETH).acquisitions_manager.get_acquisitions()
+    assert [(x.index, x.remaining_amount) for x in restored] == [(x.index, x.remaining_amount) for x in acquisitions]  # noqa: E501
+    assert cost_basis.reduce_asset_amount(A_ETH, FVal('2.5'), 6) is True
+    assert len(cost_basis.get_events(A_ETH).acquisitions_manager) == 0
+
+
 def test_missing_acquisitions(accountant):
     """Test that missing acquisitions are added properly by
     reduce_asset_amount and calculate_spend_cost_basis
@@ -580,3 +624,46 @@ def test_missing_acquisitions(accountant):
         time=4,
     ))
     assert cost_basis.missing_acquisitions == expected_missing_acquisitions
+
+
+def test_fixed_point_cost_basis(accountant):
+    """Test that the fixed point cost basis calculation gives the same results as
+    the default one and that the results are always returned as FVal"""
+    results = []
+    for fixed_point in (False, True):
+        cost_basis = CostBasisCalculator(
+            database=accountant.db,
+            msg_aggregator=accountant.msg_aggregator,
+            fixed_point=fixed_point,
+        )
+        number = FixedFVal if fixed_point else FVal
+        asset_events = cost_basis.get_events(A_BTC)
+        for idx, (amount, rate) in enumerate((('0.5', '268.1'), ('1.25', '612.45'), ('3', '603.415'))):  # noqa: E501
+            asset_events.acquisitions_manager.add_acquisition(
+                AssetAcquisitionEvent(
+                    amount=number(amount),
+                    timestamp=1446979735 + idx,
+                    rate=number(rate),
+                    index=idx,
+                ),
+            )
+
+        assert cost_basis.reduce_asset_amount(asset=A_BTC, amount=FVal('0.2'), timestamp=0)
+        cinfo = cost_basis.calculate_spend_cost_basis(
+            spending_amount=FVal('5.1'),
+            spending_asset=A_BTC,
+            timestamp=1480683904,
+        )
+        for value in (
+            cinfo.taxable_amount,
+            cinfo.taxable_bought_cost,
+            cinfo.taxfree_bought_cost,
+            *(x.amount for x in cinfo.matched_acquisitions),
+            *(getattr(x, attr) for x in cost_basis.missing_acquisitions for attr in ('found_amount', 'missing_amount')),  # noqa: E501
+        ):
+            assert isinstance(value, FVal)
+        results.append((cinfo, cost_basis.missing_acquisitions))
+
+    assert results[0] == results[1]
+    assert results[0][0].is_complete is False
+    assert results[0][1][0].missing_amount == FVal('0.55')
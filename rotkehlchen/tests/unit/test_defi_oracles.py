@@ -4,12 +4,15 @@ import pytest
 
 from rotkehlchen.assets.asset import Asset, EvmToken
 from rotkehlchen.assets.resolver import AssetResolver
+from rotkehlchen.chain.ethereum.constants import ZERO_ADDRESS
+from rotkehlchen.chain.ethereum.oracles.uniswap import UniswapV2Oracle, sort_tokens
 from rotkehlchen.constants.assets import A_1INCH, A_BTC, A_DOGE, A_ETH, A_LINK, A_USDC, A_WETH
 from rotkehlchen.constants.misc import ONE, ZERO
 from rotkehlchen.errors.defi import DefiPoolError
 from rotkehlchen.errors.price import PriceQueryUnsupportedAsset
 from rotkehlchen.fval import FVal
 from rotkehlchen.inquirer import CurrentPriceOracle
+from rotkehlchen.tests.utils.factories import make_ethereum_address
 from rotkehlchen.types import Price
 
 
@@ -102,3 +105,32 @@ def test_uniswap_no_decimals(inquirer_defi):
             inquirer_defi._uniswapv2.query_current_price(weth, A_USDC)
         with pytest.raises(DefiPoolError):
             inquirer_defi._uniswapv3.query_current_price(weth, A_USDC)
+
+
+@pytest.mark.parametrize('use_clean_caching_directory', [True])
+def test_uniswap_routing_graph_cache(inquirer_defi):
+    """Test that routes are found over the cached pools and that the pools are only
+    queried once for all the pairs, being then loaded from the global DB"""
+    inch, link, weth = (x.resolve_to_evm_token() for x in (A_1INCH, A_LINK, A_WETH))
+    existing_pools = {
+        sort_tokens(inch, weth): make_ethereum_address(),
+        sort_tokens(link, weth): make_ethereum_address(),
+    }
+    queried_pairs = []
+
+    def mock_query_pools(pairs):
+        queried_pairs.append(pairs)
+        return [existing_pools.get(pair, ZERO_ADDRESS) for pair in pairs]
+
+    oracle = inquirer_defi._uniswapv2
+    with patch.object(oracle, 'query_pools', side_effect=mock_query_pools):
+        route = oracle.find_route(inch, link)
+        assert [x.pool for x in route] == [existing_pools[sort_tokens(inch, weth)], existing_pools[sort_tokens(link, weth)]]  # noqa: E501
+        assert len(queried_pairs) == 1
+        assert oracle.find_route(link, inch) == route[::-1]
+        assert len(queried_pairs) == 1
+
+    new_oracle = UniswapV2Oracle(eth_manager=oracle.eth_manager)
+    with patch.object(new_oracle, 'query_pools', side_effect=mock_query_pools):
+        assert new_oracle.find_route(inch, link) == route
+        assert len(queried_pairs) == 1
@@ -1,12 +1,18 @@
 import os
+from unittest.mock import MagicMock, patch
 
+import gevent
 import pytest
 
-from rotkehlchen.chain.ethereum.constants import ZERO_ADDRESS
+from rotkehlchen.chain.ethereum.constants import ETHERSCAN_NODE, ZERO_ADDRESS
+from rotkehlchen.chain.ethereum.manager import OWNED_NODE_CONCURRENT_QUERIES
+from rotkehlchen.chain.ethereum.node_health import DEFAULT_HEDGE_DELAY_SECS, NodeHealthTracker
 from rotkehlchen.chain.ethereum.structures import EthereumTxReceipt, EthereumTxReceiptLog
-from rotkehlchen.chain.ethereum.types import ETHERSCAN_NODE_NAME
+from rotkehlchen.chain.ethereum.types import ETHERSCAN_NODE_NAME, NodeName, WeightedNode
+from rotkehlchen.constants import ONE
 from rotkehlchen.constants.ethereum import ATOKEN_ABI, ERC20TOKEN_ABI, YEARN_YCRV_VAULT
 from rotkehlchen.db.ethtx import DBEthTx
+from rotkehlchen.errors.misc import CallTooBigError, RemoteError
 from rotkehlchen.tests.utils.checks import assert_serialized_dicts_equal
 from rotkehlchen.tests.utils.ethereum import (
     ETHEREUM_FULL_TEST_PARAMETERS,
@@ -123,6 +129,33 @@ def test_get_transaction_receipt(
         ])
 
 
+@pytest.mark.parametrize(*ETHEREUM_FULL_TEST_PARAMETERS)
+def test_get_transaction_receipts(
+        ethereum_manager,
+        call_order,
+        ethereum_manager_connect_at_start,
+):
+    """Test that receipts are queried in batch and that unknown ones are skipped"""
+    wait_until_all_nodes_connected(
+        ethereum_manager_connect_at_start=ethereum_manager_connect_at_start,
+        ethereum=ethereum_manager,
+    )
+    tx_hash_1 = deserialize_evm_tx_hash('0x12d474b6cbba04fd1a14e55ef45b1eb175985612244631b4b70450c888962a89')  # noqa: E501
+    tx_hash_2 = deserialize_evm_tx_hash('0x692f9a6083e905bdeca4f0293f3473d7a287260547f8cbccc38c5cb01591fcda')  # noqa: E501
+    unknown_hash = deserialize_evm_tx_hash('0x' + 'f' * 64)
+    result = ethereum_manager.get_transaction_receipts(
+        tx_hashes=[tx_hash_1, unknown_hash, tx_hash_2],
+        call_order=call_order,
+    )
+    assert set(result) == {tx_hash_1, tx_hash_2}
+    for tx_hash, receipt in result.items():
+        single_receipt = ethereum_manager.get_transaction_receipt(tx_hash, call_order=call_order)
+        assert receipt['blockNumber'] == single_receipt['blockNumber']
+        assert receipt['status'] == single_receipt['status']
+        assert len(receipt['logs']) == len(single_receipt['logs'])
+        assert [x['logIndex'] for x in receipt['logs']] == [x['logIndex'] for x in single_receipt['logs']]  # noqa: E501
+
+
 @pytest.mark.parametrize(*ETHEREUM_TEST_PARAMETERS)
 def test_get_transaction_by_hash(ethereum_manager, call_order, ethereum_manager_connect_at_start):
     wait_until_all_nodes_connected(
@@ -312,3 +345,126 @@ def test_get_blocknumber_by_time_subgraph(ethereum_manager):
 def test_get_blocknumber_by_time_etherscan(ethereum_manager):
     """Queries etherscan for known block times"""
     _test_get_blocknumber_by_time(ethereum_manager, True)
+
+
+def test_multicall_chunks(ethereum_manager):
+    """Test that multicall chunks are merged in order and that chunks failing due
+    to their size are split and lower the chunk size of the next multicalls"""
+    queried_chunks = []
+
+    def mock_call(manager, method_name, arguments, call_order, block_identifier):  # pylint: disable=unused-argument  # noqa: E501
+        calls = arguments[0]
+        queried_chunks.append(len(calls))
+        if len(calls) > 4:
+            raise CallTooBigError('Response too big')
+        return 1, [data for _, data in calls]
+
+    calls = [(make_ethereum_address(), str(idx)) for idx in range(10)]
+    with patch.object(ethereum_manager, 'contract_multicall', new=MagicMock(call=mock_call)):
+        output = ethereum_manager.multicall(calls, call_order=[ETHERSCAN_NODE], calls_chunk_size=8)  # noqa: E501
+        assert output == [str(idx) for idx in range(10)]
+        assert sorted(queried_chunks) == [2, 4, 4, 8]
+        assert ethereum_manager.multicall_chunk_limit == 4
+
+        queried_chunks.clear()
+        output = ethereum_manager.multicall(calls, call_order=[ETHERSCAN_NODE], calls_chunk_size=8)  # noqa: E501
+        assert output == [str(idx) for idx in range(10)]
+        assert sorted(queried_chunks) == [2, 4, 4]
+
+
+def test_multicall_chunks_other_errors(ethereum_manager):
+    """Test that multicall chunks failing for other reasons than their size are
+    not split and do not lower the chunk size"""
+    queried_chunks = []
+
+    def mock_call(manager, method_name, arguments, call_order, block_identifier):  # pylint: disable=unused-argument  # noqa: E501
+        queried_chunks.append(len(arguments[0]))
+        raise RemoteError('execution reverted')
+
+    calls = [(make_ethereum_address(), str(idx)) for idx in range(10)]
+    with patch.object(ethereum_manager, 'contract_multicall', new=MagicMock(call=mock_call)):
+        with pytest.raises(RemoteError):
+            ethereum_manager.multicall(calls, call_order=[ETHERSCAN_NODE], calls_chunk_size=8)  # noqa: E501
+    assert set(queried_chunks) <= {2, 8}
+    assert ethereum_manager.multicall_chunk_limit is None
+
+
+def test_query_call_too_big(ethereum_manager):
+    """Test that a query is a CallTooBigError only if the nodes rejected it due to its size"""
+    def query_too_big(web3):  # pylint: disable=unused-argument
+        raise ValueError({'code': -32000, 'message': 'out of gas'})
+
+    def query_reverted(web3):  # pylint: disable=unused-argument
+        raise ValueError({'code': -32000, 'message': 'execution reverted'})
+
+    with pytest.raises(CallTooBigError):
+        ethereum_manager.query(method=query_too_big, call_order=[ETHERSCAN_NODE])
+    with pytest.raises(RemoteError) as e:
+        ethereum_manager.query(method=query_reverted, call_order=[ETHERSCAN_NODE])
+    assert not isinstance(e.value, CallTooBigError)
+
+
+def test_map_over_nodes_nested_concurrency(ethereum_manager):
+    """Test that the concurrent queries per node are bounded also across nested jobs"""
+    node = WeightedNode(
+        node_info=NodeName(
+            name='own',
+            endpoint='http://localhost:8545',
+            owned=True,
+            blockchain=SupportedBlockchain.ETHEREUM,
+        ),
+        active=True,
+        weight=ONE,
+    )
+    running, max_running = 0, 0
+
+    def query_node(web3):  # pylint: disable=unused-argument
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        gevent.sleep(0.01)
+        running -= 1
+
+    def inner_job(job, call_order):  # pylint: disable=unused-argument
+        return ethereum_manager.query(method=query_node, call_order=call_order)
+
+    def outer_job(job, call_order):  # pylint: disable=unused-argument
+        return ethereum_manager.map_over_nodes(
+            function=inner_job,
+            jobs=list(range(8)),
+            call_order=call_order,
+        )
+
+    with patch.dict(ethereum_manager.web3_mapping, {node.node_info: MagicMock()}):
+        ethereum_manager.map_over_nodes(function=outer_job, jobs=list(range(8)), call_order=[node])  # noqa: E501
+    assert max_running == OWNED_NODE_CONCURRENT_QUERIES
+
+
+def test_node_health_ranking():
+    """Test that nodes that failed recently are tried last and that the hedge delay
+    follows the latency percentile of the node once enough latencies are known"""
+    nodes = [
+        WeightedNode(
+            node_info=NodeName(
+                name=f'node{idx}',
+                endpoint=f'https://node{idx}.example.com',
+                owned=False,
+                blockchain=SupportedBlockchain.ETHEREUM,
+            ),
+            active=True,
+            weight=ONE,
+        ) for idx in range(3)
+    ]
+    tracker = NodeHealthTracker()
+    tracker.record_failure(nodes[0].node_info, latency=5)
+    assert tracker.rank(nodes) == [nodes[1], nodes[2], nodes[0]]
+    assert tracker.serialize()[0]['healthy'] is False
+
+    assert tracker.hedge_delay(nodes[1].node_info) == DEFAULT_HEDGE_DELAY_SECS
+    for _ in range(20):
+        tracker.record_success(nodes[1].node_info, latency=0.2)
+    assert tracker.hedge_delay(nodes[1].node_info) == pytest.approx(0.2)
+    assert tracker.latency(nodes[1].node_info) == pytest.approx(0.2)
+
+    tracker.reset()
+    assert tracker.rank(nodes) == nodes
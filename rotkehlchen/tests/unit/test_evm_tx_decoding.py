@@ -8,7 +8,15 @@ from rotkehlchen.accounting.structures.base import (
     HistoryEventSubType,
     HistoryEventType,
 )
-from rotkehlchen.chain.ethereum.decoding.constants import CPT_GAS
+from rotkehlchen.chain.ethereum.decoding.constants import (
+    CPT_GAS,
+    ERC20_APPROVE,
+    GTC_CLAIM,
+    GTC_DISTRIBUTOR,
+)
+from rotkehlchen.chain.ethereum.modules.uniswap.v2.decoder import (
+    SWAP_SIGNATURE as UNISWAP_V2_SWAP_SIGNATURE,
+)
 from rotkehlchen.constants.assets import A_ETH, A_SAI
 from rotkehlchen.db.ethtx import DBEthTx
 from rotkehlchen.db.filtering import ETHTransactionsFilterQuery
@@ -85,3 +93,22 @@ def test_tx_decode(evm_transaction_decoder, database):
                 assert receipt is not None, 'all receipts should be queried in the test DB'
                 events = decoder.get_or_decode_transaction_events(cursor, tx, receipt, ignore_cache=False)  # noqa: E501
         assert decode_mock.call_count == len(transactions)
+
+
+@pytest.mark.parametrize('use_custom_database', ['ethtxs.db'])
+def test_tx_decode_topic_dispatch(evm_transaction_decoder, database):
+    """Test that logs only reach the decoding rules registered for their topic
+    and that the rules' counters are kept"""
+    decoder = evm_transaction_decoder
+    assert {x for _, x in decoder.topic_dispatch[ERC20_APPROVE]} == {decoder._maybe_decode_erc20_approve}  # noqa: E501
+    assert decoder.topic_dispatch[UNISWAP_V2_SWAP_SIGNATURE][0][0] is None  # any address
+    assert (GTC_DISTRIBUTOR, decoder._maybe_enrich_transfers) in decoder.topic_dispatch[GTC_CLAIM]  # noqa: E501
+
+    approve_tx_hash = deserialize_evm_tx_hash('0x5cc0e6e62753551313412492296d5e57bea0a9d1ce507cc96aa4aa076c5bde7a')  # noqa: E501
+    decoder.decode_transaction_hashes(ignore_cache=True, tx_hashes=[approve_tx_hash])
+    stats = {x['rule']: x for x in decoder.get_rules_stats()}
+    approve_stats = stats['EVMTransactionDecoder._maybe_decode_erc20_approve']
+    assert approve_stats['hits'] == 1
+    assert approve_stats['hit_rate'] == approve_stats['hits'] / approve_stats['calls']
+    # the transaction has no swaps so the swap rules were never tried
+    assert all('swap' not in x for x in stats)
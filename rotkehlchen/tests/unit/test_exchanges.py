@@ -1,4 +1,7 @@
+import time
+
 from rotkehlchen.db.settings import ModifiableDBSettings
+from rotkehlchen.exchanges.exchange import RateLimitGovernor
 from rotkehlchen.exchanges.ftx import Ftx
 from rotkehlchen.tests.utils.factories import make_api_key, make_api_secret
 from rotkehlchen.tests.utils.kraken import MockKraken
@@ -54,3 +57,29 @@ def test_exchanges_filtering(database, exchange_manager, function_scope_messages
             non_syncing_exchanges=[ftx1.location_id()],
         ))
         assert set(exchange_manager.iterate_exchanges()) == {ftx2, kraken1, kraken2}
+
+
+def test_rate_limit_governor():
+    """Test that each endpoint class is limited separately and that the
+    classes without a configured limit are only counted"""
+    governor = RateLimitGovernor()
+    governor.configure(endpoint_class='private', rate=20, capacity=2)
+    start = time.monotonic()
+    governor.acquire(endpoint_class='private', cost=2)
+    governor.acquire(endpoint_class='public', cost=100)
+    assert time.monotonic() - start < 0.05
+    governor.acquire(endpoint_class='private', cost=1)
+    assert time.monotonic() - start >= 0.045
+
+    governor.limit_available(endpoint_class='private', tokens=0)
+    result = governor.serialize()
+    assert result['private']['requests'] == 2
+    assert result['private']['waited_secs'] > 0
+    assert result['private']['utilization'] > 0.9
+    assert result['public'] == {
+        'requests': 1,
+        'waited_secs': 0,
+        'rate': None,
+        'capacity': None,
+        'utilization': None,
+    }
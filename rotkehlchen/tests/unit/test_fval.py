@@ -2,7 +2,7 @@ import pytest
 
 from rotkehlchen.constants import ZERO
 from rotkehlchen.errors.serialization import ConversionError
-from rotkehlchen.fval import FVal
+from rotkehlchen.fval import FixedFVal, FVal
 from rotkehlchen.utils.serialization import rlk_jsondumps
 
 
@@ -157,3 +157,58 @@ def test_initialize_with_bool_fails():
     with pytest.raises(ValueError):
         FVal(True)
         FVal(False)
+
+
+def test_fixed_fval_arithmetic():
+    """Test that FixedFVal gives the same results as FVal for values that fit in 18 decimals"""
+    a = FixedFVal('5.21')
+    b = FixedFVal('2.12')
+    c = FixedFVal('-23.124')
+
+    assert a + b == FixedFVal('7.33')
+    assert a - b == FixedFVal('3.09')
+    assert a * b == FixedFVal('11.0452')
+    assert a / b == FixedFVal('2.457547169811320755')  # rounded at the 18th decimal
+    assert a ** 3 == FixedFVal('141.420761')
+    assert a.fma(b, FixedFVal('3.14')) == FixedFVal('14.1852')
+    assert c // b == FixedFVal('-10')
+    assert c % b == FVal('-23.124') % FVal('2.12')
+    assert -a == FixedFVal('-5.21')
+    assert abs(c) == FixedFVal('23.124')
+    assert 2 - a == FixedFVal('-3.21')
+    assert 2 / a == FixedFVal('0.383877159309021113')
+    assert a > b and b < a and a >= a and a <= a and a > 5 and 5 < a  # pylint: disable=comparison-with-itself  # noqa: E501
+
+    # mixing with FVal keeps the type of the left operand
+    assert isinstance(a + FVal('0.5'), FixedFVal)
+    assert isinstance(FVal('0.5') + a, FVal)
+    assert FVal('0.5') + a == a + FVal('0.5') == FVal('5.71')
+    with pytest.raises(NotImplementedError):
+        _ = a + 5.23
+    with pytest.raises(ZeroDivisionError):
+        _ = a / FixedFVal(0)
+
+
+def test_fixed_fval_conversion():
+    value = FVal('1234567890.123456789012345678')
+    fixed = FixedFVal(value)
+    assert str(fixed) == '1234567890.123456789012345678'
+    assert fixed.to_fval() == value
+    assert FVal(fixed) == value
+    assert FixedFVal('2.50').to_int(exact=False) == 2
+    assert FixedFVal('-2.50').to_int(exact=False) == -2
+    with pytest.raises(ConversionError):
+        FixedFVal('2.5').to_int(exact=True)
+    assert float(FixedFVal('2.0123')) == 2.0123
+    assert str(FixedFVal(-3)) == '-3'
+    assert FixedFVal('0.5').to_percentage() == '50.0000%'
+    assert rlk_jsondumps({'a': FixedFVal('0.1')}) == '{"a": "0.1"}'
+
+    # more than 18 decimals get rounded half to even
+    assert FixedFVal('0.0000000000000000015') == FixedFVal('0.000000000000000002')
+    assert FixedFVal('0.0000000000000000025') == FixedFVal('0.000000000000000002')
+    assert FixedFVal('-0.0000000000000000025') == FixedFVal('-0.000000000000000002')
+    with pytest.raises(ValueError):
+        FixedFVal(True)
+    with pytest.raises(ValueError):
+        FixedFVal('NaN')
@@ -1,5 +1,9 @@
 from rotkehlchen.constants.assets import A_BAL, A_BTC, A_ETH, A_USD
 from rotkehlchen.fval import FVal
+from rotkehlchen.globaldb.price_index import (
+    DEFAULT_PRICE_INDEX_MAX_POINTS,
+    HistoricalPriceIndex,
+)
 from rotkehlchen.history.types import HistoricalPrice, HistoricalPriceOracle
 from rotkehlchen.tests.utils.constants import A_EUR
 from rotkehlchen.types import Price, Timestamp
@@ -131,3 +135,53 @@ def test_get_historical_price(globaldb, historical_price_test_data):  # pylint:
         max_seconds_distance=3600,
     )
     assert price_entry is None
+
+
+def test_historical_price_index(globaldb, historical_price_test_data):  # pylint: disable=unused-argument  # noqa: E501
+    """Test that the in-memory price index follows the writes to the DB and
+    that the least recently used series are evicted"""
+    price_index = HistoricalPriceIndex()
+    price_index.clear()
+    source = HistoricalPriceOracle.CRYPTOCOMPARE
+    series = price_index.get_series(from_asset=A_ETH, to_asset=A_EUR, source=source)
+    assert list(series.timestamps) == sorted(series.timestamps)
+    assert series.nearest(timestamp=Timestamp(1511627623), max_seconds_distance=3600) == (
+        Timestamp(1511626623), Price(FVal(396.56)),
+    )
+    assert series.nearest(timestamp=Timestamp(1511627623), max_seconds_distance=10) is None
+
+    # a new entry should be visible right after being added
+    entry = HistoricalPrice(
+        from_asset=A_ETH,
+        to_asset=A_EUR,
+        source=source,
+        timestamp=Timestamp(1511627600),
+        price=Price(FVal(400)),
+    )
+    assert globaldb.add_single_historical_price(entry) is True
+    assert globaldb.get_historical_price(
+        from_asset=A_ETH,
+        to_asset=A_EUR,
+        timestamp=1511627623,
+        max_seconds_distance=3600,
+        source=source,
+    ) == entry
+
+    # and gone after it's deleted
+    globaldb.delete_historical_prices(from_asset=A_ETH, to_asset=A_EUR, source=source)
+    assert globaldb.get_historical_price_range(from_asset=A_ETH, to_asset=A_EUR, source=source) is None  # noqa: E501
+
+    # with a small limit only the most recently used series are kept
+    price_index.clear()
+    btc_series = price_index.get_series(from_asset=A_BTC, to_asset=A_EUR, source=source)
+    eth_series = price_index.get_series(from_asset=A_ETH, to_asset=A_EUR, source=HistoricalPriceOracle.COINGECKO)  # noqa: E501
+    assert len(btc_series) != 0 and len(eth_series) != 0
+    price_index.clear()
+    price_index.max_points = max(len(btc_series), len(eth_series))
+    try:
+        price_index.get_series(from_asset=A_BTC, to_asset=A_EUR, source=source)
+        price_index.get_series(from_asset=A_ETH, to_asset=A_EUR, source=HistoricalPriceOracle.COINGECKO)  # noqa: E501
+        assert price_index.total_points == len(eth_series)
+        assert list(price_index.series) == [('eth', 'eur', HistoricalPriceOracle.COINGECKO.serialize_for_db())]  # noqa: E501
+    finally:
+        price_index.max_points = DEFAULT_PRICE_INDEX_MAX_POINTS
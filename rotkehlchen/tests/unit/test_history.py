@@ -1,3 +1,7 @@
+from contextlib import ExitStack
+from unittest.mock import patch
+
+import gevent
 import pytest
 
 from rotkehlchen.accounting.ledger_actions import LedgerAction, LedgerActionType
@@ -8,15 +12,17 @@ from rotkehlchen.accounting.structures.base import HistoryBaseEntry
 from rotkehlchen.accounting.structures.types import HistoryEventSubType, HistoryEventType
 from rotkehlchen.chain.ethereum.modules.eth2.structures import ValidatorDailyStats
 from rotkehlchen.constants import ONE, ZERO
-from rotkehlchen.constants.assets import A_ETH, A_ETH2, A_USDC
+from rotkehlchen.constants.assets import A_ETH, A_ETH2, A_EUR, A_USDC
 from rotkehlchen.db.filtering import LedgerActionsFilterQuery
 from rotkehlchen.db.ledger_actions import DBLedgerActions
+from rotkehlchen.exchanges.data_structures import Trade
 from rotkehlchen.fval import FVal
+from rotkehlchen.history.events import merge_history_sources, ordered_source
 from rotkehlchen.history.types import HistoricalPriceOracle
 from rotkehlchen.tests.utils.accounting import accounting_history_process, check_pnls_and_csv
 from rotkehlchen.tests.utils.history import prices
 from rotkehlchen.tests.utils.messages import no_message_errors
-from rotkehlchen.types import Location
+from rotkehlchen.types import Location, Timestamp, TradeType
 
 
 def test_query_ledger_actions(events_historian, function_scope_messages_aggregator):
@@ -162,3 +168,197 @@ def test_pnl_processing_with_eth2_staking_setting(accountant, db_settings):
             AccountingEventType.STAKING: PNL(taxable=FVal('20.55537445038'), free=ZERO),
         })
     check_pnls_and_csv(accountant, expected_pnls, None)
+
+
+def test_get_history_source_errors_are_isolated(events_historian, function_scope_messages_aggregator):  # noqa: E501
+    """Test that a history source that fails or times out does not stop the
+    history query and is reported"""
+
+    def slow_query(**kwargs):  # pylint: disable=unused-argument
+        gevent.sleep(5)
+
+    def failing_query(**kwargs):  # pylint: disable=unused-argument
+        raise ValueError('boom')
+
+    with patch('rotkehlchen.history.events.CHAIN_HISTORY_QUERY_TIMEOUT', 0.2):
+        with patch.object(events_historian, '_query_ethereum_history', side_effect=slow_query):
+            error_or_empty, history = events_historian.get_history(
+                start_ts=0,
+                end_ts=1600000000,
+                has_premium=False,
+            )
+    assert 'Querying ethereum history timed out' in error_or_empty
+    assert history == []
+    assert events_historian.progress == 100
+
+    with patch.object(events_historian, '_query_ethereum_history', side_effect=failing_query):
+        error_or_empty, _ = events_historian.get_history(
+            start_ts=0,
+            end_ts=1600000000,
+            has_premium=False,
+        )
+    assert 'Querying ethereum history failed due to boom' in error_or_empty
+    errors = function_scope_messages_aggregator.consume_errors()
+    assert len(errors) == 2
+
+
+def test_get_history_ethereum_source_timeout(events_historian):
+    """Test that when the ethereum source times out while querying transactions its
+    next steps are not run. The timeout should not be handled like a remote error"""
+
+    def slow_query(**kwargs):  # pylint: disable=unused-argument
+        gevent.sleep(5)
+
+    transactions = events_historian.eth_tx_decoder.transactions
+    with ExitStack() as stack:
+        stack.enter_context(patch('rotkehlchen.history.events.CHAIN_HISTORY_QUERY_TIMEOUT', 0.2))
+        stack.enter_context(patch.object(transactions, 'query', side_effect=slow_query))
+        receipts = stack.enter_context(patch.object(
+            transactions,
+            'get_receipts_for_transactions_missing_them',
+        ))
+        decode = stack.enter_context(patch.object(
+            events_historian.eth_tx_decoder,
+            'get_and_decode_undecoded_transactions',
+        ))
+        error_or_empty, _ = events_historian.get_history(
+            start_ts=0,
+            end_ts=1600000000,
+            has_premium=False,
+        )
+
+    assert 'Querying ethereum history timed out after 0.2 seconds' in error_or_empty
+    assert 'etherscan' not in error_or_empty
+    assert receipts.call_count == 0
+    assert decode.call_count == 0
+
+
+def test_get_history_merges_all_sources(events_historian, function_scope_messages_aggregator):  # noqa: E501
+    """Test that the history of the exchanges, the external trades and the ledger
+    actions ends up in a single history ordered by timestamp"""
+
+    def make_trade(timestamp, location):
+        return Trade(
+            timestamp=timestamp,
+            location=location,
+            base_asset=A_ETH,
+            quote_asset=A_EUR,
+            trade_type=TradeType.BUY,
+            amount=ONE,
+            rate=FVal(100),
+            fee=None,
+            fee_currency=None,
+            link=str(timestamp),
+        )
+
+    class MockExchange():
+        name = 'mockexchange'
+
+        def query_history_with_callbacks(self, success_callback, **kwargs):  # pylint: disable=unused-argument  # noqa: E501
+            success_callback([make_trade(15, Location.KRAKEN), make_trade(3, Location.KRAKEN)], [], [], None)  # noqa: E501
+
+    with events_historian.db.user_write() as cursor:
+        events_historian.db.add_trades(cursor, [
+            make_trade(20, Location.EXTERNAL),
+            make_trade(5, Location.EXTERNAL),
+        ])
+        db = DBLedgerActions(events_historian.db, function_scope_messages_aggregator)
+        for timestamp in (30, 1, 10):
+            db.add_ledger_action(cursor, LedgerAction(
+                identifier=0,  # whatever
+                timestamp=timestamp,
+                action_type=LedgerActionType.INCOME,
+                location=Location.EXTERNAL,
+                amount=ONE,
+                asset=A_ETH,
+            ))
+
+    with ExitStack() as stack:
+        stack.enter_context(patch.object(
+            events_historian.exchange_manager,
+            'iterate_exchanges',
+            return_value=[MockExchange()],
+        ))
+        stack.enter_context(patch.object(events_historian, '_query_ethereum_history'))
+        error_or_empty, history = events_historian.get_history(
+            start_ts=0,
+            end_ts=1600000000,
+            has_premium=False,
+        )
+
+    assert error_or_empty == ''
+    assert [x.get_timestamp() for x in history] == [1, 3, 5, 10, 15, 20, 30]
+    assert [type(x) for x in history] == [
+        LedgerAction, Trade, Trade, LedgerAction, Trade, Trade, LedgerAction,
+    ]
+    assert events_historian.progress == 100
+
+
+def test_get_history_order_of_equal_events(events_historian):
+    """Test that events with equal timestamps of different sources come in the order of
+    the sources and not in the order that their concurrent queries finish"""
+
+    def make_trade(location):
+        return Trade(
+            timestamp=Timestamp(7),
+            location=location,
+            base_asset=A_ETH,
+            quote_asset=A_EUR,
+            trade_type=TradeType.BUY,
+            amount=ONE,
+            rate=FVal(100),
+            fee=None,
+            fee_currency=None,
+            link=str(location),
+        )
+
+    class MockExchange():
+
+        def __init__(self, location, delay):
+            self.name = str(location)
+            self.location = location
+            self.delay = delay
+
+        def query_history_with_callbacks(self, success_callback, **kwargs):  # pylint: disable=unused-argument  # noqa: E501
+            gevent.sleep(self.delay)
+            success_callback([make_trade(self.location)], [], [], None)
+
+    with events_historian.db.user_write() as cursor:
+        events_historian.db.add_trades(cursor, [make_trade(Location.EXTERNAL)])
+
+    with ExitStack() as stack:
+        stack.enter_context(patch.object(
+            events_historian.exchange_manager,
+            'iterate_exchanges',
+            return_value=[MockExchange(Location.KRAKEN, 0.2), MockExchange(Location.BINANCE, 0)],  # noqa: E501
+        ))
+        stack.enter_context(patch.object(events_historian, '_query_ethereum_history'))
+        error_or_empty, history = events_historian.get_history(
+            start_ts=0,
+            end_ts=1600000000,
+            has_premium=False,
+        )
+
+    assert error_or_empty == ''
+    assert [x.location for x in history] == [Location.KRAKEN, Location.BINANCE, Location.EXTERNAL]  # noqa: E501
+
+
+class MockEvent():
+
+    def __init__(self, timestamp, name):
+        self.timestamp = timestamp
+        self.name = name
+
+    def get_timestamp(self):
+        return self.timestamp
+
+
+def test_merge_history_sources():
+    """Test that ordered sources are merged in the history order and that events with
+    the same timestamp keep the order of their sources"""
+    first = [MockEvent(1, 'a'), MockEvent(5, 'b'), MockEvent(9, 'c')]
+    second = ordered_source([MockEvent(5, 'e'), MockEvent(2, 'd')])  # not ordered
+    third = [MockEvent(0, 'f'), MockEvent(5, 'g')]
+    assert [x.name for x in second] == ['d', 'e']
+    history = merge_history_sources([first, second, third, []])
+    assert [x.name for x in history] == ['f', 'a', 'd', 'b', 'e', 'g', 'c']
@@ -183,3 +183,39 @@ def test_manual_oracle_correctly_returns_price(globaldb, fake_price_historian):
             to_asset=A_USD,
             timestamp=Timestamp(1610595466),
         )
+
+
+def test_query_cached_historical_prices(globaldb, fake_price_historian):
+    """Test that the bulk cached price query follows the oracles order and only
+    returns prices that can be decided from the DB cache"""
+    globaldb.add_historical_prices([
+        HistoricalPrice(
+            from_asset=A_BTC,
+            to_asset=A_USD,
+            price=Price(FVal('30000')),
+            timestamp=Timestamp(1611595470),
+            source=HistoricalPriceOracle.MANUAL,
+        ), HistoricalPrice(
+            from_asset=A_BTC,
+            to_asset=A_USD,
+            price=Price(FVal('31000')),
+            timestamp=Timestamp(1611595470),
+            source=HistoricalPriceOracle.CRYPTOCOMPARE,
+        ), HistoricalPrice(
+            from_asset=A_BTC,
+            to_asset=A_USD,
+            price=Price(FVal('32000')),
+            timestamp=Timestamp(1611680000),
+            source=HistoricalPriceOracle.CRYPTOCOMPARE,
+        ),
+    ])
+    prices = fake_price_historian.query_cached_historical_prices(
+        from_asset=A_BTC,
+        to_asset=A_USD,
+        timestamps=[Timestamp(1611680100), Timestamp(1611595466), Timestamp(1611780000)],
+    )
+    assert prices == {
+        1611595466: FVal('30000'),  # manual price has priority
+        1611680100: FVal('32000'),  # cryptocompare price within an hour
+        # 1611780000 would need a remote cryptocompare query so is not included
+    }
@@ -6,6 +6,11 @@ import pytest
 
 from rotkehlchen.chain.bitcoin.hdkey import HDKey
 from rotkehlchen.chain.bitcoin.xpub import XpubData
+from rotkehlchen.chain.ethereum.constants import (
+    RANGE_PREFIX_ETHINTERNALTX,
+    RANGE_PREFIX_ETHTOKENTX,
+    RANGE_PREFIX_ETHTX,
+)
 from rotkehlchen.db.ethtx import DBEthTx
 from rotkehlchen.errors.misc import RemoteError
 from rotkehlchen.premium.premium import Premium, PremiumCredentials, SubscriptionStatus
@@ -67,18 +72,31 @@ def fixture_task_manager(
     return task_manager
 
 
-@pytest.mark.parametrize('number_of_eth_accounts', [2])
-def test_maybe_query_ethereum_transactions(task_manager, ethereum_accounts):
+@pytest.mark.parametrize('number_of_eth_accounts', [3])
+def test_maybe_query_ethereum_transactions(task_manager, ethereum_accounts, database):
     task_manager.potential_tasks = [task_manager._maybe_query_ethereum_transactions]
+    transactions = task_manager.eth_tx_decoder.transactions
     now = ts_now()
+    # the first address was queried recently, the second some time ago and the third never
+    with database.user_write() as write_cursor:
+        for address, end_ts in ((ethereum_accounts[0], now - 3700), (ethereum_accounts[1], now - 7200)):  # noqa: E501
+            for prefix in (RANGE_PREFIX_ETHTX, RANGE_PREFIX_ETHINTERNALTX, RANGE_PREFIX_ETHTOKENTX):  # noqa: E501
+                database.update_used_query_range(
+                    write_cursor=write_cursor,
+                    name=f'{prefix}_{address}',
+                    start_ts=0,
+                    end_ts=end_ts,
+                )
+    transactions.pause_queries([ethereum_accounts[0]])
+    queried_addresses = []
 
     def tx_query_mock(address, start_ts, end_ts):
-        assert address in ethereum_accounts
         assert start_ts == 0
         assert end_ts >= now
+        queried_addresses.append(address)
 
     tx_query_patch = patch.object(
-        task_manager.eth_tx_decoder.transactions,
+        transactions,
         'single_address_query_transactions',
         wraps=tx_query_mock,
     )
@@ -86,17 +104,22 @@ def test_maybe_query_ethereum_transactions(task_manager, ethereum_accounts):
     try:
         with gevent.Timeout(timeout):
             with tx_query_patch as tx_mock:
-                # First two calls to schedule should handle the addresses
-                for i in range(2):
-                    task_manager.schedule()
-                    while True:
-                        if tx_mock.call_count == i + 1:
-                            break
-                        gevent.sleep(.2)
+                # A single schedule should handle all addresses that are not paused
+                task_manager.schedule()
+                while tx_mock.call_count != 2:
+                    gevent.sleep(.2)
+                # addresses whose transactions were queried the least recently go first
+                assert queried_addresses == [ethereum_accounts[2], ethereum_accounts[1]]
 
                 task_manager.schedule()
                 gevent.sleep(.5)
-                assert tx_mock.call_count == 2, '3rd schedule should do nothing'
+                assert tx_mock.call_count == 2, '2nd schedule should do nothing'
+
+                transactions.resume_queries([ethereum_accounts[0]])
+                task_manager.schedule()
+                while tx_mock.call_count != 3:
+                    gevent.sleep(.2)
+                assert queried_addresses[-1] == ethereum_accounts[0]
 
     except gevent.Timeout as e:
         raise AssertionError(f'The transaction query was not scheduled within {timeout} seconds') from e  # noqa: E501
@@ -187,7 +210,7 @@ def test_maybe_schedule_ethereum_txreceipts(
     timeout = 10
     tx_hash_1 = hexstring_to_bytes('0x692f9a6083e905bdeca4f0293f3473d7a287260547f8cbccc38c5cb01591fcda')  # noqa: E501
     tx_hash_2 = hexstring_to_bytes('0x6beab9409a8f3bd11f82081e99e856466a7daf5f04cca173192f79e78ed53a77')  # noqa: E501
-    receipt_get_patch = patch.object(ethereum_manager, 'get_transaction_receipt', wraps=ethereum_manager.get_transaction_receipt)  # pylint: disable=protected-member  # noqa: E501
+    receipt_get_patch = patch.object(ethereum_manager, 'get_transaction_receipts', wraps=ethereum_manager.get_transaction_receipts)  # pylint: disable=protected-member  # noqa: E501
     queried_receipts = set()
     try:
         with gevent.Timeout(timeout):
@@ -206,7 +229,8 @@ def test_maybe_schedule_ethereum_txreceipts(
 
                 task_manager.schedule()
                 gevent.sleep(.5)
-                assert receipt_task_mock.call_count == 1 if one_receipt_in_db else 2, '2nd schedule should do nothing'  # noqa: E501
+                queried_hashes = sum(len(x.kwargs['tx_hashes']) for x in receipt_task_mock.call_args_list)  # noqa: E501
+                assert queried_hashes == (1 if one_receipt_in_db else 2), '2nd schedule should do nothing'  # noqa: E501
 
     except gevent.Timeout as e:
         raise AssertionError(f'receipts query was not completed within {timeout} seconds') from e  # noqa: E501
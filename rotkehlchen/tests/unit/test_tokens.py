@@ -1,13 +1,20 @@
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 import pytest
 from flaky import flaky
 
+from rotkehlchen.accounting.structures.balance import Balance
+from rotkehlchen.accounting.structures.base import HistoryBaseEntry
+from rotkehlchen.accounting.structures.types import HistoryEventSubType, HistoryEventType
+from rotkehlchen.chain.ethereum.constants import RANGE_PREFIX_ETHTOKENTX
 from rotkehlchen.chain.ethereum.types import string_to_evm_address
 from rotkehlchen.chain.evm.tokens import EvmTokens, generate_multicall_chunks
-from rotkehlchen.constants.assets import A_OMG
+from rotkehlchen.constants import ONE
+from rotkehlchen.constants.assets import A_DAI, A_OMG
+from rotkehlchen.db.history_events import DBHistoryEvents
 from rotkehlchen.fval import FVal
 from rotkehlchen.tests.utils.constants import A_LPT
+from rotkehlchen.types import Location, SupportedBlockchain, Timestamp, TimestampMS
 
 
 @pytest.fixture(name='evmtokens')
@@ -50,6 +57,63 @@ def test_detect_tokens_for_addresses(evmtokens):
     assert len(token_usd_prices) == len(set(result[addr1].keys()).union(set(result[addr2].keys())))
 
 
+def test_incremental_token_detection(evmtokens):
+    """Test that after a full detection only the held tokens and the tokens of the
+    transfers saved since then are checked, and that a full detection happens again
+    once the transfers range is unknown"""
+    address = string_to_evm_address('0x8d89170b92b2Be2C08d57C48a7b190a2f146720f')
+    db = evmtokens.db
+    queried_tokens = []
+
+    def mock_query_chunk(chunk, call_order):  # pylint: disable=unused-argument
+        queried_tokens.extend(chunk[1])
+        return {token: ONE for token in chunk[1] if token in (A_OMG, A_DAI)}
+
+    with db.user_write() as write_cursor:
+        db.update_used_query_range(
+            write_cursor=write_cursor,
+            name=f'{RANGE_PREFIX_ETHTOKENTX}_{address}',
+            start_ts=Timestamp(0),
+            end_ts=Timestamp(1600000000),
+        )
+
+    with patch.object(evmtokens, '_query_chunk', side_effect=mock_query_chunk):
+        evmtokens.detect_tokens(only_cache=False, addresses=[address])  # full detection
+        assert len(queried_tokens) > 100
+        with db.conn.read_ctx() as cursor:
+            tokens, _ = db.get_tokens_for_address(cursor, address, SupportedBlockchain.ETHEREUM)
+            assert {x.identifier for x in tokens} == {A_OMG.identifier, A_DAI.identifier}
+            _, transfers_cursor_ts = db.get_token_detection_state(cursor, address, SupportedBlockchain.ETHEREUM)  # noqa: E501
+            assert transfers_cursor_ts == 1600000000
+
+        queried_tokens.clear()
+        evmtokens.detect_tokens(only_cache=False, addresses=[address])
+        assert {x.identifier for x in queried_tokens} == {A_OMG.identifier, A_DAI.identifier}
+
+        # a transfer saved after the cursor makes its token a candidate
+        with db.user_write() as write_cursor:
+            DBHistoryEvents(db).add_history_event(write_cursor, HistoryBaseEntry(
+                event_identifier=HistoryBaseEntry.deserialize_event_identifier('0x64f1982504ab714037467fdd45d3ecf5a6356361403fc97dd325101d8c038c4e'),  # noqa: E501
+                sequence_index=1,
+                timestamp=TimestampMS(1600000001000),
+                location=Location.BLOCKCHAIN,
+                event_type=HistoryEventType.RECEIVE,
+                event_subtype=HistoryEventSubType.NONE,
+                asset=A_LPT,
+                balance=Balance(amount=ONE),
+                location_label=address,
+            ))
+        queried_tokens.clear()
+        evmtokens.detect_tokens(only_cache=False, addresses=[address])
+        assert {x.identifier for x in queried_tokens} == {A_OMG.identifier, A_DAI.identifier, A_LPT.identifier}  # noqa: E501
+
+        with db.user_write() as write_cursor:
+            write_cursor.execute('DELETE FROM used_query_ranges')
+        queried_tokens.clear()
+        evmtokens.detect_tokens(only_cache=False, addresses=[address])
+        assert len(queried_tokens) > 100
+
+
 def test_generate_chunks():
     generated_chunks = generate_multicall_chunks(
         chunk_length=17,
@@ -25,6 +25,7 @@ from rotkehlchen.utils.misc import (
 )
 from rotkehlchen.utils.mixins.cacheable import CacheableMixIn, cache_response_timewise
 from rotkehlchen.utils.serialization import jsonloads_dict, jsonloads_list
+from rotkehlchen.utils.token_bucket import TokenBucket
 from rotkehlchen.utils.version_check import get_current_version
 
 
@@ -383,3 +384,17 @@ def test_pairwise():
     a = [1, 2, 3, 4, 5]
     assert [x + y for x, y in pairwise(a)] == [3, 7]
     assert list(pairwise_longest(a)) == [(1, 2), (3, 4), (5, None)]
+
+
+def test_token_bucket():
+    """Test that a burst of up to the capacity goes through and then calls wait"""
+    bucket = TokenBucket(rate=10, capacity=2)
+    start = time.monotonic()
+    assert bucket.acquire() == 0
+    assert bucket.acquire() == 0
+    assert bucket.acquire() > 0
+    assert time.monotonic() - start >= 0.09
+    assert bucket.acquired == 3
+
+    bucket.configure(rate=1000, capacity=1)
+    assert bucket.tokens <= 1
@@ -3,6 +3,8 @@ from typing import NamedTuple, Optional
 from rotkehlchen.constants.misc import (
     DEFAULT_MAX_LOG_BACKUP_FILES,
     DEFAULT_MAX_LOG_SIZE_IN_MB,
+    DEFAULT_OWNED_ASSETS_CACHE_SIZE,
+    DEFAULT_SQL_READ_CONNECTIONS,
     DEFAULT_SQL_VM_INSTRUCTIONS_CB,
 )
 
@@ -17,6 +19,8 @@ class ConfigurationArgs(NamedTuple):
     max_size_in_mb_all_logs: int = DEFAULT_MAX_LOG_SIZE_IN_MB
     max_logfiles_num: int = DEFAULT_MAX_LOG_BACKUP_FILES
     sqlite_instructions: int = DEFAULT_SQL_VM_INSTRUCTIONS_CB
+    sqlite_read_connections: int = DEFAULT_SQL_READ_CONNECTIONS
+    owned_assets_cache_size: int = DEFAULT_OWNED_ASSETS_CACHE_SIZE
 
 
 def default_args(
@@ -32,6 +36,8 @@ def default_args(
         max_size_in_mb_all_logs=max_size_in_mb_all_logs,
         max_logfiles_num=DEFAULT_MAX_LOG_BACKUP_FILES,
         sqlite_instructions=DEFAULT_SQL_VM_INSTRUCTIONS_CB,
+        sqlite_read_connections=DEFAULT_SQL_READ_CONNECTIONS,
+        owned_assets_cache_size=DEFAULT_OWNED_ASSETS_CACHE_SIZE,
         logfile=None,
         logtarget=None,
     )
@@ -1177,6 +1177,8 @@ def maybe_mock_historical_price_queries(
         return price
 
     historian.query_historical_price = mock_historical_price_query
+    # bulk price prefetching reads the DB cache directly. Let everything go via the mock
+    historian.query_cached_historical_prices = lambda from_asset, to_asset, timestamps: {}
 
 
 def assert_pnl_debug_import(filepath: Path, database: DBHandler) -> None:
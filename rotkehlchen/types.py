@@ -544,6 +544,8 @@ class EnsMapping(NamedTuple):
 class CostBasisMethod(SerializableEnumMixin):
     FIFO = 1
     LIFO = 2
+    HIFO = 3
+    LOFO = 4
 
 
 class AddressbookEntry(NamedTuple):
@@ -626,6 +628,7 @@ class GeneralCacheType(Enum):
     CURVE_LP_TOKENS = auto()
     CURVE_POOL_ADDRESS = auto()  # get pool addr by lp token
     CURVE_POOL_TOKENS = auto()  # get pool tokens by pool addr
+    UNISWAP_POOL = auto()  # get best uniswap pool by version and token pair
 
     def serialize(self) -> str:
         # Using custom serialize method instead of SerializableEnumMixin since mixin replaces
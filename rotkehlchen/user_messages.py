@@ -14,6 +14,7 @@ logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 INFORMATIONAL_MESSAGE_TYPES = {
     WSMessageType.ETHEREUM_TRANSACTION_STATUS,
+    WSMessageType.ETHEREUM_RECEIPTS_STATUS,
     WSMessageType.PREMIUM_STATUS_UPDATE,
 }
 
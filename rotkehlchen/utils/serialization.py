@@ -14,13 +14,13 @@ from rotkehlchen.assets.asset import (
 )
 from rotkehlchen.assets.types import AssetType
 from rotkehlchen.errors.asset import UnknownAsset
-from rotkehlchen.fval import FVal
+from rotkehlchen.fval import FixedFVal, FVal
 from rotkehlchen.types import ChainID, EvmTokenKind, Location, Timestamp, TradeType
 
 
 class RKLEncoder(json.JSONEncoder):
     def default(self, obj: Any) -> Any:
-        if isinstance(obj, FVal):
+        if isinstance(obj, (FVal, FixedFVal)):
             return str(obj)
         if isinstance(obj, (TradeType, Location)):
             return str(obj)
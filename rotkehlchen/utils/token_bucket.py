@@ -0,0 +1,64 @@
+import time
+
+import gevent
+from gevent.lock import Semaphore
+
+
+class TokenBucket():
+    """Rate limiter that lets bursts of up to capacity calls through and then
+    rate calls per second on average.
+
+    Callers that find the bucket empty sleep until there are enough tokens,
+    letting other greenlets run. Waiting callers are served in order.
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.last_refill = time.monotonic()
+        self.lock = Semaphore()
+        self.acquired = 0  # number of acquisitions since creation
+        self.waited = 0.0  # seconds callers spent waiting for tokens since creation
+
+    def configure(self, rate: float, capacity: float) -> None:
+        with self.lock:
+            self._refill()
+            self.rate = rate
+            self.capacity = capacity
+            self.tokens = min(self.tokens, capacity)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    def available(self) -> float:
+        """Tokens that would be in the bucket now if no caller is waiting"""
+        now = time.monotonic()
+        return min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+
+    def limit(self, tokens: float) -> None:
+        """Lowers the tokens in the bucket if they are more than the given ones. For
+        when the remote reports that less are left, for example due to other clients.
+
+        Does not take the lock so that it does not wait for a caller sleeping in acquire
+        """
+        self._refill()
+        self.tokens = min(self.tokens, tokens)
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Takes tokens from the bucket, waiting until they are available.
+        Returns the seconds waited"""
+        with self.lock:
+            self._refill()
+            waited = 0.0
+            if self.tokens < tokens:
+                waited = (tokens - self.tokens) / self.rate
+                gevent.sleep(waited)
+                self._refill()
+
+            self.tokens -= tokens
+            self.acquired += 1
+            self.waited += waited
+            return waited
@@ -0,0 +1,118 @@
+"""
+Benchmark the acquisitions orders of the cost basis calculation on a synthetic
+history with many small acquisitions, like the ones of DCA bots or staking rewards.
+
+It compares the heap backed HIFO/LOFO orders with a HIFO order that keeps the
+deque of the FIFO/LIFO orders sorted by inserting each acquisition in its place,
+and with the FIFO/LIFO orders themselves as a baseline.
+
+Example of execution:
+
+python tools/scripts/benchmark_acquisitions_order.py --acquisitions 100000
+
+It outputs the time each order took to the stdout
+"""
+
+import argparse
+import random
+import time
+from typing import Callable, Dict, List, NamedTuple
+
+from rotkehlchen.accounting.cost_basis.base import (
+    AssetAcquisitionEvent,
+    BaseAcquisitionsOrder,
+    FIFOAcquisitionsOrder,
+    HIFOAcquisitionsOrder,
+    LIFOAcquisitionsOrder,
+    LOFOAcquisitionsOrder,
+)
+from rotkehlchen.fval import FVal
+from rotkehlchen.types import Price, Timestamp
+
+
+class DequeHIFOAcquisitionsOrder(BaseAcquisitionsOrder):
+    """HIFO on top of the deque of BaseAcquisitionsOrder. Insertion is O(n)"""
+    def add_acquisition(self, acquisition: AssetAcquisitionEvent) -> None:
+        for idx, entry in enumerate(self._acquisitions):
+            if acquisition.rate > entry.rate:
+                self._acquisitions.insert(idx, acquisition)
+                return
+        self._acquisitions.append(acquisition)
+
+
+class Action(NamedTuple):
+    is_acquisition: bool
+    amount: FVal
+    rate: Price
+
+
+def generate_actions(number: int, seed: int) -> List[Action]:
+    """Many small acquisitions with an occasional bigger spend"""
+    rng = random.Random(seed)
+    actions = []
+    for _ in range(number):
+        actions.append(Action(
+            is_acquisition=True,
+            amount=FVal(f'{rng.randint(1, 10 ** 4)}e-6'),
+            rate=Price(FVal(f'{rng.randint(10 ** 4, 10 ** 6)}e-2')),
+        ))
+        if rng.random() < 0.02:
+            actions.append(Action(
+                is_acquisition=False,
+                amount=FVal(f'{rng.randint(1, 10 ** 5)}e-6'),
+                rate=Price(FVal(0)),
+            ))
+    return actions
+
+
+def run(actions: List[Action], order_class: Callable[[], BaseAcquisitionsOrder]) -> float:
+    order = order_class()
+    start = time.perf_counter()
+    for idx, action in enumerate(actions):
+        if action.is_acquisition:
+            order.add_acquisition(AssetAcquisitionEvent(
+                amount=action.amount,
+                timestamp=Timestamp(idx),
+                rate=action.rate,
+                index=idx,
+            ))
+            continue
+
+        remaining = action.amount
+        for acquisition in order.processing_iterator():
+            if remaining < acquisition.remaining_amount:
+                order.consume_result(remaining)
+                break
+            remaining -= acquisition.remaining_amount
+            order.consume_result(acquisition.remaining_amount)
+
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark the cost basis acquisitions orders')
+    parser.add_argument('--acquisitions', type=int, default=100_000, help='Number of acquisitions')  # noqa: E501
+    parser.add_argument('--seed', type=int, default=42, help='Seed of the generated history')
+    parser.add_argument(
+        '--skip-deque-hifo',
+        action='store_true',
+        help='Skip the deque based HIFO which is quadratic and slow for many acquisitions',
+    )
+    args = parser.parse_args()
+
+    actions = generate_actions(args.acquisitions, args.seed)
+    orders: Dict[str, Callable[[], BaseAcquisitionsOrder]] = {
+        'FIFO (deque)': FIFOAcquisitionsOrder,
+        'LIFO (deque)': LIFOAcquisitionsOrder,
+        'HIFO (heap)': HIFOAcquisitionsOrder,
+        'LOFO (heap)': LOFOAcquisitionsOrder,
+    }
+    if args.skip_deque_hifo is False:
+        orders['HIFO (sorted deque)'] = DequeHIFOAcquisitionsOrder
+
+    for name, order_class in orders.items():
+        print(f'{name:<20} {run(actions, order_class):.2f} secs')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark the cost basis calculation with FVal and with FixedFVal arithmetic
+on a synthetic history of trades.
+
+Example of execution:
+
+python tools/scripts/benchmark_cost_basis.py --trades 1000000
+
+It outputs the time each numeric type took and the speedup to the stdout
+"""
+
+import argparse
+import random
+import time
+from typing import List, NamedTuple, Tuple
+
+from rotkehlchen.accounting.cost_basis.base import CostBasisCalculator
+from rotkehlchen.accounting.mixins.event import AccountingEventType
+from rotkehlchen.accounting.pnl import PNL, PnlTotals
+from rotkehlchen.assets.asset import Asset
+from rotkehlchen.db.settings import DBSettings
+from rotkehlchen.fval import FVal
+from rotkehlchen.types import CostBasisMethod, Price, Timestamp
+from rotkehlchen.user_messages import MessagesAggregator
+
+ASSETS = [Asset('BTC'), Asset('ETH'), Asset('XMR'), Asset('DASH')]
+
+
+class SyntheticTrade(NamedTuple):
+    """Has the attributes CostBasisCalculator.obtain_asset() needs"""
+    asset: Asset
+    timestamp: Timestamp
+    taxable_amount: FVal
+    price: Price
+    index: int
+    is_buy: bool
+
+
+def generate_trades(number: int, seed: int) -> List[SyntheticTrade]:
+    rng = random.Random(seed)
+    trades = []
+    for idx in range(number):
+        # buy a bit more often than sell so that spends are mostly covered
+        trades.append(SyntheticTrade(
+            asset=rng.choice(ASSETS),
+            timestamp=Timestamp(1420070400 + idx * 60),
+            taxable_amount=FVal(f'{rng.randint(1, 10 ** 8)}e-{rng.randint(4, 8)}'),
+            price=Price(FVal(f'{rng.randint(1, 10 ** 6)}e-2')),
+            index=idx,
+            is_buy=rng.random() < 0.55,
+        ))
+    return trades
+
+
+def run(
+        trades: List[SyntheticTrade],
+        method: CostBasisMethod,
+        fixed_point: bool,
+) -> Tuple[float, FVal]:
+    # Skip the DB backed initialization since only the settings are needed
+    calculator = CostBasisCalculator.__new__(CostBasisCalculator)
+    calculator.msg_aggregator = MessagesAggregator()
+    calculator.fixed_point = fixed_point
+    calculator.reset(DBSettings(cost_basis_method=method))
+    pnls = PnlTotals(fixed_point=fixed_point)
+
+    start = time.perf_counter()
+    for trade in trades:
+        if trade.is_buy:
+            calculator.obtain_asset(trade)  # type: ignore  # has all needed attributes
+            continue
+
+        cost_basis = calculator.calculate_spend_cost_basis(
+            spending_amount=trade.taxable_amount,
+            spending_asset=trade.asset,
+            timestamp=trade.timestamp,
+        )
+        pnls[AccountingEventType.TRADE] += PNL(
+            taxable=trade.taxable_amount * trade.price - cost_basis.taxable_bought_cost,
+            free=-cost_basis.taxfree_bought_cost,
+        )
+
+    return time.perf_counter() - start, pnls.taxable + pnls.free
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark FVal vs FixedFVal cost basis')
+    parser.add_argument('--trades', type=int, default=1_000_000, help='Number of trades')
+    parser.add_argument('--seed', type=int, default=42, help='Seed of the generated history')
+    parser.add_argument(
+        '--method',
+        choices=[x.serialize() for x in CostBasisMethod],
+        default=CostBasisMethod.FIFO.serialize(),
+        help='The cost basis method to use',
+    )
+    args = parser.parse_args()
+
+    trades = generate_trades(args.trades, args.seed)
+    method = CostBasisMethod.deserialize(args.method)
+    fval_time, fval_pnl = run(trades, method, fixed_point=False)
+    fixed_time, fixed_pnl = run(trades, method, fixed_point=True)
+    print(f'FVal:      {fval_time:.2f} secs. Total PnL: {fval_pnl}')
+    print(f'FixedFVal: {fixed_time:.2f} secs. Total PnL: {fixed_pnl}')
+    print(f'Speedup:   {fval_time / fixed_time:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark the decoding of ethereum transactions on the transactions and receipts
+recorded in a user's DB, one transaction at a time and in batches.
+
+All the transactions of the DB whose receipts are saved are force redecoded, so
+their decoded events are replaced. Only run this on a copy of your data directory.
+No remote queries are made since only transactions with saved receipts are decoded.
+
+Example of execution:
+
+python tools/scripts/benchmark_decoding.py --data-dir ~/data_copy --user foo --password bar
+
+It outputs the decoding throughput in transactions per second to the stdout
+"""
+
+import argparse
+import time
+from pathlib import Path
+from typing import List
+
+from rotkehlchen.assets.resolver import AssetResolver
+from rotkehlchen.chain.ethereum.decoding.decoder import DECODING_BATCH_SIZE, EVMTransactionDecoder
+from rotkehlchen.chain.ethereum.manager import EthereumManager
+from rotkehlchen.chain.ethereum.transactions import EthTransactions
+from rotkehlchen.data_handler import DataHandler
+from rotkehlchen.externalapis.etherscan import Etherscan
+from rotkehlchen.globaldb.handler import GlobalDBHandler
+from rotkehlchen.greenlets import GreenletManager
+from rotkehlchen.types import EVMTxHash
+from rotkehlchen.user_messages import MessagesAggregator
+
+
+def run(decoder: EVMTransactionDecoder, tx_hashes: List[EVMTxHash], batch_size: int) -> float:
+    start = time.perf_counter()
+    decoder.decode_transaction_hashes(
+        ignore_cache=True,
+        tx_hashes=tx_hashes,
+        batch_size=batch_size,
+    )
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark ethereum transactions decoding')
+    parser.add_argument('--data-dir', type=Path, required=True, help='The rotki data directory')
+    parser.add_argument('--user', required=True, help='The user whose DB to use')
+    parser.add_argument('--password', required=True, help='The password of the user')
+    parser.add_argument('--transactions', type=int, default=2000, help='Max transactions to decode')  # noqa: E501
+    parser.add_argument('--batch-size', type=int, default=DECODING_BATCH_SIZE, help='Decoding batch size')  # noqa: E501
+    args = parser.parse_args()
+
+    msg_aggregator = MessagesAggregator()
+    GlobalDBHandler(data_dir=args.data_dir, sql_vm_instructions_cb=0)
+    AssetResolver()
+    data = DataHandler(args.data_dir, msg_aggregator, sql_vm_instructions_cb=0)
+    data.unlock(args.user, args.password, create_new=False, initial_settings=None)
+    etherscan = Etherscan(database=data.db, msg_aggregator=msg_aggregator)
+    ethereum = EthereumManager(
+        etherscan=etherscan,
+        msg_aggregator=msg_aggregator,
+        greenlet_manager=GreenletManager(msg_aggregator=msg_aggregator),
+        connect_at_start=[],
+        database=data.db,
+    )
+    transactions = EthTransactions(ethereum=ethereum, database=data.db)
+    decoder = EVMTransactionDecoder(
+        database=data.db,
+        ethereum_manager=ethereum,
+        transactions=transactions,
+        msg_aggregator=msg_aggregator,
+    )
+    with data.db.conn.read_ctx() as cursor:
+        tx_hashes = [EVMTxHash(x[0]) for x in cursor.execute(
+            'SELECT tx_hash FROM ethtx_receipts LIMIT ?', (args.transactions,),
+        )]
+
+    if len(tx_hashes) == 0:
+        print('No transactions with saved receipts found in the DB')
+        return
+
+    # decode once so that tokens and caches are loaded the same for both runs
+    run(decoder, tx_hashes, batch_size=args.batch_size)
+    for name, batch_size in (('One by one', 1), (f'Batches of {args.batch_size}', args.batch_size)):  # noqa: E501
+        duration = run(decoder, tx_hashes, batch_size=batch_size)
+        print(f'{name:<20} {len(tx_hashes) / duration:.1f} tx/s ({duration:.2f} secs for {len(tx_hashes)} transactions)')  # noqa: E501
+
+
+if __name__ == '__main__':
+    main()